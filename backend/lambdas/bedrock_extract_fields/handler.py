@@ -13,6 +13,18 @@ Quando há textract_documents com conteúdo, a Lambda chama o modelo **uma vez p
 e agrega os resultados em BEDROCK_EXTRACTION. Sem PDF/imagem OCR, mantém-se uma única
 chamada com o prompt completo (ex.: só XML).
 
+Pares chave-valor do Textract FORMS (``forms`` no documento) com confiança ≥ FORMS_MIN_CONFIDENCE
+viram campos já respondidos no prompt (e o texto OCR enviado encolhe). Boleto cujo FORMS já traz
+vencimento e valor do documento não chama o modelo.
+
+As chamadas por arquivo rodam em paralelo (BEDROCK_EXTRACT_WORKERS threads; o gateway ainda limita
+por BEDROCK_MAX_CONCURRENCY) e a etapa leva ~o tempo do documento mais lento. Documento que não
+responde até o prazo (tempo restante da Lambda − BEDROCK_EXTRACT_SAFETY_SECONDS) fica de fora:
+a extração sai parcial, com os demais arquivos, em vez de estourar o timeout. Cada arquivo tem
+ainda o próprio prazo (BEDROCK_EXTRACT_DOC_TIMEOUT_SECONDS a partir de quando começa), repassado ao
+gateway: a thread abandonada para de tentar/dormir e libera a vaga do Bedrock. A ordem do merge
+segue a ordem dos documentos, não a de chegada das respostas.
+
 Input:  { "process_id": "..." }
 Output: { "process_id": "...", "fields_extracted": true/false }
 """
@@ -22,11 +34,19 @@ from __future__ import annotations
 import json
 import logging
 import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
 from typing import Any, Optional
 
 import boto3
 
+from utils.blob_store import offload_large_attributes
+from utils.bedrock_gateway import invoke_text
+from utils.boleto_duplicatas import document_source_kind
+from utils.process_snapshot import ProcessSnapshot
+
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
@@ -72,6 +92,94 @@ Se o valor não puder ser determinado com confiança, use null.
 """
 
 
+FORMS_MIN_CONFIDENCE = float(os.environ.get("FORMS_MIN_CONFIDENCE", "85"))
+# Texto OCR enviado por documento; encolhe quando o FORMS já respondeu campos.
+SINGLE_DOC_TEXT_CHARS = 8000
+SINGLE_DOC_TEXT_CHARS_WITH_FORMS = 4000
+_MAX_FORM_PAIRS_IN_PROMPT = 40
+BEDROCK_EXTRACT_WORKERS = max(1, int(os.environ.get("BEDROCK_EXTRACT_WORKERS", "4")))
+# Reserva para gravar BEDROCK_EXTRACTION / PARSED_OCR depois do fan-out.
+BEDROCK_EXTRACT_SAFETY_SECONDS = float(os.environ.get("BEDROCK_EXTRACT_SAFETY_SECONDS", "20"))
+# Prazo de cada arquivo (retries e backoff incluídos), limitado pelo prazo da Lambda.
+BEDROCK_EXTRACT_DOC_TIMEOUT_SECONDS = float(os.environ.get("BEDROCK_EXTRACT_DOC_TIMEOUT_SECONDS", "120"))
+
+# Rótulo do FORMS → campo do schema (primeiro par confiável de cada campo vence)
+_FORM_FIELD_LABELS: tuple[tuple[str, re.Pattern[str]], ...] = (
+    ("vencimento", re.compile(r"\bvencimento\b", re.I)),
+    ("valorVencimento", re.compile(r"valor\s+(do\s+)?documento|valor\s+cobrado", re.I)),
+    ("dataEmissao", re.compile(r"data\s+(de\s+|da\s+)?emiss[aã]o", re.I)),
+    ("chaveAcesso", re.compile(r"chave\s+de\s+acesso", re.I)),
+    ("documento", re.compile(r"n[uú]mero\s+da\s+(nota|nfs-?e)|n[º°o]\.?\s+da\s+nota", re.I)),
+    ("cnpjEmitente", re.compile(r"cnpj.*(benefici[aá]rio|emitente|prestador)|(benefici[aá]rio|emitente|prestador).*cnpj", re.I)),
+)
+_BR_DATE = re.compile(r"\b(\d{2})/(\d{2})/(\d{4})\b")
+_BR_MONEY = re.compile(r"\d{1,3}(?:\.\d{3})*,\d{2}|\d+,\d{2}")
+
+
+def _form_value(field: str, value: str) -> Any:
+    """Valor do FORMS normalizado para o schema, ou None se não tiver o formato esperado."""
+    digits = re.sub(r"\D", "", value)
+    if field in ("vencimento", "dataEmissao"):
+        m = _BR_DATE.search(value)
+        if not m:
+            return None
+        return f"{m.group(1)}/{m.group(2)}/{m.group(3)}" if field == "vencimento" else f"{m.group(3)}{m.group(2)}{m.group(1)}"
+    if field == "valorVencimento":
+        m = _BR_MONEY.search(value)
+        return float(m.group(0).replace(".", "").replace(",", ".")) if m else None
+    if field == "chaveAcesso":
+        return digits if len(digits) == 44 else None
+    if field == "cnpjEmitente":
+        return digits if len(digits) == 14 else None
+    if field == "documento":
+        return digits.lstrip("0") or None
+    return None
+
+
+def _confident_forms(forms: Any) -> list[dict]:
+    return [
+        f for f in forms or []
+        if isinstance(f, dict) and f.get("key") and f.get("value")
+        and float(f.get("confidence") or 0) >= FORMS_MIN_CONFIDENCE
+    ]
+
+
+def _form_answers(forms: Any) -> dict[str, Any]:
+    """
+    Campos do schema já respondidos por pares chave-valor confiáveis do Textract FORMS.
+    Campo com valores distintos (carnê, várias parcelas no mesmo PDF) fica de fora: o modelo lê.
+    """
+    values: dict[str, set] = {}
+    answers: dict[str, Any] = {}
+    for pair in _confident_forms(forms):
+        for field, label in _FORM_FIELD_LABELS:
+            if not label.search(pair["key"]):
+                continue
+            normalized = _form_value(field, str(pair["value"]))
+            if normalized is not None:
+                values.setdefault(field, set()).add(normalized)
+                answers.setdefault(field, normalized)
+    return {field: value for field, value in answers.items() if len(values[field]) == 1}
+
+
+def _extraction_from_forms(doc: dict) -> Optional[dict[str, Any]]:
+    """
+    Boleto com um único vencimento e valor do documento no FORMS: o JSON por arquivo sai direto,
+    sem Bedrock (campos fiscais nulos — boleto não é nota; só CNPJ do beneficiário se rotulado).
+    Várias parcelas seguem para o prompt, que devolve todas as duplicatas.
+    """
+    if document_source_kind(doc.get("file_name")) != "boleto":
+        return None
+    answers = _form_answers(doc.get("forms"))
+    if "vencimento" not in answers or "valorVencimento" not in answers:
+        return None
+    out: dict[str, Any] = {k: None for k in _FISCAL_MERGE_KEYS}
+    out["cnpjEmitente"] = answers.get("cnpjEmitente")
+    out["duplicatas"] = [{"vencimento": answers["vencimento"], "valorVencimento": answers["valorVencimento"]}]
+    out["itens"] = []
+    return out
+
+
 def _pedido_uso_e_consumo(pedido_metadata: Optional[dict]) -> bool:
     if not isinstance(pedido_metadata, dict):
         return False
@@ -202,8 +310,20 @@ def _build_prompt_single_doc(
         parts.append("")
 
     fn = doc.get("file_name", "?")
+    answers = _form_answers(doc.get("forms"))
+    pairs = _confident_forms(doc.get("forms"))
+    if answers:
+        parts.append(f"#### Campos já lidos no formulário (Textract FORMS, confiança ≥ {FORMS_MIN_CONFIDENCE:.0f}%)")
+        parts.append("Use estes valores como estão; procure no texto apenas os demais campos.")
+        parts.append(json.dumps(answers, ensure_ascii=False, default=str))
+        parts.append("")
+    if pairs:
+        parts.append("#### Pares chave-valor (Textract FORMS)")
+        parts.extend(f"{p['key']}: {p['value']}" for p in pairs[:_MAX_FORM_PAIRS_IN_PROMPT])
+        parts.append("")
+    text_chars = SINGLE_DOC_TEXT_CHARS_WITH_FORMS if answers else SINGLE_DOC_TEXT_CHARS
     parts.append(f"#### Documento (único alvo): {fn}")
-    parts.append((doc.get("raw_text") or "")[:8000])
+    parts.append((doc.get("raw_text") or "")[:text_chars])
     if doc.get("tables"):
         parts.append(f"Tabelas ({len(doc['tables'])}):")
         parts.append(json.dumps(doc["tables"][:5], ensure_ascii=False, default=str)[:6000])
@@ -348,56 +468,103 @@ def _merge_bedrock_extractions(
     return merged
 
 
-def _invoke_bedrock(prompt: str) -> Optional[str]:
-    bedrock_client = boto3.client("bedrock-runtime", region_name="us-east-1")
-    model_id = os.environ.get("BEDROCK_MODEL_ID", "amazon.nova-pro-v1:0")
-
-    response = bedrock_client.invoke_model(
-        modelId=model_id,
-        contentType="application/json",
-        accept="application/json",
-        body=json.dumps({
-            "messages": [{"role": "user", "content": [{"text": prompt}]}],
-            "inferenceConfig": {
-                "maxTokens": 4096,
-                "temperature": 0.1,
-            },
-        }),
-    )
-
-    result = json.loads(response["body"].read())
-    text = result.get("output", {}).get("message", {}).get("content", [{}])[0].get("text", "")
+def _invoke_bedrock(prompt: str, deadline: Optional[float] = None) -> Optional[str]:
+    text = invoke_text(
+        prompt, {"maxTokens": 4096, "temperature": 0.1}, label="bedrock_extract_fields", deadline=deadline
+    ).text
     return text.strip() if text else None
 
 
+def _extract_single_doc(
+    doc: dict[str, Any],
+    merged_data: dict[str, Any],
+    pedido_metadata: Optional[dict[str, Any]],
+    deadline: Optional[float] = None,
+) -> tuple[Optional[dict[str, Any]], str]:
+    """
+    (campos, origem) de um arquivo: Textract FORMS quando basta, senão uma chamada ao Bedrock.
+    Prazo do arquivo = início + BEDROCK_EXTRACT_DOC_TIMEOUT_SECONDS, sem passar de ``deadline``;
+    esgotado, origem ``"timeout"``.
+    """
+    fn = (doc.get("file_name") or "").strip() or "sem_nome"
+    parsed = _extraction_from_forms(doc)
+    if parsed:
+        logger.info("Bedrock dispensado para %s: boleto respondido pelo Textract FORMS", fn)
+        return parsed, "textract_forms"
+    doc_deadline = time.monotonic() + BEDROCK_EXTRACT_DOC_TIMEOUT_SECONDS
+    if deadline is not None:
+        doc_deadline = min(doc_deadline, deadline)
+    try:
+        raw = _invoke_bedrock(_build_prompt_single_doc(merged_data, doc, pedido_metadata), deadline=doc_deadline)
+    except TimeoutError as e:
+        logger.warning("Bedrock per-file %s: %s", fn, e)
+        return None, "timeout"
+    return _parse_bedrock_json(raw or ""), "bedrock"
+
+
+def _extraction_deadline(context) -> Optional[float]:
+    """Instante (monotonic) limite para as respostas por arquivo; None sem contexto da Lambda."""
+    if context is None or not hasattr(context, "get_remaining_time_in_millis"):
+        return None
+    remaining = context.get_remaining_time_in_millis() / 1000.0 - BEDROCK_EXTRACT_SAFETY_SECONDS
+    return time.monotonic() + max(remaining, 0.0)
+
+
+def _extract_docs_parallel(
+    docs: list[dict[str, Any]],
+    merged_data: dict[str, Any],
+    pedido_metadata: Optional[dict[str, Any]],
+    context,
+) -> list[tuple[Optional[dict[str, Any]], str]]:
+    """
+    Extrai cada documento em uma thread e devolve os resultados **na ordem de ``docs``**.
+    Origem ``"timeout"`` para quem não respondeu até o prazo; exceção de uma chamada sobe como no
+    laço sequencial (a Step Function faz o retry).
+    """
+    deadline = _extraction_deadline(context)
+    started = time.monotonic()
+    pool = ThreadPoolExecutor(max_workers=min(BEDROCK_EXTRACT_WORKERS, len(docs)))
+    try:
+        futures = [pool.submit(_extract_single_doc, doc, merged_data, pedido_metadata, deadline) for doc in docs]
+        timeout = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+        wait(futures, timeout=timeout)
+    finally:
+        # Não espera threads presas: a Lambda congela o container ao retornar.
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    results: list[tuple[Optional[dict[str, Any]], str]] = []
+    for fut in futures:
+        if not fut.done() or fut.cancelled():
+            results.append((None, "timeout"))
+        else:
+            results.append(fut.result())
+    logger.info(
+        "Bedrock per-file: %d/%d documento(s) extraídos em %.1fs",
+        sum(1 for parsed, _ in results if parsed), len(docs), time.monotonic() - started,
+    )
+    return results
+
+
 def handler(event, context):
     process_id = event["process_id"]
     pk = f"PROCESS#{process_id}"
 
     logger.info("bedrock_extract_fields start: process_id=%s", process_id)
 
-    items = table.query(
-        KeyConditionExpression="PK = :pk",
-        ExpressionAttributeValues={":pk": pk},
-    )["Items"]
-    items_by_sk = {it["SK"]: it for it in items}
+    snapshot = ProcessSnapshot.load(table, process_id)
 
     # Load MERGED_EXTRACTION
-    merged_item = items_by_sk.get("MERGED_EXTRACTION")
+    merged_item = snapshot.merged_item
     if not merged_item or not merged_item.get("MERGED_DATA"):
         logger.warning("MERGED_EXTRACTION not found — skipping Bedrock extraction")
         return {"process_id": process_id, "fields_extracted": False}
 
-    merged_data = json.loads(merged_item["MERGED_DATA"])
+    merged_data = snapshot.merged_data
+    if merged_data is None:
+        raise ValueError("MERGED_DATA inválido (JSON)")
 
     # Load pedido de compra metadata (optional enrichment)
-    pedido_item = items_by_sk.get("PEDIDO_COMPRA_METADATA")
-    pedido_metadata = None
-    if pedido_item and pedido_item.get("METADADOS"):
-        try:
-            pedido_metadata = json.loads(pedido_item["METADADOS"])
-        except Exception:
-            pass
+    pedido_metadata = snapshot.pedido_compra
 
     ts = int(datetime.now().timestamp())
     docs_for_llm = _textract_docs_with_content(merged_data)
@@ -407,10 +574,8 @@ def handler(event, context):
 
     if docs_for_llm:
         logger.info("Bedrock per-file: %d documento(s) Textract", len(docs_for_llm))
-        for doc in docs_for_llm:
-            sprompt = _build_prompt_single_doc(merged_data, doc, pedido_metadata)
-            raw = _invoke_bedrock(sprompt)
-            parsed = _parse_bedrock_json(raw or "")
+        results = _extract_docs_parallel(docs_for_llm, merged_data, pedido_metadata, context)
+        for doc, (parsed, source) in zip(docs_for_llm, results):
             fn = (doc.get("file_name") or "").strip() or "sem_nome"
             uid = (doc.get("file_upload_id") or "").strip()
             storage_key = uid if uid else fn
@@ -420,12 +585,15 @@ def handler(event, context):
                     "SK": f"BEDROCK_EXTRACTION#{storage_key}",
                     "FILE_NAME": fn,
                     "EXTRACTED_FIELDS": json.dumps(parsed, ensure_ascii=False, default=str),
+                    "EXTRACTION_SOURCE": source,
                     "TIMESTAMP": ts,
                 }
                 if uid:
                     bedrock_item["FILE_UPLOAD_ID"] = uid
                 table.put_item(Item=bedrock_item)
                 per_file_extracted.append((fn, parsed))
+            elif source == "timeout":
+                logger.warning("Bedrock per-file sem resposta no prazo: %s", storage_key)
             else:
                 logger.warning("Bedrock per-file inválido ou vazio: %s", storage_key)
 
@@ -434,6 +602,8 @@ def handler(event, context):
                 per_file_extracted,
                 prefer_fiscal_doc=_pedido_uso_e_consumo(pedido_metadata),
             )
+        elif any(source == "timeout" for _, source in results):
+            logger.error("Nenhum arquivo extraído dentro do prazo — sem tempo para o prompt agregado")
         else:
             logger.warning("Todas as extrações por arquivo falharam — prompt agregado")
             prompt = _build_prompt(merged_data, pedido_metadata)
@@ -473,10 +643,10 @@ def handler(event, context):
     )
 
     # Espelha em PARSED_OCR=textract_merged: consolidado + por arquivo em per_document
-    ocr_merged = items_by_sk.get("PARSED_OCR=textract_merged")
+    ocr_merged = snapshot.get("PARSED_OCR=textract_merged")
     if ocr_merged and ocr_merged.get("PARSED_DATA"):
         try:
-            pd = json.loads(ocr_merged["PARSED_DATA"])
+            pd = snapshot.json(ocr_merged, "PARSED_DATA")
             if isinstance(pd, dict):
                 pd["documento_entrada_protheus"] = extracted
                 pd["_campos_estruturados_fonte"] = "bedrock"
@@ -492,14 +662,14 @@ def handler(event, context):
                         row["documento_entrada_protheus"] = by_key[rid]
                     elif rfn and rfn in by_key:
                         row["documento_entrada_protheus"] = by_key[rfn]
-                table.put_item(Item={
+                table.put_item(Item=offload_large_attributes({
                     "PK": pk,
                     "SK": "PARSED_OCR=textract_merged",
                     "FILE_NAME": ocr_merged.get("FILE_NAME", "textract_merged"),
                     "PARSED_DATA": json.dumps(pd, ensure_ascii=False, default=str),
                     "SOURCE": ocr_merged.get("SOURCE", "TEXTRACT"),
                     "TIMESTAMP": ts,
-                })
+                }))
                 logger.info("PARSED_OCR=textract_merged updated with documento_entrada_protheus")
         except Exception as e:
             logger.warning("Could not mirror Bedrock JSON into PARSED_OCR: %s", e)
@@ -0,0 +1,95 @@
+"""
+Lambda: textract_completion (mesmo pacote/bundle do extract_documents)
+
+Recebe a notificação SNS do Textract (NotificationChannel do StartDocumentAnalysis em modo
+callback), lê o task token gravado pelo extract_documents (TEXTRACT_CALLBACK#{JobTag}), busca
+todas as páginas do resultado, grava TEXTRACT# e devolve o token ao Step Functions — a iteração
+do Map segue sem nenhuma Lambda parada esperando o job.
+
+Mensagem SNS (Message, JSON):
+  { "JobId": "...", "Status": "SUCCEEDED" | "FAILED" | "ERROR" | "PARTIAL_SUCCESS",
+    "API": "StartDocumentAnalysis", "JobTag": "...", "Timestamp": ..., "DocumentLocation": {...} }
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from datetime import datetime
+
+try:
+    from extract_documents import handler as extract
+except ImportError:  # runtime Lambda: handler.py na raiz do bundle
+    import handler as extract
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+_SUCCESS_STATUSES = {"SUCCEEDED", "PARTIAL_SUCCESS"}
+
+
+def _mark_failed(pk: str, file_sk: str, error: str) -> None:
+    extract.table.update_item(
+        Key={"PK": pk, "SK": file_sk},
+        UpdateExpression="SET #st = :st, extraction_error = :err",
+        ExpressionAttributeNames={"#st": "STATUS"},
+        ExpressionAttributeValues={":st": "EXTRACTION_FAILED", ":err": error[:500]},
+    )
+
+
+def complete_job(message: dict) -> str:
+    """Processa uma notificação de job; retorna o desfecho (succeeded / failed / unknown_job)."""
+    job_id = message.get("JobId", "")
+    status = message.get("Status", "")
+    job_tag = message.get("JobTag") or ""
+    key = extract.textract_callback_key(job_tag)
+    callback = extract.table.get_item(Key=key).get("Item") if job_tag else None
+    if not callback:
+        logger.warning("Textract job %s (tag=%r) sem callback registrado — ignorando", job_id, job_tag)
+        return "unknown_job"
+
+    token = callback["TASK_TOKEN"]
+    process_id = callback["PROCESS_ID"]
+    pk = f"PROCESS#{process_id}"
+    fname = callback["FILE_NAME"]
+    file_sk = callback["FILE_SK"]
+    try:
+        if status not in _SUCCESS_STATUSES:
+            raise RuntimeError(f"Textract job {job_id} terminou com status {status}")
+        resp = extract._collect_textract_pages(job_id, extract._get_document_analysis(job_id))
+        raw_text, tables_data, forms_data = extract._extract_text_tables_and_forms(resp.get("Blocks", []))
+        hints = extract._persist_extraction_like_textract(
+            pk,
+            file_sk,
+            fname,
+            callback["FILE_KEY"],
+            raw_text,
+            tables_data,
+            job_id,
+            int(datetime.now().timestamp()),
+            forms_data=forms_data,
+        )
+        extract.put_cached_ocr(
+            extract.table, callback.get("CONTENT_SHA256"), raw_text, tables_data, hints, None, job_id,
+            forms_data=forms_data,
+        )
+    except Exception as exc:
+        logger.error("Textract callback falhou para %s (job=%s): %s", fname, job_id, exc, exc_info=True)
+        _mark_failed(pk, file_sk, str(exc))
+        extract.sfn.send_task_failure(taskToken=token, error="TextractJobFailed", cause=str(exc)[:32768])
+        extract.table.delete_item(Key=key)
+        return "failed"
+
+    output = {"process_id": process_id, "file_name": fname, "extracted_count": 1, "rejected": []}
+    extract.sfn.send_task_success(taskToken=token, output=json.dumps(output))
+    extract.table.delete_item(Key=key)
+    logger.info("Textract callback concluído: %s (job=%s, %d chars)", fname, job_id, len(raw_text))
+    return "succeeded"
+
+
+def handler(event, context):
+    outcomes = []
+    for record in event.get("Records", []):
+        message = json.loads(record["Sns"]["Message"])
+        outcomes.append(complete_job(message))
+    return {"processed": len(outcomes), "outcomes": outcomes}
@@ -10,14 +10,22 @@ Input (from Step Functions):
 Behaviour:
   1. Query all FILE# items for the process.
   2. Skip files already classified as NF-e XML (ends with .xml — parse_xml handles those).
-  3. Para PDF / IMAGE: Textract AnalyzeDocument (TABLES+FORMS) ou StartDocumentAnalysis; se o PDF
+  3. PDF com camada de texto nativa boa (densidade, chave de 44 dígitos, CNPJ — utils.pdf_text_layer):
+     grava direto, sem Textract (TEXTRACT_MODE=pdf_text_layer).
+     Para PDF / IMAGE: Textract AnalyzeDocument (TABLES+FORMS; pares chave-valor → FORMS_DATA) ou StartDocumentAnalysis (todas as
+     páginas do resultado via NextToken; poll com backoff). Se o job não termina no tempo da Lambda,
+     o modo Map devolve ``textract_pending`` + ``textract_job_id`` e o Step Functions retoma. Em modo
+     callback (``task_token`` no evento + TEXTRACT_COMPLETION_TOPIC_ARN) o job publica no SNS e a
+     Lambda retorna logo; completion.py grava o resultado e devolve o token. Se o PDF
      for rejeitado com UnsupportedDocumentException, tenta DetectDocumentText (só texto, sem tabelas).
      Se DetectDocumentText no PDF original também falhar com UnsupportedDocumentException, rasteriza
      cada página com PyMuPDF → PNG e chama DetectDocumentText por página (texto agregado; sem tabelas).
-  4. Antes do Textract, PDFs são inspecionados em bytes (heurística XFA/Encrypt etc.) e o resultado vai
+  4. Cache de OCR por conteúdo (utils.ocr_cache, OCR_CACHE#{CONTENT_SHA256}): mesmo arquivo em outro
+     processo ou reprocessado reaproveita texto/tabelas/hints e não chama o Textract.
+  5. Antes do Textract, PDFs são inspecionados em bytes (heurística XFA/Encrypt etc.) e o resultado vai
      para os logs CloudWatch para comparar com outros anexos que funcionam.
-  5. Para .txt: lê UTF-8 do S3 (sem Textract), grava mesmo schema TEXTRACT# (merge + Bedrock iguais ao PDF).
-  6. DOCX: marcado REJECTED (Textract não suporta DOCX nativamente).
+  6. Para .txt: lê UTF-8 do S3 (sem Textract), grava mesmo schema TEXTRACT# (merge + Bedrock iguais ao PDF).
+  7. DOCX: marcado REJECTED (Textract não suporta DOCX nativamente).
 
 Output:
   { "process_id": "...", "extracted_count": N, "rejected": [...] }
@@ -29,11 +37,18 @@ import json
 import logging
 import os
 import time
+import uuid
 from datetime import datetime
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
 
+from utils.blob_store import offload_large_attributes
+from utils.dynamo_query import iter_partition
+from utils.json_codec import encode_item
+from utils.ocr_cache import get_cached_ocr, put_cached_ocr
+from utils.pdf_text_layer import text_layer_response
 from utils.pdf_textract_precheck import diagnose_pdf_bytes
 from utils.protheus_hints import hints_from_textract_text
 
@@ -44,15 +59,28 @@ logger.setLevel(logging.INFO)
 # Usar região explícita (padrão us-east-1) e AnalyzeDocument com Bytes após get_object no S3 local.
 TEXTRACT_REGION = os.environ.get("TEXTRACT_REGION", "us-east-1")
 TEXTRACT_ASYNC_STAGING_BUCKET = os.environ.get("TEXTRACT_ASYNC_STAGING_BUCKET", "").strip()
+# Modo callback: StartDocumentAnalysis com NotificationChannel (SNS na região do Textract) e retorno
+# imediato; textract_completion grava o resultado e devolve o task token do Step Functions.
+TEXTRACT_COMPLETION_TOPIC_ARN = os.environ.get("TEXTRACT_COMPLETION_TOPIC_ARN", "").strip()
+TEXTRACT_NOTIFICATION_ROLE_ARN = os.environ.get("TEXTRACT_NOTIFICATION_ROLE_ARN", "").strip()
 
 s3 = boto3.client("s3")
 textract = boto3.client("textract", region_name=TEXTRACT_REGION)
+sfn = boto3.client("stepfunctions")
 dynamodb = boto3.resource("dynamodb")
 table = dynamodb.Table(os.environ["TABLE_NAME"])
 
 TEXTRACT_SUPPORTED_EXTENSIONS = {".pdf", ".png", ".jpg", ".jpeg", ".tiff", ".tif"}
 PLAIN_TEXT_EXTENSIONS = {".txt"}
 TEXTRACT_MAX_SYNC_BYTES = 10 * 1024 * 1024  # 10 MB sync limit
+# Staging do Textract assíncrono: CopyObject único até 5 GB; acima disso o copy gerenciado usa UploadPartCopy.
+TEXTRACT_STAGING_COPY_CONFIG = TransferConfig(multipart_threshold=5 * 1024 ** 3)
+# Async: poll com backoff (1s, 2s, 4s… até 16s) enquanto couber no tempo da Lambda.
+TEXTRACT_POLL_INITIAL_SECONDS = 1.0
+TEXTRACT_POLL_MAX_SECONDS = 16.0
+TEXTRACT_ASYNC_SAFETY_SECONDS = 30.0
+TEXTRACT_ASYNC_MAX_WAIT_SECONDS = float(os.environ.get("TEXTRACT_ASYNC_MAX_WAIT_SECONDS", "240"))
+_TEXTRACT_THROTTLE_CODES = {"ThrottlingException", "ProvisionedThroughputExceededException"}
 PLAIN_TEXT_MAX_BYTES = TEXTRACT_MAX_SYNC_BYTES
 
 
@@ -79,6 +107,9 @@ def _run_textract_sync(bucket: str, key: str):
 
     Se o PDF original também for rejeitado por DetectDocumentText (UnsupportedDocumentException), tenta rasterizar
     páginas (PyMuPDF) e DetectDocumentText em cada PNG (NFSe / codecs internos incompatíveis).
+
+    Antes de tudo, PDFs com camada de texto nativa de boa qualidade (utils.pdf_text_layer) não passam
+    pelo Textract: TEXTRACT_MODE=pdf_text_layer, mesmo schema TEXTRACT#.
     """
     obj = s3.get_object(Bucket=bucket, Key=key)
     body = obj["Body"].read()
@@ -96,6 +127,10 @@ def _run_textract_sync(bucket: str, key: str):
             key,
             json.dumps(diag, ensure_ascii=False, default=str),
         )
+        # PDF gerado digitalmente: camada de texto nativa bastando, não chama o Textract
+        layer = text_layer_response(body, key, log=logger)
+        if layer is not None:
+            return layer
 
     try:
         resp = textract.analyze_document(
@@ -183,68 +218,276 @@ def _run_textract_sync(bucket: str, key: str):
                 ) from raster_err
 
 
-def _run_textract_async(bucket: str, key: str):
-    """StartDocumentAnalysis → poll until done. Requer bucket de staging na mesma região do Textract."""
+def textract_callback_key(job_tag: str) -> dict:
+    """Item com o task token de um job Textract em modo callback (JobTag → token)."""
+    return {"PK": f"TEXTRACT_CALLBACK#{job_tag}", "SK": "CALLBACK"}
+
+
+def _callback_mode_enabled() -> bool:
+    return bool(TEXTRACT_COMPLETION_TOPIC_ARN and TEXTRACT_NOTIFICATION_ROLE_ARN)
+
+
+def _content_hash(head: dict) -> str | None:
+    """Hash do conteúdo a partir do HeadObject (SHA-256 do S3 se houver; senão ETag)."""
+    checksum = head.get("ChecksumSHA256")
+    if checksum:
+        return "sha256-" + checksum.rstrip("=").replace("/", "_").replace("+", "-")
+    etag = str(head.get("ETag") or "").strip('"')
+    return f"etag-{etag}" if etag else None
+
+
+def _staging_exists(s3_tx, staging_key: str) -> bool:
+    try:
+        s3_tx.head_object(Bucket=TEXTRACT_ASYNC_STAGING_BUCKET, Key=staging_key)
+        return True
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound", "403"):
+            return False
+        raise
+
+
+def _stage_for_textract(bucket: str, key: str) -> str:
+    """
+    Coloca o PDF no bucket de staging (região do Textract) sem passar os bytes pela Lambda.
+
+    Chave = hash do conteúdo: reprocessar o mesmo arquivo reaproveita o objeto já copiado. Cópia
+    server-side (CopyObject / UploadPartCopy); se a cópia entre regiões for negada, faz streaming
+    do GetObject para o upload multipart (sem carregar o PDF inteiro em memória).
+    """
+    s3_tx = boto3.client("s3", region_name=TEXTRACT_REGION)
+    head = s3.head_object(Bucket=bucket, Key=key, ChecksumMode="ENABLED")
+    ext = os.path.splitext(key)[1].lower()
+    content_hash = _content_hash(head)
+    if content_hash:
+        staging_key = f"textract-staging/{content_hash}{ext}"
+        if _staging_exists(s3_tx, staging_key):
+            logger.info("Textract staging reaproveitado: %s", staging_key)
+            return staging_key
+    else:
+        staging_key = f"textract-staging/{int(time.time())}-{os.path.basename(key)}"
+
+    try:
+        s3_tx.copy(
+            {"Bucket": bucket, "Key": key},
+            TEXTRACT_ASYNC_STAGING_BUCKET,
+            staging_key,
+            SourceClient=s3,
+            Config=TEXTRACT_STAGING_COPY_CONFIG,
+        )
+    except ClientError as e:
+        source_region = s3.meta.region_name
+        if source_region == TEXTRACT_REGION:
+            raise
+        logger.warning(
+            "Cópia server-side %s → %s falhou (%s); streaming entre regiões",
+            source_region,
+            TEXTRACT_REGION,
+            e.response.get("Error", {}).get("Code"),
+        )
+        body = s3.get_object(Bucket=bucket, Key=key)["Body"]
+        s3_tx.upload_fileobj(body, TEXTRACT_ASYNC_STAGING_BUCKET, staging_key)
+    return staging_key
+
+
+def _start_textract_async(bucket: str, key: str, job_tag: str | None = None) -> str:
+    """
+    Copia o PDF para o staging (região do Textract) e dispara StartDocumentAnalysis.
+
+    Com ``job_tag`` o job publica a conclusão no SNS do modo callback (JobTag volta na mensagem).
+    """
     if not TEXTRACT_ASYNC_STAGING_BUCKET:
         raise RuntimeError(
             "PDF maior que o limite síncrono: defina TEXTRACT_ASYNC_STAGING_BUCKET "
             f"(bucket na região {TEXTRACT_REGION}, mesma do Textract) para análise assíncrona."
         )
-    obj = s3.get_object(Bucket=bucket, Key=key)
-    body = obj["Body"].read()
-    staging_key = f"textract-staging/{int(time.time())}-{os.path.basename(key)}"
-    s3_tx = boto3.client("s3", region_name=TEXTRACT_REGION)
-    s3_tx.put_object(Bucket=TEXTRACT_ASYNC_STAGING_BUCKET, Key=staging_key, Body=body)
-    start = textract.start_document_analysis(
-        DocumentLocation={
+    staging_key = _stage_for_textract(bucket, key)
+    kwargs = {
+        "DocumentLocation": {
             "S3Object": {"Bucket": TEXTRACT_ASYNC_STAGING_BUCKET, "Name": staging_key}
         },
-        FeatureTypes=["TABLES", "FORMS"],
-    )
+        "FeatureTypes": ["TABLES", "FORMS"],
+    }
+    if job_tag:
+        kwargs["JobTag"] = job_tag
+        kwargs["NotificationChannel"] = {
+            "SNSTopicArn": TEXTRACT_COMPLETION_TOPIC_ARN,
+            "RoleArn": TEXTRACT_NOTIFICATION_ROLE_ARN,
+        }
+    start = textract.start_document_analysis(**kwargs)
     job_id = start["JobId"]
     logger.info("Textract async job started: %s for %s", job_id, key)
+    return job_id
+
+
+def _async_deadline(context) -> float:
+    """Instante (monotonic) até o qual dá para esperar o job, reservando tempo para gravar o resultado."""
+    budget = TEXTRACT_ASYNC_MAX_WAIT_SECONDS
+    if context is not None and hasattr(context, "get_remaining_time_in_millis"):
+        remaining = context.get_remaining_time_in_millis() / 1000.0 - TEXTRACT_ASYNC_SAFETY_SECONDS
+        budget = min(budget, max(remaining, 0.0))
+    return time.monotonic() + budget
+
+
+def _get_document_analysis(job_id: str, next_token: str | None = None) -> dict:
+    kwargs = {"JobId": job_id, "MaxResults": 1000}
+    if next_token:
+        kwargs["NextToken"] = next_token
+    return textract.get_document_analysis(**kwargs)
+
+
+def _collect_textract_pages(job_id: str, first: dict) -> dict:
+    """Junta os Blocks de todas as páginas do resultado (segue NextToken)."""
+    blocks = list(first.get("Blocks", []))
+    next_token = first.get("NextToken")
+    pages = 1
+    while next_token:
+        page = _get_document_analysis(job_id, next_token)
+        blocks.extend(page.get("Blocks", []))
+        next_token = page.get("NextToken")
+        pages += 1
+    logger.info("Textract job %s: %d página(s) de resultado, %d blocks", job_id, pages, len(blocks))
+    result = {k: v for k, v in first.items() if k not in ("Blocks", "NextToken")}
+    result["Blocks"] = blocks
+    return result
+
 
+def _run_textract_async(bucket: str, key: str, context=None, job_id: str | None = None):
+    """
+    StartDocumentAnalysis (ou retoma ``job_id``) → poll com backoff exponencial até o prazo.
+
+    Retorna (job_id, resposta com todos os Blocks) ou (job_id, None) se o job ainda está em
+    andamento quando o prazo (tempo restante da Lambda) acaba — o chamador devolve o marcador
+    de progresso e o Step Functions reinvoca com ``textract_job_id``.
+    """
+    if not job_id:
+        job_id = _start_textract_async(bucket, key)
+    deadline = _async_deadline(context)
+    delay = TEXTRACT_POLL_INITIAL_SECONDS
     while True:
-        time.sleep(3)
-        result = textract.get_document_analysis(JobId=job_id)
+        try:
+            result = _get_document_analysis(job_id)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") not in _TEXTRACT_THROTTLE_CODES:
+                raise
+            result = {"JobStatus": "IN_PROGRESS"}
         status = result["JobStatus"]
-        if status == "SUCCEEDED":
-            return job_id, result
+        if status in ("SUCCEEDED", "PARTIAL_SUCCESS"):
+            if status == "PARTIAL_SUCCESS":
+                logger.warning("Textract job %s PARTIAL_SUCCESS: %s", job_id, result.get("Warnings"))
+            return job_id, _collect_textract_pages(job_id, result)
         if status == "FAILED":
             raise RuntimeError(f"Textract job {job_id} failed: {result.get('StatusMessage')}")
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            logger.info("Textract job %s ainda em andamento; devolvendo marcador para retomada", job_id)
+            return job_id, None
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, TEXTRACT_POLL_MAX_SECONDS)
 
 
-def _extract_text_and_tables(blocks: list[dict]) -> tuple[str, list[dict]]:
-    """Pull raw text (LINE blocks) and table structures from Textract response."""
-    lines: list[str] = []
-    tables: list[dict] = []
+def _start_textract_callback(event: dict, bucket: str, content_sha256: str = "") -> str:
+    """
+    Grava o task token (chave = JobTag novo) e dispara o job com NotificationChannel.
+
+    O token é gravado antes do StartDocumentAnalysis: a notificação nunca chega antes dele.
+    """
+    job_tag = uuid.uuid4().hex
+    key = textract_callback_key(job_tag)
+    table.put_item(Item={
+        **key,
+        "TASK_TOKEN": event["task_token"],
+        "PROCESS_ID": event["process_id"],
+        "FILE_NAME": event["file_name"],
+        "FILE_KEY": event["file_key"],
+        "FILE_SK": event["file_sk"],
+        "CONTENT_SHA256": content_sha256,
+        "TIMESTAMP": int(datetime.now().timestamp()),
+    })
+    try:
+        return _start_textract_async(bucket, event["file_key"], job_tag=job_tag)
+    except Exception:
+        table.delete_item(Key=key)
+        raise
 
-    block_map = {b["Id"]: b for b in blocks}
 
+def _block_text(block: dict, block_map: dict[str, dict]) -> str:
+    """Texto dos filhos WORD (e marcação de SELECTION_ELEMENT) de um CELL / KEY / VALUE."""
+    words: list[str] = []
+    for rel in block.get("Relationships", []):
+        if rel["Type"] != "CHILD":
+            continue
+        for cid in rel["Ids"]:
+            child = block_map.get(cid)
+            if not child:
+                continue
+            if child["BlockType"] == "WORD":
+                words.append(child.get("Text", ""))
+            elif child["BlockType"] == "SELECTION_ELEMENT":
+                words.append("[X]" if child.get("SelectionStatus") == "SELECTED" else "[ ]")
+    return " ".join(words)
+
+
+def _extract_text_tables_and_forms(blocks: list[dict]) -> tuple[str, list[dict], list[dict]]:
+    """
+    Uma passada no grafo de blocos do Textract: texto (LINE), tabelas (TABLE → CELL) e pares
+    chave-valor do FORMS (KEY_VALUE_SET KEY → VALUE), cada par com a menor confiança entre
+    chave e valor.
+    """
+    lines: list[str] = []
+    table_blocks: list[dict] = []
+    key_blocks: list[dict] = []
+    block_map: dict[str, dict] = {}
     for b in blocks:
-        if b["BlockType"] == "LINE":
+        block_map[b["Id"]] = b
+        kind = b["BlockType"]
+        if kind == "LINE":
             lines.append(b.get("Text", ""))
-        elif b["BlockType"] == "TABLE":
-            rows: list[list[str]] = []
-            for rel in b.get("Relationships", []):
-                if rel["Type"] == "CHILD":
-                    cells = [block_map[cid] for cid in rel["Ids"] if cid in block_map]
-                    for cell in sorted(cells, key=lambda c: (c.get("RowIndex", 0), c.get("ColumnIndex", 0))):
-                        ri = cell.get("RowIndex", 1) - 1
-                        while len(rows) <= ri:
-                            rows.append([])
-                        cell_text = ""
-                        for crel in cell.get("Relationships", []):
-                            if crel["Type"] == "CHILD":
-                                cell_text = " ".join(
-                                    block_map[wid].get("Text", "")
-                                    for wid in crel["Ids"]
-                                    if wid in block_map
-                                )
-                        rows[ri].append(cell_text)
-            tables.append({"rows": rows})
-
-    return "\n".join(lines), tables
+        elif kind == "TABLE":
+            table_blocks.append(b)
+        elif kind == "KEY_VALUE_SET" and "KEY" in (b.get("EntityTypes") or []):
+            key_blocks.append(b)
+
+    tables: list[dict] = []
+    for b in table_blocks:
+        rows: list[list[str]] = []
+        for rel in b.get("Relationships", []):
+            if rel["Type"] == "CHILD":
+                cells = [block_map[cid] for cid in rel["Ids"] if cid in block_map]
+                for cell in sorted(cells, key=lambda c: (c.get("RowIndex", 0), c.get("ColumnIndex", 0))):
+                    ri = cell.get("RowIndex", 1) - 1
+                    while len(rows) <= ri:
+                        rows.append([])
+                    rows[ri].append(_block_text(cell, block_map))
+        tables.append({"rows": rows})
+
+    forms: list[dict] = []
+    for kb in key_blocks:
+        key = _block_text(kb, block_map).strip()
+        if not key:
+            continue
+        value_blocks = [
+            block_map[vid]
+            for rel in kb.get("Relationships", [])
+            if rel["Type"] == "VALUE"
+            for vid in rel["Ids"]
+            if vid in block_map
+        ]
+        value = " ".join(_block_text(vb, block_map) for vb in value_blocks).strip()
+        confidences = [c for c in [kb.get("Confidence")] + [vb.get("Confidence") for vb in value_blocks] if c is not None]
+        forms.append({
+            "key": key,
+            "value": value,
+            "confidence": round(min(confidences), 1) if confidences else None,
+            "page": kb.get("Page"),
+        })
+
+    return "\n".join(lines), tables, forms
+
+
+def _extract_text_and_tables(blocks: list[dict]) -> tuple[str, list[dict]]:
+    """Pull raw text (LINE blocks) and table structures from Textract response."""
+    raw_text, tables, _forms = _extract_text_tables_and_forms(blocks)
+    return raw_text, tables
 
 
 def _persist_extraction_like_textract(
@@ -257,10 +500,16 @@ def _persist_extraction_like_textract(
     job_id: str,
     timestamp: int,
     textract_mode: str | None = None,
-) -> None:
-    """Grava TEXTRACT#* + STATUS EXTRACTED no FILE# — mesmo formato que Textract (merge/Bedrock)."""
+    hints: dict | None = None,
+    forms_data: list | None = None,
+) -> dict:
+    """Grava TEXTRACT#* + STATUS EXTRACTED no FILE# — mesmo formato que Textract (merge/Bedrock).
+
+    Devolve os hints Protheus gravados (calculados do texto, se não vierem prontos do cache de OCR).
+    """
     sk = _textract_result_sk(file_sk, fname)
-    hints = hints_from_textract_text(raw_text)
+    if hints is None:
+        hints = hints_from_textract_text(raw_text)
     textract_item: dict = {
         "PK": pk,
         "SK": sk,
@@ -274,15 +523,53 @@ def _persist_extraction_like_textract(
     }
     if textract_mode:
         textract_item["TEXTRACT_MODE"] = textract_mode
+    if forms_data:
+        # Pares chave-valor do FeatureTypes FORMS (bedrock_extract_fields usa para encurtar o prompt)
+        textract_item["FORM_COUNT"] = len(forms_data)
+        textract_item["FORMS_DATA"] = json.dumps(forms_data, ensure_ascii=False)
     if hints:
         textract_item["PROTHEUS_HINTS"] = json.dumps(hints, ensure_ascii=False)
-    table.put_item(Item=textract_item)
+    table.put_item(Item=offload_large_attributes(encode_item(textract_item)))
     table.update_item(
         Key={"PK": pk, "SK": file_sk},
         UpdateExpression="SET #st = :st",
         ExpressionAttributeNames={"#st": "STATUS"},
         ExpressionAttributeValues={":st": "EXTRACTED"},
     )
+    return hints
+
+
+def _file_content_sha256(event: dict, pk: str, file_sk: str) -> str:
+    """CONTENT_SHA256 do anexo: do evento (Map) ou do FILE# (leitura de um atributo)."""
+    if event.get("content_sha256"):
+        return event["content_sha256"]
+    item = table.get_item(
+        Key={"PK": pk, "SK": file_sk},
+        ProjectionExpression="CONTENT_SHA256",
+    ).get("Item") or {}
+    return item.get("CONTENT_SHA256") or ""
+
+
+def _persist_from_ocr_cache(pk, file_sk, fname, fkey, content_sha256, timestamp) -> bool:
+    """Mesmo conteúdo já extraído (outro processo / reprocessamento): grava TEXTRACT# sem Textract."""
+    cached = get_cached_ocr(table, content_sha256)
+    if not cached:
+        return False
+    _persist_extraction_like_textract(
+        pk,
+        file_sk,
+        fname,
+        fkey,
+        cached["raw_text"],
+        cached["tables_data"],
+        f"ocr_cache:{cached['job_id']}",
+        timestamp,
+        textract_mode=cached["textract_mode"],
+        hints=cached["hints"],
+        forms_data=cached["forms_data"],
+    )
+    logger.info("OCR cache hit para %s (sha256=%s, mode=%s)", fname, content_sha256, cached["textract_mode"])
+    return True
 
 
 def _extract_plain_text_from_s3(bucket: str, fkey: str, max_bytes: int) -> str:
@@ -306,8 +593,9 @@ def handle_single_textract(event, context):
     fname = event["file_name"]
     fkey = event["file_key"]
     fi_sk = event["file_sk"]
+    resume_job_id = event.get("textract_job_id")
 
-    logger.info("extract_documents single: %s", fname)
+    logger.info("extract_documents single: %s%s", fname, f" (retomando job {resume_job_id})" if resume_job_id else "")
 
     ext = _ext(fname)
 
@@ -356,22 +644,59 @@ def handle_single_textract(event, context):
         }
 
     try:
-        head = s3.head_object(Bucket=bucket, Key=fkey)
-        size = head["ContentLength"]
-
-        if size <= TEXTRACT_MAX_SYNC_BYTES:
-            resp = _run_textract_sync(bucket, fkey)
+        content_sha256 = _file_content_sha256(event, pk, fi_sk)
+        if not resume_job_id and _persist_from_ocr_cache(pk, fi_sk, fname, fkey, content_sha256, timestamp):
+            return {
+                "process_id": process_id,
+                "file_name": fname,
+                "extracted_count": 1,
+                "rejected": [],
+            }
+        size = 0 if resume_job_id else s3.head_object(Bucket=bucket, Key=fkey)["ContentLength"]
+
+        if (
+            event.get("task_token")
+            and not resume_job_id
+            and size > TEXTRACT_MAX_SYNC_BYTES
+            and _callback_mode_enabled()
+        ):
+            job_id = _start_textract_callback(event, bucket, content_sha256)
+            logger.info("Textract callback: job %s; Map retoma via task token", job_id)
+            return {
+                "process_id": process_id,
+                "file_name": fname,
+                "textract_job_id": job_id,
+                "textract_callback": True,
+            }
+        if resume_job_id or size > TEXTRACT_MAX_SYNC_BYTES:
+            job_id, resp = _run_textract_async(bucket, fkey, context, job_id=resume_job_id)
+            if resp is None:
+                return {
+                    "process_id": process_id,
+                    "attachment": {
+                        "file_name": fname,
+                        "file_key": fkey,
+                        "file_sk": fi_sk,
+                        "handler": "textract",
+                    },
+                    "textract_job_id": job_id,
+                    "textract_pending": True,
+                    "extracted_count": 0,
+                    "rejected": [],
+                }
             mode = resp.pop("_textract_mode", None)
-            raw_text, tables_data = _extract_text_and_tables(resp.get("Blocks", []))
-            job_id = "sync"
+            raw_text, tables_data, forms_data = _extract_text_tables_and_forms(resp.get("Blocks", []))
         else:
-            job_id, resp = _run_textract_async(bucket, fkey)
+            resp = _run_textract_sync(bucket, fkey)
             mode = resp.pop("_textract_mode", None)
-            raw_text, tables_data = _extract_text_and_tables(resp.get("Blocks", []))
+            raw_text, tables_data, forms_data = _extract_text_tables_and_forms(resp.get("Blocks", []))
+            job_id = "sync"
 
-        _persist_extraction_like_textract(
-            pk, fi_sk, fname, fkey, raw_text, tables_data, job_id, timestamp, textract_mode=mode
+        hints = _persist_extraction_like_textract(
+            pk, fi_sk, fname, fkey, raw_text, tables_data, job_id, timestamp,
+            textract_mode=mode, forms_data=forms_data,
         )
+        put_cached_ocr(table, content_sha256, raw_text, tables_data, hints, mode, job_id, forms_data=forms_data)
 
         return {
             "process_id": process_id,
@@ -393,6 +718,22 @@ def handle_single_textract(event, context):
         raise
 
 
+def handle_single_textract_with_token(event, context):
+    """
+    Map com waitForTaskToken: resultados síncronos (txt, PDF pequeno, rejeição) devolvem o token
+    aqui mesmo; PDF grande em modo callback devolve em textract_completion.
+    """
+    token = event["task_token"]
+    try:
+        result = handle_single_textract(event, context)
+    except Exception as exc:
+        sfn.send_task_failure(taskToken=token, error="ExtractDocumentsError", cause=str(exc)[:32768])
+        raise
+    if not result.get("textract_callback"):
+        sfn.send_task_success(taskToken=token, output=json.dumps(result, default=str))
+    return result
+
+
 def handler(event, context):
     process_id = event["process_id"]
     bucket = os.environ["BUCKET_NAME"]
@@ -402,12 +743,11 @@ def handler(event, context):
     logger.info("extract_documents start: process_id=%s", process_id)
 
     if event.get("file_name") and event.get("file_key") and event.get("file_sk"):
+        if event.get("task_token"):
+            return handle_single_textract_with_token(event, context)
         return handle_single_textract(event, context)
 
-    items = table.query(
-        KeyConditionExpression="PK = :pk",
-        ExpressionAttributeValues={":pk": pk},
-    )["Items"]
+    items = iter_partition(table, pk, sk_prefix="FILE#")
 
     file_items = [
         it for it in items
@@ -466,22 +806,31 @@ def handler(event, context):
         logger.info("Running Textract on %s (%s)", fname, fkey)
 
         try:
+            content_sha256 = fi.get("CONTENT_SHA256") or ""
+            if _persist_from_ocr_cache(pk, fi_sk, fname, fkey, content_sha256, timestamp):
+                extracted_count += 1
+                continue
+
             head = s3.head_object(Bucket=bucket, Key=fkey)
             size = head["ContentLength"]
 
             if size <= TEXTRACT_MAX_SYNC_BYTES:
                 resp = _run_textract_sync(bucket, fkey)
                 mode = resp.pop("_textract_mode", None)
-                raw_text, tables_data = _extract_text_and_tables(resp.get("Blocks", []))
+                raw_text, tables_data, forms_data = _extract_text_tables_and_forms(resp.get("Blocks", []))
                 job_id = "sync"
             else:
-                job_id, resp = _run_textract_async(bucket, fkey)
+                job_id, resp = _run_textract_async(bucket, fkey, context)
+                if resp is None:
+                    raise RuntimeError(f"Textract job {job_id} não terminou dentro do tempo da Lambda")
                 mode = resp.pop("_textract_mode", None)
-                raw_text, tables_data = _extract_text_and_tables(resp.get("Blocks", []))
+                raw_text, tables_data, forms_data = _extract_text_tables_and_forms(resp.get("Blocks", []))
 
-            _persist_extraction_like_textract(
-                pk, fi_sk, fname, fkey, raw_text, tables_data, job_id, timestamp, textract_mode=mode
+            hints = _persist_extraction_like_textract(
+                pk, fi_sk, fname, fkey, raw_text, tables_data, job_id, timestamp,
+                textract_mode=mode, forms_data=forms_data,
             )
+            put_cached_ocr(table, content_sha256, raw_text, tables_data, hints, mode, job_id, forms_data=forms_data)
 
             extracted_count += 1
             logger.info(
@@ -11,6 +11,7 @@ import os
 
 import boto3
 
+from utils.dynamo_query import iter_partition
 from utils.extraction_dedup import dedupe_file_items_by_content_hash
 
 logger = logging.getLogger()
@@ -33,10 +34,12 @@ def handler(event, context):
     pk = f"PROCESS#{process_id}"
     logger.info("list_attachments process_id=%s", process_id)
 
-    items = table.query(
-        KeyConditionExpression="PK = :pk",
-        ExpressionAttributeValues={":pk": pk},
-    )["Items"]
+    items = iter_partition(
+        table,
+        pk,
+        sk_prefix="FILE#",
+        projection=("FILE_NAME", "FILE_KEY", "CONTENT_SHA256", "TIMESTAMP"),
+    )
 
     file_items = [
         it
@@ -16,6 +16,7 @@ Schema (MERGED_EXTRACTION):
             "file_name": "...",
             "raw_text": "...",
             "tables": [{"rows": [[...]]}],
+            "forms": [{"key": "...", "value": "...", "confidence": 0-100}],  // Textract FORMS
             "job_id": "...",
             "protheus_hints": { ... , "parsed_xml_style": { ... } }  // flat + espelho tipo PARSED_DATA XML
         }
@@ -39,7 +40,8 @@ from datetime import datetime
 
 import boto3
 
-from utils.primary_xml import iter_parsed_xml_items, pick_best_parsed_xml_item
+from utils.blob_store import offload_large_attributes
+from utils.process_snapshot import ProcessSnapshot
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -57,54 +59,41 @@ def handler(event, context):
 
     logger.info("merge_extractions start: process_id=%s", process_id)
 
-    items = table.query(
-        KeyConditionExpression="PK = :pk",
-        ExpressionAttributeValues={":pk": pk},
-    )["Items"]
-
-    items_by_sk = {it["SK"]: it for it in items}
+    snapshot = ProcessSnapshot.load(table, process_id)
 
     # ---- Todos os XMLs parseados ----
     xml_documents = [
         {"file_name": fn, "parsed_data": data}
-        for _, fn, data in iter_parsed_xml_items(items)
+        for _, fn, data in snapshot.parsed_xml_documents()
     ]
 
-    best_xml = pick_best_parsed_xml_item(items)
+    best_xml = snapshot.best_parsed_xml
     nfe_xml_data = None
     nfe_file = None
     if best_xml and best_xml.get("PARSED_DATA"):
-        try:
-            nfe_xml_data = json.loads(best_xml["PARSED_DATA"])
+        nfe_xml_data = snapshot.json(best_xml, "PARSED_DATA")
+        if nfe_xml_data is not None:
             nfe_file = best_xml.get("FILE_NAME")
             logger.info("Primary PARSED_XML: %s", best_xml.get("SK"))
-        except Exception as e:
-            logger.warning("Could not parse primary PARSED_DATA: %s", e)
+        else:
+            logger.warning("Could not parse primary PARSED_DATA: %s", best_xml.get("SK"))
 
     # ---- Textract results ----
     textract_docs: list[dict] = []
     combined_raw_text_parts: list[str] = []
-    for sk, it in items_by_sk.items():
-        if not sk.startswith("TEXTRACT#"):
-            continue
-        suffix = sk[len("TEXTRACT#") :] if sk.startswith("TEXTRACT#") else ""
+    for it in snapshot.with_prefix("TEXTRACT#"):
+        suffix = str(it["SK"])[len("TEXTRACT#") :]
         doc: dict = {
             "file_name": it.get("FILE_NAME", ""),
             "file_upload_id": suffix or None,
-            "raw_text": it.get("RAW_TEXT", ""),
-            "tables": [],
+            "raw_text": snapshot.text(it, "RAW_TEXT"),
+            "tables": snapshot.json(it, "TABLES_DATA", []),
+            "forms": snapshot.json(it, "FORMS_DATA", []),
             "job_id": it.get("JOB_ID", ""),
         }
-        try:
-            doc["tables"] = json.loads(it.get("TABLES_DATA", "[]"))
-        except Exception:
-            pass
-        hints_raw = it.get("PROTHEUS_HINTS")
-        if hints_raw:
-            try:
-                doc["protheus_hints"] = json.loads(hints_raw)
-            except Exception:
-                pass
+        hints = snapshot.json(it, "PROTHEUS_HINTS")
+        if hints is not None:
+            doc["protheus_hints"] = hints
         doc["timestamp"] = it.get("TIMESTAMP")
         textract_docs.append(doc)
         if doc["raw_text"]:
@@ -143,12 +132,12 @@ def handler(event, context):
     }
     merged_json = json.dumps(merged, ensure_ascii=False, default=str)
 
-    table.put_item(Item={
+    table.put_item(Item=offload_large_attributes({
         "PK": pk,
         "SK": "MERGED_EXTRACTION",
         "MERGED_DATA": merged_json,
         "TIMESTAMP": timestamp,
-    })
+    }))
     logger.info("MERGED_EXTRACTION written (%d bytes)", len(merged_json))
 
     # ---- Backfill PARSED_OCR for send_to_protheus compatibility ----
@@ -175,14 +164,14 @@ def handler(event, context):
             ],
         }
         ocr_json = json.dumps(ocr_compat, ensure_ascii=False, default=str)
-        table.put_item(Item={
+        table.put_item(Item=offload_large_attributes({
             "PK": pk,
             "SK": "PARSED_OCR=textract_merged",
             "FILE_NAME": "textract_merged",
             "PARSED_DATA": ocr_json,
             "SOURCE": "TEXTRACT",
             "TIMESTAMP": timestamp,
-        })
+        }))
         logger.info("PARSED_OCR backfill written for send_to_protheus compat")
 
     return {"process_id": process_id}
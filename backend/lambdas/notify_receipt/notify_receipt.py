@@ -10,6 +10,15 @@ logger.setLevel(logging.INFO)
 dynamodb = boto3.resource('dynamodb')
 table = dynamodb.Table(os.environ['TABLE_NAME'])
 
+
+def _process_list_keys(process_id, timestamp):
+    """LIST_PK/LIST_SK do GSI ProcessListIndex (mesmo formato de src/utils/process_list.py)."""
+    return {
+        'LIST_PK': 'PROCESS_LIST',
+        'LIST_SK': f"{int(timestamp):012d}#{process_id}",
+    }
+
+
 def handler(event, context):
     """Notifica recebimento e inicia processamento"""
     logger.info(f"Received event: {json.dumps(event)}")
@@ -42,12 +51,18 @@ def handler(event, context):
             
             # Se o item existe, fazer update preservando campos existentes
             if existing_item:
+                list_keys = _process_list_keys(process_id, existing_item.get('TIMESTAMP') or timestamp)
                 table.update_item(
                     Key={'PK': pk, 'SK': 'METADATA'},
-                    UpdateExpression='SET START_TIME = :start_time, TIMESTAMP = :timestamp',
+                    UpdateExpression=(
+                        'SET START_TIME = :start_time, TIMESTAMP = :timestamp, '
+                        'LIST_PK = if_not_exists(LIST_PK, :list_pk), LIST_SK = if_not_exists(LIST_SK, :list_sk)'
+                    ),
                     ExpressionAttributeValues={
                         ':start_time': start_time,
-                        ':timestamp': timestamp
+                        ':timestamp': timestamp,
+                        ':list_pk': list_keys['LIST_PK'],
+                        ':list_sk': list_keys['LIST_SK'],
                     }
                 )
                 logger.info(f"Updated start_time {start_time} in existing METADATA for process {process_id}")
@@ -60,7 +75,8 @@ def handler(event, context):
                         'START_TIME': start_time,
                         'TIMESTAMP': timestamp,
                         'STATUS': 'NOTIFIED',
-                        'PROCESS_TYPE': process_type
+                        'PROCESS_TYPE': process_type,
+                        **_process_list_keys(process_id, timestamp),
                     }
                 )
                 logger.info(f"Created METADATA with start_time {start_time} for process {process_id}")
@@ -74,7 +90,8 @@ def handler(event, context):
                     'START_TIME': start_time,
                     'TIMESTAMP': timestamp,
                     'STATUS': 'NOTIFIED',
-                    'PROCESS_TYPE': process_type
+                    'PROCESS_TYPE': process_type,
+                    **_process_list_keys(process_id, timestamp),
                 }
             )
             logger.info(f"Created METADATA with start_time {start_time} for process {process_id} (fallback)")
@@ -11,10 +11,12 @@ sys.path.insert(0, os.path.dirname(__file__))
 try:
     from utils.bedrock_success_summary import generate_success_feedback_summary_with_bedrock
     from utils.ritm_metadata import ritm_from_items_by_sk
+    from utils.process_snapshot import ProcessSnapshot
 except ImportError:
     sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
     from utils.bedrock_success_summary import generate_success_feedback_summary_with_bedrock
     from utils.ritm_metadata import ritm_from_items_by_sk
+    from utils.process_snapshot import ProcessSnapshot
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -108,16 +110,10 @@ def lambda_handler(event, context):
         }
     
     # Buscar dados completos do processo no DynamoDB
-    pk = f"PROCESS#{process_id}"
-    
     try:
-        response = table.query(
-            KeyConditionExpression='PK = :pk',
-            ExpressionAttributeValues={':pk': pk}
-        )
-        
-        items = {item['SK']: item for item in response.get('Items', [])}
-        metadata = items.get('METADATA', {})
+        snapshot = ProcessSnapshot.load(table, process_id)
+        items = snapshot.by_sk
+        metadata = snapshot.metadata
         
         # Extrair informações relevantes
         process_type = metadata.get('PROCESS_TYPE', 'UNKNOWN')
@@ -132,31 +128,16 @@ def lambda_handler(event, context):
             protheus_response = protheus_response_str
         
         # Buscar payload enviado ao Protheus (do pedido de compra ou input_json)
-        payload_enviado = None
-        
         # Tentar buscar do PEDIDO_COMPRA_METADATA
-        pedido_compra_item = items.get('PEDIDO_COMPRA_METADATA')
-        if pedido_compra_item:
-            metadados = pedido_compra_item.get('METADADOS')
-            if metadados:
-                try:
-                    payload_enviado = json.loads(metadados) if isinstance(metadados, str) else metadados
-                except:
-                    pass
+        payload_enviado = snapshot.pedido_compra
         
         # Se não encontrou, tentar buscar dos arquivos
         if not payload_enviado:
-            for sk, item in items.items():
-                if sk.startswith('FILE#'):
-                    file_metadata = item.get('METADADOS')
-                    if file_metadata:
-                        try:
-                            parsed = json.loads(file_metadata) if isinstance(file_metadata, str) else file_metadata
-                            if isinstance(parsed, dict) and ('header' in parsed or 'requestBody' in parsed):
-                                payload_enviado = parsed
-                                break
-                        except:
-                            pass
+            for item in snapshot.file_items:
+                parsed = snapshot.file_metadados(item)
+                if isinstance(parsed, dict) and ('header' in parsed or 'requestBody' in parsed):
+                    payload_enviado = parsed
+                    break
         
         timestamp = datetime.utcnow().isoformat() + 'Z'
         
@@ -4,6 +4,9 @@ import boto3
 import logging
 import xml.etree.ElementTree as ET
 
+from utils.blob_store import offload_large_attributes
+from utils.dynamo_query import query_partition
+
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
@@ -11,6 +14,15 @@ s3 = boto3.client('s3')
 dynamodb = boto3.resource('dynamodb')
 table = dynamodb.Table(os.environ['TABLE_NAME'])
 
+
+def _process_list_keys(process_id, timestamp):
+    """LIST_PK/LIST_SK do GSI ProcessListIndex (mesmo formato de src/utils/process_list.py)."""
+    return {
+        'LIST_PK': 'PROCESS_LIST',
+        'LIST_SK': f"{int(timestamp):012d}#{process_id}",
+    }
+
+
 def _select_nfe_xml(items, bucket):
     """Among all FILE# items ending in .xml, pick the NF-e (by namespace heuristic).
 
@@ -118,13 +130,13 @@ def handle_single_xml_attachment(event, pk, process_id, bucket):
     suffix = _parsed_xml_sk_suffix(event)
     sk = f"PARSED_XML={suffix}"
     table.put_item(
-        Item={
+        Item=offload_large_attributes({
             "PK": pk,
             "SK": sk,
             "FILE_NAME": file_name,
             "PARSED_DATA": json.dumps(data, ensure_ascii=False, default=str),
             "SOURCE": "XML",
-        }
+        })
     )
     return {"process_id": process_id, "file_name": file_name, "status": "parsed_xml"}
 
@@ -141,10 +153,7 @@ def handler(event, context):
         if event.get("file_name") and event.get("file_key"):
             return handle_single_xml_attachment(event, pk, process_id, bucket)
 
-        items = table.query(
-            KeyConditionExpression='PK = :pk',
-            ExpressionAttributeValues={':pk': pk}
-        )['Items']
+        items = query_partition(table, pk, sk_prefix='FILE#')
 
         xml_file, xml_raw = _select_nfe_xml(items, bucket)
 
@@ -165,14 +174,14 @@ def handler(event, context):
         parsed_json = json.dumps(parsed_data)
         logger.info(f"Parsed data size: {len(parsed_json)} bytes")
 
-        table.put_item(Item={
+        table.put_item(Item=offload_large_attributes({
             'PK': pk,
             'SK': sk,
             'FILE_NAME': xml_file['FILE_NAME'],
             'PARSED_DATA': parsed_json,
             'SOURCE': 'XML',
             'IS_PRIMARY': True,
-        })
+        }))
 
         xml_files_parsed = 1
 
@@ -209,13 +218,13 @@ def handler(event, context):
 
             csuffix = cand["SK"][5:] if str(cand.get("SK", "")).startswith("FILE#") else cand["FILE_NAME"]
             sec_sk = f"PARSED_XML={csuffix}"
-            table.put_item(Item={
+            table.put_item(Item=offload_large_attributes({
                 'PK': pk,
                 'SK': sec_sk,
                 'FILE_NAME': cand['FILE_NAME'],
                 'PARSED_DATA': json.dumps(sec_data, ensure_ascii=False, default=str),
                 'SOURCE': 'XML',
-            })
+            }))
             xml_files_parsed += 1
 
         logger.info(f"XML(s) gravados: {xml_files_parsed}")
@@ -278,7 +287,8 @@ def update_process_status_to_failed(pk, process_id, error_message, error_type):
                     'timestamp': timestamp,
                     'lambda': 'parse_xml'
                 },
-                'updated_at': timestamp
+                'updated_at': timestamp,
+                **_process_list_keys(process_id, datetime.now().timestamp()),
             })
             logger.info(f"Item METADATA criado com status FAILED para processo {process_id}")
             
@@ -1,7 +1,12 @@
 import os
-import json
+import re
 import boto3
 import logging
+from urllib.parse import unquote_plus
+
+from botocore.exceptions import ClientError
+
+from utils.dynamo_query import iter_partition
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -9,37 +14,78 @@ logger.setLevel(logging.INFO)
 dynamodb = boto3.resource('dynamodb')
 table = dynamodb.Table(os.environ['TABLE_NAME'])
 
+# processes/{process_id}/{folder}/{upload_id}_{nome} — upload_id = _new_file_upload_id() (uuid4 hex) = sufixo do FILE#
+_UPLOAD_ID_RE = re.compile(r'^([0-9a-f]{32})_')
+
+
+def parse_upload_key(key):
+    """(process_id, FILE# SK ou None) a partir da chave S3; None se não for processes/{id}/…"""
+    parts = key.split('/')
+    if len(parts) < 3 or parts[0] != 'processes' or not parts[1]:
+        return None
+    match = _UPLOAD_ID_RE.match(parts[-1])
+    return parts[1], (f"FILE#{match.group(1)}" if match else None)
+
+
+def _mark_uploaded(pk, sk, key):
+    """UpdateItem condicional (o FILE# precisa ter esse FILE_KEY); False se não bateu."""
+    try:
+        table.update_item(
+            Key={'PK': pk, 'SK': sk},
+            UpdateExpression='SET #status = :status',
+            ConditionExpression='FILE_KEY = :key',
+            ExpressionAttributeNames={'#status': 'STATUS'},
+            ExpressionAttributeValues={':status': 'UPLOADED', ':key': key}
+        )
+        return True
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+            raise
+        return False
+
+
+def _file_sks_by_key(pk):
+    """FILE_KEY → SK dos FILE# do processo (uma leitura por processo, para chaves legadas)."""
+    return {
+        item['FILE_KEY']: item['SK']
+        for item in iter_partition(table, pk, sk_prefix='FILE#', projection=('FILE_KEY',))
+        if item.get('FILE_KEY')
+    }
+
+
 def handler(event, context):
-    """Atualiza status do arquivo quando upload é concluído no S3"""
-    
-    for record in event['Records']:
-        bucket = record['s3']['bucket']['name']
-        key = record['s3']['object']['key']
-        
-        logger.info(f"File uploaded: {key}")
-        
-        # Extrair process_id e file_name do key: processes/{process_id}/{file_name}
-        parts = key.split('/')
-        if len(parts) >= 3 and parts[0] == 'processes':
-            process_id = parts[1]
-            file_name = parts[2]
-            
-            pk = f"PROCESS#{process_id}"
-            
-            response = table.query(
-                KeyConditionExpression='PK = :pk AND begins_with(SK, :sk)',
-                ExpressionAttributeValues={':pk': pk, ':sk': 'FILE#'}
-            )
-            
-            for item in response.get('Items', []):
-                if item.get('FILE_KEY') == key:
-                    table.update_item(
-                        Key={'PK': pk, 'SK': item['SK']},
-                        UpdateExpression='SET #status = :status',
-                        ExpressionAttributeNames={'#status': 'STATUS'},
-                        ExpressionAttributeValues={':status': 'UPLOADED'}
-                    )
-                    logger.info(f"Updated file status: {key} -> UPLOADED")
-                    break
-    
-    return {'statusCode': 200}
+    """Atualiza status dos arquivos quando o upload é concluído no S3 (todos os records do evento)"""
+    pending = {}
+    for record in event.get('Records', []):
+        key = unquote_plus(record['s3']['object']['key'])
+        parsed = parse_upload_key(key)
+        if not parsed:
+            logger.info(f"Ignorando chave fora de processes/: {key}")
+            continue
+        process_id, file_sk = parsed
+        pending.setdefault(f"PROCESS#{process_id}", {})[key] = file_sk
+
+    logger.info(f"Files uploaded: {sum(len(keys) for keys in pending.values())} em {len(pending)} processo(s)")
+
+    updated = 0
+    for pk, keys in pending.items():
+        legacy = []
+        for key, file_sk in keys.items():
+            if file_sk and _mark_uploaded(pk, file_sk, key):
+                updated += 1
+                logger.info(f"Updated file status: {key} -> UPLOADED")
+            else:
+                legacy.append(key)
+        if not legacy:
+            continue
+        # Chaves sem upload_id (ou FILE# com outro FILE_KEY): resolve pela partição, uma vez por processo
+        sks_by_key = _file_sks_by_key(pk)
+        for key in legacy:
+            sk = sks_by_key.get(key)
+            if sk and _mark_uploaded(pk, sk, key):
+                updated += 1
+                logger.info(f"Updated file status: {key} -> UPLOADED")
+            else:
+                logger.warning(f"FILE# não encontrado para a chave: {key}")
+
+    return {'statusCode': 200, 'updated': updated}
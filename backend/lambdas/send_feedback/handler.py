@@ -13,12 +13,16 @@ try:
     from utils.bedrock_error_summary import generate_error_summary_with_bedrock
     from utils.bedrock_success_summary import generate_success_feedback_summary_with_bedrock
     from utils.ritm_metadata import load_ritm_for_process
+    from utils.dynamo_query import query_partition
+    from utils.json_codec import decode_item
 except ImportError:
     # Fallback: tentar importar do diretório pai
     sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
     from utils.bedrock_error_summary import generate_error_summary_with_bedrock
     from utils.bedrock_success_summary import generate_success_feedback_summary_with_bedrock
     from utils.ritm_metadata import load_ritm_for_process
+    from utils.dynamo_query import query_partition
+    from utils.json_codec import decode_item
 
 dynamodb = boto3.resource('dynamodb')
 table = dynamodb.Table(os.environ['TABLE_NAME'])
@@ -217,15 +221,7 @@ def lambda_handler(event, context):
                     try:
                         pk = f"PROCESS#{process_id}"
                         # Buscar resultados de validação do DynamoDB
-                        validation_response = table.query(
-                            KeyConditionExpression='PK = :pk AND begins_with(SK, :sk)',
-                            ExpressionAttributeValues={
-                                ':pk': pk,
-                                ':sk': 'VALIDATION#'
-                            }
-                        )
-                        
-                        validation_items = validation_response.get('Items', [])
+                        validation_items = query_partition(table, pk, sk_prefix='VALIDATION#')
                         if validation_items:
                             # Ordenar por timestamp e pegar o mais recente
                             latest_validation = max(validation_items, key=lambda x: x.get('TIMESTAMP', 0))
@@ -309,7 +305,7 @@ def lambda_handler(event, context):
                 pk = f"PROCESS#{process_id}"
                 response = table.get_item(Key={'PK': pk, 'SK': 'METADATA'})
                 if 'Item' in response:
-                    metadata = response['Item']
+                    metadata = decode_item(response['Item'])
                     
                     # Prioridade 1: Buscar protheus_request_info (contém headers, payload, response)
                     protheus_request_info_str = metadata.get('protheus_request_info')
@@ -13,6 +13,7 @@ import sys
 sys.path.insert(0, os.path.dirname(__file__))
 try:
     from utils.bedrock_error_summary import generate_error_summary_with_bedrock
+    from utils.bedrock_gateway import invoke_text
     from utils.boleto_duplicatas import extract_duplicatas_from_sources, resolve_duplicatas_uc
     from utils.duplicatas_protheus import build_duplicatas_protheus_payload
     from utils.document_field_resolver import (
@@ -26,12 +27,14 @@ try:
         uso_e_consumo_active,
     )
     from utils.ritm_metadata import get_ritm_from_request_body
-    from utils.primary_xml import pick_best_parsed_xml_item
     from utils.nfse_detection import detect_nfse_from_sources, NFSE_SERIE_PROTHEUS
+    from utils.process_snapshot import ProcessSnapshot
+    from utils.json_codec import encode_attribute
 except ImportError:
     # Fallback: tentar importar do diretório pai
     sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
     from utils.bedrock_error_summary import generate_error_summary_with_bedrock
+    from utils.bedrock_gateway import invoke_text
     from utils.boleto_duplicatas import extract_duplicatas_from_sources, resolve_duplicatas_uc
     from utils.duplicatas_protheus import build_duplicatas_protheus_payload
     from utils.document_field_resolver import (
@@ -45,8 +48,9 @@ except ImportError:
         uso_e_consumo_active,
     )
     from utils.ritm_metadata import get_ritm_from_request_body
-    from utils.primary_xml import pick_best_parsed_xml_item
     from utils.nfse_detection import detect_nfse_from_sources, NFSE_SERIE_PROTHEUS
+    from utils.process_snapshot import ProcessSnapshot
+    from utils.json_codec import encode_attribute
 
 # Usar região da variável de ambiente para serviços locais (DynamoDB, Secrets Manager)
 aws_region = os.environ.get('AWS_REGION') or os.environ.get('AWS_DEFAULT_REGION')
@@ -291,8 +295,6 @@ def _valor_unitario_payload(produto_xml, quantidade, valor_total_doc, n_linhas,
 
 dynamodb = boto3.resource('dynamodb', region_name=aws_region)
 table = dynamodb.Table(os.environ['TABLE_NAME'])
-# Bedrock Nova Pro está disponível apenas em us-east-1 por enquanto
-bedrock = boto3.client('bedrock-runtime', region_name='us-east-1')
 secrets_manager = boto3.client('secretsmanager', region_name=aws_region)
 
 def _env(name: str, default: str | None = None) -> str:
@@ -980,28 +982,12 @@ Retorne APENAS o JSON.
 '''
     
     try:
-        request_body = {
-            'messages': [{
-                'role': 'user',
-                'content': [{'text': prompt}]
-            }],
-            'inferenceConfig': {
-                'maxTokens': 2000,
-                'temperature': 0.1
-            }
-        }
-        
         print(f"[EXTRACT_LOTES] Chamando Bedrock Nova Pro...")
-        # Obter modelo ID da variável de ambiente
-        model_id = os.environ.get('BEDROCK_MODEL_ID', 'amazon.nova-pro-v1:0')
-        response = bedrock.invoke_model(
-            modelId=model_id,
-            body=json.dumps(request_body)
-        )
-        
-        body_content = response['body'].read()
-        result = json.loads(body_content)
-        content = result['output']['message']['content'][0]['text']
+        content = invoke_text(
+            prompt,
+            {'maxTokens': 2000, 'temperature': 0.1},
+            label='extract_lotes',
+        ).text
         
         print(f"[EXTRACT_LOTES] Resposta do Bedrock: {content[:500]}...")
         
@@ -1515,16 +1501,12 @@ def lambda_handler(event, context):
     
     # Buscar dados do processo no DynamoDB
     print(f"\n[2] Consultando DynamoDB com PK=PROCESS#{process_id}")
-    response = table.query(
-        KeyConditionExpression='PK = :pk',
-        ExpressionAttributeValues={':pk': f'PROCESS#{process_id}'}
-    )
+    snapshot = ProcessSnapshot.load(table, process_id)
     
-    print(f"[2.1] Total de items retornados: {len(response['Items'])}")
-    print(f"[2.2] SKs encontrados: {[item['SK'] for item in response['Items']]}")
+    print(f"[2.1] Total de items retornados: {len(snapshot.items)}")
+    print(f"[2.2] SKs encontrados: {list(snapshot.by_sk)}")
     
-    items = {item['SK']: item for item in response['Items']}
-    metadata = items.get('METADATA', {})
+    metadata = snapshot.metadata
     
     print(f"\n[3] Metadata encontrado: {bool(metadata)}")
     if metadata:
@@ -1539,13 +1521,11 @@ def lambda_handler(event, context):
     
     # PRIORIDADE 1: Buscar metadados do pedido de compra (SK: PEDIDO_COMPRA_METADATA)
     print(f"\n[3.4] Buscando metadados do pedido de compra (PRIORIDADE 1)...")
-    pedido_compra_item = items.get('PEDIDO_COMPRA_METADATA')
+    pedido_compra_item = snapshot.pedido_compra_item
     if pedido_compra_item:
-        file_metadata = pedido_compra_item.get('METADADOS')
-        if file_metadata:
+        if pedido_compra_item.get('METADADOS'):
             try:
-                if isinstance(file_metadata, str):
-                    file_metadata = json.loads(file_metadata)
+                file_metadata = snapshot.pedido_compra
                 
                 # Verificar se é um pedido de compra (tem header e requestBody)
                 if isinstance(file_metadata, dict) and ('header' in file_metadata or 'requestBody' in file_metadata):
@@ -1566,30 +1546,27 @@ def lambda_handler(event, context):
     # PRIORIDADE 1.5: Buscar nos arquivos (METADADOS) como fallback
     if not pedido_compra_json:
         print(f"\n[3.4.5] Buscando pedido de compra nos arquivos do processo (fallback)...")
-        for sk, item in items.items():
-            if sk.startswith('FILE#'):
-                file_metadata = item.get('METADADOS')
-                if file_metadata:
-                    try:
-                        if isinstance(file_metadata, str):
-                            file_metadata = json.loads(file_metadata)
+        for item in snapshot.file_items:
+            if item.get('METADADOS'):
+                try:
+                    file_metadata = snapshot.file_metadados(item)
+                    
+                    # Verificar se é um pedido de compra (tem header e requestBody)
+                    if isinstance(file_metadata, dict) and ('header' in file_metadata or 'requestBody' in file_metadata):
+                        pedido_compra_json = file_metadata
+                        input_json = file_metadata  # Usar como input_json também
+                        print(f"[3.4.6] Pedido de compra encontrado no arquivo: {item.get('FILE_NAME')} (fallback)")
+                        print(f"[3.4.7] Pedido de compra tem header: {bool(pedido_compra_json.get('header'))}")
+                        print(f"[3.4.8] Pedido de compra tem requestBody: {bool(pedido_compra_json.get('requestBody'))}")
                         
-                        # Verificar se é um pedido de compra (tem header e requestBody)
-                        if isinstance(file_metadata, dict) and ('header' in file_metadata or 'requestBody' in file_metadata):
-                            pedido_compra_json = file_metadata
-                            input_json = file_metadata  # Usar como input_json também
-                            print(f"[3.4.6] Pedido de compra encontrado no arquivo: {item.get('FILE_NAME')} (fallback)")
-                            print(f"[3.4.7] Pedido de compra tem header: {bool(pedido_compra_json.get('header'))}")
-                            print(f"[3.4.8] Pedido de compra tem requestBody: {bool(pedido_compra_json.get('requestBody'))}")
-                            
-                            # Extrair tenantId
-                            if pedido_compra_json.get('header'):
-                                tenant_id = pedido_compra_json['header'].get('tenantId') or pedido_compra_json['header'].get('tenant_id')
-                                if tenant_id:
-                                    print(f"[3.4.9] tenantId encontrado no pedido de compra: {tenant_id}")
-                            break
-                    except Exception as e:
-                        print(f"[3.4.5] ERRO ao processar metadados do arquivo {item.get('FILE_NAME')}: {e}")
+                        # Extrair tenantId
+                        if pedido_compra_json.get('header'):
+                            tenant_id = pedido_compra_json['header'].get('tenantId') or pedido_compra_json['header'].get('tenant_id')
+                            if tenant_id:
+                                print(f"[3.4.9] tenantId encontrado no pedido de compra: {tenant_id}")
+                        break
+                except Exception as e:
+                    print(f"[3.4.5] ERRO ao processar metadados do arquivo {item.get('FILE_NAME')}: {e}")
     
     # PRIORIDADE 2: Buscar INPUT_JSON nos metadados do processo
     if not input_json:
@@ -1656,12 +1633,8 @@ def lambda_handler(event, context):
     cfop_mapping = {}
     matched_danfe_positions = []  # Posições dos produtos que deram match na validação (fallback)
     product_matches = []  # Lista de matches: (danfe_position, doc_position) dos resultados de validação
-    validation_items = [(sk, item) for sk, item in items.items() if sk.startswith('VALIDATION#')]
-    if validation_items:
-        # Ordenar por timestamp (mais recente primeiro)
-        validation_items.sort(key=lambda x: x[1].get('TIMESTAMP', 0), reverse=True)
-        # Pegar o mais recente
-        latest_validation = validation_items[0][1]
+    latest_validation = snapshot.latest_validation
+    if latest_validation:
         
         # Buscar CFOP_MAPPING
         cfop_mapping_str = latest_validation.get('CFOP_MAPPING', '')
@@ -1675,9 +1648,8 @@ def lambda_handler(event, context):
             print(f"[3.5] CFOP_MAPPING não encontrado no registro de validação")
         
         # Buscar VALIDATION_RESULTS para obter produtos que deram match
-        validation_results_str = latest_validation.get('VALIDATION_RESULTS', '[]')
         try:
-            validation_results = json.loads(validation_results_str) if isinstance(validation_results_str, str) else validation_results_str
+            validation_results = snapshot.latest_validation_results
             print(f"\n[3.6] Resultados de validação encontrados: {len(validation_results)} regras")
             
             # Buscar resultado da regra validar_produtos
@@ -1714,7 +1686,7 @@ def lambda_handler(event, context):
         print(f"[3.5] Nenhum registro de validação encontrado")
     
     # Buscar PARSED_XML principal (NF-e; IS_PRIMARY ou melhor score entre vários XMLs)
-    parsed_xml = pick_best_parsed_xml_item(list(items.values()))
+    parsed_xml = snapshot.best_parsed_xml
     if parsed_xml:
         print(f"\n[4] PARSED_XML principal com SK: {parsed_xml.get('SK')}")
     else:
@@ -1723,11 +1695,9 @@ def lambda_handler(event, context):
     
     # Buscar PARSED_OCR
     parsed_ocr = None
-    for sk, item in items.items():
-        if sk.startswith('PARSED_OCR'):
-            parsed_ocr = item
-            print(f"\n[5] PARSED_OCR encontrado com SK: {sk}")
-            break
+    parsed_ocr = snapshot.first_with_prefix('PARSED_OCR')
+    if parsed_ocr:
+        print(f"\n[5] PARSED_OCR encontrado com SK: {parsed_ocr['SK']}")
     
     if not parsed_ocr:
         print("[5] AVISO: PARSED_OCR não encontrado!")
@@ -1735,10 +1705,12 @@ def lambda_handler(event, context):
     
     # Buscar BEDROCK_EXTRACTION (campos extraídos por IA — fase 6 multi-anexo)
     bedrock_extraction = {}
-    bedrock_item = items.get('BEDROCK_EXTRACTION')
+    bedrock_item = snapshot.get('BEDROCK_EXTRACTION')
     if bedrock_item and bedrock_item.get('EXTRACTED_FIELDS'):
         try:
-            bedrock_extraction = json.loads(bedrock_item['EXTRACTED_FIELDS'])
+            bedrock_extraction = snapshot.bedrock_extraction
+            if bedrock_extraction is None:
+                raise ValueError("EXTRACTED_FIELDS não é um JSON válido")
             print(f"\n[5.1] BEDROCK_EXTRACTION encontrado com {len(bedrock_extraction)} campos")
         except Exception as be_err:
             print(f"[5.1] AVISO: erro ao parsear BEDROCK_EXTRACTION: {be_err}")
@@ -1751,7 +1723,9 @@ def lambda_handler(event, context):
     xml_data = {}
     if parsed_xml and 'PARSED_DATA' in parsed_xml:
         try:
-            xml_data = json.loads(parsed_xml['PARSED_DATA'])
+            xml_data = snapshot.json(parsed_xml, 'PARSED_DATA')
+            if xml_data is None:
+                raise ValueError("PARSED_DATA não é um JSON válido")
             print(f"[6.1] XML data carregado com sucesso")
             print(f"[6.2] XML data keys: {list(xml_data.keys())}")
         except Exception as e:
@@ -1762,7 +1736,9 @@ def lambda_handler(event, context):
     ocr_data = {}
     if parsed_ocr and 'PARSED_DATA' in parsed_ocr:
         try:
-            ocr_data = json.loads(parsed_ocr['PARSED_DATA'])
+            ocr_data = snapshot.json(parsed_ocr, 'PARSED_DATA')
+            if ocr_data is None:
+                raise ValueError("PARSED_DATA não é um JSON válido")
             print(f"[6.3] OCR data carregado com sucesso")
             print(f"[6.4] OCR data keys: {list(ocr_data.keys())}")
         except Exception as e:
@@ -2809,7 +2785,7 @@ def lambda_handler(event, context):
             Key={'PK': f'PROCESS#{process_id}', 'SK': 'METADATA'},
             UpdateExpression='SET protheus_request_payload = :payload, updated_at = :timestamp',
             ExpressionAttributeValues={
-                ':payload': payload_str_db,
+                ':payload': encode_attribute(payload_str_db),
                 ':timestamp': datetime.utcnow().isoformat()
             }
         )
@@ -3116,7 +3092,7 @@ def lambda_handler(event, context):
         update_expr = 'SET #status = :status, protheus_response = :response, updated_at = :timestamp'
         expr_values = {
             ':status': 'COMPLETED',
-            ':response': json.dumps(protheus_response),
+            ':response': encode_attribute(json.dumps(protheus_response)),
             ':timestamp': datetime.utcnow().isoformat()
         }
         if id_unico:
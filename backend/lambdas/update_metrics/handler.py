@@ -1,9 +1,11 @@
 import json
 import os
 import sys
+from collections import Counter
 from pathlib import Path
 
 import boto3
+from botocore.exceptions import ClientError
 from datetime import datetime, timezone
 from decimal import Decimal
 
@@ -13,8 +15,16 @@ for _root in (_handler_dir, _handler_dir.parent):
     if (_root / "utils").is_dir() and str(_root) not in sys.path:
         sys.path.insert(0, str(_root))
 
-from utils.failure_dedup import failure_identity_fallback, format_failure_key_display
+from utils.blob_store import resolve_blob
+from utils.dynamo_query import query_partition
+from utils.json_codec import decode_attribute, decode_item
+from utils.failure_dedup import (
+    failure_dedup_record_key,
+    failure_identity_fallback,
+    format_failure_key_display,
+)
 from utils.metrics_rates import metrics_outcome_for_status
+from utils.metrics_rollups import ROLLUP_COUNTERS, ROLLUP_MAPS, rollup_keys_for_date
 from utils.protheus_regras import (
     build_failed_rules_for_metrics,
     extract_protheus_regras_from_metadata,
@@ -32,6 +42,11 @@ def _coerce_dict(value):
         return None
     if isinstance(value, dict):
         return value
+    try:
+        # Binary do json_codec (itens lidos sem decode_item, ex.: scans dos scripts)
+        value = decode_attribute(value)
+    except Exception:
+        return None
     if isinstance(value, str):
         try:
             return json.loads(value)
@@ -217,11 +232,7 @@ def _extract_failure_identity(
     pedido = ""
     pk = f"PROCESS#{process_id}"
     try:
-        resp = table.query(
-            KeyConditionExpression='PK = :pk',
-            ExpressionAttributeValues={':pk': pk}
-        )
-        items = resp.get("Items", [])
+        items = query_partition(table, pk)
     except Exception:
         items = []
 
@@ -230,7 +241,7 @@ def _extract_failure_identity(
     ]
     if parsed_xml_items:
         parsed_xml_items.sort(key=lambda x: x.get("TIMESTAMP", 0), reverse=True)
-        parsed_data = _parse_json_blob(parsed_xml_items[0].get("PARSED_DATA"))
+        parsed_data = _parse_json_blob(resolve_blob(parsed_xml_items[0].get("PARSED_DATA")))
         nf, cnpj = _nf_cnpj_from_parsed_xml(parsed_data)
 
     if not nf:
@@ -309,6 +320,8 @@ def lambda_handler(event, context):
         metadata_response = table.get_item(
             Key={'PK': pk, 'SK': 'METADATA'}
         )
+        if 'Item' in metadata_response:
+            metadata_response['Item'] = decode_item(metadata_response['Item'])
         
         if 'Item' in metadata_response:
             start_time_str = metadata_response['Item'].get('START_TIME')
@@ -373,15 +386,7 @@ def lambda_handler(event, context):
     try:
         # Buscar resultados de validação do DynamoDB
         pk = f"PROCESS#{process_id}"
-        response = table.query(
-            KeyConditionExpression='PK = :pk AND begins_with(SK, :sk)',
-            ExpressionAttributeValues={
-                ':pk': pk,
-                ':sk': 'VALIDATION#'
-            }
-        )
-        
-        items = response.get('Items', [])
+        items = query_partition(table, pk, sk_prefix='VALIDATION#')
         print(f"Buscando regras que falharam - encontrados {len(items)} itens de validação")
         
         if items:
@@ -418,7 +423,6 @@ def lambda_handler(event, context):
                 print(f"Traceback:\n{traceback.format_exc()}")
         else:
             print("⚠️ Nenhum resultado de validação encontrado no DynamoDB")
-            print(f"Query response: {response}")
     except Exception as e:
         print(f"Erro ao buscar regras que falharam: {e}")
         import traceback
@@ -764,6 +768,356 @@ def save_metrics_status(
         traceback.print_exc()
 
 
+# Contadores e mapas dos itens METRICS# (SUMMARY / MONTHLY_SUMMARY). DynamoDB não
+# cria o mapa pai num ADD em caminho aninhado: na primeira escrita do período (ou
+# em SUMMARY antigo sem o mapa) o update falha com ValidationException, os mapas
+# são criados vazios com if_not_exists e o update é repetido.
+_SUMMARY_COUNTERS = (
+    'total_count',
+    'success_count',
+    'success_prenota_count',
+    'failed_count',
+    'skipped_operacional',
+    'total_time',
+)
+_DAILY_SUMMARY_MAPS = (
+    'processes_by_hour',
+    'failure_reasons',
+    'processes_by_type',
+    'failed_rules',
+    'failed_rules_operacional',
+)
+_MONTHLY_SUMMARY_MAPS = ('processes_by_type',)
+
+
+def _client_error_code(error):
+    return error.response.get('Error', {}).get('Code')
+
+
+class _SummaryUpdate:
+    """
+    UpdateItem atômico sobre um item de métricas.
+
+    As operações ficam estruturadas (e não em string) para que a mesma
+    atualização possa ser enviada numa única UpdateExpression ou reaplicada
+    uma operação por vez (fallback dos decrementos com contador já em 0).
+    """
+
+    def __init__(self):
+        self.ops = []
+        self.conditions = []
+
+    def __bool__(self):
+        return bool(self.ops)
+
+    def add(self, *path, amount=1):
+        self.ops.append(('ADD', path, amount))
+        return self
+
+    def decrement(self, *path, amount=1):
+        """ADD negativo condicionado a ``path >= amount`` (contador nunca fica negativo)."""
+        self.ops.append(('DEC', path, amount))
+        return self
+
+    def clamp_to_zero(self, *path, below):
+        """SET 0 se ``0 < path < below`` (resto que o decremento guardado não cobre)."""
+        self.ops.append(('CLAMP', path, below))
+        return self
+
+    def set(self, *path, value):
+        self.ops.append(('SET', path, value))
+        return self
+
+    def remove(self, *path):
+        self.ops.append(('REMOVE', path, None))
+        return self
+
+    def require(self, function, *path):
+        """Condição ``attribute_exists``/``attribute_not_exists`` sobre ``path``."""
+        self.conditions.append((function, path))
+        return self
+
+    def deltas(self):
+        """[(path, delta)] dos contadores (ADD/DEC) — o que os rollups precisam replicar."""
+        return [
+            (path, operand if op == 'ADD' else -operand)
+            for op, path, operand in self.ops
+            if op in ('ADD', 'DEC')
+        ]
+
+    def split(self):
+        singles = []
+        for op in self.ops:
+            single = _SummaryUpdate()
+            single.ops.append(op)
+            singles.append(single)
+        return singles
+
+    def to_kwargs(self):
+        names = {}
+        values = {}
+
+        def path(parts):
+            tokens = []
+            for part in parts:
+                placeholder = f'#n{len(names)}'
+                names[placeholder] = str(part)
+                tokens.append(placeholder)
+            return '.'.join(tokens)
+
+        def value(v):
+            placeholder = f':v{len(values)}'
+            values[placeholder] = v
+            return placeholder
+
+        sections = {'ADD': [], 'SET': [], 'REMOVE': []}
+        conditions = []
+        for op, parts, operand in self.ops:
+            p = path(parts)
+            if op == 'ADD':
+                sections['ADD'].append(f'{p} {value(operand)}')
+            elif op == 'DEC':
+                sections['ADD'].append(f'{p} {value(-operand)}')
+                conditions.append(f'{p} >= {value(operand)}')
+            elif op == 'CLAMP':
+                zero = value(0)
+                sections['SET'].append(f'{p} = {zero}')
+                conditions.append(f'{p} > {zero} AND {p} < {value(operand)}')
+            elif op == 'SET':
+                sections['SET'].append(f'{p} = {value(operand)}')
+            else:
+                sections['REMOVE'].append(p)
+        for function, parts in self.conditions:
+            conditions.append(f'{function}({path(parts)})')
+
+        kwargs = {
+            'UpdateExpression': ' '.join(
+                f"{section} {', '.join(parts)}" for section, parts in sections.items() if parts
+            ),
+            'ExpressionAttributeNames': names,
+        }
+        if values:
+            kwargs['ExpressionAttributeValues'] = values
+        if conditions:
+            kwargs['ConditionExpression'] = ' AND '.join(conditions)
+        return kwargs
+
+
+def _ensure_summary(summary_key, maps):
+    """Cria o item/contadores/mapas que faltam sem tocar nos existentes (idempotente)."""
+    names = {}
+    set_parts = []
+    for idx, attr in enumerate(_SUMMARY_COUNTERS):
+        names[f'#c{idx}'] = attr
+        set_parts.append(f'#c{idx} = if_not_exists(#c{idx}, :zero)')
+    for idx, attr in enumerate(maps):
+        names[f'#m{idx}'] = attr
+        set_parts.append(f'#m{idx} = if_not_exists(#m{idx}, :empty)')
+    table.update_item(
+        Key=summary_key,
+        UpdateExpression='SET ' + ', '.join(set_parts),
+        ExpressionAttributeNames=names,
+        ExpressionAttributeValues={':zero': 0, ':empty': {}},
+    )
+
+
+def _update_summary(summary_key, update, maps, return_old=False):
+    """Envia ``update``; se faltar mapa pai (ValidationException), cria os mapas e repete uma vez."""
+    kwargs = update.to_kwargs()
+    if return_old:
+        kwargs['ReturnValues'] = 'UPDATED_OLD'
+    try:
+        return table.update_item(Key=summary_key, **kwargs)
+    except ClientError as e:
+        if _client_error_code(e) != 'ValidationException':
+            raise
+    _ensure_summary(summary_key, maps)
+    return table.update_item(Key=summary_key, **kwargs)
+
+
+def _apply_decrements(summary_key, update, maps):
+    """
+    Decrementos guardados numa única chamada; se algum contador já está abaixo do
+    valor (ConditionalCheckFailed), aplica um a um e zera o que não comporta o
+    decremento inteiro — mesmo resultado do antigo max(valor - n, 0).
+    Retorna os deltas efetivamente aplicados ([] se nenhum decremento coube).
+    """
+    if not update:
+        return []
+    try:
+        _update_summary(summary_key, update, maps)
+        return update.deltas()
+    except ClientError as e:
+        if _client_error_code(e) != 'ConditionalCheckFailedException':
+            raise
+
+    applied = []
+    for single in update.split():
+        try:
+            _update_summary(summary_key, single, maps)
+            applied.extend(single.deltas())
+            continue
+        except ClientError as e:
+            if _client_error_code(e) != 'ConditionalCheckFailedException':
+                raise
+        _, path, amount = single.ops[0]
+        try:
+            response = _update_summary(
+                summary_key, _SummaryUpdate().clamp_to_zero(*path, below=amount), maps, return_old=True
+            )
+        except ClientError as e:
+            if _client_error_code(e) != 'ConditionalCheckFailedException':
+                raise
+            continue
+        old = response.get('Attributes') or {}
+        for part in path:
+            old = old.get(part, 0) if isinstance(old, dict) else 0
+        applied.append((path, -old))
+    return applied
+
+
+def _add_to_rollups(date_key, deltas):
+    """
+    Replica nos rollups da semana ISO e do mês os deltas aplicados ao SUMMARY do
+    dia. O SUMMARY é a fonte de verdade: erro aqui só é logado (relançar faria o
+    Step Functions repetir o processo e contar o dia duas vezes).
+    """
+    totals = {}
+    for path, delta in deltas:
+        if path[0] in ROLLUP_COUNTERS or path[0] in ROLLUP_MAPS:
+            totals[path] = totals.get(path, 0) + delta
+    update = _SummaryUpdate()
+    for path, delta in totals.items():
+        if delta:
+            update.add(*path, amount=delta)
+    if not update:
+        return
+    for rollup_key in rollup_keys_for_date(date_key):
+        try:
+            _update_summary(rollup_key, update, ROLLUP_MAPS)
+        except Exception as e:
+            print(f"[rollups] Erro ao atualizar {rollup_key['PK']}/{rollup_key['SK']}: {e}")
+
+
+def _claim_failure_key(date_key, summary_key, failure_key, process_id):
+    """
+    Reserva ``failure_key`` no dia (put condicional em METRICS_DEDUP#) e conta a
+    falha no SUMMARY — só a primeira execução com a chave conta.
+    """
+    dedup_key = failure_dedup_record_key(date_key, failure_key)
+    try:
+        table.put_item(
+            Item={
+                **dedup_key,
+                'FAILURE_KEY': failure_key,
+                'PROCESS_ID': process_id,
+                'CREATED_AT': datetime.now(timezone.utc).isoformat(),
+            },
+            ConditionExpression='attribute_not_exists(PK)',
+        )
+    except ClientError as e:
+        if _client_error_code(e) != 'ConditionalCheckFailedException':
+            raise
+        return False
+
+    # A condição cobre dias gravados antes dos itens METRICS_DEDUP#, em que a
+    # chave ainda pode estar no mapa failure_dedup_registry do próprio SUMMARY.
+    count = (
+        _SummaryUpdate()
+        .add('failed_count')
+        .add('failed_rules', _error_tag_from_failure_key(failure_key))
+        .require('attribute_not_exists', 'failure_dedup_registry', failure_key)
+    )
+    try:
+        _update_summary(summary_key, count, _DAILY_SUMMARY_MAPS)
+    except Exception as e:
+        # Falha não contada: libera a reserva para não deixar a chave "órfã"
+        table.delete_item(Key=dedup_key)
+        if isinstance(e, ClientError) and _client_error_code(e) == 'ConditionalCheckFailedException':
+            return False
+        raise
+    _add_to_rollups(date_key, count.deltas())
+    return True
+
+
+def _failure_key_owner(date_key, summary_key, failure_key):
+    """process_id que reservou ``failure_key`` no dia (item METRICS_DEDUP# ou registry legado)."""
+    response = table.get_item(
+        Key=failure_dedup_record_key(date_key, failure_key),
+        ProjectionExpression='PROCESS_ID',
+    )
+    if 'Item' in response:
+        return response['Item'].get('PROCESS_ID')
+    response = table.get_item(
+        Key=summary_key,
+        ProjectionExpression='#r.#k',
+        ExpressionAttributeNames={'#r': 'failure_dedup_registry', '#k': failure_key},
+    )
+    registry = (response.get('Item') or {}).get('failure_dedup_registry') or {}
+    return registry.get(failure_key)
+
+
+def _release_failure_key(date_key, summary_key, failure_key):
+    """Apaga a reserva de ``failure_key`` e desconta a falha, só se a chave estava reservada."""
+    try:
+        table.delete_item(
+            Key=failure_dedup_record_key(date_key, failure_key),
+            ConditionExpression='attribute_exists(PK)',
+        )
+    except ClientError as e:
+        if _client_error_code(e) != 'ConditionalCheckFailedException':
+            raise
+        _release_legacy_failure_key(date_key, summary_key, failure_key)
+        return
+    deltas = _apply_decrements(
+        summary_key,
+        _SummaryUpdate()
+        .decrement('failed_count')
+        .decrement('failed_rules', _error_tag_from_failure_key(failure_key)),
+        _DAILY_SUMMARY_MAPS,
+    )
+    _add_to_rollups(date_key, deltas)
+
+
+def _release_legacy_failure_key(date_key, summary_key, failure_key):
+    """Mesmo que _release_failure_key para chaves no mapa failure_dedup_registry do SUMMARY."""
+    error_tag = _error_tag_from_failure_key(failure_key)
+    release = (
+        _SummaryUpdate()
+        .remove('failure_dedup_registry', failure_key)
+        .decrement('failed_count')
+        .decrement('failed_rules', error_tag)
+        .require('attribute_exists', 'failure_dedup_registry', failure_key)
+    )
+    try:
+        _update_summary(summary_key, release, _DAILY_SUMMARY_MAPS)
+        _add_to_rollups(date_key, release.deltas())
+        return
+    except ClientError as e:
+        if _client_error_code(e) != 'ConditionalCheckFailedException':
+            raise
+
+    # Chave ausente ou contador já em 0: remove a chave isoladamente e, se ela
+    # existia, desconta cada contador com sua própria guarda.
+    remove_only = (
+        _SummaryUpdate()
+        .remove('failure_dedup_registry', failure_key)
+        .require('attribute_exists', 'failure_dedup_registry', failure_key)
+    )
+    try:
+        _update_summary(summary_key, remove_only, _DAILY_SUMMARY_MAPS)
+    except ClientError as e:
+        if _client_error_code(e) != 'ConditionalCheckFailedException':
+            raise
+        return
+    deltas = _apply_decrements(
+        summary_key,
+        _SummaryUpdate().decrement('failed_count').decrement('failed_rules', error_tag),
+        _DAILY_SUMMARY_MAPS,
+    )
+    _add_to_rollups(date_key, deltas)
+
+
 def record_operacional_skip_metrics(
     date_key,
     month_key,
@@ -774,88 +1128,34 @@ def record_operacional_skip_metrics(
 ):
     """Falha só Operacional: entra no total do dia, mas não em failed_count (taxa OCR)."""
     operacional_rule_ids = operacional_rule_ids or []
-    response = table.get_item(Key={"PK": f"METRICS#{date_key}", "SK": "SUMMARY"})
-    if "Item" not in response:
-        table.put_item(
-            Item={
-                "PK": f"METRICS#{date_key}",
-                "SK": "SUMMARY",
-                "total_count": 0,
-                "success_count": 0,
-                "success_prenota_count": 0,
-                "failed_count": 0,
-                "skipped_operacional": 0,
-                "total_time": Decimal("0"),
-                "processes_by_hour": {},
-                "failure_reasons": {},
-                "processes_by_type": {},
-                "failed_rules": {},
-                "failed_rules_operacional": {},
-            }
-        )
-
-    expr_names = {}
-    expr_values = {":inc": 1, ":time": Decimal(str(processing_time)), ":zero": 0}
-    add_parts = ["total_count :inc", "skipped_operacional :inc", "total_time :time"]
-    set_parts = []
-
-    hour_key = "#h"
-    hour_path = f"processes_by_hour.{hour_key}"
-    set_parts.append(f"{hour_path} = if_not_exists({hour_path}, :zero) + :hour_inc")
-    expr_names[hour_key] = str(hour)
-    expr_values[":hour_inc"] = 1
-
-    type_key = "#t"
-    type_path = f"processes_by_type.{type_key}"
-    set_parts.append(f"{type_path} = if_not_exists({type_path}, :zero) + :type_inc")
-    expr_names[type_key] = process_type
-    expr_values[":type_inc"] = 1
-
-    for idx, rid in enumerate(operacional_rule_ids):
-        rule_key = f"#ro{idx}"
-        rule_path = f"failed_rules_operacional.{rule_key}"
-        rule_inc = f":rop{idx}"
-        set_parts.append(f"{rule_path} = if_not_exists({rule_path}, :zero) + {rule_inc}")
-        expr_names[rule_key] = rid
-        expr_values[rule_inc] = 1
-
-    update_expr = "ADD " + ", ".join(add_parts) + " SET " + ", ".join(set_parts)
-    table.update_item(
-        Key={"PK": f"METRICS#{date_key}", "SK": "SUMMARY"},
-        UpdateExpression=update_expr,
-        ExpressionAttributeNames=expr_names,
-        ExpressionAttributeValues=expr_values,
+    time_inc = Decimal(str(processing_time))
+
+    daily = (
+        _SummaryUpdate()
+        .add("total_count")
+        .add("skipped_operacional")
+        .add("total_time", amount=time_inc)
+        .add("processes_by_hour", str(hour))
     )
+    if process_type:
+        daily.add("processes_by_type", process_type)
+    for rid, count in Counter(operacional_rule_ids).items():
+        daily.add("failed_rules_operacional", rid, amount=count)
+    _update_summary(
+        {"PK": f"METRICS#{date_key}", "SK": "SUMMARY"}, daily, _DAILY_SUMMARY_MAPS
+    )
+    _add_to_rollups(date_key, daily.deltas())
 
-    mresp = table.get_item(Key={"PK": f"METRICS#{month_key}", "SK": "MONTHLY_SUMMARY"})
-    if "Item" not in mresp:
-        table.put_item(
-            Item={
-                "PK": f"METRICS#{month_key}",
-                "SK": "MONTHLY_SUMMARY",
-                "total_count": 0,
-                "success_count": 0,
-                "success_prenota_count": 0,
-                "failed_count": 0,
-                "skipped_operacional": 0,
-                "total_time": Decimal("0"),
-                "processes_by_type": {},
-            }
-        )
-    mnames = {"#t": process_type}
-    table.update_item(
-        Key={"PK": f"METRICS#{month_key}", "SK": "MONTHLY_SUMMARY"},
-        UpdateExpression=(
-            "ADD total_count :inc, skipped_operacional :inc, total_time :time "
-            "SET processes_by_type.#t = if_not_exists(processes_by_type.#t, :zero) + :one"
-        ),
-        ExpressionAttributeNames=mnames,
-        ExpressionAttributeValues={
-            ":inc": 1,
-            ":time": Decimal(str(processing_time)),
-            ":one": 1,
-            ":zero": 0,
-        },
+    monthly = (
+        _SummaryUpdate()
+        .add("total_count")
+        .add("skipped_operacional")
+        .add("total_time", amount=time_inc)
+    )
+    if process_type:
+        monthly.add("processes_by_type", process_type)
+    _update_summary(
+        {"PK": f"METRICS#{month_key}", "SK": "MONTHLY_SUMMARY"}, monthly, _MONTHLY_SUMMARY_MAPS
     )
     print(
         f"[record_operacional_skip_metrics] {date_key}: +1 skipped_operacional, "
@@ -884,67 +1184,44 @@ def decrement_daily_metrics(
     
     failed_rules = failed_rules or []
     failure_keys = failure_keys or []
+    summary_key = {'PK': f'METRICS#{date_key}', 'SK': 'SUMMARY'}
 
     try:
-        response = table.get_item(Key={'PK': f'METRICS#{date_key}', 'SK': 'SUMMARY'})
-        if 'Item' not in response:
-            print(f"[decrement_daily_metrics] Item não existe para {date_key}, nada a decrementar")
-            return
-
-        item = response['Item']
-        item.setdefault('processes_by_type', {})
-        item.setdefault('failed_rules', {})
-        item.setdefault('failure_reasons', {})
-        item.setdefault('failure_dedup_registry', {})
-
-        item['total_count'] = max(int(item.get('total_count', 0) or 0) - 1, 0)
+        update = _SummaryUpdate().decrement('total_count')
         if previous_processing_time > 0:
-            old_total_time = Decimal(str(item.get('total_time', 0) or 0))
-            item['total_time'] = max(
-                old_total_time - Decimal(str(round(previous_processing_time, 2))),
-                Decimal('0'),
+            update.decrement(
+                'total_time', amount=Decimal(str(round(previous_processing_time, 2)))
             )
 
         if status == 'SUCCESS':
-            item['success_count'] = max(int(item.get('success_count', 0) or 0) - 1, 0)
+            update.decrement('success_count')
             if previous_is_prenota:
-                item['success_prenota_count'] = max(
-                    int(item.get('success_prenota_count', 0) or 0) - 1, 0
-                )
+                update.decrement('success_prenota_count')
 
         if process_type:
-            current = int((item.get('processes_by_type') or {}).get(process_type, 0) or 0)
-            if current > 0:
-                item['processes_by_type'][process_type] = current - 1
+            update.decrement('processes_by_type', process_type)
 
         if status == 'FAILED' and previous_failure_error_type:
-            et = str(previous_failure_error_type)
-            fr = item.get('failure_reasons') or {}
-            cur = int(fr.get(et, 0) or 0)
-            if cur > 0:
-                fr[et] = cur - 1
-                item['failure_reasons'] = fr
-
-        registry = item.get('failure_dedup_registry') or {}
+            update.decrement('failure_reasons', str(previous_failure_error_type))
+
+        _add_to_rollups(date_key, _apply_decrements(summary_key, update, _DAILY_SUMMARY_MAPS))
+
         if status == 'FAILED':
-            for key in failure_keys:
-                if key in registry:
-                    registry.pop(key, None)
-                    item['failed_count'] = max(int(item.get('failed_count', 0) or 0) - 1, 0)
-                    error_tag = _error_tag_from_failure_key(key)
-                    rule_val = int((item.get('failed_rules') or {}).get(error_tag, 0) or 0)
-                    if rule_val > 0:
-                        item['failed_rules'][error_tag] = rule_val - 1
-            item['failure_dedup_registry'] = registry
-
-            if not failure_keys and int(item.get('failed_count', 0) or 0) > 0:
-                item['failed_count'] = max(int(item.get('failed_count', 0) or 0) - 1, 0)
-                for rule_name in failed_rules:
-                    rv = int((item.get('failed_rules') or {}).get(rule_name, 0) or 0)
-                    if rv > 0:
-                        item['failed_rules'][rule_name] = rv - 1
-
-        table.put_item(Item=item)
+            for key in dict.fromkeys(failure_keys):
+                _release_failure_key(date_key, summary_key, key)
+
+            if not failure_keys:
+                # Sem chaves de dedup (métricas antigas): regras só saem se a falha ainda conta
+                deltas = _apply_decrements(
+                    summary_key, _SummaryUpdate().decrement('failed_count'), _DAILY_SUMMARY_MAPS
+                )
+                if deltas:
+                    rules_update = _SummaryUpdate()
+                    for rule_name in dict.fromkeys(failed_rules):
+                        rules_update.decrement('failed_rules', rule_name)
+                    deltas += _apply_decrements(summary_key, rules_update, _DAILY_SUMMARY_MAPS)
+                _add_to_rollups(date_key, deltas)
+
         print(f"[decrement_daily_metrics] ✓ Métricas diárias decrementadas para {date_key}")
 
     except Exception as e:
@@ -965,59 +1242,29 @@ def decrement_monthly_metrics(
     )
     
     try:
-        # Verificar se o item existe
-        response = table.get_item(
-            Key={'PK': f'METRICS#{month_key}', 'SK': 'MONTHLY_SUMMARY'}
-        )
-        
-        if 'Item' not in response:
-            print(f"[decrement_monthly_metrics] Item não existe para {month_key}, nada a decrementar")
-            return
-        
-        existing_item = response['Item']
-        
-        # Construir expressão de atualização
-        add_parts = []
-        expr_names = {}
-        expr_values = {
-            ':dec': -1
-        }
-        
-        # Decrementar total_count
-        add_parts.append('total_count :dec')
+        update = _SummaryUpdate().decrement('total_count')
         
         # Decrementar total_time com o tempo de processamento anterior
         if previous_processing_time > 0:
-            dec_time = Decimal(str(round(previous_processing_time, 2))) * Decimal('-1')
-            expr_values[':dec_time'] = dec_time
-            add_parts.append('total_time :dec_time')
+            update.decrement(
+                'total_time', amount=Decimal(str(round(previous_processing_time, 2)))
+            )
             print(f"[decrement_monthly_metrics] Decrementando total_time em {previous_processing_time}s")
         
         # Decrementar contador de status
         if status == 'SUCCESS':
-            add_parts.append('success_count :dec')
+            update.decrement('success_count')
             if previous_is_prenota:
-                sp = int(existing_item.get('success_prenota_count', 0) or 0)
-                if sp > 0:
-                    add_parts.append('success_prenota_count :dec')
+                update.decrement('success_prenota_count')
         elif status == 'FAILED':
-            add_parts.append('failed_count :dec')
+            update.decrement('failed_count')
         
         # Decrementar por tipo de processo
-        if process_type and existing_item.get('processes_by_type', {}).get(process_type):
-            type_key = '#t0'
-            add_parts.append(f'processes_by_type.{type_key} :dec')
-            expr_names[type_key] = process_type
-        
-        update_expr = 'ADD ' + ', '.join(add_parts)
-        
-        print(f"[decrement_monthly_metrics] UpdateExpression: {update_expr}")
+        if process_type:
+            update.decrement('processes_by_type', process_type)
         
-        table.update_item(
-            Key={'PK': f'METRICS#{month_key}', 'SK': 'MONTHLY_SUMMARY'},
-            UpdateExpression=update_expr,
-            ExpressionAttributeNames=expr_names if expr_names else None,
-            ExpressionAttributeValues=expr_values
+        _apply_decrements(
+            {'PK': f'METRICS#{month_key}', 'SK': 'MONTHLY_SUMMARY'}, update, _MONTHLY_SUMMARY_MAPS
         )
         
         print(f"[decrement_monthly_metrics] ✓ Métricas mensais decrementadas para {month_key}")
@@ -1050,90 +1297,51 @@ def update_daily_metrics(
     failed_rules = failed_rules or []
     failure_keys = failure_keys or []
     operacional_failed_rules = operacional_failed_rules or []
+    summary_key = {'PK': f'METRICS#{date_key}', 'SK': 'SUMMARY'}
 
     try:
-        response = table.get_item(Key={'PK': f'METRICS#{date_key}', 'SK': 'SUMMARY'})
-        if 'Item' not in response:
-            item = {
-                'PK': f'METRICS#{date_key}',
-                'SK': 'SUMMARY',
-                'total_count': 0,
-                'success_count': 0,
-                'success_prenota_count': 0,
-                'failed_count': 0,
-                'skipped_operacional': 0,
-                'total_time': Decimal('0'),
-                'processes_by_hour': {},
-                'failure_reasons': {},
-                'processes_by_type': {},
-                'failed_rules': {},
-                'failed_rules_operacional': {},
-                'failure_dedup_registry': {},
-            }
-        else:
-            item = response['Item']
-            item.setdefault('processes_by_hour', {})
-            item.setdefault('failure_reasons', {})
-            item.setdefault('processes_by_type', {})
-            item.setdefault('failed_rules', {})
-            item.setdefault('failed_rules_operacional', {})
-            item.setdefault('failure_dedup_registry', {})
-            if 'success_prenota_count' not in item:
-                item['success_prenota_count'] = 0
-            if 'skipped_operacional' not in item:
-                item['skipped_operacional'] = 0
-
-        item['total_count'] = int(item.get('total_count', 0) or 0) + 1
-        item['total_time'] = Decimal(str(item.get('total_time', 0) or 0)) + Decimal(str(processing_time))
+        counters = (
+            _SummaryUpdate()
+            .add('total_count')
+            .add('total_time', amount=Decimal(str(processing_time)))
+            .add('processes_by_hour', str(hour))
+        )
 
         if status == 'SUCCESS':
-            item['success_count'] = int(item.get('success_count', 0) or 0) + 1
+            counters.add('success_count')
             if is_prenota:
-                item['success_prenota_count'] = int(item.get('success_prenota_count', 0) or 0) + 1
-
-        hour_key = str(hour)
-        item['processes_by_hour'][hour_key] = int(
-            (item['processes_by_hour'] or {}).get(hour_key, 0) or 0
-        ) + 1
+                counters.add('success_prenota_count')
 
         if process_type:
-            item['processes_by_type'][process_type] = int(
-                (item['processes_by_type'] or {}).get(process_type, 0) or 0
-            ) + 1
+            counters.add('processes_by_type', process_type)
 
         if status == 'FAILED' and error_type:
-            item['failure_reasons'][error_type] = int(
-                (item['failure_reasons'] or {}).get(error_type, 0) or 0
-            ) + 1
+            counters.add('failure_reasons', error_type)
 
+        for rule_name, count in Counter(operacional_failed_rules).items():
+            counters.add('failed_rules_operacional', rule_name, amount=count)
+
+        _update_summary(summary_key, counters, _DAILY_SUMMARY_MAPS)
+        _add_to_rollups(date_key, counters.deltas())
+
+        # Cada chave de falha é reservada num item METRICS_DEDUP#{dia} próprio
+        # (put condicional): entre execuções do mesmo dia só uma conta a falha e
+        # o SUMMARY guarda apenas contadores.
         dedup_role = None
         primary_process_id = None
         new_slots = 0
         if status == 'FAILED':
-            registry = item.get('failure_dedup_registry') or {}
             pid = process_id or 'unknown_process'
-            for key in failure_keys:
-                if key in registry:
-                    if registry[key] != pid and primary_process_id is None:
-                        primary_process_id = registry[key]
+            for key in dict.fromkeys(failure_keys):
+                if _claim_failure_key(date_key, summary_key, key, pid):
+                    new_slots += 1
                     continue
-                registry[key] = pid
-                new_slots += 1
-                item['failed_count'] = int(item.get('failed_count', 0) or 0) + 1
-                error_tag = _error_tag_from_failure_key(key)
-                item['failed_rules'][error_tag] = int(
-                    (item['failed_rules'] or {}).get(error_tag, 0) or 0
-                ) + 1
-            item['failure_dedup_registry'] = registry
+                owner = _failure_key_owner(date_key, summary_key, key)
+                if owner and owner != pid and primary_process_id is None:
+                    primary_process_id = owner
             if failure_keys:
                 dedup_role = 'primary' if new_slots > 0 else 'duplicate'
 
-        for rule_name in operacional_failed_rules:
-            item['failed_rules_operacional'][rule_name] = int(
-                (item.get('failed_rules_operacional') or {}).get(rule_name, 0) or 0
-            ) + 1
-
-        table.put_item(Item=item)
         print(f"[update_daily_metrics] ✓ Métricas diárias atualizadas para {date_key}")
         return {
             'dedup_role': dedup_role,
@@ -1150,64 +1358,27 @@ def update_monthly_metrics(month_key, status, processing_time, process_type='UNK
     """Atualiza métricas mensais"""
     
     try:
-        # Verificar se item existe
-        response = table.get_item(
-            Key={'PK': f'METRICS#{month_key}', 'SK': 'MONTHLY_SUMMARY'}
+        update = (
+            _SummaryUpdate()
+            .add('total_count')
+            .add('total_time', amount=Decimal(str(processing_time)))
         )
         
-        if 'Item' not in response:
-            # Criar item inicial
-            table.put_item(
-                Item={
-                    'PK': f'METRICS#{month_key}',
-                    'SK': 'MONTHLY_SUMMARY',
-                    'total_count': 0,
-                    'success_count': 0,
-                    'success_prenota_count': 0,
-                    'failed_count': 0,
-                    'total_time': Decimal('0'),
-                    'processes_by_type': {}
-                }
-            )
-        
-        # Coletar todos os campos ADD em uma única lista
-        add_parts = []
-        expr_names = {}
-        expr_values = {
-            ':inc': 1,
-            ':time': Decimal(str(processing_time))
-        }
-        
-        # Campos numéricos simples (ADD)
-        add_parts.append('total_count :inc')
-        add_parts.append('total_time :time')
-        
         if status == 'SUCCESS':
-            add_parts.append('success_count :succ')
-            expr_values[':succ'] = 1
+            update.add('success_count')
             if is_prenota:
-                add_parts.append('success_prenota_count :pren')
-                expr_values[':pren'] = 1
+                update.add('success_prenota_count')
         elif status == 'FAILED':
-            add_parts.append('failed_count :fail')
-            expr_values[':fail'] = 1
+            update.add('failed_count')
         
         # Contador por tipo de processo
-        type_key = f'#t{len(expr_names)}'
-        add_parts.append(f'processes_by_type.{type_key} :type_inc')
-        expr_names[type_key] = process_type
-        expr_values[':type_inc'] = 1
-        
-        # Construir UpdateExpression com uma única seção ADD
-        update_expr = 'ADD ' + ', '.join(add_parts)
+        if process_type:
+            update.add('processes_by_type', process_type)
         
-        table.update_item(
-            Key={'PK': f'METRICS#{month_key}', 'SK': 'MONTHLY_SUMMARY'},
-            UpdateExpression=update_expr,
-            ExpressionAttributeNames=expr_names if expr_names else None,
-            ExpressionAttributeValues=expr_values
+        _update_summary(
+            {'PK': f'METRICS#{month_key}', 'SK': 'MONTHLY_SUMMARY'}, update, _MONTHLY_SUMMARY_MAPS
         )
         
     except Exception as e:
         print(f'Erro específico em update_monthly_metrics: {e}')
-        raise
\ No newline at end of file
+        raise
@@ -10,6 +10,15 @@ logger.setLevel(logging.INFO)
 dynamodb = boto3.resource('dynamodb')
 table = dynamodb.Table(os.environ['TABLE_NAME'])
 
+
+def _process_list_keys(process_id, timestamp):
+    """LIST_PK/LIST_SK do GSI ProcessListIndex (mesmo formato de src/utils/process_list.py)."""
+    return {
+        'LIST_PK': 'PROCESS_LIST',
+        'LIST_SK': f"{int(timestamp):012d}#{process_id}",
+    }
+
+
 def handler(event, context):
     """
     Atualiza o status do processo para FAILED e salva informações do erro.
@@ -88,7 +97,8 @@ def handler(event, context):
                 'STATUS': 'FAILED',
                 'PROCESS_ID': process_id,
                 'error_info': error_info,
-                'updated_at': timestamp
+                'updated_at': timestamp,
+                **_process_list_keys(process_id, datetime.now().timestamp()),
             })
             logger.info(f"Item METADATA criado com status FAILED para processo {process_id}")
         
@@ -1,8 +1,8 @@
 import json
-import os
-import boto3
 import logging
 
+from utils.bedrock_gateway import invoke_text
+
 logger = logging.getLogger()
 
 def generate_error_summary_with_bedrock(error_data):
@@ -22,9 +22,6 @@ def generate_error_summary_with_bedrock(error_data):
         else:
             error_json_str = str(error_data)
         
-        # Bedrock Nova Pro está disponível apenas em us-east-1 por enquanto
-        bedrock_client = boto3.client('bedrock-runtime', region_name='us-east-1')
-        
         prompt = """Você é um especialista em tradução de erros técnicos de sistemas ERP, APIs e integrações em mensagens claras, detalhadas e amigáveis para usuários finais.
 
 Sua tarefa é analisar o erro técnico fornecido e transformá-lo em uma mensagem completa, detalhada e fácil de entender, incluindo APENAS os dados RELEVANTES para o problema específico.
@@ -128,43 +125,25 @@ Mensagem amigável, completa e detalhada no formato de 3 parágrafos conforme es
 
 IMPORTANTE: Retorne APENAS texto puro, sem formatação markdown, sem asteriscos (**), sem negrito, sem itálico, sem listas com marcadores. Apenas texto simples e direto."""
         
-        # Obter modelo ID da variável de ambiente
-        model_id = os.environ.get('BEDROCK_MODEL_ID', 'amazon.nova-pro-v1:0')
-        response = bedrock_client.invoke_model(
-            modelId=model_id,
-            body=json.dumps({
-                'messages': [{
-                    'role': 'user',
-                    'content': [{'text': prompt}]
-                }],
-                'inferenceConfig': {
-                    'maxTokens': 2000,
-                    'temperature': 0.3,
-                    'topP': 0.9
-                }
-            })
+        result = invoke_text(
+            prompt,
+            {'maxTokens': 2000, 'temperature': 0.3, 'topP': 0.9},
+            label='error_summary',
         )
         
-        body_bytes = response['body'].read()
-        
-        if not body_bytes:
+        if not result.body:
             logger.error("Bedrock returned empty response")
             return None
         
-        result = json.loads(body_bytes)
-        
         # Extrair o texto da resposta
-        if 'output' in result and 'message' in result['output']:
-            content = result['output']['message'].get('content', [])
-            if content and len(content) > 0:
-                text_content = content[0].get('text', '')
-                # Limpar apenas formatação markdown (asteriscos, negrito, etc.), mantendo quebras de linha
-                text_content = text_content.replace('**', '').replace('*', '').replace('__', '').replace('_', '')
-                # Retornar texto limpo, mantendo todas as quebras de linha
-                return text_content.strip()
+        if result.text:
+            # Limpar apenas formatação markdown (asteriscos, negrito, etc.), mantendo quebras de linha
+            text_content = result.text.replace('**', '').replace('*', '').replace('__', '').replace('_', '')
+            # Retornar texto limpo, mantendo todas as quebras de linha
+            return text_content.strip()
         
         logger.warning("Bedrock response format unexpected")
-        logger.warning(f"Response structure: {list(result.keys()) if isinstance(result, dict) else 'Not a dict'}")
+        logger.warning(f"Response structure: {list(result.body.keys())}")
         return None
         
     except Exception as e:
@@ -0,0 +1,282 @@
+"""
+Gateway único para chamadas ao Bedrock Runtime (Nova, formato messages/inferenceConfig).
+
+- Cliente por região criado uma vez por container (reaproveitado entre invocações quentes).
+- Limite de chamadas simultâneas por container (BEDROCK_MAX_CONCURRENCY, padrão 4).
+- Retry adaptativo com jitter: throttling dobra uma penalidade compartilhada pelo container
+  (até BEDROCK_BACKOFF_MAX_SECONDS); toda chamada espera um sorteio em [0, penalidade) antes
+  de sair e cada sucesso reduz a penalidade pela metade — uma rajada desacelera junta em vez de
+  esgotar as tentativas e derrubar a Step Function. Erros não transitórios (validação, acesso)
+  sobem na primeira tentativa.
+- Prazo opcional (``deadline``, em time.monotonic()): passado o prazo o gateway não espera vaga,
+  não dorme e não tenta de novo — levanta TimeoutError, e a thread abandonada pelo chamador
+  devolve a vaga do semáforo assim que a chamada em voo terminar.
+- Latência e tokens de entrada/saída por chamada (log) e acumulados no container (usage_totals).
+
+Uso:
+    from utils.bedrock_gateway import invoke_text
+    result = invoke_text(prompt, {"maxTokens": 2000, "temperature": 0.3}, label="error_summary")
+    result.text  # "" se o modelo não devolveu texto
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError, ConnectionClosedError, EndpointConnectionError, ReadTimeoutError
+
+logger = logging.getLogger(__name__)
+
+# Bedrock Nova Pro está disponível apenas em us-east-1 por enquanto
+DEFAULT_REGION = "us-east-1"
+DEFAULT_MODEL_ID = "amazon.nova-pro-v1:0"
+
+THROTTLING_CODES = frozenset({
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceUnavailableException",
+})
+TRANSIENT_CODES = THROTTLING_CODES | {
+    "ModelNotReadyException",
+    "ModelTimeoutException",
+    "InternalServerException",
+}
+_TRANSIENT_NETWORK_ERRORS = (ConnectionClosedError, EndpointConnectionError, ReadTimeoutError)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.environ.get(name, default)))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return max(0.0, float(os.environ.get(name, default)))
+    except ValueError:
+        return default
+
+
+MAX_CONCURRENCY = _env_int("BEDROCK_MAX_CONCURRENCY", 4)
+MAX_ATTEMPTS = _env_int("BEDROCK_MAX_ATTEMPTS", 6)
+BACKOFF_BASE_SECONDS = _env_float("BEDROCK_BACKOFF_BASE_SECONDS", 0.5)
+BACKOFF_MAX_SECONDS = _env_float("BEDROCK_BACKOFF_MAX_SECONDS", 20.0)
+
+_clients: dict[str, Any] = {}
+_clients_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(MAX_CONCURRENCY)
+
+_state_lock = threading.Lock()
+_penalty_seconds = 0.0
+_totals: dict[str, float] = {
+    "calls": 0,
+    "errors": 0,
+    "throttles": 0,
+    "input_tokens": 0,
+    "output_tokens": 0,
+    "latency_ms": 0.0,
+}
+
+
+@dataclass
+class BedrockResult:
+    """Resposta de invoke_text: texto do 1º bloco de conteúdo e métricas da chamada."""
+
+    text: str
+    body: dict = field(default_factory=dict)
+    input_tokens: int = 0
+    output_tokens: int = 0
+    latency_ms: float = 0.0
+    attempts: int = 1
+
+
+def get_client(region: Optional[str] = None) -> Any:
+    """Cliente bedrock-runtime do container (um por região). O retry do botocore fica desligado: quem tenta de novo é o gateway."""
+    region = region or os.environ.get("BEDROCK_REGION") or DEFAULT_REGION
+    client = _clients.get(region)
+    if client is not None:
+        return client
+    with _clients_lock:
+        if region not in _clients:
+            _clients[region] = boto3.client(
+                "bedrock-runtime",
+                region_name=region,
+                config=Config(
+                    retries={"total_max_attempts": 1, "mode": "standard"},
+                    max_pool_connections=max(10, MAX_CONCURRENCY),
+                ),
+            )
+        return _clients[region]
+
+
+def usage_totals() -> dict[str, float]:
+    """Cópia dos contadores acumulados no container (chamadas, erros, throttles, tokens, latência)."""
+    with _state_lock:
+        return dict(_totals)
+
+
+def reset_usage_totals() -> None:
+    global _penalty_seconds
+    with _state_lock:
+        for k in _totals:
+            _totals[k] = 0
+        _penalty_seconds = 0.0
+
+
+def _error_code(exc: Exception) -> str:
+    if isinstance(exc, ClientError):
+        return exc.response.get("Error", {}).get("Code", "") or ""
+    return type(exc).__name__
+
+
+def _is_transient(exc: Exception) -> bool:
+    return isinstance(exc, _TRANSIENT_NETWORK_ERRORS) or _error_code(exc) in TRANSIENT_CODES
+
+
+def _on_throttle() -> float:
+    global _penalty_seconds
+    with _state_lock:
+        _totals["throttles"] += 1
+        _penalty_seconds = min(BACKOFF_MAX_SECONDS, max(BACKOFF_BASE_SECONDS, _penalty_seconds * 2))
+        return _penalty_seconds
+
+
+def _on_success() -> None:
+    global _penalty_seconds
+    with _state_lock:
+        _penalty_seconds = _penalty_seconds / 2 if _penalty_seconds > BACKOFF_BASE_SECONDS else 0.0
+
+
+def _current_penalty() -> float:
+    with _state_lock:
+        return _penalty_seconds
+
+
+def _deadline_exceeded(label: str) -> None:
+    with _state_lock:
+        _totals["errors"] += 1
+    logger.warning("[bedrock] %s: prazo esgotado antes da chamada", label)
+    raise TimeoutError(f"Bedrock {label}: prazo esgotado")
+
+
+def _time_left(deadline: Optional[float], label: str) -> Optional[float]:
+    """Segundos até o prazo (None sem prazo); TimeoutError se já passou."""
+    if deadline is None:
+        return None
+    left = deadline - time.monotonic()
+    if left <= 0:
+        _deadline_exceeded(label)
+    return left
+
+
+def _token_counts(body: dict, response: dict) -> tuple[int, int]:
+    usage = body.get("usage") or {}
+    headers = (response.get("ResponseMetadata") or {}).get("HTTPHeaders") or {}
+    inp = usage.get("inputTokens", headers.get("x-amzn-bedrock-input-token-count", 0))
+    out = usage.get("outputTokens", headers.get("x-amzn-bedrock-output-token-count", 0))
+    try:
+        return int(inp or 0), int(out or 0)
+    except (TypeError, ValueError):
+        return 0, 0
+
+
+def _first_text(body: dict) -> str:
+    content = ((body.get("output") or {}).get("message") or {}).get("content") or [{}]
+    return (content[0] or {}).get("text") or ""
+
+
+def invoke_text(
+    prompt: str,
+    inference_config: dict,
+    *,
+    label: str = "",
+    model_id: Optional[str] = None,
+    client: Any = None,
+    deadline: Optional[float] = None,
+) -> BedrockResult:
+    """
+    Envia ``prompt`` como mensagem de usuário e devolve o texto da resposta.
+    ``inference_config`` vai como está no corpo (maxTokens/max_new_tokens, temperature, topP).
+    Esgotadas as tentativas (ou erro não transitório), relança a exceção do boto3.
+    Com ``deadline`` (time.monotonic()), levanta TimeoutError em vez de esperar vaga, dormir ou
+    tentar de novo além do prazo.
+    """
+    model_id = model_id or os.environ.get("BEDROCK_MODEL_ID", DEFAULT_MODEL_ID)
+    bedrock = client or get_client()
+    payload = json.dumps({
+        "messages": [{"role": "user", "content": [{"text": prompt}]}],
+        "inferenceConfig": inference_config,
+    })
+
+    attempt = 0
+    while True:
+        attempt += 1
+        penalty = _current_penalty()
+        left = _time_left(deadline, label or model_id)
+        if penalty:
+            pause = random.uniform(0, penalty)
+            time.sleep(pause if left is None else min(pause, left))
+            left = _time_left(deadline, label or model_id)
+        if not _slots.acquire(timeout=left):
+            _deadline_exceeded(label or model_id)
+        started = time.monotonic()
+        try:
+            try:
+                response = bedrock.invoke_model(
+                    modelId=model_id,
+                    contentType="application/json",
+                    accept="application/json",
+                    body=payload,
+                )
+                body_bytes = response["body"].read()
+            finally:
+                _slots.release()
+        except Exception as e:
+            code = _error_code(e)
+            if not _is_transient(e) or attempt >= MAX_ATTEMPTS:
+                with _state_lock:
+                    _totals["errors"] += 1
+                logger.warning("[bedrock] %s falhou (tentativa %d, %s): %s", label or model_id, attempt, code, e)
+                raise
+            wait = _on_throttle() if code in THROTTLING_CODES else BACKOFF_BASE_SECONDS * 2 ** (attempt - 1)
+            wait = random.uniform(0, min(wait, BACKOFF_MAX_SECONDS))
+            if deadline is not None and time.monotonic() + wait >= deadline:
+                with _state_lock:
+                    _totals["errors"] += 1
+                logger.warning("[bedrock] %s %s (tentativa %d); prazo esgotado, sem nova tentativa",
+                               label or model_id, code, attempt)
+                raise TimeoutError(f"Bedrock {label or model_id}: prazo esgotado após {code}") from e
+            logger.info("[bedrock] %s %s (tentativa %d/%d); nova tentativa em %.2fs",
+                        label or model_id, code, attempt, MAX_ATTEMPTS, wait)
+            time.sleep(wait)
+            continue
+
+        latency_ms = (time.monotonic() - started) * 1000
+        _on_success()
+        body = json.loads(body_bytes) if body_bytes else {}
+        input_tokens, output_tokens = _token_counts(body, response)
+        with _state_lock:
+            _totals["calls"] += 1
+            _totals["input_tokens"] += input_tokens
+            _totals["output_tokens"] += output_tokens
+            _totals["latency_ms"] += latency_ms
+        logger.info("[bedrock] %s latency_ms=%.0f input_tokens=%d output_tokens=%d attempts=%d",
+                    label or model_id, latency_ms, input_tokens, output_tokens, attempt)
+        return BedrockResult(
+            text=_first_text(body),
+            body=body,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            latency_ms=latency_ms,
+            attempts=attempt,
+        )
@@ -11,10 +11,9 @@ Não altera bedrock_error_summary.py — módulo separado só para o ramo de suc
 
 import json
 import logging
-import os
 from typing import Optional
 
-import boto3
+from utils.bedrock_gateway import invoke_text
 
 logger = logging.getLogger()
 
@@ -39,37 +38,22 @@ Retorne APENAS o texto dos três parágrafos, em texto puro."""
 
 
 def _invoke_bedrock(prompt: str) -> Optional[str]:
-    bedrock_client = boto3.client("bedrock-runtime", region_name="us-east-1")
-    model_id = os.environ.get("BEDROCK_MODEL_ID", "amazon.nova-pro-v1:0")
-    response = bedrock_client.invoke_model(
-        modelId=model_id,
-        body=json.dumps(
-            {
-                "messages": [{"role": "user", "content": [{"text": prompt}]}],
-                "inferenceConfig": {
-                    "maxTokens": 2000,
-                    "temperature": 0.3,
-                    "topP": 0.9,
-                },
-            }
-        ),
+    result = invoke_text(
+        prompt,
+        {"maxTokens": 2000, "temperature": 0.3, "topP": 0.9},
+        label="success_summary",
     )
-    body_bytes = response["body"].read()
-    if not body_bytes:
+    if not result.body:
         logger.error("Bedrock returned empty response (success summary)")
         return None
-    result = json.loads(body_bytes)
-    if "output" in result and "message" in result["output"]:
-        content = result["output"]["message"].get("content", [])
-        if content:
-            text_content = content[0].get("text", "")
-            text_content = (
-                text_content.replace("**", "")
-                .replace("*", "")
-                .replace("__", "")
-                .replace("_", "")
-            )
-            return text_content.strip()
+    if result.text:
+        text_content = (
+            result.text.replace("**", "")
+            .replace("*", "")
+            .replace("__", "")
+            .replace("_", "")
+        )
+        return text_content.strip()
     logger.warning("Bedrock success summary: unexpected response shape")
     return None
 
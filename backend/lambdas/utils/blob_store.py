@@ -0,0 +1,147 @@
+"""
+Atributos grandes de extração (MERGED_DATA, RAW_TEXT, TABLES_DATA, FORMS_DATA, PARSED_DATA) fora do DynamoDB.
+API FastAPI usa src.utils.blob_store (mesmo formato de ponteiro, só leitura).
+
+Na escrita, ``offload_large_attributes`` troca cada atributo acima de
+``BLOB_INLINE_MAX_BYTES`` (UTF-8) por um ponteiro curto no mesmo atributo:
+
+    blob+s3://{bucket}/blobs/{sha256[:2]}/{sha256}.gz
+
+O objeto é o texto original comprimido com gzip e endereçado pelo hash do
+conteúdo — imutável, então reescritas do mesmo conteúdo não geram PUT e a
+leitura pode ser memoizada no container. Na leitura, ``resolve_blob`` devolve
+o texto original (valores que não são ponteiro passam direto).
+
+Bucket: ``BLOB_BUCKET`` ou, na falta, ``BUCKET_NAME``. Sem bucket configurado
+nada é descarregado (itens continuam inline, como antes).
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import logging
+import os
+from functools import lru_cache
+from typing import Any, Iterable, Optional
+
+import boto3
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+BLOB_POINTER_PREFIX = "blob+s3://"
+BLOB_KEY_PREFIX = "blobs/"
+OFFLOAD_ATTRIBUTES = ("MERGED_DATA", "RAW_TEXT", "TABLES_DATA", "FORMS_DATA", "PARSED_DATA")
+DEFAULT_INLINE_MAX_BYTES = 32 * 1024
+
+_s3_client = None
+
+
+def _s3():
+    global _s3_client
+    if _s3_client is None:
+        _s3_client = boto3.client("s3")
+    return _s3_client
+
+
+def blob_bucket() -> Optional[str]:
+    return os.environ.get("BLOB_BUCKET") or os.environ.get("BUCKET_NAME") or None
+
+
+def inline_max_bytes() -> int:
+    try:
+        return int(os.environ.get("BLOB_INLINE_MAX_BYTES") or DEFAULT_INLINE_MAX_BYTES)
+    except ValueError:
+        return DEFAULT_INLINE_MAX_BYTES
+
+
+def is_blob_pointer(value: Any) -> bool:
+    return isinstance(value, str) and value.startswith(BLOB_POINTER_PREFIX)
+
+
+def _split_pointer(pointer: str) -> tuple[str, str]:
+    bucket, _, key = pointer[len(BLOB_POINTER_PREFIX):].partition("/")
+    if not bucket or not key:
+        raise ValueError(f"Ponteiro de blob inválido: {pointer!r}")
+    return bucket, key
+
+
+def put_blob(text: str, bucket: Optional[str] = None) -> str:
+    """Grava ``text`` (gzip) endereçado pelo SHA-256 e devolve o ponteiro."""
+    bucket = bucket or blob_bucket()
+    if not bucket:
+        raise RuntimeError("BLOB_BUCKET/BUCKET_NAME não configurado")
+    raw = text.encode("utf-8")
+    digest = hashlib.sha256(raw).hexdigest()
+    key = f"{BLOB_KEY_PREFIX}{digest[:2]}/{digest}.gz"
+    client = _s3()
+    try:
+        client.head_object(Bucket=bucket, Key=key)
+    except ClientError as e:
+        # Sem s3:ListBucket o HEAD de chave inexistente responde 403
+        if e.response.get("Error", {}).get("Code") not in ("403", "404", "NoSuchKey", "NotFound"):
+            raise
+        client.put_object(
+            Bucket=bucket,
+            Key=key,
+            Body=gzip.compress(raw, compresslevel=6),
+            ContentType="text/plain; charset=utf-8",
+            ContentEncoding="gzip",
+        )
+    return f"{BLOB_POINTER_PREFIX}{bucket}/{key}"
+
+
+@lru_cache(maxsize=64)
+def _read_blob(pointer: str) -> str:
+    bucket, key = _split_pointer(pointer)
+    body = _s3().get_object(Bucket=bucket, Key=key)["Body"].read()
+    return gzip.decompress(body).decode("utf-8")
+
+
+def resolve_blob(value: Any) -> Any:
+    """Texto original se ``value`` for ponteiro; caso contrário ``value`` inalterado."""
+    if is_blob_pointer(value):
+        return _read_blob(value)
+    return value
+
+
+def offload_large_attributes(
+    item: dict,
+    attributes: Iterable[str] = OFFLOAD_ATTRIBUTES,
+) -> dict:
+    """
+    Cópia de ``item`` com os atributos grandes trocados por ponteiros.
+
+    Falha no S3 não impede a escrita: o atributo fica inline e o erro é logado
+    (o limite de 400 KB do DynamoDB ainda pode rejeitar o item, como antes).
+    """
+    bucket = blob_bucket()
+    if not bucket:
+        return item
+    limit = inline_max_bytes()
+    out = dict(item)
+    for attr in attributes:
+        value = out.get(attr)
+        if not isinstance(value, str) or is_blob_pointer(value):
+            continue
+        if len(value) <= limit // 4 or len(value.encode("utf-8")) <= limit:
+            continue
+        try:
+            out[attr] = put_blob(value, bucket)
+        except Exception as e:
+            logger.error("[blob_store] Falha ao descarregar %s (%s) para S3: %s", attr, item.get("SK"), e)
+    return out
+
+
+def resolve_item_blobs(item: Optional[dict], attributes: Iterable[str] = OFFLOAD_ATTRIBUTES) -> Optional[dict]:
+    """Cópia de ``item`` com ponteiros de ``attributes`` resolvidos (``item`` se não houver nenhum)."""
+    if not item:
+        return item
+    pointers = [attr for attr in attributes if is_blob_pointer(item.get(attr))]
+    if not pointers:
+        return item
+    out = dict(item)
+    for attr in pointers:
+        out[attr] = _read_blob(out[attr])
+    return out
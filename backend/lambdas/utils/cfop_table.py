@@ -1,16 +1,25 @@
 """
 CFOP × Chave (DynamoDB) — leitura da tabela e desambiguação compartilhada entre
 validate_rules e send_to_protheus.
+
+A partição CFOP_OPERATION inteira fica em cache no container (warm Lambda).
+A cada ``CFOP_CACHE_CHECK_SECONDS`` o cache confere o item ``VERSION`` (um
+GetItem pequeno, incrementado pelo CfopOperationService a cada escrita) e só
+recarrega se mudou; ``CFOP_CACHE_MAX_AGE_SECONDS`` força recarga mesmo sem
+mudança de versão (escritas feitas por scripts fora do service).
 """
 
 from __future__ import annotations
 
 import logging
 import os
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
 import boto3
 
+from .dynamo_query import batch_get_items, iter_partition
+from .versioned_cache import VersionedCache, read_version_item
+
 logger = logging.getLogger(__name__)
 
 
@@ -21,98 +30,169 @@ def normalize_cfop(cfop):
     return str(cfop).strip()
 
 
-def get_all_cfop_mappings_direct(table, cfop):
-    """Busca todos os mapeamentos ativos do CFOP na tabela (PK CFOP_OPERATION)."""
-    try:
-        pk = "CFOP_OPERATION"
-        sk = f"CFOP#{cfop}"
+CFOP_PK = "CFOP_OPERATION"
+CFOP_VERSION_SK = "VERSION"
 
-        logger.info(
-            "[cfop_table] Buscando CFOP no DynamoDB - PK: %s, SK: %s, Tabela: %s",
-            pk,
-            sk,
-            getattr(table, "name", "?"),
-        )
+CFOP_CACHE_CHECK_SECONDS = float(os.environ.get("CFOP_CACHE_CHECK_SECONDS", "60"))
+CFOP_CACHE_MAX_AGE_SECONDS = float(os.environ.get("CFOP_CACHE_MAX_AGE_SECONDS", "900"))
 
-        try:
-            response = table.get_item(Key={"PK": pk, "SK": sk})
-        except Exception as get_item_err:
-            logger.error("[cfop_table] Erro ao fazer get_item: %s", get_item_err)
-            raise
-
-        if "Item" not in response:
-            logger.info("[cfop_table] CFOP %s não encontrado (PK: %s, SK: %s)", cfop, pk, sk)
-            try:
-                query_response = table.query(
-                    KeyConditionExpression="PK = :pk AND begins_with(SK, :sk_prefix)",
-                    ExpressionAttributeValues={":pk": pk, ":sk_prefix": f"CFOP#{cfop}"},
-                )
-                logger.info(
-                    "[cfop_table] Query alternativa: %s item(ns)",
-                    len(query_response.get("Items", [])),
-                )
-            except Exception as query_err:
-                logger.warning("[cfop_table] Erro na query alternativa: %s", query_err)
-            return []
-
-        cfop_item = response["Item"]
-
-        mapping_ids = []
-        if cfop_item.get("MAPPING_ID"):
-            mapping_ids.append(cfop_item.get("MAPPING_ID"))
-        if cfop_item.get("MAPPING_IDS"):
-            mapping_ids.extend(cfop_item.get("MAPPING_IDS", []))
-
-        mapping_ids = list(set(mapping_ids))
-
-        if not mapping_ids:
+def _mapping_from_item(mapping_id, mapping_item: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": mapping_id,
+        "chave": mapping_item.get("CHAVE", ""),
+        "descricao": mapping_item.get("DESCRICAO", ""),
+        "cfop": mapping_item.get("CFOP", ""),
+        "operacao": mapping_item.get("OPERACAO", ""),
+        "regra": mapping_item.get("REGRA", ""),
+        "observacao": mapping_item.get("OBSERVACAO", ""),
+        "pedido_compra": mapping_item.get("PEDIDO_COMPRA", False),
+        "ativo": mapping_item.get("ATIVO", True),
+    }
+
+
+def _mapping_ids(cfop_item: Dict[str, Any]) -> List[Any]:
+    ids = []
+    if cfop_item.get("MAPPING_ID"):
+        ids.append(cfop_item.get("MAPPING_ID"))
+    if cfop_item.get("MAPPING_IDS"):
+        ids.extend(cfop_item.get("MAPPING_IDS", []))
+    return list(dict.fromkeys(ids))
+
+
+def get_cfop_mappings_batch(table, cfops: Iterable[str]) -> Dict[str, list]:
+    """
+    Mapeamentos ativos de vários CFOPs: um BatchGetItem para os CFOP# e outro para
+    todos os MAPPING# referenciados. Retorna {cfop: [mapeamentos ativos]} (lista vazia se
+    o CFOP não existe ou não tem mapeamentos).
+    """
+    wanted = list(dict.fromkeys(c for c in cfops if c))
+    if not wanted:
+        return {}
+
+    cfop_items = batch_get_items(table, [{"PK": CFOP_PK, "SK": f"CFOP#{c}"} for c in wanted])
+    ids_by_cfop: Dict[str, List[Any]] = {}
+    for item in cfop_items:
+        cfop = str(item.get("SK", ""))[len("CFOP#") :]
+        ids_by_cfop[cfop] = _mapping_ids(item)
+
+    all_ids = list(dict.fromkeys(mid for ids in ids_by_cfop.values() for mid in ids))
+    mapping_items: Dict[str, Dict[str, Any]] = {}
+    if all_ids:
+        keys = [{"PK": CFOP_PK, "SK": f"MAPPING#{mid}"} for mid in all_ids]
+        for item in batch_get_items(table, keys):
+            mapping_items[str(item.get("SK", ""))[len("MAPPING#") :]] = item
+
+    result: Dict[str, list] = {}
+    for cfop in wanted:
+        if cfop not in ids_by_cfop:
+            logger.info("[cfop_table] CFOP %s não encontrado (PK: %s)", cfop, CFOP_PK)
+            result[cfop] = []
+            continue
+        if not ids_by_cfop[cfop]:
             logger.info("[cfop_table] CFOP %s sem mapping_ids", cfop)
-            return []
+            result[cfop] = []
+            continue
 
         mappings = []
-        mappings_inativos = []
-        for mapping_id in mapping_ids:
-            mapping_sk = f"MAPPING#{mapping_id}"
-            mapping_response = table.get_item(Key={"PK": pk, "SK": mapping_sk})
-
-            if "Item" not in mapping_response:
+        inativos = 0
+        for mapping_id in ids_by_cfop[cfop]:
+            mapping_item = mapping_items.get(str(mapping_id))
+            if mapping_item is None:
                 logger.warning("[cfop_table] Mapeamento %s não encontrado", mapping_id)
                 continue
-
-            mapping_item = mapping_response["Item"]
-            is_ativo = mapping_item.get("ATIVO", True)
-
-            mapping_data = {
-                "id": mapping_id,
-                "chave": mapping_item.get("CHAVE", ""),
-                "descricao": mapping_item.get("DESCRICAO", ""),
-                "cfop": mapping_item.get("CFOP", ""),
-                "operacao": mapping_item.get("OPERACAO", ""),
-                "regra": mapping_item.get("REGRA", ""),
-                "observacao": mapping_item.get("OBSERVACAO", ""),
-                "pedido_compra": mapping_item.get("PEDIDO_COMPRA", False),
-                "ativo": is_ativo,
-            }
-
-            if is_ativo:
+            mapping_data = _mapping_from_item(mapping_id, mapping_item)
+            if mapping_data["ativo"]:
                 mappings.append(mapping_data)
             else:
-                mappings_inativos.append(mapping_data)
+                inativos += 1
 
-        if mappings_inativos:
+        if inativos:
             logger.info(
                 "[cfop_table] CFOP %s: %s ativo(s), %s inativo(s)",
                 cfop,
                 len(mappings),
-                len(mappings_inativos),
+                inativos,
             )
         else:
             logger.info("[cfop_table] CFOP %s: %s mapeamento(s) ativo(s)", cfop, len(mappings))
+        result[cfop] = mappings
+    return result
+
+
+def _load_cfop_table(table) -> Dict[str, list]:
+    """Partição CFOP_OPERATION inteira → {cfop: [mapeamentos, ativos e inativos]}."""
+    ids_by_cfop: Dict[str, List[Any]] = {}
+    mapping_items: Dict[str, Dict[str, Any]] = {}
+    for item in iter_partition(table, CFOP_PK):
+        sk = str(item.get("SK", ""))
+        if sk.startswith("CFOP#"):
+            ids_by_cfop[sk[len("CFOP#") :]] = _mapping_ids(item)
+        elif sk.startswith("MAPPING#"):
+            mapping_items[sk[len("MAPPING#") :]] = item
+
+    by_cfop: Dict[str, list] = {}
+    for cfop, ids in ids_by_cfop.items():
+        by_cfop[cfop] = [
+            _mapping_from_item(mid, mapping_items[str(mid)])
+            for mid in ids
+            if str(mid) in mapping_items
+        ]
+    logger.info("[cfop_table] Cache CFOP carregado: %s CFOP(s)", len(by_cfop))
+    return by_cfop
+
+
+_cache = VersionedCache(CFOP_CACHE_CHECK_SECONDS, CFOP_CACHE_MAX_AGE_SECONDS)
+
+
+def clear_cfop_cache() -> None:
+    """Descarta o cache do container (testes / após escrita local)."""
+    _cache.clear()
+
+
+def get_cfop_mappings_cached(table, cfops: Iterable[str]) -> Dict[str, list]:
+    """Mesmo contrato de ``get_cfop_mappings_batch``, servido do cache do container."""
+    by_cfop = _cache.get(
+        CFOP_PK,
+        lambda: read_version_item(table, CFOP_PK, CFOP_VERSION_SK),
+        lambda: _load_cfop_table(table),
+    )
+    result: Dict[str, list] = {}
+    for cfop in dict.fromkeys(c for c in cfops if c):
+        mappings = [dict(m) for m in by_cfop.get(cfop, []) if m["ativo"]]
+        if cfop not in by_cfop:
+            logger.info("[cfop_table] CFOP %s não encontrado (cache)", cfop)
+        else:
+            logger.info("[cfop_table] CFOP %s: %s mapeamento(s) ativo(s) (cache)", cfop, len(mappings))
+        result[cfop] = mappings
+    return result
 
-        return mappings
+
+def get_all_cfop_mappings_direct(table, cfop):
+    """
+    Busca todos os mapeamentos ativos do CFOP na tabela (PK CFOP_OPERATION).
+
+    ``cfop`` str → lista de mapeamentos; lista/tupla/set de CFOPs → {cfop: lista}.
+    Lê do cache do container; se o cache falhar, cai no BatchGetItem direto.
+    Em erro, lista/dict vazio.
+    """
+    multiple = not isinstance(cfop, str)
+    try:
+        cfops = list(cfop) if multiple else [cfop]
+        logger.info(
+            "[cfop_table] Buscando CFOP(s) %s no DynamoDB - PK: %s, Tabela: %s",
+            cfops,
+            CFOP_PK,
+            getattr(table, "name", "?"),
+        )
+        try:
+            by_cfop = get_cfop_mappings_cached(table, cfops)
+        except Exception as cache_err:
+            logger.warning("[cfop_table] Cache CFOP indisponível, lendo direto: %s", cache_err)
+            by_cfop = get_cfop_mappings_batch(table, cfops)
+        return by_cfop if multiple else by_cfop.get(cfop, [])
     except Exception as e:
         logger.error("[cfop_table] Erro ao buscar CFOP: %s", e)
-        return []
+        return {} if multiple else []
 
 
 def disambiguate_cfop_mappings(mappings: list, context: Optional[Dict[str, Any]]) -> list:
@@ -0,0 +1,142 @@
+"""
+Leitura paginada de partições DynamoDB.
+
+Query devolve no máximo 1 MB por página; partições PROCESS# com TEXTRACT#,
+MERGED_EXTRACTION e muitos VALIDATION# passam disso. ``iter_partition`` segue
+``LastEvaluatedKey`` e entrega item a item (memória constante por página).
+Atributos Binary do ``json_codec`` chegam já decodificados (texto JSON).
+``batch_get_items`` lê itens de partições distintas (ex.: METRICS#{dia}) em
+lotes de BatchGetItem.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Iterable, Iterator, Optional
+
+from .json_codec import decode_item
+
+# BatchGetItem aceita até 100 chaves por chamada; UnprocessedKeys são reenviadas com backoff.
+_BATCH_GET_MAX_KEYS = 100
+_BATCH_GET_MAX_ATTEMPTS = 5
+_BATCH_GET_BASE_DELAY = 0.05
+
+
+def _projection_params(attributes: Iterable[str]) -> dict[str, Any]:
+    """ProjectionExpression com placeholders (#p0, #p1…) — evita palavras reservadas (STATUS, TIMESTAMP…)."""
+    names: dict[str, str] = {}
+    parts: list[str] = []
+    for idx, attr in enumerate(dict.fromkeys(attributes)):
+        placeholder = f"#p{idx}"
+        names[placeholder] = attr
+        parts.append(placeholder)
+    if not parts:
+        return {}
+    return {
+        "ProjectionExpression": ", ".join(parts),
+        "ExpressionAttributeNames": names,
+    }
+
+
+def build_partition_query(
+    pk: str,
+    *,
+    sk_prefix: Optional[str] = None,
+    projection: Optional[Iterable[str]] = None,
+    scan_forward: bool = True,
+    page_size: Optional[int] = None,
+) -> dict[str, Any]:
+    """kwargs de ``table.query`` para PK (+ begins_with(SK) opcional)."""
+    kwargs: dict[str, Any] = {
+        "KeyConditionExpression": "PK = :pk",
+        "ExpressionAttributeValues": {":pk": pk},
+    }
+    if sk_prefix:
+        kwargs["KeyConditionExpression"] = "PK = :pk AND begins_with(SK, :sk)"
+        kwargs["ExpressionAttributeValues"][":sk"] = sk_prefix
+    if projection:
+        # PK/SK sempre presentes: os consumidores indexam por SK.
+        kwargs.update(_projection_params(["PK", "SK", *projection]))
+    if not scan_forward:
+        kwargs["ScanIndexForward"] = False
+    if page_size:
+        kwargs["Limit"] = int(page_size)
+    return kwargs
+
+
+def iter_query_pages(table: Any, **query_kwargs: Any) -> Iterator[list[dict]]:
+    """Páginas de ``table.query`` até esgotar ``LastEvaluatedKey``."""
+    kwargs = dict(query_kwargs)
+    while True:
+        resp = table.query(**kwargs)
+        yield [decode_item(item) for item in resp.get("Items", [])]
+        lek = resp.get("LastEvaluatedKey")
+        if not isinstance(lek, dict) or not lek:
+            return
+        kwargs["ExclusiveStartKey"] = lek
+
+
+def iter_partition(
+    table: Any,
+    pk: str,
+    *,
+    sk_prefix: Optional[str] = None,
+    projection: Optional[Iterable[str]] = None,
+    max_items: Optional[int] = None,
+    scan_forward: bool = True,
+    page_size: Optional[int] = None,
+) -> Iterator[dict]:
+    """
+    Itera todos os itens de ``pk`` (opcionalmente ``begins_with(SK, sk_prefix)``).
+
+    ``max_items`` interrompe a leitura sem buscar páginas extras; ``projection``
+    limita os atributos lidos (PK/SK sempre incluídos).
+    """
+    if max_items is not None and max_items <= 0:
+        return
+    if max_items is not None and not page_size:
+        page_size = max_items
+    kwargs = build_partition_query(
+        pk,
+        sk_prefix=sk_prefix,
+        projection=projection,
+        scan_forward=scan_forward,
+        page_size=page_size,
+    )
+    yielded = 0
+    for page in iter_query_pages(table, **kwargs):
+        for item in page:
+            yield item
+            yielded += 1
+            if max_items is not None and yielded >= max_items:
+                return
+
+
+def query_partition(table: Any, pk: str, **kwargs: Any) -> list[dict]:
+    """Lista completa (todas as páginas) — mesmo contrato de ``iter_partition``."""
+    return list(iter_partition(table, pk, **kwargs))
+
+
+def batch_get_items(
+    table: Any,
+    keys: list[dict],
+    projection: Optional[Iterable[str]] = None,
+) -> list[dict]:
+    """BatchGetItem em lotes de 100 (ordem não garantida), reenviando UnprocessedKeys."""
+    client = table.meta.client
+    table_name = table.name
+    extra = _projection_params(projection) if projection else {}
+    items: list[dict] = []
+    for start in range(0, len(keys), _BATCH_GET_MAX_KEYS):
+        request = {table_name: {"Keys": keys[start : start + _BATCH_GET_MAX_KEYS], **extra}}
+        for attempt in range(_BATCH_GET_MAX_ATTEMPTS):
+            response = client.batch_get_item(RequestItems=request)
+            items.extend(decode_item(it) for it in response.get("Responses", {}).get(table_name, []))
+            request = response.get("UnprocessedKeys") or {}
+            if not request.get(table_name, {}).get("Keys"):
+                break
+            time.sleep(_BATCH_GET_BASE_DELAY * (2**attempt))
+        else:
+            pending = len(request.get(table_name, {}).get("Keys", []))
+            raise RuntimeError(f"BatchGetItem: {pending} chave(s) não processadas após retries")
+    return items
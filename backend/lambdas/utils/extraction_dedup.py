@@ -4,6 +4,8 @@ from __future__ import annotations
 
 from typing import Any
 
+from .dynamo_query import iter_partition
+
 
 def is_ephemeral_extraction_sk(sk: str) -> bool:
     """SKs derivados de OCR/Bedrock/validação — recriados a cada execução do SFN."""
@@ -22,13 +24,16 @@ def is_ephemeral_extraction_sk(sk: str) -> bool:
 
 def clear_process_extractions(table: Any, pk: str) -> int:
     """Remove extrações anteriores do processo (mantém FILE#, METADATA, pedido)."""
-    resp = table.query(KeyConditionExpression="PK = :pk", ExpressionAttributeValues={":pk": pk})
+    # Só as chaves: a partição pode ter vários MB de TEXTRACT#/MERGED_EXTRACTION.
+    stale = [
+        item.get("SK", "")
+        for item in iter_partition(table, pk, projection=("SK",))
+        if is_ephemeral_extraction_sk(item.get("SK", ""))
+    ]
     deleted = 0
-    for item in resp.get("Items", []):
-        sk = item.get("SK", "")
-        if is_ephemeral_extraction_sk(sk):
-            table.delete_item(Key={"PK": pk, "SK": sk})
-            deleted += 1
+    for sk in stale:
+        table.delete_item(Key={"PK": pk, "SK": sk})
+        deleted += 1
     return deleted
 
 
@@ -6,6 +6,10 @@ NAO_IDENTIFICADO_NF = "NAO_IDENTIFICADO_NF"
 NAO_IDENTIFICADO_CNPJ = "NAO_IDENTIFICADO_CNPJ"
 NAO_IDENTIFICADO_PEDIDO = "NAO_IDENTIFICADO_PEDIDO"
 
+# Reserva de cada chave de falha do dia: um item por chave (fora do METRICS#/SUMMARY)
+FAILURE_DEDUP_PK_PREFIX = "METRICS_DEDUP#"
+FAILURE_DEDUP_SK_PREFIX = "KEY#"
+
 
 def failure_identity_fallback(field: str) -> str:
     return {
@@ -15,6 +19,14 @@ def failure_identity_fallback(field: str) -> str:
     }[field]
 
 
+def failure_dedup_record_key(date_key: str, failure_key: str) -> dict:
+    """Chave do item que reserva ``failure_key`` no dia ``date_key`` (YYYY-MM-DD)."""
+    return {
+        "PK": f"{FAILURE_DEDUP_PK_PREFIX}{date_key}",
+        "SK": f"{FAILURE_DEDUP_SK_PREFIX}{failure_key}",
+    }
+
+
 def format_failure_key_display(key: str) -> str:
     parts = (key or "").split("|")
     if len(parts) >= 4:
@@ -0,0 +1,96 @@
+"""
+Codec de atributos JSON médios (METADADOS, VALIDATION_RESULTS, PROTHEUS_HINTS,
+protheus_request_payload, protheus_response) como Binary comprimido no DynamoDB.
+API FastAPI usa src.utils.json_codec (mesmo formato).
+
+Formato gravado: 1 byte de versão + payload. Versão 1 = texto JSON UTF-8 em
+zlib (deflate). Só é usado quando fica menor que a string original; do
+contrário o atributo continua String (formato legado).
+
+A leitura é transparente: ``dynamo_query`` (e o repositório da API) passam
+cada item por ``decode_item``, que devolve o mesmo texto JSON do formato
+legado — os consumidores continuam fazendo ``json.loads`` / ``snapshot.json``.
+"""
+
+from __future__ import annotations
+
+import json
+import zlib
+from typing import Any, Iterable, Optional
+
+from boto3.dynamodb.types import Binary
+
+CODEC_ATTRIBUTES = (
+    "METADADOS",
+    "VALIDATION_RESULTS",
+    "PROTHEUS_HINTS",
+    "protheus_request_payload",
+    "protheus_response",
+)
+CODEC_VERSION_ZLIB = 1
+_ZLIB_LEVEL = 6
+
+
+def _raw_bytes(value: Any) -> Optional[bytes]:
+    if isinstance(value, Binary):
+        return bytes(value.value)
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    return None
+
+
+def is_encoded(value: Any) -> bool:
+    raw = _raw_bytes(value)
+    return bool(raw) and raw[0] == CODEC_VERSION_ZLIB
+
+
+def encode_attribute(value: Any) -> Any:
+    """
+    Binary (versão + zlib) para um texto JSON ou objeto serializável.
+
+    Strings são comprimidas como estão (o texto decodificado é idêntico ao
+    legado). Se a compressão não reduzir o tamanho, devolve a string.
+    """
+    if value is None or _raw_bytes(value) is not None:
+        return value
+    text = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, default=str)
+    raw = text.encode("utf-8")
+    packed = bytes([CODEC_VERSION_ZLIB]) + zlib.compress(raw, _ZLIB_LEVEL)
+    if len(packed) >= len(raw):
+        return text
+    return Binary(packed)
+
+
+def decode_attribute(value: Any) -> Any:
+    """Texto JSON de um atributo (Binary do codec ou String legada); outros valores passam direto."""
+    raw = _raw_bytes(value)
+    if raw is None:
+        return value
+    if not raw:
+        return ""
+    version = raw[0]
+    if version == CODEC_VERSION_ZLIB:
+        return zlib.decompress(raw[1:]).decode("utf-8")
+    raise ValueError(f"Versão de codec JSON desconhecida: {version}")
+
+
+def encode_item(item: dict, attributes: Iterable[str] = CODEC_ATTRIBUTES) -> dict:
+    """Cópia de ``item`` com os atributos do codec comprimidos (quando compensa)."""
+    out = dict(item)
+    for attr in attributes:
+        if isinstance(out.get(attr), str):
+            out[attr] = encode_attribute(out[attr])
+    return out
+
+
+def decode_item(item: Optional[dict], attributes: Iterable[str] = CODEC_ATTRIBUTES) -> Optional[dict]:
+    """``item`` com atributos do codec de volta ao texto JSON (o próprio ``item`` se não houver nenhum)."""
+    if not item:
+        return item
+    encoded = [attr for attr in attributes if _raw_bytes(item.get(attr)) is not None]
+    if not encoded:
+        return item
+    out = dict(item)
+    for attr in encoded:
+        out[attr] = decode_attribute(out[attr])
+    return out
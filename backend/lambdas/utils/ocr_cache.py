@@ -0,0 +1,101 @@
+"""
+Cache global de OCR por conteúdo: o mesmo PDF (boleto, DANFE) reenviado em outro processo ou
+reprocessado não passa de novo pelo Textract.
+
+Item (mesma tabela single-table):
+  PK = OCR_CACHE#{CONTENT_SHA256}   SK = V#{OCR_CACHE_VERSION}
+  RAW_TEXT, TABLES_DATA, FORMS_DATA (blob_store acima do limite inline), PROTHEUS_HINTS (json_codec),
+  TEXTRACT_MODE, JOB_ID, TIMESTAMP, EXPIRES_AT (TTL do DynamoDB, epoch segundos)
+
+``OCR_CACHE_VERSION`` entra na chave: mudou FeatureTypes, o parser de blocos ou a camada de texto
+nativa → incrementar, e as entradas antigas deixam de ser lidas (e expiram pelo TTL).
+O hash é o CONTENT_SHA256 do FILE# (informado no upload); sem hash não há cache.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from typing import Any, Optional
+
+from utils.blob_store import offload_large_attributes, resolve_item_blobs
+from utils.extraction_dedup import normalize_content_sha256
+from utils.json_codec import decode_item, encode_item
+
+logger = logging.getLogger(__name__)
+
+OCR_CACHE_VERSION = "2"
+DEFAULT_TTL_DAYS = 30
+
+
+def ocr_cache_key(content_sha256: str) -> dict:
+    return {"PK": f"OCR_CACHE#{content_sha256}", "SK": f"V#{OCR_CACHE_VERSION}"}
+
+
+def _ttl_seconds() -> int:
+    return int(float(os.environ.get("OCR_CACHE_TTL_DAYS", DEFAULT_TTL_DAYS)) * 86400)
+
+
+def get_cached_ocr(table: Any, content_sha256: Any) -> Optional[dict]:
+    """
+    Extração em cache para o hash, ou None (sem hash, ausente ou expirada — o TTL do DynamoDB
+    remove com atraso, então a validade é conferida aqui também). Falha de leitura (DynamoDB,
+    blob ilegível, JSON corrompido) só gera log e conta como miss: o arquivo segue para o Textract.
+    """
+    h = normalize_content_sha256(content_sha256)
+    if not h:
+        return None
+    try:
+        item = table.get_item(Key=ocr_cache_key(h)).get("Item")
+        if not item or int(item.get("EXPIRES_AT") or 0) <= int(time.time()):
+            return None
+        item = resolve_item_blobs(decode_item(item))
+        hints = item.get("PROTHEUS_HINTS")
+        return {
+            "raw_text": item.get("RAW_TEXT") or "",
+            "tables_data": json.loads(item.get("TABLES_DATA") or "[]"),
+            "forms_data": json.loads(item.get("FORMS_DATA") or "[]"),
+            "hints": json.loads(hints) if hints else {},
+            "textract_mode": item.get("TEXTRACT_MODE"),
+            "job_id": item.get("JOB_ID") or "",
+        }
+    except Exception as e:
+        logger.warning("OCR cache: falha ao ler %s: %s", h, e)
+        return None
+
+
+def put_cached_ocr(
+    table: Any,
+    content_sha256: Any,
+    raw_text: str,
+    tables_data: list,
+    hints: dict,
+    textract_mode: Optional[str],
+    job_id: str,
+    forms_data: Optional[list] = None,
+) -> None:
+    """Grava/renova a entrada; falha de escrita só gera log (o TEXTRACT# do processo já foi gravado)."""
+    h = normalize_content_sha256(content_sha256)
+    if not h:
+        return
+    now = int(time.time())
+    item: dict = {
+        **ocr_cache_key(h),
+        "RAW_TEXT": raw_text,
+        "TABLES_DATA": json.dumps(tables_data),
+        "JOB_ID": job_id,
+        "TIMESTAMP": now,
+        "EXPIRES_AT": now + _ttl_seconds(),
+    }
+    if forms_data:
+        item["FORMS_DATA"] = json.dumps(forms_data, ensure_ascii=False)
+    if textract_mode:
+        item["TEXTRACT_MODE"] = textract_mode
+    if hints:
+        item["PROTHEUS_HINTS"] = json.dumps(hints, ensure_ascii=False)
+    try:
+        table.put_item(Item=offload_large_attributes(encode_item(item)))
+    except Exception as e:
+        logger.warning("OCR cache: falha ao gravar %s: %s", h, e)
@@ -9,10 +9,41 @@ from __future__ import annotations
 
 import logging
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from typing import Any
 
 logger = logging.getLogger(__name__)
 
+# Passo de redução do DPI quando o PNG da página passa do limite síncrono do Textract.
+_DPI_STEP_DOWN = 0.75
+
+
+def _render_page_png(fitz: Any, page: Any, dpi: float, min_dpi: float, max_sync_bytes: int) -> tuple[bytes, float]:
+    """PNG da página no maior DPI (a partir de ``dpi``) que cabe em ``max_sync_bytes``."""
+    while True:
+        zoom = dpi / 72.0
+        png = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False).tobytes("png")
+        if len(png) <= max_sync_bytes:
+            return png, dpi
+        if dpi <= min_dpi:
+            raise ValueError(
+                f"Página {page.number + 1} rasterizada ({len(png)} bytes, {dpi:.0f} dpi) excede limite "
+                f"síncrono Textract ({max_sync_bytes})"
+            )
+        dpi = max(min_dpi, dpi * _DPI_STEP_DOWN)
+
+
+def _detect_lines(textract_client: Any, png: bytes) -> tuple[list[str], float]:
+    started = time.perf_counter()
+    resp = textract_client.detect_document_text(Document={"Bytes": png})
+    lines = [
+        (b.get("Text") or "").strip()
+        for b in resp.get("Blocks") or []
+        if b.get("BlockType") == "LINE" and (b.get("Text") or "").strip()
+    ]
+    return lines, time.perf_counter() - started
+
 
 def textract_line_blocks_from_pdf_via_raster(
     textract_client: Any,
@@ -24,6 +55,12 @@ def textract_line_blocks_from_pdf_via_raster(
 ) -> list[dict]:
     """
     Devolve lista de blocos sintéticos só LINE, compatível com _extract_text_and_tables.
+
+    A renderização (PyMuPDF, não thread-safe) fica na thread principal; cada PNG pronto vai para
+    um pool de DetectDocumentText (TEXTRACT_RASTER_WORKERS), então render e OCR se sobrepõem.
+    No máximo ``workers`` páginas ficam em voo: antes de renderizar a próxima, espera a mais
+    antiga — a memória fica em O(workers × PNG), não O(páginas × PNG).
+    As linhas saem na ordem das páginas, independente da ordem em que as chamadas terminam.
     """
     lg = log or logger
     try:
@@ -34,11 +71,13 @@ def textract_line_blocks_from_pdf_via_raster(
         ) from e
 
     dpi = float(os.environ.get("TEXTRACT_RASTER_DPI", "200"))
+    min_dpi = min(dpi, float(os.environ.get("TEXTRACT_RASTER_MIN_DPI", "100")))
     max_pages = int(os.environ.get("TEXTRACT_RASTER_MAX_PAGES", "15"))
+    workers = max(1, int(os.environ.get("TEXTRACT_RASTER_WORKERS", "4")))
 
+    started = time.perf_counter()
     doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-    synthetic: list[dict] = []
-    line_idx = 0
+    futures = []
     try:
         total = len(doc)
         n = min(total, max_pages)
@@ -49,42 +88,59 @@ def textract_line_blocks_from_pdf_via_raster(
                 total,
                 max_pages,
             )
-        zoom = dpi / 72.0
-        mat = fitz.Matrix(zoom, zoom)
-        for page_no in range(n):
-            page = doc.load_page(page_no)
-            pix = page.get_pixmap(matrix=mat, alpha=False)
-            png = pix.tobytes("png")
-            if len(png) > max_sync_bytes:
-                raise ValueError(
-                    f"Página {page_no + 1} rasterizada ({len(png)} bytes) excede limite síncrono Textract ({max_sync_bytes})"
-                )
-            lg.info(
-                "[raster_textract] key=%s page=%d/%d png_bytes=%d dpi=%s",
-                key_log,
-                page_no + 1,
-                n,
-                len(png),
-                dpi,
-            )
-            resp = textract_client.detect_document_text(Document={"Bytes": png})
-            for b in resp.get("Blocks") or []:
-                if b.get("BlockType") != "LINE":
-                    continue
-                txt = (b.get("Text") or "").strip()
-                if not txt:
-                    continue
-                synthetic.append(
-                    {
-                        "Id": f"r{page_no}-L{line_idx}",
-                        "BlockType": "LINE",
-                        "Text": txt,
-                    }
+        with ThreadPoolExecutor(max_workers=min(workers, max(n, 1))) as pool:
+            try:
+                for page_no in range(n):
+                    if page_no >= workers:
+                        wait([futures[page_no - workers][-1]])
+                    render_started = time.perf_counter()
+                    png, page_dpi = _render_page_png(fitz, doc.load_page(page_no), dpi, min_dpi, max_sync_bytes)
+                    render_s = time.perf_counter() - render_started
+                    fut = pool.submit(_detect_lines, textract_client, png)
+                    futures.append((page_no, len(png), page_dpi, render_s, fut))
+                    del png
+            except BaseException:
+                for *_, fut in futures:
+                    fut.cancel()
+                raise
+            pages = []
+            for page_no, png_bytes, page_dpi, render_s, fut in futures:
+                lines, ocr_s = fut.result()
+                lg.info(
+                    "[raster_textract] key=%s page=%d/%d png_bytes=%d dpi=%.0f render_ms=%d textract_ms=%d lines=%d",
+                    key_log,
+                    page_no + 1,
+                    n,
+                    png_bytes,
+                    page_dpi,
+                    render_s * 1000,
+                    ocr_s * 1000,
+                    len(lines),
                 )
-                line_idx += 1
+                pages.append((page_no, lines))
     finally:
         doc.close()
 
+    synthetic: list[dict] = []
+    line_idx = 0
+    for page_no, lines in pages:
+        for txt in lines:
+            synthetic.append(
+                {
+                    "Id": f"r{page_no}-L{line_idx}",
+                    "BlockType": "LINE",
+                    "Text": txt,
+                }
+            )
+            line_idx += 1
+    lg.info(
+        "[raster_textract] key=%s páginas=%d workers=%d total_ms=%d",
+        key_log,
+        n,
+        workers,
+        (time.perf_counter() - started) * 1000,
+    )
+
     if not synthetic:
         raise RuntimeError(
             f"Raster fallback: Textract não devolveu linhas de texto nas imagens (key={key_log})"
@@ -0,0 +1,167 @@
+"""
+Camada de texto nativa de PDFs gerados digitalmente (boletos, DANFE impresso, NFS-e de prefeitura).
+
+Antes do Textract: extrai texto e tabelas simples com PyMuPDF, pontua a qualidade e, se bastar,
+devolve blocos sintéticos LINE/TABLE/CELL/WORD no formato da resposta do Textract — o
+TEXTRACT# gravado é o mesmo (merge/Bedrock não distinguem a origem).
+
+Score (0–1):
+  0.60 × densidade (caracteres alfanuméricos por página / PDF_TEXT_LAYER_TARGET_CHARS, máx. 1)
+  0.25 × chave de acesso de 44 dígitos (protheus_hints)
+  0.15 × CNPJ válido encontrado (protheus_hints)
+Limiar padrão (PDF_TEXT_LAYER_MIN_SCORE) 0.7, acima do peso da densidade: texto farto sem chave e
+sem CNPJ não basta — precisa de densidade alta + CNPJ ou densidade média + chave.
+Score zero se alguma página tiver imagem e quase nenhum texto (página escaneada no meio) ou se o
+texto estiver corrompido (fonte sem ToUnicode → U+FFFD / caracteres de controle).
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from typing import Any
+
+from utils.protheus_hints import hints_from_textract_text
+
+logger = logging.getLogger(__name__)
+
+TEXT_LAYER_MODE = "pdf_text_layer"
+# Página com imagem e menos que isso (alfanuméricos) é tratada como escaneada.
+_MIN_CHARS_PER_PAGE = 40
+_MIN_CLEAN_RATIO = 0.95
+DEFAULT_MIN_SCORE = 0.7
+
+
+def _settings() -> tuple[bool, float, float]:
+    enabled = os.environ.get("PDF_TEXT_LAYER_ENABLED", "1").strip().lower() not in ("0", "false", "no")
+    min_score = float(os.environ.get("PDF_TEXT_LAYER_MIN_SCORE", DEFAULT_MIN_SCORE))
+    target_chars = float(os.environ.get("PDF_TEXT_LAYER_TARGET_CHARS", "400"))
+    return enabled, min_score, target_chars
+
+
+def _clean_ratio(text: str) -> float:
+    if not text:
+        return 0.0
+    bad = sum(1 for ch in text if ch == "\ufffd" or (ord(ch) < 32 and ch not in "\n\t\r"))
+    return 1.0 - bad / len(text)
+
+
+def score_text_layer(page_texts: list[str], target_chars: float = 400.0, scanned_pages: int = 0) -> dict[str, Any]:
+    """Métricas e score da camada de texto (uma string por página; ``scanned_pages`` já contadas)."""
+    text = "\n".join(page_texts)
+    alnum_per_page = [sum(ch.isalnum() for ch in t) for t in page_texts]
+    pages = len(page_texts)
+    density = (sum(alnum_per_page) / pages) if pages else 0.0
+    clean = _clean_ratio(text)
+    hints = hints_from_textract_text(text) if density else {}
+    has_chave = bool(hints.get("chaveAcesso"))
+    has_cnpj = bool(hints.get("cnpjEmitente") or hints.get("cnpjTomador"))
+
+    score = 0.6 * min(density / target_chars, 1.0) if target_chars > 0 else 0.6
+    score += 0.25 * has_chave + 0.15 * has_cnpj
+    if not pages or scanned_pages or clean < _MIN_CLEAN_RATIO:
+        score = 0.0
+    return {
+        "score": round(score, 3),
+        "pages": pages,
+        "chars_per_page": round(density, 1),
+        "scanned_pages": scanned_pages,
+        "clean_ratio": round(clean, 3),
+        "has_chave": has_chave,
+        "has_cnpj": has_cnpj,
+    }
+
+
+def _page_tables(page: Any) -> list[list[list[str]]]:
+    """Tabelas com linhas de grade (PyMuPDF find_tables); vazio se a versão não suportar."""
+    find_tables = getattr(page, "find_tables", None)
+    if find_tables is None:
+        return []
+    try:
+        found = find_tables()
+    except Exception as e:  # detecção de tabela é best-effort; o texto já basta
+        logger.debug("[pdf_text_layer] find_tables falhou: %s", e)
+        return []
+    tables = []
+    for tab in getattr(found, "tables", found) or []:
+        rows = [[(cell or "").strip() for cell in row] for row in tab.extract() or []]
+        if any(any(cell for cell in row) for row in rows):
+            tables.append(rows)
+    return tables
+
+
+def _synthetic_blocks(page_lines: list[list[str]], page_tables: list[list[list[str]]]) -> list[dict]:
+    """Blocos no formato Textract (LINE; TABLE → CELL → WORD) para _extract_text_and_tables."""
+    blocks: list[dict] = []
+    line_idx = 0
+    for page_no, lines in enumerate(page_lines):
+        for txt in lines:
+            blocks.append({"Id": f"t{page_no}-L{line_idx}", "BlockType": "LINE", "Text": txt, "Page": page_no + 1})
+            line_idx += 1
+    for table_no, rows in enumerate(page_tables):
+        cell_ids = []
+        for ri, row in enumerate(rows, start=1):
+            for ci, cell in enumerate(row, start=1):
+                cell_id = f"t-T{table_no}-C{ri}-{ci}"
+                cell_block: dict = {"Id": cell_id, "BlockType": "CELL", "RowIndex": ri, "ColumnIndex": ci}
+                if cell:
+                    word_id = f"{cell_id}-W"
+                    blocks.append({"Id": word_id, "BlockType": "WORD", "Text": cell})
+                    cell_block["Relationships"] = [{"Type": "CHILD", "Ids": [word_id]}]
+                blocks.append(cell_block)
+                cell_ids.append(cell_id)
+        blocks.append({
+            "Id": f"t-T{table_no}",
+            "BlockType": "TABLE",
+            "Relationships": [{"Type": "CHILD", "Ids": cell_ids}],
+        })
+    return blocks
+
+
+def text_layer_response(pdf_bytes: bytes, key_log: str, log: logging.Logger | None = None) -> dict | None:
+    """
+    Resposta sintética estilo Textract a partir da camada de texto, ou None se o PDF precisa de OCR
+    (sem texto, página escaneada, texto corrompido, score abaixo de PDF_TEXT_LAYER_MIN_SCORE).
+    """
+    lg = log or logger
+    enabled, min_score, target_chars = _settings()
+    if not enabled:
+        return None
+    try:
+        import fitz  # PyMuPDF
+    except ImportError:
+        lg.warning("[pdf_text_layer] PyMuPDF indisponível; seguindo para o Textract (key=%s)", key_log)
+        return None
+
+    try:
+        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    except Exception as e:
+        lg.info("[pdf_text_layer] PyMuPDF não abriu o PDF key=%s: %s", key_log, e)
+        return None
+    try:
+        if doc.needs_pass:
+            return None
+        page_texts: list[str] = []
+        page_lines: list[list[str]] = []
+        tables: list[list[list[str]]] = []
+        scanned_pages = 0
+        for page in doc:
+            text = page.get_text("text", sort=True) or ""
+            page_texts.append(text)
+            page_lines.append([ln.strip() for ln in text.splitlines() if ln.strip()])
+            if sum(ch.isalnum() for ch in text) < _MIN_CHARS_PER_PAGE and page.get_images():
+                scanned_pages += 1
+        metrics = score_text_layer(page_texts, target_chars, scanned_pages)
+        if metrics["score"] < min_score:
+            lg.info("[pdf_text_layer] key=%s insuficiente → Textract. métricas=%s", key_log, metrics)
+            return None
+        for page in doc:
+            tables.extend(_page_tables(page))
+    finally:
+        doc.close()
+
+    lg.info("[pdf_text_layer] key=%s usando camada de texto (tabelas=%d). métricas=%s", key_log, len(tables), metrics)
+    return {
+        "Blocks": _synthetic_blocks(page_lines, tables),
+        "_textract_mode": TEXT_LAYER_MODE,
+    }
@@ -5,6 +5,8 @@ from __future__ import annotations
 import json
 from typing import Any
 
+from .blob_store import resolve_blob
+
 
 def score_nfe_payload(data: dict[str, Any]) -> int:
     if data.get("_kind") == "generic_xml":
@@ -27,7 +29,7 @@ def iter_parsed_xml_items(items: list[dict]) -> list[tuple[str, str, dict[str, A
         if not sk.startswith("PARSED_XML="):
             continue
         try:
-            data = json.loads(it.get("PARSED_DATA") or "{}")
+            data = json.loads(resolve_blob(it.get("PARSED_DATA")) or "{}")
         except Exception:
             continue
         out.append((sk, it.get("FILE_NAME", ""), data))
@@ -0,0 +1,207 @@
+"""
+Visão única de uma partição PROCESS#{id} para as Lambdas do Step Functions.
+
+Indexa os itens por SK e por família de SK (``FILE#``, ``PARSED_XML=``,
+``VALIDATION#``…) numa única passada e decodifica atributos JSON (PARSED_DATA,
+METADADOS, MERGED_DATA, VALIDATION_RESULTS…) só quando pedidos, com memoização.
+Atributos descarregados para S3 (``utils.blob_store``) são resolvidos na mesma hora.
+"""
+
+from __future__ import annotations
+
+import json
+from functools import cached_property
+from typing import Any, Iterable, Optional
+
+from .blob_store import resolve_blob
+from .dynamo_query import query_partition
+from .primary_xml import score_nfe_payload
+
+_MISSING = object()
+
+
+def sk_family(sk: str) -> str:
+    """Prefixo de família da SK: ``FILE#abc`` → ``FILE#``, ``PARSED_XML=x`` → ``PARSED_XML=``."""
+    cut = min((i for i in (sk.find("#"), sk.find("=")) if i != -1), default=-1)
+    return sk[: cut + 1] if cut != -1 else sk
+
+
+def _timestamp(item: dict) -> int:
+    try:
+        return int(item.get("TIMESTAMP") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class ProcessSnapshot:
+    """Itens de um processo indexados por SK, com JSON decodificado sob demanda."""
+
+    def __init__(self, process_id: str, items: Iterable[dict]):
+        self.process_id = process_id
+        self.pk = f"PROCESS#{process_id}"
+        self.items: list[dict] = []
+        self.by_sk: dict[str, dict] = {}
+        self._families: dict[str, list[dict]] = {}
+        self._decoded: dict[tuple[str, str], Any] = {}
+        for item in items:
+            sk = str(item.get("SK") or "")
+            self.items.append(item)
+            self.by_sk[sk] = item
+            self._families.setdefault(sk_family(sk), []).append(item)
+
+    @classmethod
+    def load(cls, table: Any, process_id: str, **query_kwargs: Any) -> "ProcessSnapshot":
+        """Lê a partição inteira (paginada) — ``query_kwargs`` repassados a ``query_partition``."""
+        return cls(process_id, query_partition(table, f"PROCESS#{process_id}", **query_kwargs))
+
+    # ------------------------------------------------------------------
+    # Acesso aos itens
+    # ------------------------------------------------------------------
+    def get(self, sk: str) -> Optional[dict]:
+        return self.by_sk.get(sk)
+
+    def with_prefix(self, prefix: str) -> list[dict]:
+        """Itens cuja SK começa com ``prefix`` (O(1) quando ``prefix`` é uma família)."""
+        if prefix.endswith(("#", "=")) and sk_family(prefix) == prefix:
+            return list(self._families.get(prefix, ()))
+        return [it for it in self.items if str(it.get("SK") or "").startswith(prefix)]
+
+    def first_with_prefix(self, prefix: str) -> Optional[dict]:
+        found = self.with_prefix(prefix)
+        return found[0] if found else None
+
+    # ------------------------------------------------------------------
+    # JSON sob demanda
+    # ------------------------------------------------------------------
+    def json(self, item: Optional[dict], attr: str, default: Any = None) -> Any:
+        """
+        Atributo JSON decodificado e memoizado por (SK, atributo).
+
+        Valores já estruturados (dict/list) são devolvidos como estão; JSON inválido
+        ou ausente → ``default``.
+        """
+        if not item:
+            return default
+        key = (str(item.get("SK") or ""), attr)
+        cached = self._decoded.get(key, _MISSING)
+        if cached is _MISSING:
+            raw = resolve_blob(item.get(attr))
+            if isinstance(raw, (dict, list)):
+                cached = raw
+            elif isinstance(raw, str) and raw.strip():
+                try:
+                    cached = json.loads(raw)
+                except (json.JSONDecodeError, TypeError):
+                    cached = None
+            else:
+                cached = None
+            self._decoded[key] = cached
+        return default if cached is None else cached
+
+    def text(self, item: Optional[dict], attr: str, default: str = "") -> str:
+        """Atributo texto (ex.: RAW_TEXT), resolvendo ponteiro de blob; memoizado como ``json``."""
+        if not item:
+            return default
+        key = (str(item.get("SK") or ""), f"text:{attr}")
+        cached = self._decoded.get(key, _MISSING)
+        if cached is _MISSING:
+            cached = self._decoded[key] = resolve_blob(item.get(attr))
+        return cached if isinstance(cached, str) and cached else default
+
+    # ------------------------------------------------------------------
+    # Acessores tipados
+    # ------------------------------------------------------------------
+    @property
+    def metadata(self) -> dict:
+        return self.by_sk.get("METADATA") or {}
+
+    @property
+    def process_type(self) -> Optional[str]:
+        return self.metadata.get("PROCESS_TYPE")
+
+    @property
+    def input_json(self) -> Optional[dict]:
+        data = self.json(self.get("METADATA"), "INPUT_JSON")
+        return data if isinstance(data, dict) else None
+
+    @property
+    def pedido_compra_item(self) -> Optional[dict]:
+        return self.get("PEDIDO_COMPRA_METADATA")
+
+    @property
+    def pedido_compra(self) -> Optional[dict]:
+        """METADADOS de PEDIDO_COMPRA_METADATA (header/requestBody) ou None."""
+        data = self.json(self.pedido_compra_item, "METADADOS")
+        return data if isinstance(data, dict) else None
+
+    @property
+    def file_items(self) -> list[dict]:
+        return self.with_prefix("FILE#")
+
+    def file_metadados(self, item: dict) -> Any:
+        return self.json(item, "METADADOS")
+
+    @cached_property
+    def latest_validation(self) -> Optional[dict]:
+        """VALIDATION# mais recente (maior TIMESTAMP)."""
+        candidates = self.with_prefix("VALIDATION#")
+        if not candidates:
+            return None
+        return max(candidates, key=_timestamp)
+
+    @property
+    def latest_validation_results(self) -> list:
+        data = self.json(self.latest_validation, "VALIDATION_RESULTS", [])
+        return data if isinstance(data, list) else []
+
+    @property
+    def parsed_xml_items(self) -> list[dict]:
+        return self.with_prefix("PARSED_XML=")
+
+    def parsed_xml_documents(self) -> list[tuple[str, str, dict]]:
+        """Mesmo contrato de ``primary_xml.iter_parsed_xml_items`` (ignora JSON inválido)."""
+        out: list[tuple[str, str, dict]] = []
+        for it in self.parsed_xml_items:
+            data = self.json(it, "PARSED_DATA")
+            if data is None and not it.get("PARSED_DATA"):
+                data = {}
+            if data is None:
+                continue
+            out.append((it.get("SK", ""), it.get("FILE_NAME", ""), data))
+        return out
+
+    @cached_property
+    def best_parsed_xml(self) -> Optional[dict]:
+        """Mesma escolha de ``primary_xml.pick_best_parsed_xml_item``, sem redecodificar PARSED_DATA."""
+        candidates = self.parsed_xml_items
+        if not candidates:
+            return None
+        for it in candidates:
+            if it.get("IS_PRIMARY"):
+                return it
+        entries = self.parsed_xml_documents()
+        if not entries:
+            return None
+        best = max(entries, key=lambda e: score_nfe_payload(e[2]))
+        if score_nfe_payload(best[2]) == 0:
+            best = entries[0]
+        return self.get(best[0])
+
+    @property
+    def best_parsed_xml_data(self) -> Optional[dict]:
+        data = self.json(self.best_parsed_xml, "PARSED_DATA")
+        return data if isinstance(data, dict) else None
+
+    @property
+    def merged_item(self) -> Optional[dict]:
+        return self.get("MERGED_EXTRACTION")
+
+    @property
+    def merged_data(self) -> Optional[dict]:
+        data = self.json(self.merged_item, "MERGED_DATA")
+        return data if isinstance(data, dict) else None
+
+    @property
+    def bedrock_extraction(self) -> Optional[dict]:
+        data = self.json(self.get("BEDROCK_EXTRACTION"), "EXTRACTED_FIELDS")
+        return data if isinstance(data, dict) else None
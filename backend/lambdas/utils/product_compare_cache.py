@@ -0,0 +1,148 @@
+"""
+Cache das comparações de nome de produto feitas pelo Bedrock (validar_produtos).
+
+Os mesmos pares de descrição ("VESSARYA 5L" × "VESSARYA SC 5 LT") voltam em quase toda NF do
+mesmo fornecedor; a resposta do modelo (status + detalhe estruturado ``bedrock``) é reaproveitada.
+
+Chave: sha256 de versão do prompt, flag ``has_equivalent_code``, campo e os dois nomes
+normalizados (maiúsculas, espaços colapsados — a ordem DANFE × pedido é mantida).
+
+Camadas:
+  1. LRU no container (PRODUCT_COMPARE_LRU_SIZE, padrão 2048 pares)
+  2. DynamoDB (mesma tabela single-table, TTL do DynamoDB em EXPIRES_AT):
+       PK = PRODUCT_COMPARE#{hash}   SK = RESULT
+       RESULT (json), VALUE1, VALUE2, PROMPT_VERSION, TIMESTAMP, EXPIRES_AT
+     Validade em PRODUCT_COMPARE_TTL_DAYS (padrão 90); quem grava pode pedir validade menor
+     (respostas do prompt em lote), respeitada também no LRU.
+
+Falhas de leitura/escrita no DynamoDB só geram log: a comparação segue para o Bedrock.
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+import boto3
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LRU_SIZE = 2048
+DEFAULT_TTL_DAYS = 90
+
+_lru: "OrderedDict[str, tuple[int, dict]]" = OrderedDict()
+_lru_lock = threading.Lock()
+_table = None
+
+
+def _lru_size() -> int:
+    return int(os.environ.get("PRODUCT_COMPARE_LRU_SIZE", DEFAULT_LRU_SIZE))
+
+
+def _ttl_seconds() -> int:
+    return int(float(os.environ.get("PRODUCT_COMPARE_TTL_DAYS", DEFAULT_TTL_DAYS)) * 86400)
+
+
+def _get_table():
+    """Tabela do processo (TABLE_NAME), criada uma vez por container; None fora da Lambda."""
+    global _table
+    if _table is None and os.environ.get("TABLE_NAME"):
+        _table = boto3.resource("dynamodb").Table(os.environ["TABLE_NAME"])
+    return _table
+
+
+def normalize_name(value: Any) -> str:
+    return " ".join(str(value or "").upper().split())
+
+
+def compare_cache_key(value1: Any, value2: Any, field: str, has_equivalent_code: bool, prompt_version: str) -> str:
+    raw = "|".join([
+        prompt_version,
+        "1" if has_equivalent_code else "0",
+        field.strip().lower(),
+        normalize_name(value1),
+        normalize_name(value2),
+    ])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _dynamo_key(key: str) -> dict:
+    return {"PK": f"PRODUCT_COMPARE#{key}", "SK": "RESULT"}
+
+
+def _remember(key: str, result: dict, expires_at: int) -> None:
+    with _lru_lock:
+        _lru[key] = (expires_at, result)
+        _lru.move_to_end(key)
+        while len(_lru) > max(1, _lru_size()):
+            _lru.popitem(last=False)
+
+
+def get_cached_compare(key: str) -> Optional[dict]:
+    """Resultado em cache (cópia) ou None; um acerto no DynamoDB também aquece o LRU."""
+    with _lru_lock:
+        hit = _lru.get(key)
+        if hit is not None:
+            if hit[0] > int(time.time()):
+                _lru.move_to_end(key)
+                return copy.deepcopy(hit[1])
+            del _lru[key]
+
+    table = _get_table()
+    if table is None:
+        return None
+    try:
+        item = table.get_item(Key=_dynamo_key(key)).get("Item")
+    except Exception as e:
+        logger.warning("product_compare_cache: falha ao ler %s: %s", key, e)
+        return None
+    expires_at = int(item.get("EXPIRES_AT") or 0) if item else 0
+    if expires_at <= int(time.time()):
+        return None
+    result = json.loads(item["RESULT"])
+    _remember(key, result, expires_at)
+    return copy.deepcopy(result)
+
+
+def put_cached_compare(
+    key: str,
+    result: dict,
+    value1: Any = "",
+    value2: Any = "",
+    prompt_version: str = "",
+    ttl_seconds: Optional[int] = None,
+) -> None:
+    """
+    Grava no LRU e no DynamoDB; só chamar com resposta válida do modelo (nunca com erro/timeout).
+    ``ttl_seconds`` encurta a validade padrão (PRODUCT_COMPARE_TTL_DAYS).
+    """
+    now = int(time.time())
+    expires_at = now + (_ttl_seconds() if ttl_seconds is None else int(ttl_seconds))
+    _remember(key, copy.deepcopy(result), expires_at)
+    table = _get_table()
+    if table is None:
+        return
+    try:
+        table.put_item(Item={
+            **_dynamo_key(key),
+            "RESULT": json.dumps(result, ensure_ascii=False),
+            "VALUE1": str(value1 or "")[:500],
+            "VALUE2": str(value2 or "")[:500],
+            "PROMPT_VERSION": prompt_version,
+            "TIMESTAMP": now,
+            "EXPIRES_AT": expires_at,
+        })
+    except Exception as e:
+        logger.warning("product_compare_cache: falha ao gravar %s: %s", key, e)
+
+
+def clear_local_cache() -> None:
+    with _lru_lock:
+        _lru.clear()
@@ -9,6 +9,8 @@ import unicodedata
 from pathlib import Path
 from typing import Any
 
+from .dynamo_query import iter_partition
+
 _CATALOG_PATH = Path(__file__).resolve().parent / "protheus_regras_catalog.json"
 _API_CATALOG_PATH = Path(__file__).resolve().parent / "api_regras_catalog.json"
 RE_INVALID_FIELD = re.compile(r"(\w+)\s+:=\s*[^<\r\n]+<\s*--\s*Invalido", re.I)
@@ -433,13 +435,16 @@ def validation_failed_rule_names(validation_results: list[dict]) -> list[str]:
 def fetch_latest_validation_failed_rules(table: Any, pk: str) -> list[str]:
     """Regras validar_* com status FAILED no VALIDATION# mais recente."""
     try:
-        resp = table.query(
-            KeyConditionExpression="PK = :pk AND begins_with(SK, :sk)",
-            ExpressionAttributeValues={":pk": pk, ":sk": "VALIDATION#"},
-            ScanIndexForward=False,
-            Limit=1,
+        items = list(
+            iter_partition(
+                table,
+                pk,
+                sk_prefix="VALIDATION#",
+                projection=("VALIDATION_RESULTS",),
+                max_items=1,
+                scan_forward=False,
+            )
         )
-        items = resp.get("Items") or []
         if not items:
             return []
         return validation_failed_rule_names(
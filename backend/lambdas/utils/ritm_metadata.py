@@ -8,6 +8,8 @@ from __future__ import annotations
 import json
 from typing import Any, Dict, Optional
 
+from .json_codec import decode_item
+
 
 def get_ritm_from_request_body(request_body: Any) -> Optional[Any]:
     if not isinstance(request_body, dict) or "ritm" not in request_body:
@@ -61,11 +63,12 @@ def ritm_from_items_by_sk(items_by_sk: Dict[str, Dict]) -> Optional[Any]:
 def load_ritm_for_process(table, process_id: str) -> Optional[Any]:
     try:
         pk = f"PROCESS#{process_id}"
-        response = table.query(
-            KeyConditionExpression="PK = :pk",
-            ExpressionAttributeValues={":pk": pk},
-        )
-        items = {item["SK"]: item for item in response.get("Items", [])}
+        # Só METADATA e PEDIDO_COMPRA_METADATA importam; evita ler TEXTRACT#/MERGED.
+        items: Dict[str, Dict] = {}
+        for sk in ("PEDIDO_COMPRA_METADATA", "METADATA"):
+            item = decode_item(table.get_item(Key={"PK": pk, "SK": sk}).get("Item"))
+            if item:
+                items[sk] = item
         return ritm_from_items_by_sk(items)
     except Exception:
         return None
@@ -0,0 +1,67 @@
+"""
+Cache em memória do container (warm Lambda) invalidado por carimbo de versão.
+
+Cada entrada guarda o valor carregado e a versão lida no momento da carga.
+A cada ``check_seconds`` a versão é relida (uma leitura pequena — ex.: GetItem
+de um item ``VERSION`` incrementado pelo service que escreve os dados) e o valor
+só é recarregado se ela mudou. ``max_age_seconds`` força recarga mesmo sem
+mudança de versão (escritas feitas fora do service, por scripts).
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class _Entry:
+    __slots__ = ("value", "version", "loaded_at", "checked_at")
+
+    def __init__(self, value: Any, version: Any, now: float):
+        self.value = value
+        self.version = version
+        self.loaded_at = now
+        self.checked_at = now
+
+
+class VersionedCache:
+    def __init__(self, check_seconds: float, max_age_seconds: float):
+        self.check_seconds = check_seconds
+        self.max_age_seconds = max_age_seconds
+        self._entries: Dict[Hashable, _Entry] = {}
+
+    def clear(self, key: Optional[Hashable] = None) -> None:
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def get(
+        self,
+        key: Hashable,
+        read_version: Callable[[], Any],
+        load: Callable[[], Any],
+    ) -> Any:
+        """Valor de ``key``; ``load()`` só roda na primeira vez, após expirar ou se a versão mudou."""
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is None or now - entry.loaded_at >= self.max_age_seconds:
+            version = read_version()
+            entry = self._entries[key] = _Entry(load(), version, time.monotonic())
+        elif now - entry.checked_at >= self.check_seconds:
+            version = read_version()
+            if version != entry.version:
+                entry = self._entries[key] = _Entry(load(), version, time.monotonic())
+            else:
+                entry.checked_at = now
+        return entry.value
+
+
+def read_version_item(table, pk: str, sk: str = "VERSION", attribute: str = "VERSION") -> Any:
+    """Lê só o atributo de versão de um item (None se o item ainda não existe)."""
+    response = table.get_item(
+        Key={"PK": pk, "SK": sk},
+        ProjectionExpression="#v",
+        ExpressionAttributeNames={"#v": attribute},
+    )
+    return (response.get("Item") or {}).get(attribute)
@@ -5,7 +5,10 @@ import logging
 from datetime import datetime
 from decimal import Decimal
 
-from utils.primary_xml import pick_best_parsed_xml_item
+from utils.blob_store import offload_large_attributes, resolve_blob
+from utils.json_codec import encode_item
+from utils.process_snapshot import ProcessSnapshot
+from rules.registry import get_rule_module, get_rules, import_failed, lacks_validate, preload_rule_modules
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -20,11 +23,12 @@ if not aws_region:
     except:
         aws_region = 'sa-east-1'
 
-# Bedrock Nova Pro está disponível apenas em us-east-1 por enquanto
-bedrock = boto3.client('bedrock-runtime', region_name='us-east-1')
 dynamodb = boto3.resource('dynamodb', region_name=aws_region)
 table = dynamodb.Table(os.environ['TABLE_NAME'])
 
+# Importa todas as regras no init do container (fora do caminho quente)
+preload_rule_modules()
+
 def decimal_to_native(obj):
     """Converte Decimal para tipos nativos"""
     if isinstance(obj, Decimal):
@@ -43,10 +47,7 @@ def handler(event, context):
     
     # Buscar dados parseados
     pk = f"PROCESS#{process_id}"
-    items = table.query(
-        KeyConditionExpression='PK = :pk',
-        ExpressionAttributeValues={':pk': pk}
-    )['Items']
+    snapshot = ProcessSnapshot.load(table, process_id)
     
     danfe_data = None
     docs_data = []
@@ -54,26 +55,26 @@ def handler(event, context):
     input_json = None  # Novo formato com header e requestBody
     
     # Buscar METADATA (fonte única)
-    metadata_item = next((item for item in items if item['SK'] == 'METADATA'), None)
+    metadata_item = snapshot.get('METADATA')
     
     # Buscar process_type do METADATA (fonte única)
     if metadata_item:
         process_type = metadata_item.get('PROCESS_TYPE', 'AGROQUIMICOS')
-        input_json_str = metadata_item.get('INPUT_JSON')
-        if input_json_str:
-            try:
-                input_json = json.loads(input_json_str) if isinstance(input_json_str, str) else input_json_str
+        if metadata_item.get('INPUT_JSON'):
+            input_json = snapshot.input_json
+            if input_json is not None:
                 logger.info(f"Found INPUT_JSON with requestBody.itens: {len(input_json.get('requestBody', {}).get('itens', []))} produtos")
-            except Exception as e:
-                logger.warning(f"Failed to parse INPUT_JSON: {str(e)}")
+            else:
+                logger.warning("Failed to parse INPUT_JSON")
     
     # Buscar metadados do pedido de compra (SK: PEDIDO_COMPRA_METADATA) - PRIORIDADE 1
-    pedido_compra_item = next((item for item in items if item.get('SK') == 'PEDIDO_COMPRA_METADATA'), None)
+    pedido_compra_item = snapshot.pedido_compra_item
     if pedido_compra_item:
-        metadados_str = pedido_compra_item.get('METADADOS', '')
-        if metadados_str:
+        if pedido_compra_item.get('METADADOS', ''):
             try:
-                metadados = json.loads(metadados_str) if isinstance(metadados_str, str) else metadados_str
+                metadados = snapshot.json(pedido_compra_item, 'METADADOS')
+                if metadados is None:
+                    raise ValueError("METADADOS não é um JSON válido")
                 
                 # Verificar se está no formato do pedido de compra (com header e requestBody)
                 if isinstance(metadados, dict):
@@ -93,47 +94,47 @@ def handler(event, context):
                 traceback.print_exc()
     
     # Buscar metadados dos arquivos (FILE#) - PRIORIDADE 2
-    for item in items:
-        if 'FILE#' in item['SK']:
-            file_name = item.get('FILE_NAME', '')
-            metadados_str = item.get('METADADOS', '')
-            if metadados_str:
-                try:
-                    metadados = json.loads(metadados_str) if isinstance(metadados_str, str) else metadados_str
-                    
-                    # Verificar se está no formato do pedido de compra (com header e requestBody)
-                    if isinstance(metadados, dict):
-                        if 'requestBody' in metadados:
-                            logger.info(f"[handler] Arquivo {file_name} - Metadados no formato pedido de compra (tem header e requestBody)")
-                            logger.info(f"[handler] Arquivo {file_name} - requestBody keys: {list(metadados.get('requestBody', {}).keys())}")
-                            logger.info(f"[handler] Arquivo {file_name} - requestBody.cnpjEmitente: {metadados.get('requestBody', {}).get('cnpjEmitente')}")
-                            logger.info(f"[handler] Arquivo {file_name} - requestBody.cnpjDestinatario: {metadados.get('requestBody', {}).get('cnpjDestinatario')}")
-                            logger.info(f"[handler] Arquivo {file_name} - requestBody.itens: {len(metadados.get('requestBody', {}).get('itens', []))} itens")
-                        else:
-                            logger.info(f"[handler] Arquivo {file_name} - Metadados no formato antigo (sem requestBody)")
-                            logger.info(f"[handler] Arquivo {file_name} - Metadados keys: {list(metadados.keys())}")
-                    
-                    file_metadata[file_name] = metadados
-                    logger.info(f"[handler] Metadados salvos para arquivo: {file_name}")
-                except Exception as e:
-                    logger.warning(f"[handler] Falha ao parsear metadados para {file_name}: {str(e)}")
-                    import traceback
-                    traceback.print_exc()
+    for item in snapshot.file_items:
+        file_name = item.get('FILE_NAME', '')
+        if item.get('METADADOS', ''):
+            try:
+                metadados = snapshot.file_metadados(item)
+                if metadados is None:
+                    raise ValueError("METADADOS não é um JSON válido")
+                
+                # Verificar se está no formato do pedido de compra (com header e requestBody)
+                if isinstance(metadados, dict):
+                    if 'requestBody' in metadados:
+                        logger.info(f"[handler] Arquivo {file_name} - Metadados no formato pedido de compra (tem header e requestBody)")
+                        logger.info(f"[handler] Arquivo {file_name} - requestBody keys: {list(metadados.get('requestBody', {}).keys())}")
+                        logger.info(f"[handler] Arquivo {file_name} - requestBody.cnpjEmitente: {metadados.get('requestBody', {}).get('cnpjEmitente')}")
+                        logger.info(f"[handler] Arquivo {file_name} - requestBody.cnpjDestinatario: {metadados.get('requestBody', {}).get('cnpjDestinatario')}")
+                        logger.info(f"[handler] Arquivo {file_name} - requestBody.itens: {len(metadados.get('requestBody', {}).get('itens', []))} itens")
+                    else:
+                        logger.info(f"[handler] Arquivo {file_name} - Metadados no formato antigo (sem requestBody)")
+                        logger.info(f"[handler] Arquivo {file_name} - Metadados keys: {list(metadados.keys())}")
+                
+                file_metadata[file_name] = metadados
+                logger.info(f"[handler] Metadados salvos para arquivo: {file_name}")
+            except Exception as e:
+                logger.warning(f"[handler] Falha ao parsear metadados para {file_name}: {str(e)}")
+                import traceback
+                traceback.print_exc()
     
-    best_xml = pick_best_parsed_xml_item(items)
+    best_xml = snapshot.best_parsed_xml
     if best_xml and best_xml.get('PARSED_DATA'):
-        try:
-            parsed = json.loads(best_xml.get('PARSED_DATA', '{}'))
+        parsed = snapshot.json(best_xml, 'PARSED_DATA')
+        if parsed is not None:
             danfe_data = {'file_name': best_xml['FILE_NAME'], 'data': parsed}
             logger.info(f"[handler] PARSED_XML principal: {best_xml.get('SK')}")
-        except Exception as e:
-            logger.warning(f"[handler] Falha ao parsear PARSED_DATA do XML principal: {e}")
+        else:
+            logger.warning("[handler] Falha ao parsear PARSED_DATA do XML principal")
 
     if not danfe_data:
-        merged_item = next((item for item in items if item.get('SK') == 'MERGED_EXTRACTION'), None)
+        merged_item = snapshot.merged_item
         if merged_item and merged_item.get('MERGED_DATA'):
             try:
-                merged = json.loads(merged_item['MERGED_DATA'])
+                merged = snapshot.merged_data or {}
                 for doc in merged.get('textract_documents') or []:
                     hints = doc.get('protheus_hints') or {}
                     px = hints.get('parsed_xml_style') or {}
@@ -299,9 +300,8 @@ def handler(event, context):
         
         # Verificar no pedido de compra metadata
         if not has_codigo_operacao_in_metadata and pedido_compra_item:
-            metadados_check_str = pedido_compra_item.get('METADADOS', '')
-            if metadados_check_str:
-                metadados_check = json.loads(metadados_check_str) if isinstance(metadados_check_str, str) else metadados_check_str
+            metadados_check = snapshot.pedido_compra
+            if metadados_check:
                 if isinstance(metadados_check, dict) and metadados_check.get('requestBody', {}).get('itens'):
                     for item_check in metadados_check['requestBody']['itens']:
                         if item_check.get('codigoOperacao'):
@@ -321,11 +321,7 @@ def handler(event, context):
             uso_e_consumo_active,
         )
 
-        met_pedido = None
-        if pedido_compra_item:
-            raw_m = pedido_compra_item.get("METADADOS", "")
-            if raw_m:
-                met_pedido = json.loads(raw_m) if isinstance(raw_m, str) else raw_m
+        met_pedido = snapshot.pedido_compra
         # Mesmo formato do pedido pode estar só no INPUT_JSON do METADATA
         pedido_fonte = met_pedido if isinstance(met_pedido, dict) else None
         if pedido_fonte is None and isinstance(input_json, dict):
@@ -374,18 +370,32 @@ def handler(event, context):
             })
             continue
 
+        module = get_rule_module(rule_name)
+        if module is None and lacks_validate(rule_name):
+            logger.warning(f"Rule {rule_name} não possui função validate - pulando")
+            results.append({
+                'rule': rule_name,
+                'status': 'ERROR',
+                'danfe_value': 'null',
+                'message': 'Regra não encontrada (função validate ausente)'
+            })
+            continue
+        import_error = import_failed(rule_name) if module is None else None
+        if import_error:
+            logger.error(f"Rule execution failed: {import_error}")
+            results.append({
+                'rule': rule_name,
+                'status': 'ERROR',
+                'danfe_value': 'null',
+                'message': import_error
+            })
+            continue
+        if module is None:
+            logger.warning(f"Rule {rule_name} não encontrada (módulo não existe) - pulando")
+            # Não adicionar ao results para não poluir - apenas logar o aviso
+            continue
+
         try:
-            module = __import__(f"rules.{rule_name}", fromlist=['validate'])
-            if not hasattr(module, 'validate'):
-                logger.warning(f"Rule {rule_name} não possui função validate - pulando")
-                results.append({
-                    'rule': rule_name,
-                    'status': 'ERROR',
-                    'danfe_value': 'null',
-                    'message': 'Regra não encontrada (função validate ausente)'
-                })
-                continue
-            
             if rule_name == "validar_cfop_chave":
                 result = module.validate(danfe_parsed, ocr_docs, cfop_validate_context)
             else:
@@ -397,10 +407,6 @@ def handler(event, context):
             if result.get('corrections'):
                 apply_corrections(process_id, result['corrections'])
             
-        except ModuleNotFoundError as e:
-            logger.warning(f"Rule {rule_name} não encontrada (módulo não existe) - pulando: {str(e)}")
-            # Não adicionar ao results para não poluir - apenas logar o aviso
-            continue
         except Exception as e:
             logger.error(f"Rule execution failed: {str(e)}")
             results.append({
@@ -443,7 +449,7 @@ def handler(event, context):
     if cfop_mapping_data:
         item_data['CFOP_MAPPING'] = json.dumps(cfop_mapping_data)
     
-    table.put_item(Item=item_data)
+    table.put_item(Item=encode_item(item_data))
     
     return {
         'process_id': process_id,
@@ -471,51 +477,26 @@ def apply_corrections(process_id, corrections):
             continue
         
         item = response['Item']
-        parsed_data = json.loads(item.get('PARSED_DATA', '{}'))
+        parsed_data = json.loads(resolve_blob(item.get('PARSED_DATA', '{}')))
         
         # Aplicar correção
         if field in parsed_data:
             parsed_data[field] = new_value
         
         # Atualizar no DynamoDB
+        updated = offload_large_attributes({'SK': sk, 'PARSED_DATA': json.dumps(parsed_data)})
         table.update_item(
             Key={'PK': pk, 'SK': sk},
             UpdateExpression='SET PARSED_DATA = :data',
-            ExpressionAttributeValues={':data': json.dumps(parsed_data)}
+            ExpressionAttributeValues={':data': updated['PARSED_DATA']}
         )
         
         logger.info(f"Correction applied successfully")
 
 def get_rules_for_process_type(process_type):
-    """Busca regras configuradas no DynamoDB"""
+    """Regras habilitadas do process_type (RULES#…), via cache do registro de regras"""
     try:
-        pk = f'RULES#{process_type}'
-        logger.info(f"Querying rules with PK={pk}, SK prefix=RULE#")
-        
-        response = table.query(
-            KeyConditionExpression='PK = :pk AND begins_with(SK, :sk)',
-            ExpressionAttributeValues={
-                ':pk': pk,
-                ':sk': 'RULE#'
-            }
-        )
-        
-        logger.info(f"Found {len(response.get('Items', []))} rules")
-        
-        rules = []
-        for item in response.get('Items', []):
-            rule = {
-                'rule_name': item.get('rule_name') or item.get('RULE_NAME'),
-                'order': item.get('order') or item.get('ORDER', 999),
-                'enabled': item.get('enabled', item.get('ENABLED', True))
-            }
-            logger.info(f"Rule found: {rule}")
-            rules.append(rule)
-        
-        # Ordenar por ordem e filtrar habilitadas
-        rules = [r for r in rules if r['enabled']]
-        rules.sort(key=lambda x: x['order'])
-        
+        rules = get_rules(table, process_type)
         logger.info(f"Returning {len(rules)} enabled rules")
         return rules
     except Exception as e:
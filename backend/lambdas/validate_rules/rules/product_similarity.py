@@ -0,0 +1,205 @@
+"""
+Comparação local (determinística) de nomes de produto, antes do Bedrock.
+
+Extrai de cada lado:
+  - nome base / marca: palavras distintivas (sem categoria agronômica, embalagem, unidade)
+  - volume/peso: "10L" = "10 LT" = "10 LITROS"; "500 GR" = 0,5 KG; "TN 1000 KG"
+  - códigos NPK (15.15.15 = 15-15-15, via normalize_code_separators)
+  - embalagem (GL, bombona, SC, PT...) — só informativa, não separa SKU
+
+e decide MATCH / MISMATCH só com evidência forte (mesmas regras do prompt de
+compare_with_bedrock); o resto é UNSURE e segue para o Bedrock.
+
+  MATCH     códigos equivalentes já validados; mesmo NPK; mesma marca + mesmo volume;
+            mesma marca + todas as palavras (2+) do nome mais curto presentes no outro
+  MISMATCH  NPK diferente; volume diferente na mesma grandeza (10 L vs 20 L);
+            nenhuma palavra distintiva em comum nem parecida
+
+Decisões com confiança abaixo de PRODUCT_SIMILARITY_MIN_CONFIDENCE (0.85) viram UNSURE.
+O 0.85 é provisório: só foi conferido nos 19 pares de test_bedrock_compare_produto.PAIRS (parte
+sintética). Validar com scripts/benchmark_product_similarity.py --table (veredictos reais do
+Bedrock gravados no cache) antes de baixar o limiar; na dúvida, subir o limiar manda mais pares
+ao Bedrock sem mudar o resultado.
+"""
+
+import os
+import re
+import unicodedata
+from difflib import SequenceMatcher
+
+from .validar_produtos import normalize_code_separators
+
+MATCH = "MATCH"
+MISMATCH = "MISMATCH"
+UNSURE = "UNSURE"
+
+DEFAULT_MIN_CONFIDENCE = 0.85
+
+_NPK_RE = re.compile(r"\b\d{1,2}[.\- ]\d{1,2}[.\- ]\d{1,2}\b")
+_VOLUME_RE = re.compile(
+    r"(?<![\w.,])(?:\d+\s*X\s*)?(\d+(?:[.,]\d+)?)\s*"
+    r"(LITROS|LITRO|LTS|LT|L|ML|KGS|KG|KILOS|KILO|GRAMAS|GRS|GR|G|TON|TN)\b"
+)
+# unidade -> (grandeza, fator para L ou KG)
+_UNITS = {
+    "LITROS": ("L", 1.0), "LITRO": ("L", 1.0), "LTS": ("L", 1.0), "LT": ("L", 1.0), "L": ("L", 1.0),
+    "ML": ("L", 0.001),
+    "KGS": ("KG", 1.0), "KG": ("KG", 1.0), "KILOS": ("KG", 1.0), "KILO": ("KG", 1.0),
+    "GRAMAS": ("KG", 0.001), "GRS": ("KG", 0.001), "GR": ("KG", 0.001), "G": ("KG", 0.001),
+    "TON": ("KG", 1000.0), "TN": ("KG", 1000.0),
+}
+
+CATEGORIES = frozenset({
+    "FUNGICIDA", "HERBICIDA", "INSETICIDA", "ACARICIDA", "NEMATICIDA", "BACTERICIDA",
+    "ADJUVANTE", "ESPALHANTE", "FERTILIZANTE", "ADUBO", "FOLIAR", "CORRETIVO", "INOCULANTE",
+})
+PACKAGING = frozenset({
+    "GL", "GALAO", "BOMBONA", "BB", "FRASCO", "FR", "BIDAO", "SC", "SACO", "SACA", "PT", "POTE",
+    "BD", "BALDE", "BAG", "BIG", "CX", "CAIXA", "TB", "TAMBOR", "GRANEL", "EMB", "EMBALAGEM",
+})
+_NOISE = CATEGORIES | PACKAGING | frozenset(_UNITS) | frozenset({
+    "REG", "ESTAB", "REGISTRO", "DOS", "DAS", "COM", "PARA", "UNID", "UND", "NPK",
+})
+
+
+def _min_confidence():
+    try:
+        return float(os.environ.get("PRODUCT_SIMILARITY_MIN_CONFIDENCE", DEFAULT_MIN_CONFIDENCE))
+    except ValueError:
+        return DEFAULT_MIN_CONFIDENCE
+
+
+def _fold(text):
+    text = unicodedata.normalize("NFKD", str(text or "").upper())
+    return "".join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def extract_features(name):
+    """Features de um nome: tokens distintivos (em ordem), volumes, códigos NPK e embalagens."""
+    text = _fold(name)
+    npk = {normalize_code_separators(m) for m in _NPK_RE.findall(text)}
+    text = _NPK_RE.sub(" ", text)
+
+    volumes = set()
+    for number, unit in _VOLUME_RE.findall(text):
+        dim, factor = _UNITS[unit]
+        volumes.add((dim, round(float(number.replace(",", ".")) * factor, 4)))
+    text = _VOLUME_RE.sub(" ", text)
+
+    words = re.split(r"[^A-Z0-9]+", text)
+    tokens = []
+    for w in words:
+        if len(w) >= 3 and w.isalpha() and w not in _NOISE and w not in tokens:
+            tokens.append(w)
+    return {
+        "tokens": tokens,
+        "volumes": volumes,
+        "npk": npk,
+        "packaging": sorted({w for w in words if w in PACKAGING}),
+        "categories": sorted({w for w in words if w in CATEGORIES}),
+    }
+
+
+def _tokens_match(a, b):
+    if a == b:
+        return True
+    if min(len(a), len(b)) >= 4 and (a.startswith(b) or b.startswith(a)):
+        return True
+    return SequenceMatcher(None, a, b).ratio() >= 0.85
+
+
+def _same_anchor(t1, t2):
+    """Marca = 1ª palavra distintiva; aceita marca colada/separada (OPTERADUO x OPTERA DUO)."""
+    a, b = t1[0], t2[0]
+    if _tokens_match(a, b):
+        return True
+    if len(t1) > 1 and a + t1[1] == b:
+        return True
+    return len(t2) > 1 and b + t2[1] == a
+
+
+def _coverage(t1, t2):
+    """Fração das palavras do nome mais curto com correspondente no outro."""
+    short, long_ = (t1, t2) if len(t1) <= len(t2) else (t2, t1)
+    hits = sum(1 for a in short if any(_tokens_match(a, b) for b in long_))
+    return hits / len(short)
+
+
+def _volumes_by_dim(volumes):
+    out = {}
+    for dim, value in volumes:
+        out.setdefault(dim, set()).add(value)
+    return out
+
+
+def _describe_volumes(v1, v2):
+    if not v1 and not v2:
+        return "nao_identificado"
+    fmt = lambda vs: ", ".join(f"{value:g} {dim}" for dim, value in sorted(vs)) or "-"
+    return f"{fmt(v1)} vs {fmt(v2)}"
+
+
+def score_product_names(value1, value2, has_equivalent_code=False):
+    """
+    Compara dois nomes de produto localmente.
+
+    Retorna dict ``{"status": MATCH|MISMATCH|UNSURE, "confidence": float, "reason": str,
+    "features": (f1, f2)}``; decisões abaixo do limiar de confiança saem como UNSURE.
+    """
+    f1, f2 = extract_features(value1), extract_features(value2)
+    t1, t2 = f1["tokens"], f2["tokens"]
+    status, confidence, reason = UNSURE, 0.5, "sem evidência suficiente"
+
+    vol1, vol2 = _volumes_by_dim(f1["volumes"]), _volumes_by_dim(f2["volumes"])
+    shared_dims = set(vol1) & set(vol2)
+    volume_conflict = any(not (vol1[d] & vol2[d]) for d in shared_dims)
+    volume_equal = bool(shared_dims) and not volume_conflict
+
+    if has_equivalent_code:
+        status, confidence, reason = MATCH, 1.0, "códigos numéricos já validados como equivalentes"
+    elif f1["npk"] and f2["npk"]:
+        if f1["npk"] & f2["npk"]:
+            status, confidence, reason = MATCH, 0.95, "mesmo código NPK após normalizar separadores"
+        else:
+            status, confidence, reason = MISMATCH, 0.95, "códigos NPK diferentes"
+    elif volume_conflict:
+        status, confidence, reason = MISMATCH, 0.9, "volume/peso diferente"
+    elif t1 and t2:
+        anchor = _same_anchor(t1, t2)
+        coverage = _coverage(t1, t2)
+        if anchor and volume_equal:
+            status, confidence, reason = MATCH, 0.95, "mesmo nome base e mesmo volume"
+        elif anchor and coverage == 1.0 and min(len(t1), len(t2)) >= 2:
+            status, confidence, reason = MATCH, 0.9, "mesmo nome base; demais palavras contidas"
+        elif coverage == 0.0 and SequenceMatcher(None, " ".join(t1), " ".join(t2)).ratio() < 0.5:
+            status, confidence, reason = MISMATCH, 0.85, "nenhuma palavra distintiva em comum"
+        else:
+            confidence = 0.5 + coverage / 4
+
+    if status != UNSURE and confidence < _min_confidence():
+        status = UNSURE
+    return {"status": status, "confidence": confidence, "reason": reason, "features": (f1, f2)}
+
+
+def local_compare_result(score):
+    """Converte o score em retorno no formato de compare_with_bedrock (``bedrock`` com os 7 campos)."""
+    f1, f2 = score["features"]
+    if score["status"] == MATCH and f1["tokens"] and f2["tokens"]:
+        nome_base = f1["tokens"][0]
+    elif f1["npk"] & f2["npk"]:
+        nome_base = sorted(f1["npk"] & f2["npk"])[0]
+    else:
+        nome_base = f"{' '.join(f1['tokens'][:2]) or '-'} vs {' '.join(f2['tokens'][:2]) or '-'}"
+    cats = sorted(set(f1["categories"]) | set(f2["categories"]))
+    return {
+        "status": score["status"],
+        "bedrock": {
+            "explicacao": f"Comparação local: {score['reason']}.",
+            "nome_base": nome_base,
+            "volumetria": _describe_volumes(f1["volumes"], f2["volumes"]),
+            "categoria_agronomica": ", ".join(c.lower() for c in cats) or "nao_se_aplica",
+            "embalagem": f"Produto1: {'/'.join(f1['packaging']) or '-'}; Produto2: {'/'.join(f2['packaging']) or '-'}",
+            "detalhes": f"comparação local sem Bedrock (confiança {score['confidence']:.2f})",
+            "origem": "local",
+        },
+    }
@@ -0,0 +1,109 @@
+"""
+Registro das regras de validação.
+
+Os módulos ``rules/*.py`` que expõem ``validate`` são importados uma única vez
+(no init do container) e a lista de regras habilitadas/ordenadas de cada
+process_type (``RULES#{process_type}``) fica em cache, revalidada pelo item
+``RULES#{process_type}/VERSION`` que o RulesService incrementa a cada escrita.
+"""
+
+import importlib
+import logging
+import os
+import pkgutil
+
+from utils.dynamo_query import query_partition
+from utils.versioned_cache import VersionedCache, read_version_item
+
+logger = logging.getLogger()
+
+RULES_CACHE_CHECK_SECONDS = float(os.environ.get("RULES_CACHE_CHECK_SECONDS", "30"))
+RULES_CACHE_MAX_AGE_SECONDS = float(os.environ.get("RULES_CACHE_MAX_AGE_SECONDS", "600"))
+
+# Módulos auxiliares do pacote que não são regras
+_NON_RULE_MODULES = {"registry", "utils", "ocr_utils", "product_similarity"}
+
+_rule_modules = {}
+_modules_without_validate = set()
+_import_errors = {}
+_rules_cache = VersionedCache(RULES_CACHE_CHECK_SECONDS, RULES_CACHE_MAX_AGE_SECONDS)
+
+
+def preload_rule_modules():
+    """Importa todas as regras do pacote (idempotente); retorna {rule_name: módulo}."""
+    if _rule_modules:
+        return _rule_modules
+    package_dir = os.path.dirname(__file__)
+    for info in pkgutil.iter_modules([package_dir]):
+        name = info.name
+        if name in _NON_RULE_MODULES or name.startswith("_"):
+            continue
+        try:
+            module = importlib.import_module(f"{__package__}.{name}")
+        except ModuleNotFoundError as e:
+            logger.warning(f"[rule_registry] Regra {name} ignorada (módulo não encontrado): {str(e)}")
+            continue
+        except Exception as e:
+            logger.error(f"[rule_registry] Falha ao importar regra {name}: {str(e)}")
+            _import_errors[name] = str(e)
+            continue
+        if not callable(getattr(module, "validate", None)):
+            logger.warning(f"[rule_registry] Módulo {name} não possui função validate - ignorado")
+            _modules_without_validate.add(name)
+            continue
+        _rule_modules[name] = module
+    logger.info(f"[rule_registry] {len(_rule_modules)} regras carregadas: {sorted(_rule_modules)}")
+    return _rule_modules
+
+
+def get_rule_module(rule_name):
+    """Módulo pré-carregado da regra, ou None se não existe/sem validate."""
+    return preload_rule_modules().get(rule_name)
+
+
+def lacks_validate(rule_name):
+    """True se ``rules/{rule_name}.py`` existe mas não expõe ``validate``."""
+    preload_rule_modules()
+    return rule_name in _modules_without_validate
+
+
+def import_failed(rule_name):
+    """Mensagem do erro de import de ``rules/{rule_name}.py`` (exceto módulo ausente), ou None."""
+    preload_rule_modules()
+    return _import_errors.get(rule_name)
+
+
+def _load_rules(table, process_type):
+    pk = f"RULES#{process_type}"
+    logger.info(f"Querying rules with PK={pk}, SK prefix=RULE#")
+    rule_items = query_partition(table, pk, sk_prefix="RULE#")
+    logger.info(f"Found {len(rule_items)} rules")
+
+    rules = []
+    for item in rule_items:
+        rule = {
+            "rule_name": item.get("rule_name") or item.get("RULE_NAME"),
+            "order": item.get("order") or item.get("ORDER", 999),
+            "enabled": item.get("enabled", item.get("ENABLED", True)),
+        }
+        logger.info(f"Rule found: {rule}")
+        rules.append(rule)
+
+    # Ordenar por ordem e filtrar habilitadas
+    rules = [r for r in rules if r["enabled"]]
+    rules.sort(key=lambda x: x["order"])
+    return rules
+
+
+def get_rules(table, process_type):
+    """Regras habilitadas e ordenadas de ``process_type`` (cache do container)."""
+    rules = _rules_cache.get(
+        process_type,
+        lambda: read_version_item(table, f"RULES#{process_type}"),
+        lambda: _load_rules(table, process_type),
+    )
+    return [dict(r) for r in rules]
+
+
+def clear_rules_cache():
+    _rules_cache.clear()
@@ -1,10 +1,49 @@
 import json
-import os
 import logging
-import boto3
+import os
+
+from utils.bedrock_gateway import invoke_text
+from utils.product_compare_cache import compare_cache_key, get_cached_compare, put_cached_compare
 
 logger = logging.getLogger()
 
+# Incrementar ao mudar o prompt de comparação de produto: invalida o cache de comparações.
+PRODUCT_COMPARE_PROMPT_VERSION = "1"
+# Prompt em lote (sem os exemplos do prompt por par): chave própria e validade curta — a resposta
+# serve às chamadas por par do mesmo processamento, mas não substitui o prompt por par no cache longo.
+PRODUCT_COMPARE_BATCH_PROMPT_VERSION = "batch-1"
+
+# Regras 1–5 da comparação de nomes de produto (prompt por par e prompt em lote).
+PRODUCT_COMPARE_RULES = """1. Produtos são o MESMO se tiverem o mesmo nome principal/essencial, mesmo que:
+   - Tenham informações adicionais diferentes (código, lote, registro, etc.)
+   - Tenham unidades de medida diferentes na descrição (KG, SC, PT, etc.)
+   - Tenham tipo de embalagem diferente (galão/GL, bombona, frasco, bidão, etc.) — se o nome base e o volume forem equivalentes
+   - Tenham categoria agronômica extra (fungicida, herbicida, inseticida, etc.) que descreve o uso — não use isso sozinho para separar SKU
+   - Tenham formatação diferente (maiúsculas/minúsculas, espaços, etc.)
+   - Tenham códigos numéricos com separadores diferentes (pontos vs traços)
+     Exemplo: "15.15.15" é EQUIVALENTE a "15-15-15"
+     Exemplo: "30.00.20" é EQUIVALENTE a "30-00-20"
+     Exemplo: "20.00.20" é EQUIVALENTE a "20-00-20"
+
+2. IMPORTANTE - Normalização de códigos numéricos:
+   - Códigos numéricos com pontos (.) são EQUIVALENTES aos mesmos códigos com traços (-)
+   - "15.15.15" = "15-15-15" = "15 15 15" (mesmo código, apenas separador diferente)
+   - "30.00.20" = "30-00-20" = "30 00 20" (mesmo código, apenas separador diferente)
+   - "20.00.20" = "20-00-20" = "20 00 20" (mesmo código, apenas separador diferente)
+   - Se os códigos numéricos forem iguais (ignorando separadores), os produtos são o MESMO
+
+3. Produtos são DIFERENTES apenas se:
+   - O nome principal for completamente diferente
+   - Não houver palavras-chave em comum que identifiquem o mesmo produto
+   - Os códigos numéricos forem diferentes (mesmo após normalizar separadores)
+   - O volume/capacidade for claramente diferente (ex.: 10 L vs 20 L)
+
+4. NOME BASE / MARCA COMERCIAL (âncora forte):
+   - Se AMBOS contiverem o mesmo nome distintivo de produto ou marca (ex.: VESSARYA, SPHERIC PLUS, PROTAC), isso é evidência forte de MESMO produto quando o volume for equivalente (regra 5), mesmo com redação diferente na DANFE x pedido.
+
+5. VOLUME E CAPACIDADE (líquidos):
+   - Trate como equivalentes o mesmo valor numérico de volume: "10L" = "10 LT" = "10 LITROS" = "10 L" (espaços e maiúsculas ignorados)."""
+
 
 def bedrock_compare_status(result) -> str:
     """Extrai MATCH/MISMATCH do retorno de compare_with_bedrock (dict) ou string legada."""
@@ -16,17 +55,42 @@ def bedrock_compare_status(result) -> str:
 
 
 def compare_with_bedrock(value1, value2, field, has_equivalent_code=False):
-    """Usa Bedrock Nova para comparação contextual (cria cliente internamente).
+    """Usa Bedrock Nova para comparação contextual (cliente compartilhado do bedrock_gateway).
 
     Retorno: dict ``{"status": "MATCH"|"MISMATCH", "bedrock": {...}}``.
     Para nomes de produto, ``bedrock`` inclui explicacao, nome_base, volumetria,
     categoria_agronomica, embalagem, detalhes. Use ``bedrock_compare_status()`` para obter só o status.
+    Comparações de nome de produto respondidas pelo modelo ficam em cache (utils.product_compare_cache).
     """
-    # Bedrock Nova Pro está disponível apenas em us-east-1 por enquanto
-    bedrock_client = boto3.client("bedrock-runtime", region_name="us-east-1")
-    return _compare_with_bedrock_client(
-        bedrock_client, value1, value2, field, has_equivalent_code
+    if not _is_product_field(field):
+        return _compare_with_bedrock_client(
+            None, value1, value2, field, has_equivalent_code
+        )
+
+    key = compare_cache_key(
+        value1, value2, field, has_equivalent_code, PRODUCT_COMPARE_PROMPT_VERSION
     )
+    cached = get_cached_compare(key)
+    if cached is None and not has_equivalent_code:
+        cached = get_cached_compare(_batch_cache_key(value1, value2, field))
+    if cached is not None:
+        logger.info(f"Bedrock compare (cache): '{value1}' x '{value2}' -> {cached.get('status')}")
+        return cached
+
+    result, answered = _compare_with_bedrock_answer(
+        None, value1, value2, field, has_equivalent_code
+    )
+    if answered:
+        put_cached_compare(key, result, value1, value2, PRODUCT_COMPARE_PROMPT_VERSION)
+    return result
+
+
+def _batch_cache_key(value1, value2, field):
+    return compare_cache_key(value1, value2, field, False, PRODUCT_COMPARE_BATCH_PROMPT_VERSION)
+
+
+def _is_product_field(field) -> bool:
+    return "produto" in field.lower() or "nome" in field.lower()
 
 
 def _bedrock_result_from_validation(
@@ -51,14 +115,24 @@ def _bedrock_result_from_validation(
     return {"status": status, "bedrock": detail}
 
 def _compare_with_bedrock_client(bedrock_client, value1, value2, field, has_equivalent_code=False):
+    """Usa Bedrock Nova para comparação contextual; ver _compare_with_bedrock_answer."""
+    return _compare_with_bedrock_answer(
+        bedrock_client, value1, value2, field, has_equivalent_code
+    )[0]
+
+
+def _compare_with_bedrock_answer(bedrock_client, value1, value2, field, has_equivalent_code=False):
     """Usa Bedrock Nova para comparação contextual
     
     Args:
-        bedrock_client: Cliente Bedrock
+        bedrock_client: Cliente Bedrock (None = cliente do container no bedrock_gateway)
         value1: Primeiro valor a comparar
         value2: Segundo valor a comparar
         field: Nome do campo sendo comparado
         has_equivalent_code: Se True, indica que os códigos numéricos já foram validados como equivalentes
+
+    Retorna (resultado, respondido): respondido=False em erro/resposta vazia/sem JSON
+    (resultado MISMATCH que não deve ir para o cache).
     """
     
     # Prompt específico para nomes de produtos
@@ -80,35 +154,7 @@ Neste caso, você DEVE retornar "validado": true (e preencher os demais campos d
 Produto 1: {value1}
 Produto 2: {value2}
 {equivalent_code_note}REGRAS:
-1. Produtos são o MESMO se tiverem o mesmo nome principal/essencial, mesmo que:
-   - Tenham informações adicionais diferentes (código, lote, registro, etc.)
-   - Tenham unidades de medida diferentes na descrição (KG, SC, PT, etc.)
-   - Tenham tipo de embalagem diferente (galão/GL, bombona, frasco, bidão, etc.) — se o nome base e o volume forem equivalentes
-   - Tenham categoria agronômica extra (fungicida, herbicida, inseticida, etc.) que descreve o uso — não use isso sozinho para separar SKU
-   - Tenham formatação diferente (maiúsculas/minúsculas, espaços, etc.)
-   - Tenham códigos numéricos com separadores diferentes (pontos vs traços)
-     Exemplo: "15.15.15" é EQUIVALENTE a "15-15-15"
-     Exemplo: "30.00.20" é EQUIVALENTE a "30-00-20"
-     Exemplo: "20.00.20" é EQUIVALENTE a "20-00-20"
-
-2. IMPORTANTE - Normalização de códigos numéricos:
-   - Códigos numéricos com pontos (.) são EQUIVALENTES aos mesmos códigos com traços (-)
-   - "15.15.15" = "15-15-15" = "15 15 15" (mesmo código, apenas separador diferente)
-   - "30.00.20" = "30-00-20" = "30 00 20" (mesmo código, apenas separador diferente)
-   - "20.00.20" = "20-00-20" = "20 00 20" (mesmo código, apenas separador diferente)
-   - Se os códigos numéricos forem iguais (ignorando separadores), os produtos são o MESMO
-
-3. Produtos são DIFERENTES apenas se:
-   - O nome principal for completamente diferente
-   - Não houver palavras-chave em comum que identifiquem o mesmo produto
-   - Os códigos numéricos forem diferentes (mesmo após normalizar separadores)
-   - O volume/capacidade for claramente diferente (ex.: 10 L vs 20 L)
-
-4. NOME BASE / MARCA COMERCIAL (âncora forte):
-   - Se AMBOS contiverem o mesmo nome distintivo de produto ou marca (ex.: VESSARYA, SPHERIC PLUS, PROTAC), isso é evidência forte de MESMO produto quando o volume for equivalente (regra 5), mesmo com redação diferente na DANFE x pedido.
-
-5. VOLUME E CAPACIDADE (líquidos):
-   - Trate como equivalentes o mesmo valor numérico de volume: "10L" = "10 LT" = "10 LITROS" = "10 L" (espaços e maiúsculas ignorados).
+{PRODUCT_COMPARE_RULES}
 
 FORMATO OBRIGATÓRIO — responda um único objeto JSON (sem markdown, sem texto fora do JSON) com TODOS os campos:
 {{
@@ -204,55 +250,144 @@ RESULTADO: {{"validado": false, "explicacao": "Produtos e linhas distintas."}}
 
 Responda APENAS JSON com "validado" e "explicacao" (string obrigatória)."""
     
-    is_product = "produto" in field.lower() or "nome" in field.lower()
+    is_product = _is_product_field(field)
     max_tokens = 600 if is_product else 200
 
     try:
-        model_id = os.environ.get("BEDROCK_MODEL_ID", "amazon.nova-pro-v1:0")
-        response = bedrock_client.invoke_model(
-            modelId=model_id,
-            body=json.dumps(
-                {
-                    "messages": [
-                        {"role": "user", "content": [{"text": prompt}]}
-                    ],
-                    "inferenceConfig": {
-                        "max_new_tokens": max_tokens,
-                        "temperature": 0.1,
-                    },
-                }
-            ),
+        result = invoke_text(
+            prompt,
+            {"max_new_tokens": max_tokens, "temperature": 0.1},
+            label=f"compare:{field}",
+            client=bedrock_client,
         )
+        logger.info(f"Bedrock raw response: {result.body}")
 
-        body_bytes = response["body"].read()
-        logger.info(f"Bedrock raw response: {body_bytes}")
-
-        if not body_bytes:
+        if not result.text:
             logger.error("Bedrock returned empty response")
             return {
                 "status": "MISMATCH",
                 "bedrock": {"explicacao": "Resposta vazia do Bedrock"},
-            }
+            }, False
 
-        result = json.loads(body_bytes)
-        content = result["output"]["message"]["content"][0]["text"].strip()
+        content = result.text.strip()
         logger.info(f"Bedrock content: {content}")
 
         if "{" not in content:
             return {
                 "status": "MISMATCH",
                 "bedrock": {"explicacao": "Resposta sem JSON"},
-            }
+            }, False
 
         json_start = content.index("{")
         json_end = content.rindex("}") + 1
         json_str = content[json_start:json_end]
         validation = json.loads(json_str)
-        return _bedrock_result_from_validation(validation, is_product=is_product)
+        return _bedrock_result_from_validation(validation, is_product=is_product), True
 
     except Exception as e:
         logger.error(f"Bedrock error: {str(e)}")
         return {
             "status": "MISMATCH",
             "bedrock": {"explicacao": f"Erro: {str(e)}"},
-        }
+        }, False
+
+
+def _batch_settings():
+    batch_size = max(1, int(os.environ.get("PRODUCT_COMPARE_BATCH_SIZE", "15")))
+    max_pairs = int(os.environ.get("PRODUCT_COMPARE_BATCH_MAX_PAIRS", "60"))
+    return batch_size, max_pairs
+
+
+def _batch_prompt(chunk):
+    """Prompt com vários pares (ids p1..pN); resposta esperada: array JSON, um objeto por par."""
+    pares = json.dumps(
+        [{"id": pid, "produto1": v1, "produto2": v2} for pid, v1, v2 in chunk],
+        ensure_ascii=False,
+        indent=1,
+    )
+    return (
+        "Compare CADA par de nomes de produto abaixo (produto1 = nota fiscal, produto2 = pedido de compra). "
+        "Avalie cada par de forma independente.\n\n"
+        f"PARES:\n{pares}\n\n"
+        f"REGRAS:\n{PRODUCT_COMPARE_RULES}\n\n"
+        "FORMATO OBRIGATÓRIO — responda um único array JSON (sem markdown, sem texto fora do JSON), "
+        "um objeto por par, com o mesmo id e TODOS os campos:\n"
+        '[{"id": "p1", "validado": true, "explicacao": "frase curta", "nome_base": "...", '
+        '"volumetria": "...", "categoria_agronomica": "...", "embalagem": "...", "detalhes": "..."}]'
+    )
+
+
+def _parse_batch_answer(content):
+    """{id: validação} das entradas bem formadas (id conhecido + ``validado`` booleano)."""
+    if "[" not in content or "]" not in content:
+        return {}
+    try:
+        answers = json.loads(content[content.index("["):content.rindex("]") + 1])
+    except ValueError:
+        return {}
+    out = {}
+    for answer in answers if isinstance(answers, list) else []:
+        if isinstance(answer, dict) and isinstance(answer.get("validado"), bool) and answer.get("id"):
+            out[str(answer["id"])] = answer
+    return out
+
+
+def prefetch_product_comparisons(pairs, field="nome do produto"):
+    """Modo em lote: compara vários pares (valor1, valor2) de nome de produto em um prompt.
+
+    As respostas válidas vão para o cache de compare_with_bedrock (product_compare_cache) com
+    versão própria (PRODUCT_COMPARE_BATCH_PROMPT_VERSION) e validade curta
+    (PRODUCT_COMPARE_BATCH_TTL_SECONDS, padrão 1 h): as chamadas por par do mesmo processamento
+    saem do cache sem ir ao Bedrock, e o cache longo só guarda respostas do prompt por par.
+    Par sem resposta, resposta malformada ou erro no lote não é gravado: compare_with_bedrock faz
+    a chamada individual depois. Retorna quantos pares ficaram respondidos.
+    """
+    batch_size, max_pairs = _batch_settings()
+    batch_ttl = int(float(os.environ.get("PRODUCT_COMPARE_BATCH_TTL_SECONDS", "3600")))
+    pending = {}
+    for value1, value2 in pairs:
+        key = _batch_cache_key(value1, value2, field)
+        if key in pending or get_cached_compare(key) is not None:
+            continue
+        if get_cached_compare(compare_cache_key(value1, value2, field, False, PRODUCT_COMPARE_PROMPT_VERSION)) is None:
+            pending[key] = (value1, value2)
+    todo = list(pending.items())[:max_pairs]
+    if len(todo) < 2:
+        return 0
+
+    answered = 0
+    for start in range(0, len(todo), batch_size):
+        chunk = todo[start:start + batch_size]
+        ids = {f"p{i + 1}": item for i, item in enumerate(chunk)}
+        try:
+            result = invoke_text(
+                _batch_prompt([(pid, v1, v2) for pid, (_key, (v1, v2)) in ids.items()]),
+                {"maxTokens": min(4096, 250 * len(chunk) + 200), "temperature": 0.1},
+                label=f"compare_batch:{len(chunk)}",
+            )
+        except Exception as e:
+            logger.warning(f"Bedrock compare em lote falhou ({len(chunk)} pares): {str(e)}")
+            continue
+        validations = _parse_batch_answer(result.text or "")
+        missing = 0
+        for pid, (key, (value1, value2)) in ids.items():
+            validation = validations.get(pid)
+            if validation is None:
+                missing += 1
+                continue
+            put_cached_compare(
+                key,
+                _bedrock_result_from_validation(validation, is_product=True),
+                value1,
+                value2,
+                PRODUCT_COMPARE_BATCH_PROMPT_VERSION,
+                ttl_seconds=batch_ttl,
+            )
+            answered += 1
+        if missing:
+            logger.warning(
+                f"Bedrock compare em lote: {missing} de {len(chunk)} pares sem resposta válida "
+                "(seguem por chamada individual)"
+            )
+    logger.info(f"Bedrock compare em lote: {answered}/{len(todo)} pares respondidos")
+    return answered
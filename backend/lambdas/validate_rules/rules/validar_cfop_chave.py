@@ -11,6 +11,16 @@ from utils.cfop_table import (
 logger = logging.getLogger()
 
 
+def _item_cfops(produtos):
+    """CFOPs distintos das linhas de produto, na ordem da nota."""
+    cfops = []
+    for item in produtos:
+        cfop = normalize_cfop(item.get('cfop') or item.get('CFOP') or item.get('codigoOperacao'))
+        if cfop and cfop not in cfops:
+            cfops.append(cfop)
+    return cfops
+
+
 def validate(danfe_data, ocr_docs, context=None):
     """
     Valida se o CFOP do DANFE está mapeado na tabela Chave x CFOP
@@ -18,6 +28,9 @@ def validate(danfe_data, ocr_docs, context=None):
 
     context (opcional): process_type, uso_e_consumo, has_pedido_de_compra, natureza — para
     desambiguar quando existem vários mapeamentos ativos para o mesmo CFOP.
+
+    A chave (e o resultado) vem do CFOP do primeiro item; os CFOPs das demais linhas são buscados
+    na mesma leitura (cache do container / BatchGetItem) e só entram como comparação informativa.
     """
     logger.info(f"[validar_cfop_chave.py] Starting validation with {len(ocr_docs)} docs")
     
@@ -79,8 +92,10 @@ def validate(danfe_data, ocr_docs, context=None):
     danfe_cfop_normalized = normalize_cfop(danfe_cfop)
     logger.info(f"[validar_cfop_chave] DANFE CFOP: {danfe_cfop_normalized}")
     
-    # Buscar TODOS os mapeamentos correspondentes no DynamoDB
-    cfop_mappings = get_all_cfop_mappings_direct(table, danfe_cfop_normalized)
+    # Buscar TODOS os mapeamentos dos CFOPs da nota numa única leitura
+    line_cfops = [c for c in _item_cfops(produtos) if c != danfe_cfop_normalized]
+    mappings_by_cfop = get_all_cfop_mappings_direct(table, [danfe_cfop_normalized, *line_cfops])
+    cfop_mappings = mappings_by_cfop.get(danfe_cfop_normalized, [])
     if len(cfop_mappings) > 1:
         before = len(cfop_mappings)
         cfop_mappings = disambiguate_cfop_mappings(cfop_mappings, context)
@@ -202,6 +217,22 @@ def validate(danfe_data, ocr_docs, context=None):
             ]
         }
     
+    # CFOPs das demais linhas: só informativos (a regra continua decidida pelo CFOP do primeiro item)
+    for line_cfop in line_cfops:
+        line_mappings = mappings_by_cfop.get(line_cfop, [])
+        if not line_mappings:
+            logger.warning(f"[validar_cfop_chave] CFOP de item {line_cfop} NÃO encontrado na tabela Chave x CFOP")
+            continue
+        comparisons.append({
+            'doc_file': 'DANFE',
+            'doc_value': f"CFOP (item): {line_cfop}",
+            'chave': line_mappings[0].get('chave', '') if len(line_mappings) == 1 else None,
+            'cfop_encontrado': line_cfop,
+            'status': 'MATCH',
+            'source': 'DynamoDB',
+            'message': f'{len(line_mappings)} mapeamento(s) ativo(s)'
+        })
+
     result = {
         'rule': 'validar_cfop_chave',
         'status': 'PASSED' if all_match else 'FAILED',
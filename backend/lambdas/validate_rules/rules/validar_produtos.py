@@ -123,19 +123,94 @@ def normalize_code_separators(text):
     # Remover espaços no início e fim
     return text.strip()
 
-def find_matching_product(danfe_prod, doc_produtos, used_indices):
-    """Encontra produto correspondente no documento usando apenas nome, sem depender de código/ID
-    Retorna: (doc_idx, doc_prod, has_equivalent_code) onde has_equivalent_code indica se houve match por código numérico equivalente"""
+def compare_product_names(danfe_nome, doc_nome, has_equivalent_code=False):
+    """Compara nomes de produto: decisão local (product_similarity) e, se UNSURE, Bedrock.
+    Retorno no formato de compare_with_bedrock: ``{"status", "bedrock": {...}}``."""
     import logging
     logger = logging.getLogger()
-    
-    # Buscar nome do produto no DANFE (prioridade: produto > nome > descricao)
+    from .product_similarity import UNSURE, local_compare_result, score_product_names
+    from .utils import compare_with_bedrock
+
+    score = score_product_names(danfe_nome, doc_nome, has_equivalent_code)
+    if score['status'] != UNSURE:
+        logger.info(
+            f"[validar_produtos] Comparação local {score['status']} ({score['confidence']:.2f}, "
+            f"{score['reason']}): '{danfe_nome}' x '{doc_nome}'"
+        )
+        return local_compare_result(score)
+    return compare_with_bedrock(
+        danfe_nome,
+        doc_nome,
+        "nome do produto",
+        has_equivalent_code=has_equivalent_code,
+    )
+
+def prefetch_unsure_name_pairs(danfe_produtos, doc_produtos):
+    """Modo em lote (PRODUCT_COMPARE_BATCH_ENABLED, padrão ligado): os pares de nome que o
+    pareamento abaixo ainda vai comparar e que a comparação local deixa UNSURE vão ao Bedrock em
+    um prompt só; as respostas aquecem o cache de compare_with_bedrock e o pareamento não faz
+    chamadas por par.
+
+    Simula as prioridades locais de find_matching_product: linha casada por código/nome só entra
+    com o próprio par (e o mesmo has_equivalent_code da comparação de detalhe); linha sem match
+    local entra contra as linhas do pedido que continuam livres."""
+    import logging
+    import os
+    if os.environ.get("PRODUCT_COMPARE_BATCH_ENABLED", "1").strip().lower() in ("0", "false", "no"):
+        return 0
+    from .product_similarity import UNSURE, score_product_names
+    from .utils import prefetch_product_comparisons
+
+    quiet = logging.getLogger(f"{__name__}.prefetch")
+    quiet.setLevel(logging.WARNING)
+
+    pairs = []
+
+    def add(danfe_prod, doc_prod, has_equivalent_code):
+        danfe_nome = (
+            danfe_prod.get('produto', '').strip()
+            or danfe_prod.get('nome', '').strip()
+            or danfe_prod.get('descricao', '').strip()
+        )
+        doc_nome = (
+            doc_prod.get('produto')
+            or doc_prod.get('nomeProduto')
+            or doc_prod.get('nome')
+            or doc_prod.get('descricaoProduto')
+            or doc_prod.get('descricao', '')
+        ).strip()
+        if not danfe_nome or not doc_nome or danfe_nome.upper() == doc_nome.upper():
+            return
+        if (danfe_nome, doc_nome) in pairs:
+            return
+        if score_product_names(danfe_nome, doc_nome, has_equivalent_code)['status'] == UNSURE:
+            pairs.append((danfe_nome, doc_nome))
+
+    used_indices = set()
+    unresolved = []
+    for danfe_prod in danfe_produtos:
+        local = _find_local_match(danfe_prod, doc_produtos, used_indices, quiet)
+        if local is None:
+            unresolved.append(danfe_prod)
+            continue
+        doc_idx, doc_prod, has_equivalent_code = local
+        used_indices.add(doc_idx)
+        # Código equivalente: _append_matched_line_detail não compara nome (ou a comparação é MATCH local)
+        if not has_equivalent_code:
+            add(danfe_prod, doc_prod, False)
+    for danfe_prod in unresolved:
+        for i, doc_prod in enumerate(doc_produtos):
+            if i not in used_indices:
+                add(danfe_prod, doc_prod, False)
+    return prefetch_product_comparisons(pairs) if len(pairs) >= 2 else 0
+
+def _find_local_match(danfe_prod, doc_produtos, used_indices, logger):
+    """Prioridades 0 a 2 de find_matching_product (código do fornecedor, nome exato, código
+    numérico equivalente, match parcial), sem Bedrock. Retorna (doc_idx, doc_prod, has_equivalent_code)
+    ou None quando a linha só pode ser resolvida pela comparação de nomes."""
     danfe_nome = (danfe_prod.get('produto', '').strip() or 
                   danfe_prod.get('nome', '').strip() or 
                   danfe_prod.get('descricao', '').strip())
-    
-    logger.info(f"[validar_produtos] Buscando match para produto DANFE:")
-    logger.info(f"  Nome: '{danfe_nome}'")
 
     # PRIORIDADE 0: Match por código fornecedor (codProdFornecedor) vs código XML (cProd)
     danfe_codigo = normalize_codigo(danfe_prod.get('codigo', ''))
@@ -247,6 +322,26 @@ def find_matching_product(danfe_prod, doc_produtos, used_indices):
                 logger.info(f"    DANFE: '{danfe_nome}' (normalizado: '{danfe_nome_normalized}')")
                 logger.info(f"    DOC: '{doc_nome}' (normalizado: '{doc_nome_normalized}')")
                 return i, doc_prod, False
+
+    return None
+
+def find_matching_product(danfe_prod, doc_produtos, used_indices):
+    """Encontra produto correspondente no documento usando apenas nome, sem depender de código/ID
+    Retorna: (doc_idx, doc_prod, has_equivalent_code) onde has_equivalent_code indica se houve match por código numérico equivalente"""
+    import logging
+    logger = logging.getLogger()
+    
+    # Buscar nome do produto no DANFE (prioridade: produto > nome > descricao)
+    danfe_nome = (danfe_prod.get('produto', '').strip() or 
+                  danfe_prod.get('nome', '').strip() or 
+                  danfe_prod.get('descricao', '').strip())
+    
+    logger.info(f"[validar_produtos] Buscando match para produto DANFE:")
+    logger.info(f"  Nome: '{danfe_nome}'")
+
+    local = _find_local_match(danfe_prod, doc_produtos, used_indices, logger)
+    if local is not None:
+        return local
     
     # PRIORIDADE 3: Tentar todos os produtos restantes e usar Bedrock para validar
     # Se chegou aqui, não encontrou match exato nem parcial
@@ -262,10 +357,10 @@ def find_matching_product(danfe_prod, doc_produtos, used_indices):
                    doc_prod.get('descricaoProduto') or 
                    doc_prod.get('descricao', '')).strip()
         
-        # Usar Bedrock para validar se são o mesmo produto
-        from .utils import compare_with_bedrock, bedrock_compare_status
+        # Comparação local primeiro; Bedrock só para pares incertos
+        from .utils import bedrock_compare_status
 
-        bedrock_result = compare_with_bedrock(danfe_nome, doc_nome, "nome do produto")
+        bedrock_result = compare_product_names(danfe_nome, doc_nome)
 
         if bedrock_compare_status(bedrock_result) == "MATCH":
             ex = (
@@ -449,7 +544,7 @@ def _codigo_fornecedor_field(danfe_prod, doc_prod):
 
 
 def _nome_comparison(danfe_prod, doc_prod, has_equivalent_code):
-    """Comparação por nome (Bedrock + heurísticas). Retorna (status, field_dict)."""
+    """Comparação por nome (local + Bedrock + heurísticas). Retorna (status, field_dict)."""
     danfe_nome = (
         danfe_prod.get('produto', '').strip()
         or danfe_prod.get('nome', '').strip()
@@ -463,14 +558,9 @@ def _nome_comparison(danfe_prod, doc_prod, has_equivalent_code):
         or doc_prod.get('descricao', '')
     ).strip()
 
-    from .utils import compare_with_bedrock, bedrock_compare_status
+    from .utils import bedrock_compare_status
 
-    nome_cmp = compare_with_bedrock(
-        danfe_nome,
-        doc_nome,
-        "nome do produto",
-        has_equivalent_code=has_equivalent_code,
-    )
+    nome_cmp = compare_product_names(danfe_nome, doc_nome, has_equivalent_code)
     nome_status = bedrock_compare_status(nome_cmp)
     bedrock_meta = (
         nome_cmp.get("bedrock") if isinstance(nome_cmp, dict) else None
@@ -547,6 +637,9 @@ def validate_products_comparison(danfe_produtos, doc_produtos, doc_file, source_
     used_indices = set()
     unmatched_danfe = []
     all_match = True
+
+    # Pares incertos de nome em um prompt só (fallback por par dentro de compare_with_bedrock)
+    prefetch_unsure_name_pairs(danfe_produtos, doc_produtos)
     
     # Tentar parear cada produto DANFE com DOC (1:1; used_indices consome linha do pedido)
     for danfe_idx, danfe_prod in enumerate(danfe_produtos):
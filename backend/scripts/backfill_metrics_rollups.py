@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Backfill dos rollups de métricas (WEEK_ROLLUP / MONTH_ROLLUP) a partir dos
+METRICS#{dia}/SUMMARY existentes.
+
+O update_metrics replica cada delta diário nos rollups da semana ISO e do mês,
+mas só a partir do deploy. Este script (rodar depois do deploy):
+
+- Grava METRICS_ROLLUP/CONFIG.SINCE = amanhã (UTC), se ainda não existir.
+  Períodos que começam em/após SINCE têm todos os deltas replicados ao vivo.
+- Para períodos fechados (fim < hoje) que começam antes de SINCE, grava o rollup
+  como soma dos dias, marcado BACKFILLED.
+- Períodos ainda abertos e anteriores a SINCE ficam de fora (o dashboard usa os
+  dias); rode de novo depois que fecharem.
+
+Uso:
+  export TABLE_NAME=...
+  export AWS_DEFAULT_REGION=us-east-1
+  python3 scripts/backfill_metrics_rollups.py --dry-run
+  python3 scripts/backfill_metrics_rollups.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import boto3
+from boto3.dynamodb.conditions import Attr
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "lambdas"))
+from utils.metrics_rollups import (  # noqa: E402
+    ROLLUP_CONFIG_KEY,
+    ROLLUP_COUNTERS,
+    ROLLUP_MAPS,
+    build_rollup_items,
+    month_bounds,
+    parse_date,
+    rollup_keys_for_date,
+    week_bounds,
+)
+
+
+def _scan_daily_summaries(table) -> dict[str, dict]:
+    out: dict[str, dict] = {}
+    names = {f"#a{i}": attr for i, attr in enumerate(("PK",) + ROLLUP_COUNTERS + ROLLUP_MAPS)}
+    kwargs = {
+        "FilterExpression": Attr("PK").begins_with("METRICS#") & Attr("SK").eq("SUMMARY"),
+        "ProjectionExpression": ", ".join(names),
+        "ExpressionAttributeNames": names,
+    }
+    while True:
+        resp = table.scan(**kwargs)
+        for item in resp.get("Items", []):
+            date_key = (item.get("PK") or "").replace("METRICS#", "")
+            if len(date_key) == 10:
+                out[date_key] = item
+        lek = resp.get("LastEvaluatedKey")
+        if not lek:
+            break
+        kwargs["ExclusiveStartKey"] = lek
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill WEEK_ROLLUP/MONTH_ROLLUP dos METRICS#")
+    parser.add_argument("--dry-run", action="store_true", help="Só imprime, não grava")
+    args = parser.parse_args()
+
+    table_name = os.environ.get("TABLE_NAME")
+    if not table_name:
+        print("Defina TABLE_NAME", file=sys.stderr)
+        sys.exit(1)
+
+    table = boto3.resource("dynamodb").Table(table_name)
+    today = datetime.now(timezone.utc).date()
+    tomorrow = (today + timedelta(days=1)).isoformat()
+
+    if args.dry_run:
+        config = table.get_item(Key=ROLLUP_CONFIG_KEY).get("Item") or {}
+        since = config.get("SINCE") or tomorrow
+    else:
+        since = table.update_item(
+            Key=ROLLUP_CONFIG_KEY,
+            UpdateExpression="SET SINCE = if_not_exists(SINCE, :since)",
+            ExpressionAttributeValues={":since": tomorrow},
+            ReturnValues="ALL_NEW",
+        )["Attributes"]["SINCE"]
+    print(f"SINCE = {since}")
+
+    summaries = _scan_daily_summaries(table)
+    print(f"{len(summaries)} dias com SUMMARY")
+
+    periods = {}
+    for date_key in summaries:
+        day = parse_date(date_key)
+        for key, bounds in zip(rollup_keys_for_date(date_key), (week_bounds(day), month_bounds(day))):
+            periods[(key["PK"], key["SK"])] = bounds
+
+    written = skipped_open = 0
+    rollups = build_rollup_items(summaries)
+    with table.batch_writer() as batch:
+        for (pk, sk), rollup in sorted(rollups.items()):
+            start, end = periods[(pk, sk)]
+            if start.isoformat() >= since:
+                continue
+            if end >= today:
+                skipped_open += 1
+                print(f"[aberto] {pk}/{sk} ({start}..{end}) — rode de novo após o fim do período")
+                continue
+            print(f"{'[dry-run] ' if args.dry_run else ''}{pk}/{sk}: total={rollup['total_count']}")
+            if not args.dry_run:
+                batch.put_item(Item=rollup)
+            written += 1
+
+    print(f"Rollups gravados: {written} | períodos abertos ignorados: {skipped_open}")
+
+
+if __name__ == "__main__":
+    main()
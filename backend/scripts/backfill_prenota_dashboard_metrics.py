@@ -6,6 +6,7 @@ Usa METADATA (STATUS=COMPLETED) + campo protheus_response para detectar a mesma
 update_metrics (mensagem contendo "Documento de entrada criado como pré-nota").
 
 - Não altera success_count (já reflete o total de sucessos).
+- Replica o incremento nos rollups da semana ISO e do mês (mesmo caminho do update_metrics).
 - Marca METADATA.METRICS_PRENOTA_BACKFILL_AT para não contar duas vezes se rodar de novo.
 
 Uso:
@@ -29,7 +30,12 @@ import boto3
 # Reutiliza a mesma função da Lambda update_metrics
 _ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.insert(0, os.path.join(_ROOT, "lambdas"))
-from update_metrics.handler import protheus_response_indicates_prenota  # noqa: E402
+from update_metrics.handler import (  # noqa: E402
+    _add_to_rollups,
+    _SummaryUpdate,
+    protheus_response_indicates_prenota,
+)
+from utils.json_codec import decode_item  # noqa: E402
 
 
 def _date_for_metrics(item: dict) -> str | None:
@@ -70,6 +76,7 @@ def main():
             scan_kwargs["ExclusiveStartKey"] = last_key
         resp = table.scan(**scan_kwargs)
         for item in resp.get("Items", []):
+            item = decode_item(item)  # protheus_response pode estar como Binary comprimido
             if args.limit and processed >= args.limit:
                 last_key = None
                 break
@@ -97,6 +104,7 @@ def main():
                     except Exception as e:
                         print(f"  ERRO ao atualizar METRICS#{date_key}: {e}", file=sys.stderr)
                         continue
+                    _add_to_rollups(date_key, _SummaryUpdate().add("success_prenota_count").deltas())
                     table.update_item(
                         Key={"PK": item["PK"], "SK": item["SK"]},
                         UpdateExpression="SET METRICS_PRENOTA_BACKFILL_AT = :ts",
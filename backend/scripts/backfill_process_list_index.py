@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Backfill de LIST_PK/LIST_SK nos METADATA de processos antigos (GSI ProcessListIndex).
+
+Processos criados antes do índice só têm a linha PK=PROCESS / SK=PROCESS#{id};
+sem LIST_PK o METADATA não aparece na listagem paginada do GET /process.
+
+- Lê o índice antigo (PK=PROCESS, paginado) e usa o TIMESTAMP de lá (criação).
+- Só grava se o METADATA existir e ainda não tiver LIST_PK (idempotente).
+
+Uso:
+  export TABLE_NAME=...
+  export AWS_DEFAULT_REGION=us-east-1
+  python3 scripts/backfill_process_list_index.py --dry-run
+  python3 scripts/backfill_process_list_index.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+
+import boto3
+from botocore.exceptions import ClientError
+
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, _ROOT)
+from src.utils.dynamo_query import iter_partition  # noqa: E402
+from src.utils.process_list import process_list_keys  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill LIST_PK/LIST_SK no METADATA dos processos")
+    parser.add_argument("--dry-run", action="store_true", help="Só imprime, não grava")
+    parser.add_argument("--limit", type=int, default=0, help="Máximo de processos (0 = sem limite)")
+    args = parser.parse_args()
+
+    table_name = os.environ.get("TABLE_NAME")
+    if not table_name:
+        print("Defina TABLE_NAME", file=sys.stderr)
+        sys.exit(1)
+
+    table = boto3.resource("dynamodb").Table(table_name)
+    updated = skipped = 0
+    rows = iter_partition(
+        table,
+        "PROCESS",
+        sk_prefix="PROCESS#",
+        projection=("PROCESS_ID", "TIMESTAMP"),
+        max_items=args.limit or None,
+    )
+    for row in rows:
+        process_id = row.get("PROCESS_ID") or str(row["SK"]).split("#", 1)[-1]
+        keys = process_list_keys(process_id, int(row.get("TIMESTAMP") or 0))
+        if args.dry_run:
+            print(f"[dry-run] PROCESS#{process_id} → {keys['LIST_SK']}")
+            updated += 1
+            continue
+        try:
+            table.update_item(
+                Key={"PK": f"PROCESS#{process_id}", "SK": "METADATA"},
+                UpdateExpression="SET LIST_PK = :lpk, LIST_SK = :lsk",
+                ConditionExpression="attribute_exists(PK) AND attribute_not_exists(LIST_PK)",
+                ExpressionAttributeValues={":lpk": keys["LIST_PK"], ":lsk": keys["LIST_SK"]},
+            )
+            updated += 1
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") != "ConditionalCheckFailedException":
+                raise
+            skipped += 1
+
+    print(f"Atualizados: {updated} | ignorados (sem METADATA ou já indexados): {skipped}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark da comparação local de nomes de produto (rules/product_similarity.py).
+
+Repassa pares rotulados por score_product_names para cada limiar de confiança e mostra:
+  - decididos localmente (MATCH/MISMATCH) x UNSURE (iriam para o Bedrock)
+  - erros entre os decididos (decisão local ≠ esperado) — precisam ser 0 no limiar escolhido
+  - tempo médio por comparação
+
+Fontes de pares:
+  - padrão: test_bedrock_compare_produto.PAIRS (19 pares; parte são exemplos sintéticos do prompt,
+    escritos junto com o scorer — servem de teste de fumaça, não de calibração)
+  - --table: veredictos reais do Bedrock gravados no cache de comparações (PRODUCT_COMPARE#…,
+    PROMPT_VERSION do prompt por par; respostas do prompt em lote ficam de fora). É esta
+    a base para validar/ajustar PRODUCT_SIMILARITY_MIN_CONFIDENCE.
+
+Sem --table não usa AWS.
+
+Uso:
+  cd backend/scripts
+  python3 benchmark_product_similarity.py
+  python3 benchmark_product_similarity.py --thresholds 0.8,0.85,0.9,0.95 --repeat 2000 -v
+  python3 benchmark_product_similarity.py --table tabela-document-processor-prd --repeat 0
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+_SCRIPT_DIR = Path(__file__).resolve().parent
+_VALIDATE_RULES = _SCRIPT_DIR.parent / "lambdas" / "validate_rules"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark da comparação local de nomes de produto")
+    parser.add_argument("--thresholds", default="0.8,0.85,0.9,0.95,1.0", help="Limiares de confiança (vírgula)")
+    parser.add_argument("--repeat", type=int, default=1000, help="Repetições por par para medir tempo")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Mostra a decisão de cada par")
+    parser.add_argument(
+        "--table",
+        help="Tabela DynamoDB: usa os veredictos do Bedrock gravados no cache (PRODUCT_COMPARE#) como rótulo",
+    )
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(_SCRIPT_DIR))
+    sys.path.insert(0, str(_VALIDATE_RULES))
+    sys.path.insert(0, str(_VALIDATE_RULES.parent))
+    from rules.product_similarity import UNSURE, score_product_names
+
+    if args.table:
+        PAIRS = _recorded_pairs(args.table)
+        print(f"{len(PAIRS)} pares com veredicto do Bedrock em {args.table}")
+    else:
+        from test_bedrock_compare_produto import PAIRS
+
+        print(f"{len(PAIRS)} pares (test_bedrock_compare_produto.PAIRS)")
+    if not PAIRS:
+        return 1
+    print(f"{'limiar':>7} {'decididos':>10} {'unsure':>7} {'erros':>6}")
+    for raw in args.thresholds.split(","):
+        os.environ["PRODUCT_SIMILARITY_MIN_CONFIDENCE"] = raw.strip()
+        decided = errors = 0
+        for p1, p2, expected, eq in PAIRS:
+            score = score_product_names(p1, p2, eq)
+            if score["status"] == UNSURE:
+                continue
+            decided += 1
+            errors += score["status"] != expected
+        print(f"{float(raw):>7.2f} {decided:>10} {len(PAIRS) - decided:>7} {errors:>6}")
+    os.environ.pop("PRODUCT_SIMILARITY_MIN_CONFIDENCE", None)
+
+    if args.verbose:
+        print("-" * 60)
+        for p1, p2, expected, eq in PAIRS:
+            score = score_product_names(p1, p2, eq)
+            flag = "  " if score["status"] in (UNSURE, expected) else "!!"
+            print(f"{flag} {score['status']:8} {score['confidence']:.2f} esperado={expected:8} "
+                  f"{score['reason']} | {p1} x {p2}")
+
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        for p1, p2, _expected, eq in PAIRS:
+            score_product_names(p1, p2, eq)
+    elapsed = time.perf_counter() - started
+    if args.repeat:
+        print("-" * 60)
+        print(f"tempo médio por comparação: {elapsed / (args.repeat * len(PAIRS)) * 1e6:.1f} µs")
+    return 0
+
+
+def _recorded_pairs(table_name: str) -> list:
+    """(produto1, produto2, status do Bedrock, False) das entradas do cache do prompt por par.
+
+    Só entram comparações sem código equivalente: com has_equivalent_code a decisão local é MATCH
+    e o Bedrock não é chamado.
+    """
+    import boto3
+    from boto3.dynamodb.conditions import Attr
+
+    from rules.utils import PRODUCT_COMPARE_PROMPT_VERSION
+
+    table = boto3.resource("dynamodb").Table(table_name)
+    kwargs = {
+        "FilterExpression": Attr("PK").begins_with("PRODUCT_COMPARE#")
+        & Attr("PROMPT_VERSION").eq(PRODUCT_COMPARE_PROMPT_VERSION),
+        "ProjectionExpression": "VALUE1, VALUE2, #r",
+        "ExpressionAttributeNames": {"#r": "RESULT"},
+    }
+    pairs = []
+    while True:
+        resp = table.scan(**kwargs)
+        for item in resp.get("Items", []):
+            try:
+                status = json.loads(item["RESULT"]).get("status")
+            except (KeyError, TypeError, ValueError):
+                continue
+            if status in ("MATCH", "MISMATCH") and item.get("VALUE1") and item.get("VALUE2"):
+                pairs.append((item["VALUE1"], item["VALUE2"], status, False))
+        if "LastEvaluatedKey" not in resp:
+            return pairs
+        kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
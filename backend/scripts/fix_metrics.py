@@ -26,6 +26,11 @@ import sys
 from collections import defaultdict
 from decimal import Decimal
 from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "lambdas"))
+
+from utils.json_codec import decode_item  # noqa: E402
 
 
 def get_all_processes(table):
@@ -63,7 +68,7 @@ def get_process_metadata(table, process_id):
     response = table.get_item(
         Key={'PK': f'PROCESS#{process_id}', 'SK': 'METADATA'}
     )
-    return response.get('Item')
+    return decode_item(response.get('Item'))
 
 
 def get_validation_results(table, process_id):
@@ -76,7 +81,7 @@ def get_validation_results(table, process_id):
         }
     )
     
-    items = response.get('Items', [])
+    items = [decode_item(item) for item in response.get('Items', [])]
     if not items:
         return []
     
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Migra atributos JSON em String (formato legado) para o Binary comprimido do
+``utils.json_codec``: METADADOS, VALIDATION_RESULTS, PROTHEUS_HINTS,
+protheus_request_payload e protheus_response.
+
+Leitura e escrita já aceitam os dois formatos, então a migração pode rodar com
+o sistema no ar e em várias passadas. Cada item é atualizado com condição de
+que o atributo ainda tenha o mesmo texto lido no scan (escritas concorrentes
+vencem; o item fica para a próxima passada). Atributos em que a compressão não
+reduz o tamanho continuam String.
+
+Uso:
+  cd backend/scripts
+  export TABLE_NAME=tabela-document-processor-prd
+  export AWS_REGION=sa-east-1
+
+  # Só contabiliza (não grava)
+  python3 migrate_json_attributes_to_binary.py
+
+  # Grava
+  python3 migrate_json_attributes_to_binary.py --apply
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from collections import Counter
+from pathlib import Path
+
+import boto3
+from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
+
+_SCRIPT_DIR = Path(__file__).resolve().parent
+_LAMBDAS_DIR = _SCRIPT_DIR.parent / "lambdas"
+sys.path.insert(0, str(_LAMBDAS_DIR))
+
+from utils.json_codec import CODEC_ATTRIBUTES, encode_attribute  # noqa: E402
+
+
+def _scan_candidates(table, limit: int):
+    """Itens com ao menos um atributo do codec ainda em String."""
+    condition = None
+    for attr in CODEC_ATTRIBUTES:
+        clause = Attr(attr).attribute_type("S")
+        condition = clause if condition is None else condition | clause
+    names = {f"#a{i}": attr for i, attr in enumerate(("PK", "SK") + CODEC_ATTRIBUTES)}
+    kwargs = {
+        "FilterExpression": condition,
+        "ProjectionExpression": ", ".join(names),
+        "ExpressionAttributeNames": names,
+    }
+    seen = 0
+    while True:
+        resp = table.scan(**kwargs)
+        for item in resp.get("Items", []):
+            yield item
+            seen += 1
+            if limit and seen >= limit:
+                return
+        lek = resp.get("LastEvaluatedKey")
+        if not lek:
+            return
+        kwargs["ExclusiveStartKey"] = lek
+
+
+def _migrate_item(table, item: dict, apply: bool, stats: Counter) -> None:
+    sets: list[str] = []
+    conditions: list[str] = []
+    names: dict[str, str] = {}
+    values: dict[str, object] = {}
+    for idx, attr in enumerate(CODEC_ATTRIBUTES):
+        text = item.get(attr)
+        if not isinstance(text, str):
+            continue
+        encoded = encode_attribute(text)
+        if isinstance(encoded, str):
+            stats["mantidos_string"] += 1
+            continue
+        names[f"#a{idx}"] = attr
+        values[f":new{idx}"] = encoded
+        values[f":old{idx}"] = text
+        sets.append(f"#a{idx} = :new{idx}")
+        conditions.append(f"#a{idx} = :old{idx}")
+        stats["bytes_antes"] += len(text.encode("utf-8"))
+        stats["bytes_depois"] += len(encoded.value)
+        stats[f"attr:{attr}"] += 1
+    if not sets:
+        return
+    stats["itens"] += 1
+    if not apply:
+        return
+    try:
+        table.update_item(
+            Key={"PK": item["PK"], "SK": item["SK"]},
+            UpdateExpression="SET " + ", ".join(sets),
+            ConditionExpression=" AND ".join(conditions),
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values,
+        )
+        stats["gravados"] += 1
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") != "ConditionalCheckFailedException":
+            raise
+        stats["alterados_durante_migracao"] += 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Migra atributos JSON (String) para Binary comprimido (json_codec)"
+    )
+    parser.add_argument("--table-name", default=os.environ.get("TABLE_NAME"))
+    parser.add_argument("--region", default=os.environ.get("AWS_REGION", "sa-east-1"))
+    parser.add_argument("--limit", type=int, default=0, help="Máximo de itens (0 = todos)")
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Gravar no DynamoDB (sem isso = só contabiliza)",
+    )
+    args = parser.parse_args()
+
+    if not args.table_name:
+        print("Defina TABLE_NAME ou --table-name", file=sys.stderr)
+        sys.exit(1)
+
+    table = boto3.resource("dynamodb", region_name=args.region).Table(args.table_name)
+    stats: Counter = Counter()
+    for item in _scan_candidates(table, args.limit):
+        _migrate_item(table, item, args.apply, stats)
+        if stats["itens"] and stats["itens"] % 500 == 0:
+            print(f"... {stats['itens']} itens")
+
+    before, after = stats["bytes_antes"], stats["bytes_depois"]
+    ratio = (before / after) if after else 0
+    print(f"{'' if args.apply else '[preview] '}Itens a migrar: {stats['itens']}")
+    for attr in CODEC_ATTRIBUTES:
+        print(f"  {attr}: {stats[f'attr:{attr}']}")
+    print(f"Bytes: {before} -> {after} ({ratio:.1f}x)")
+    print(f"Atributos mantidos em String (não compensa comprimir): {stats['mantidos_string']}")
+    if args.apply:
+        print(f"Gravados: {stats['gravados']} | alterados durante a migração: {stats['alterados_durante_migracao']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -50,7 +50,11 @@ from update_metrics.handler import (  # noqa: E402
     _extract_failure_identity,
     protheus_response_indicates_prenota,
 )
+from utils.dynamo_query import query_partition  # noqa: E402
+from utils.failure_dedup import failure_dedup_record_key  # noqa: E402
+from utils.json_codec import decode_item  # noqa: E402
 from utils.metrics_process import effective_metrics_status_from_metadata  # noqa: E402
+from utils.metrics_rollups import build_rollup_items, rollup_keys_for_date  # noqa: E402
 from utils.metrics_rates import success_rate_pct  # noqa: E402
 
 
@@ -146,7 +150,7 @@ def _scan_all_metadata(table, after: str = "", limit: int = 0) -> list[dict]:
     kwargs: dict = {"FilterExpression": filter_expr}
     while True:
         resp = table.scan(**kwargs)
-        items.extend(resp.get("Items", []))
+        items.extend(decode_item(item) for item in resp.get("Items", []))
         if limit and len(items) >= limit:
             return items[:limit]
         lek = resp.get("LastEvaluatedKey")
@@ -556,6 +560,26 @@ def _backfill_metadata_metrics(
     return updated
 
 
+def _replace_dedup_records(table, date_key: str, registry: dict) -> None:
+    """Regrava as reservas METRICS_DEDUP#{dia} (um item por chave de falha) a partir do registry recalculado."""
+    pk = failure_dedup_record_key(date_key, "")["PK"]
+    wanted = {failure_dedup_record_key(date_key, k)["SK"] for k in registry}
+    stale = [
+        it["SK"] for it in query_partition(table, pk, projection=("SK",)) if it["SK"] not in wanted
+    ]
+    with table.batch_writer() as batch:
+        for sk in stale:
+            batch.delete_item(Key={"PK": pk, "SK": sk})
+        for failure_key, process_id in registry.items():
+            batch.put_item(
+                Item={
+                    **failure_dedup_record_key(date_key, failure_key),
+                    "FAILURE_KEY": failure_key,
+                    "PROCESS_ID": process_id,
+                }
+            )
+
+
 def _apply_metrics(
     table,
     preview: dict,
@@ -569,10 +593,9 @@ def _apply_metrics(
     daily = preview.get("daily", {})
     only_months = {only_date[:7]} if only_date else None
 
+    summaries = {}
     for date_key, d in daily.items():
-        if only_date and date_key != only_date:
-            continue
-        item = {
+        summaries[date_key] = {
             "PK": f"METRICS#{date_key}",
             "SK": "SUMMARY",
             "total_count": d["total_count"],
@@ -586,13 +609,31 @@ def _apply_metrics(
             "failed_rules_operacional": d.get("failed_rules_operacional", {}),
             "failure_reasons": d.get("failure_reasons", {}),
             "skipped_operacional": d.get("skipped_operacional", 0),
-            "failure_dedup_registry": d.get("failure_dedup_registry", {}),
         }
+
+    for date_key, item in summaries.items():
+        if only_date and date_key != only_date:
+            continue
         table.put_item(Item=item)
+        _replace_dedup_records(table, date_key, daily[date_key].get("failure_dedup_registry", {}))
+
+    # Rollups semana ISO / mês = soma dos SUMMARY recalculados (com --date, só os do dia)
+    rollups = build_rollup_items(summaries)
+    wanted_rollups = (
+        {(k["PK"], k["SK"]) for k in rollup_keys_for_date(only_date)} if only_date else None
+    )
+    with table.batch_writer() as batch:
+        for rollup_key, rollup in rollups.items():
+            if wanted_rollups is None or rollup_key in wanted_rollups:
+                batch.put_item(Item=rollup)
 
     if not only_date:
         for date in set(existing.keys()) - set(daily.keys()):
             table.delete_item(Key={"PK": f"METRICS#{date}", "SK": "SUMMARY"})
+            _replace_dedup_records(table, date, {})
+            for key in rollup_keys_for_date(date):
+                if (key["PK"], key["SK"]) not in rollups:
+                    table.delete_item(Key=key)
 
     monthly = preview.get("monthly", {})
     for month_key, m in monthly.items():
@@ -56,6 +56,10 @@ from datetime import datetime, timezone
 from decimal import Decimal
 from typing import Any, Dict, List, Optional
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambdas"))
+
+from utils.json_codec import decode_item  # noqa: E402
+
 try:
     from zoneinfo import ZoneInfo
 except ImportError:
@@ -128,7 +132,7 @@ def build_failure_payload(table, process_id: str, metadata: Dict[str, Any]) -> D
         }
         while True:
             r = table.query(**qkwargs)
-            items.extend(r.get("Items", []))
+            items.extend(decode_item(it) for it in r.get("Items", []))
             lek = r.get("LastEvaluatedKey")
             if not lek:
                 break
@@ -278,7 +282,7 @@ def main() -> int:
         pid = row.get("PROCESS_ID") or (row.get("SK") or "").replace("PROCESS#", "", 1)
         if not pid:
             continue
-        meta = table.get_item(Key={"PK": f"PROCESS#{pid}", "SK": "METADATA"}).get("Item")
+        meta = decode_item(table.get_item(Key={"PK": f"PROCESS#{pid}", "SK": "METADATA"}).get("Item"))
         if not meta:
             continue
         ts = _int_ts(meta.get("TIMESTAMP"))
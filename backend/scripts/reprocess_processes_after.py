@@ -52,6 +52,10 @@ from decimal import Decimal
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambdas"))
+
+from utils.json_codec import decode_item  # noqa: E402
+
 try:
     from zoneinfo import ZoneInfo
 except ImportError:
@@ -213,7 +217,7 @@ def main() -> int:
         pid = row.get("PROCESS_ID") or (row.get("SK") or "").replace("PROCESS#", "", 1)
         if not pid:
             continue
-        meta = table.get_item(Key={"PK": f"PROCESS#{pid}", "SK": "METADATA"}).get("Item")
+        meta = decode_item(table.get_item(Key={"PK": f"PROCESS#{pid}", "SK": "METADATA"}).get("Item"))
         if not meta:
             skipped_meta.append((pid, "METADATA inexistente"))
             continue
@@ -244,14 +248,14 @@ def main() -> int:
             break
 
         q = table.query(KeyConditionExpression="PK = :pk", ExpressionAttributeValues={":pk": f"PROCESS#{pid}"})
-        items = q.get("Items", [])
+        items = [decode_item(it) for it in q.get("Items", [])]
         while "LastEvaluatedKey" in q:
             q = table.query(
                 KeyConditionExpression="PK = :pk",
                 ExpressionAttributeValues={":pk": f"PROCESS#{pid}"},
                 ExclusiveStartKey=q["LastEvaluatedKey"],
             )
-            items.extend(q.get("Items", []))
+            items.extend(decode_item(it) for it in q.get("Items", []))
 
         ok, reason = _validate_ready_for_start(items)
         if not ok:
@@ -38,8 +38,10 @@ from typing import Any, Dict, List, Optional, Tuple
 _SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 if _SCRIPT_DIR not in sys.path:
     sys.path.insert(0, _SCRIPT_DIR)
+sys.path.insert(0, os.path.join(os.path.dirname(_SCRIPT_DIR), "lambdas"))
 
 from replay_feedback_only import build_failure_payload  # noqa: E402
+from utils.json_codec import decode_item  # noqa: E402
 
 
 def _protheus_succeeded(meta: dict) -> bool:
@@ -116,7 +118,7 @@ def patch_metrics_failure_reason(
         return False
     key = {"PK": f"METRICS#{date_key[:10]}", "SK": "SUMMARY"}
     resp = table.get_item(Key=key)
-    item = resp.get("Item")
+    item = decode_item(resp.get("Item"))
     if not item:
         print(f"  METRICS#{date_key[:10]} não existe — nada a ajustar")
         return False
@@ -170,7 +172,7 @@ def _has_validation_failure(table, process_id: str) -> bool:
     }
     while True:
         r = table.query(**qkwargs)
-        items.extend(r.get("Items", []))
+        items.extend(decode_item(it) for it in r.get("Items", []))
         lek = r.get("LastEvaluatedKey")
         if not lek:
             break
@@ -358,7 +360,7 @@ def main() -> int:
                 print("  (feedback pode ter iniciado; reinvocar é idempotente no ServiceNow?)")
 
     meta_resp = table.get_item(Key={"PK": f"PROCESS#{process_id}", "SK": "METADATA"})
-    meta = meta_resp.get("Item")
+    meta = decode_item(meta_resp.get("Item"))
     if not meta:
         print(f"ERRO: METADATA não encontrado para {process_id}", file=sys.stderr)
         return 1
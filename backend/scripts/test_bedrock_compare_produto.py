@@ -20,6 +20,10 @@ Uso:
     --produto2 "OPTERADUO GL 20 LT"
 
   python3 test_bedrock_compare_produto.py --equivalent-code
+
+  python3 test_bedrock_compare_produto.py --all   # todos os pares de PAIRS
+
+PAIRS também alimenta scripts/benchmark_product_similarity.py (comparação local, sem AWS).
 """
 
 from __future__ import annotations
@@ -38,6 +42,31 @@ _VALIDATE_RULES = _SCRIPT_DIR.parent / "lambdas" / "validate_rules"
 DEFAULT_P1 = "EXPEDITION GL 10 LT"
 DEFAULT_P2 = "EXPEDITION BOMBONA 10L INSETICIDA"
 
+# (produto 1, produto 2, resultado esperado, has_equivalent_code) — casos reais e exemplos do prompt.
+# Os últimos pares (GLIFOSATO PRODUTO UNICO, HERBICIDA X…) são sintéticos: teste de fumaça, não
+# calibração do limiar local (para isso: benchmark_product_similarity.py --table).
+PAIRS = [
+    (DEFAULT_P1, DEFAULT_P2, "MATCH", False),
+    ("VESSARYA GL 10 LT", "VESSARYA BOMBONA 10L FUNGICIDA", "MATCH", False),
+    ("VESSARYA GL 5 LT", "VESSARYA 5L", "MATCH", False),
+    ("OPTERADUO 1X20L", "OPTERADUO GL 20 LT", "MATCH", False),
+    ("SPHERIC PLUS NORTOX N2% Ca6,5% S13,5% B1,7% Cu0,85% Mn4% Zn2,1% 1X25", "SPHERIC PLUS SC 25 KG (03040012)", "MATCH", False),
+    ("SPHERIC PLUS 20L", "SPHERIC PLUS NORTOX 20 LITROS", "MATCH", False),
+    ("PROTAC NORTOX AD 36X0,500", "PROTAC NORTOX AD PT 500 GR (03100013)", "MATCH", False),
+    ("PRIMER BIO 33 GL 1 LT", "PRIMER BIO 33 GL LT Reg. do Estab (ET) MT 79796-1", "MATCH", False),
+    ("PRIMESTRA GOLD 20L", "PRIMESTRA GOLD VINTE LITROS", "MATCH", False),
+    ("15.15.15 UNI BASE 180 AMIDICO", "15-15-15 UNIFERTIL TN 1000 KG", "MATCH", False),
+    ("30.00.20 UNI COBERTURA 180", "30-00-20 UNIFERTIL TN 1000 KG", "MATCH", False),
+    ("FERTILIZANTE 20.00.20", "20-00-20 TOCANTINS TN 1000 KG", "MATCH", True),
+    ("GLIFOSATO NORTOX 20L CONCENTRADO", "GLIFOSATO NORTOX HERBICIDA 20 LITROS", "MATCH", False),
+    ("SPHERIC PLUS NORTOX", "GALIL SC 1X20", "MISMATCH", False),
+    ("PRIMER BIO 33 GL 1 LT", "GALIL SC 1X20", "MISMATCH", False),
+    ("15.15.15 UNI BASE 180 AMIDICO", "20.20.20 UNIFERTIL TN 1000 KG", "MISMATCH", False),
+    ("VESSARYA GL 10 LT", "VESSARYA GL 20 LT", "MISMATCH", False),
+    ("GLIFOSATO PRODUTO UNICO", "GLIFOSATO TOTALMENTE DIFERENTE OUTRO", "MISMATCH", False),
+    ("HERBICIDA X", "INSETICIDA Y", "MISMATCH", False),
+]
+
 
 def main() -> int:
     parser = argparse.ArgumentParser(
@@ -50,6 +79,11 @@ def main() -> int:
         action="store_true",
         help="Simula códigos já validados como equivalentes (has_equivalent_code=True)",
     )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Compara todos os pares de PAIRS e mostra acertos vs resultado esperado",
+    )
     parser.add_argument(
         "-v",
         "--verbose",
@@ -67,9 +101,21 @@ def main() -> int:
         print(f"Pasta validate_rules não encontrada: {_VALIDATE_RULES}", file=sys.stderr)
         return 1
 
+    sys.path.insert(0, str(_VALIDATE_RULES.parent))  # lambdas/utils (bedrock_gateway, cache)
     sys.path.insert(0, str(_VALIDATE_RULES))
     from rules.utils import bedrock_compare_status, compare_with_bedrock
 
+    if args.all:
+        hits = 0
+        for p1, p2, expected, eq in PAIRS:
+            status = bedrock_compare_status(
+                compare_with_bedrock(p1, p2, "nome do produto", has_equivalent_code=eq)
+            )
+            hits += status == expected
+            print(f"{'ok ' if status == expected else 'ERR'} {status:8} esperado={expected:8} | {p1} x {p2}")
+        print(f"{hits}/{len(PAIRS)} conforme esperado")
+        return 0
+
     print("Produto 1:", args.produto1)
     print("Produto 2:", args.produto2)
     print("has_equivalent_code:", args.equivalent_code)
@@ -10,7 +10,11 @@ service = DashboardService()
 @router.get("/metrics", summary="Métricas Dashboard")
 async def get_dashboard_metrics(
     start_date: Optional[str] = Query(None, description="Data inicial (YYYY-MM-DD)"),
-    end_date: Optional[str] = Query(None, description="Data final (YYYY-MM-DD)")
+    end_date: Optional[str] = Query(None, description="Data final (YYYY-MM-DD)"),
+    include_days: bool = Query(
+        True,
+        description="false: só totais do período (sem série diária), lidos dos rollups semanais/mensais",
+    ),
 ):
     """Retorna métricas agregadas. Se start_date e end_date forem fornecidos, retorna métricas do período."""
     logger.info("=" * 80)
@@ -20,7 +24,7 @@ async def get_dashboard_metrics(
     
     try:
         logger.info("[get_dashboard_metrics] Chamando service.get_dashboard_metrics...")
-        result = service.get_dashboard_metrics(start_date, end_date)
+        result = service.get_dashboard_metrics(start_date, end_date, include_days=include_days)
         logger.info(f"[get_dashboard_metrics] Métricas obtidas com sucesso!")
         logger.info("=" * 80)
         return result
@@ -1,6 +1,7 @@
 import logging
 import re
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
 from src.models.api import (
     XmlPresignedUrlRequest, DocsPresignedUrlRequest, DocsPresignedUrlResponse,
     DynamicPresignedUrlRequest,
@@ -275,17 +276,34 @@ async def get_process(process_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/", summary="Listar Processos", include_in_schema=False)
-async def list_processes():
-    """Lista todos os processos"""
+async def list_processes(
+    limit: int = Query(50, ge=1, le=200, description="Tamanho da página"),
+    cursor: Optional[str] = Query(None, description="next_cursor devolvido pela página anterior"),
+    status: Optional[str] = Query(None, description="Filtrar por STATUS"),
+    process_type: Optional[str] = Query(None, description="Filtrar por PROCESS_TYPE"),
+    date_from: Optional[str] = Query(None, description="Criados a partir de (YYYY-MM-DD, UTC)"),
+    date_to: Optional[str] = Query(None, description="Criados até (YYYY-MM-DD, UTC, inclusivo)"),
+):
+    """Lista processos paginados (mais recentes primeiro)"""
     logger.info("=" * 80)
     logger.info("[list_processes] Requisição recebida para listar processos")
     
     try:
         logger.info("[list_processes] Chamando service.list_processes...")
-        processes = service.list_processes()
-        logger.info(f"[list_processes] Processos listados com sucesso! Total: {len(processes) if processes else 0}")
+        page = service.list_processes(
+            limit=limit,
+            cursor=cursor,
+            status=status,
+            process_type=process_type,
+            date_from=date_from,
+            date_to=date_to,
+        )
+        logger.info(f"[list_processes] Processos listados com sucesso! Total: {len(page['processes'])}")
         logger.info("=" * 80)
-        return {"processes": processes}
+        return page
+    except ValueError as e:
+        logger.warning(f"[list_processes] Parâmetros inválidos: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"[list_processes] Erro inesperado: {str(e)}")
         logger.error(f"[list_processes] Tipo do erro: {type(e).__name__}")
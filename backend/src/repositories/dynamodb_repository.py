@@ -1,7 +1,8 @@
 import os
 import boto3
-from typing import Optional, Dict, Any
-from boto3.dynamodb.conditions import Key
+from typing import Optional, Dict, Any, Iterable, Iterator, Tuple
+from src.utils.dynamo_query import iter_partition
+from src.utils.json_codec import decode_item, encode_item
 
 class DynamoDBRepository:
     def __init__(self):
@@ -11,25 +12,58 @@ class DynamoDBRepository:
     
     def put_item(self, pk: str, sk: str, attributes: Dict[str, Any]) -> None:
         """Insere item no DynamoDB"""
-        item = {'PK': pk, 'SK': sk, **attributes}
+        item = encode_item({'PK': pk, 'SK': sk, **attributes})
         self.table.put_item(Item=item)
     
     def get_item(self, pk: str, sk: str) -> Optional[Dict[str, Any]]:
         """Busca item específico usando GetItem"""
         response = self.table.get_item(Key={'PK': pk, 'SK': sk})
-        return response.get('Item')
+        return decode_item(response.get('Item'))
     
-    def query_by_pk(self, pk: str) -> list[Dict[str, Any]]:
+    def iter_by_pk(
+        self,
+        pk: str,
+        sk_prefix: Optional[str] = None,
+        projection: Optional[Iterable[str]] = None,
+        max_items: Optional[int] = None,
+        scan_forward: bool = True,
+    ) -> Iterator[Dict[str, Any]]:
+        """Itera itens de um PK seguindo LastEvaluatedKey (todas as páginas)"""
+        return iter_partition(
+            self.table,
+            pk,
+            sk_prefix=sk_prefix,
+            projection=projection,
+            max_items=max_items,
+            scan_forward=scan_forward,
+        )
+    
+    def query_by_pk(
+        self,
+        pk: str,
+        projection: Optional[Iterable[str]] = None,
+        max_items: Optional[int] = None,
+    ) -> list[Dict[str, Any]]:
         """Query todos os itens de um PK"""
-        response = self.table.query(KeyConditionExpression=Key('PK').eq(pk))
-        return response.get('Items', [])
+        return list(self.iter_by_pk(pk, projection=projection, max_items=max_items))
     
-    def query_by_pk_and_sk_prefix(self, pk: str, sk_prefix: str) -> list[Dict[str, Any]]:
+    def query_by_pk_and_sk_prefix(
+        self,
+        pk: str,
+        sk_prefix: str,
+        projection: Optional[Iterable[str]] = None,
+        max_items: Optional[int] = None,
+    ) -> list[Dict[str, Any]]:
         """Query com filtro de SK usando begins_with"""
-        response = self.table.query(
-            KeyConditionExpression=Key('PK').eq(pk) & Key('SK').begins_with(sk_prefix)
+        return list(
+            self.iter_by_pk(pk, sk_prefix=sk_prefix, projection=projection, max_items=max_items)
         )
-        return response.get('Items', [])
+    
+    def query_page(self, **query_kwargs: Any) -> Tuple[list[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """Uma única chamada Query (tabela ou GSI): (itens, LastEvaluatedKey)"""
+        response = self.table.query(**query_kwargs)
+        items = [decode_item(item) for item in response.get('Items', [])]
+        return items, response.get('LastEvaluatedKey') or None
     
     def update_item(self, pk: str, sk: str, attributes: Dict[str, Any]) -> None:
         """Atualiza atributos de um item"""
@@ -49,7 +83,7 @@ class DynamoDBRepository:
                 update_parts.append(f'{k} = :{k}')
         
         update_expr = 'SET ' + ', '.join(update_parts)
-        expr_values = {f':{k}': v for k, v in attributes.items()}
+        expr_values = {f':{k}': v for k, v in encode_item(attributes).items()}
         
         try:
             params = {
@@ -66,6 +100,17 @@ class DynamoDBRepository:
             logger.error(f"Update failed: {str(e)}")
             raise
     
+    def increment(self, pk: str, sk: str, attribute: str, amount: int = 1) -> int:
+        """Incremento atômico (ADD) de um contador numérico; cria o item se não existir"""
+        response = self.table.update_item(
+            Key={'PK': pk, 'SK': sk},
+            UpdateExpression='ADD #attr :amount',
+            ExpressionAttributeNames={'#attr': attribute},
+            ExpressionAttributeValues={':amount': amount},
+            ReturnValues='UPDATED_NEW',
+        )
+        return int(response.get('Attributes', {}).get(attribute, 0))
+    
     def delete_item(self, pk: str, sk: str) -> None:
         """Remove item do DynamoDB"""
         self.table.delete_item(Key={'PK': pk, 'SK': sk})
@@ -9,6 +9,13 @@ class CfopOperationService:
         self.repository = DynamoDBRepository()
         self.pk = "CFOP_OPERATION"
     
+    def _bump_version(self) -> None:
+        """Incrementa CFOP_OPERATION/VERSION — invalida o cache CFOP das Lambdas (utils.cfop_table)"""
+        try:
+            self.repository.increment(self.pk, 'VERSION', 'VERSION')
+        except Exception as e:
+            logger.warning(f"Falha ao incrementar versão da tabela CFOP: {e}")
+    
     def list_all(self) -> List[Dict[str, Any]]:
         """Lista todas as regras Chave x CFOP"""
         items = self.repository.query_by_pk_and_sk_prefix(self.pk, "MAPPING#")
@@ -148,6 +155,7 @@ class CfopOperationService:
                     'ATIVO': ativo
                 })
         
+        self._bump_version()
         return {
             'id': mapping_id,
             'chave': chave,
@@ -273,6 +281,7 @@ class CfopOperationService:
         
         if updates:
             self.repository.update_item(self.pk, sk, updates)
+        self._bump_version()
         
         # Retornar item atualizado
         updated_item = self.repository.get_item(self.pk, sk)
@@ -324,6 +333,7 @@ class CfopOperationService:
         
         # Remover registro principal
         self.repository.delete_item(self.pk, sk)
+        self._bump_version()
         
         return {
             'id': mapping_id,
@@ -4,9 +4,45 @@ import boto3
 from datetime import datetime, timedelta
 from decimal import Decimal
 
+from src.utils.dynamo_query import batch_get_items
 from src.utils.metrics_rates import success_rate_pct
+from src.utils.metrics_rollups import (
+    ROLLUP_CONFIG_KEY,
+    ROLLUP_COUNTERS,
+    ROLLUP_MAPS,
+    month_rollup_key,
+    parse_date,
+    plan_date_range,
+    rollup_is_trusted,
+    sum_summaries,
+    week_rollup_key,
+)
 from src.utils.regras_labels import get_regras_labels_for_dashboard
 
+# Atributos do METRICS#{dia}/SUMMARY usados no dashboard (deixa de fora o
+# failure_dedup_registry que dias antigos ainda carregam no item).
+_SUMMARY_ATTRIBUTES = (
+    'PK',
+    'SK',
+    'total_count',
+    'success_count',
+    'success_prenota_count',
+    'failed_count',
+    'total_time',
+    'processes_by_hour',
+    'failure_reasons',
+    'processes_by_type',
+    'failed_rules',
+    'failed_rules_operacional',
+    'skipped_operacional',
+)
+
+_ROLLUP_READ_ATTRIBUTES = ('PK', 'SK', 'BACKFILLED', 'SINCE') + ROLLUP_COUNTERS + ROLLUP_MAPS
+
+
+def _next_day(date):
+    return (datetime.strptime(date, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+
 
 class DashboardService:
     def __init__(self):
@@ -32,13 +68,17 @@ class DashboardService:
             fr["Outros"] = fr.get("Outros", 0) + (fc - attributed)
         return fr
 
-    def get_dashboard_metrics(self, start_date=None, end_date=None):
+    def get_dashboard_metrics(self, start_date=None, end_date=None, include_days=True):
         """Retorna métricas completas para dashboard
         
         Args:
             start_date: Data inicial no formato YYYY-MM-DD (opcional)
             end_date: Data final no formato YYYY-MM-DD (opcional)
+            include_days: False devolve só os totais do período (sem 'period'),
+                calculados a partir dos rollups semanais/mensais
         """
+        if start_date and end_date and not include_days:
+            return self.get_period_aggregates(start_date, end_date)
         if start_date and end_date:
             # Buscar por período específico
             start = datetime.strptime(start_date, '%Y-%m-%d')
@@ -46,17 +86,16 @@ class DashboardService:
             days_diff = (end - start).days + 1
             
             period_days = []
-            total_time_period = 0
-            total_count_period = 0
+            period_dates = [
+                (start + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(days_diff)
+            ]
+            metrics_by_date, summaries = self._daily_metrics(period_dates)
             
-            for i in range(days_diff):
-                date = (start + timedelta(days=i)).strftime('%Y-%m-%d')
-                daily_metrics = self.get_metrics_by_date(date)
+            for date in period_dates:
+                daily_metrics = metrics_by_date.get(date)
                 if daily_metrics:
                     total_count = daily_metrics.get('total_count', 0)
                     avg_time = daily_metrics.get('avg_processing_time', 0)
-                    total_time_period += avg_time * total_count  # Acumular tempo total
-                    total_count_period += total_count
                     
                     fr_day = self._failed_rules_with_gap(
                         daily_metrics.get('failed_rules', {}),
@@ -92,66 +131,20 @@ class DashboardService:
                         'processes_by_type': {}
                     })
             
-            # Calcular métricas agregadas do período
-            processes_by_type_period = {}
-            failed_rules_period = {}
-            
-            for daily in period_days:
-                # Agregar por tipo
-                for proc_type, count in daily.get('processes_by_type', {}).items():
-                    processes_by_type_period[proc_type] = processes_by_type_period.get(proc_type, 0) + count
-                
-                # Agregar regras que falharam (inclui Outros por dia quando aplicável)
-                for rule, count in daily.get('failed_rules', {}).items():
-                    failed_rules_period[rule] = failed_rules_period.get(rule, 0) + int(count)
-
-            # Garantir consistência com totais de falha do período (somatório das barras = falhas reais)
-            total_failed_period = sum(int(d['failed']) for d in period_days)
-            sum_rules_period = sum(int(v) for v in failed_rules_period.values())
-            if total_failed_period > sum_rules_period:
-                failed_rules_period['Outros'] = failed_rules_period.get('Outros', 0) + (
-                    total_failed_period - sum_rules_period
-                )
-
-            # Calcular tempo médio do período
-            avg_processing_time_period = (total_time_period / total_count_period) if total_count_period > 0 else 0
-            failed_rules_operacional_period = {}
-            for daily in period_days:
-                for rule, count in daily.get('failed_rules_operacional', {}).items():
-                    failed_rules_operacional_period[rule] = (
-                        failed_rules_operacional_period.get(rule, 0) + int(count)
-                    )
-
-            sum_success = sum(d['success'] for d in period_days)
-            sum_prenota = sum(d.get('success_prenota', 0) for d in period_days)
-            sum_classified = sum(d.get('success_classified', 0) for d in period_days)
-            sum_skipped_op = sum(d.get('skipped_operacional', 0) for d in period_days)
-
-            return self._attach_regras_labels({
-                'period': period_days,
-                'summary': {
-                    'total': sum(d['total'] for d in period_days),
-                    'success': sum_success,
-                    'success_prenota': sum_prenota,
-                    'success_classified': sum_classified,
-                    'failed': sum(d['failed'] for d in period_days),
-                    'skipped_operacional': sum_skipped_op,
-                    'success_rate': self._success_rate_pct(
-                        sum_success, sum(d['failed'] for d in period_days)
-                    ),
-                    'avg_processing_time': round(avg_processing_time_period, 2)
-                },
-                'processes_by_type': processes_by_type_period,
-                'failed_rules': failed_rules_period,
-                'failed_rules_operacional': failed_rules_operacional_period,
-                'start_date': start_date,
-                'end_date': end_date
-            })
+            # Totais do período: rollups semana/mês + dias de borda já carregados acima
+            result = self.get_period_aggregates(start_date, end_date, day_items=summaries or {})
+            result['period'] = period_days
+            return result
         else:
             # Comportamento padrão: hoje e últimos 7 dias
             today = datetime.now().strftime('%Y-%m-%d')
-            today_metrics = self.get_metrics_by_date(today)
+            week_dates = [
+                (datetime.now() - timedelta(days=i)).strftime('%Y-%m-%d') for i in range(7)
+            ]
+            metrics_by_date, summaries = self._daily_metrics(week_dates)
+            today_metrics = metrics_by_date.get(today)
             if today_metrics:
+                today_metrics = dict(today_metrics)
                 today_metrics['failed_rules'] = self._failed_rules_with_gap(
                     today_metrics.get('failed_rules', {}),
                     today_metrics.get('failed_count', 0),
@@ -159,17 +152,12 @@ class DashboardService:
 
             # Últimos 7 dias (índice 0 = hoje — ordenação cronológica refeita no cliente se necessário)
             last_7_days = []
-            total_time_week = 0
-            total_count_week = 0
 
-            for i in range(7):
-                date = (datetime.now() - timedelta(days=i)).strftime('%Y-%m-%d')
-                daily_metrics = self.get_metrics_by_date(date)
+            for date in week_dates:
+                daily_metrics = metrics_by_date.get(date)
                 if daily_metrics:
                     total_count = daily_metrics.get('total_count', 0)
                     avg_time = daily_metrics.get('avg_processing_time', 0)
-                    total_time_week += avg_time * total_count
-                    total_count_week += total_count
 
                     fr_day = self._failed_rules_with_gap(
                         daily_metrics.get('failed_rules', {}),
@@ -192,78 +180,40 @@ class DashboardService:
                         'processes_by_type': daily_metrics.get('processes_by_type', {})
                     })
         
-            # Calcular métricas agregadas por tipo
-            processes_by_type_week = {}
-            failed_rules_week = {}
-
-            for daily in last_7_days:
-                for proc_type, count in daily.get('processes_by_type', {}).items():
-                    processes_by_type_week[proc_type] = processes_by_type_week.get(proc_type, 0) + count
-
-                for rule, count in daily.get('failed_rules', {}).items():
-                    failed_rules_week[rule] = failed_rules_week.get(rule, 0) + int(count)
-
-            total_failed_week = sum(int(d['failed']) for d in last_7_days)
-            sum_rules_week = sum(int(v) for v in failed_rules_week.values())
-            if total_failed_week > sum_rules_week:
-                failed_rules_week['Outros'] = failed_rules_week.get('Outros', 0) + (
-                    total_failed_week - sum_rules_week
-                )
-
-            avg_processing_time_week = (total_time_week / total_count_week) if total_count_week > 0 else 0
-            failed_rules_operacional_week = {}
-            for daily in last_7_days:
-                for rule, count in daily.get('failed_rules_operacional', {}).items():
-                    failed_rules_operacional_week[rule] = (
-                        failed_rules_operacional_week.get(rule, 0) + int(count)
-                    )
-
-            sum_success_w = sum(d['success'] for d in last_7_days)
-            sum_prenota_w = sum(d.get('success_prenota', 0) for d in last_7_days)
-            sum_classified_w = sum(d.get('success_classified', 0) for d in last_7_days)
-            sum_skipped_op_w = sum(d.get('skipped_operacional', 0) for d in last_7_days)
+            week = self._period_totals(week_dates[-1], today, day_items=summaries or {})
+            week_summary = week['summary']
 
             return self._attach_regras_labels({
                 'today': today_metrics,
                 'last_7_days': last_7_days,
                 'summary': {
-                    'total_week': sum(d['total'] for d in last_7_days),
-                    'success_week': sum_success_w,
-                    'success_prenota_week': sum_prenota_w,
-                    'success_classified_week': sum_classified_w,
-                    'failed_week': sum(d['failed'] for d in last_7_days),
-                    'skipped_operacional_week': sum_skipped_op_w,
-                    'success_rate_week': self._success_rate_pct(
-                        sum_success_w, sum(d['failed'] for d in last_7_days)
-                    ),
-                    'avg_processing_time': round(avg_processing_time_week, 2)
+                    'total_week': week_summary['total'],
+                    'success_week': week_summary['success'],
+                    'success_prenota_week': week_summary['success_prenota'],
+                    'success_classified_week': week_summary['success_classified'],
+                    'failed_week': week_summary['failed'],
+                    'skipped_operacional_week': week_summary['skipped_operacional'],
+                    'success_rate_week': week_summary['success_rate'],
+                    'avg_processing_time': week_summary['avg_processing_time']
                 },
-                'processes_by_type_week': processes_by_type_week,
-                'failed_rules_week': failed_rules_week,
-                'failed_rules_operacional_week': failed_rules_operacional_week,
+                'processes_by_type_week': week['processes_by_type'],
+                'failed_rules_week': week['failed_rules'],
+                'failed_rules_operacional_week': week['failed_rules_operacional'],
             })
     
-    def _get_raw_hourly(self, date):
-        """Busca processes_by_hour raw (UTC) de uma data específica"""
-        try:
-            response = self.table.get_item(
-                Key={'PK': f'METRICS#{date}', 'SK': 'SUMMARY'}
-            )
-            if 'Item' not in response:
-                return {}
-            item = response['Item']
-            raw = {}
-            if 'processes_by_hour' in item:
-                for hour, count in item['processes_by_hour'].items():
-                    try:
-                        raw[int(hour)] = int(count)
-                    except (ValueError, TypeError):
-                        pass
-            return raw
-        except Exception:
-            return {}
+    @staticmethod
+    def _raw_hourly(item):
+        """processes_by_hour raw (UTC) de um item SUMMARY"""
+        raw = {}
+        for hour, count in ((item or {}).get('processes_by_hour') or {}).items():
+            try:
+                raw[int(hour)] = int(count)
+            except (ValueError, TypeError):
+                pass
+        return raw
     
-    def _convert_hourly_utc_to_brt(self, date):
+    @staticmethod
+    def _convert_hourly_utc_to_brt(raw_current, raw_next):
         """
         Monta a distribuição por hora em BRT para uma data específica.
         
@@ -273,13 +223,6 @@ class DashboardService:
         """
         BRT_OFFSET = -3
         
-        # Buscar dados raw UTC do dia atual e do dia seguinte
-        current_date = datetime.strptime(date, '%Y-%m-%d')
-        next_date = (current_date + timedelta(days=1)).strftime('%Y-%m-%d')
-        
-        raw_current = self._get_raw_hourly(date)
-        raw_next = self._get_raw_hourly(next_date)
-        
         processes_by_hour = {}
         
         # Do dia UTC atual: horas 3-23 → BRT 0-20 (pertencem ao mesmo dia BRT)
@@ -299,126 +242,266 @@ class DashboardService:
         
         return processes_by_hour
 
-    def get_metrics_by_date(self, date):
-        """Retorna métricas de uma data específica"""
+    def _load_summaries(self, dates):
+        """Itens METRICS#{dia}/SUMMARY das datas, via BatchGetItem (100 dias por chamada)."""
+        keys = [{'PK': f'METRICS#{date}', 'SK': 'SUMMARY'} for date in dict.fromkeys(dates)]
+        items = batch_get_items(self.table, keys, projection=_SUMMARY_ATTRIBUTES)
+        return {item['PK'][len('METRICS#'):]: item for item in items}
+
+    def _daily_metrics(self, dates):
+        """
+        ({date: métricas}, {date: item SUMMARY}) das datas com uma única leitura em lote.
+
+        O dia seguinte de cada data entra no mesmo lote (horas 0-2 UTC → 21-23 BRT),
+        então dias vizinhos do período reaproveitam o mesmo item.
+        """
+        dates = list(dates)
+        if not dates:
+            return {}, {}
+        try:
+            summaries = self._load_summaries(dates + [_next_day(d) for d in dates])
+        except Exception as e:
+            print(f"Erro ao buscar métricas para {dates[0]}..{dates[-1]}: {e}")
+            return {date: None for date in dates}, None
+        
+        metrics = {}
+        for date in dates:
+            try:
+                metrics[date] = self._metrics_from_summary(
+                    date, summaries.get(date), summaries.get(_next_day(date))
+                )
+            except Exception as e:
+                print(f"Erro ao buscar métricas para {date}: {e}")
+                metrics[date] = None
+        return metrics, summaries
+
+    def get_metrics_for_dates(self, dates):
+        """Métricas de várias datas ({date: métricas}) com uma única leitura em lote."""
+        return self._daily_metrics(dates)[0]
+
+    def _load_rollup_items(self, keys):
+        items = batch_get_items(self.table, keys, projection=_ROLLUP_READ_ATTRIBUTES)
+        return {(item['PK'], item['SK']): item for item in items}
+
+    def get_period_aggregates(self, start_date, end_date, day_items=None):
+        """
+        Totais do período sem a série diária. Meses e semanas ISO inteiros saem dos
+        rollups (MONTH_ROLLUP / WEEK_ROLLUP) e só as bordas saem dos dias: um ano
+        custa ~12 itens em vez de 365. Rollup não confiável (período anterior ao
+        SINCE e sem backfill) é trocado pelos seus dias numa segunda leitura.
+
+        ``day_items`` ({date: item SUMMARY}, ex.: já lidos para a série diária) atende
+        os dias de borda e de fallback sem nova leitura.
+
+        ``success_classified`` e a lacuna ``Outros`` de ``failed_rules`` são calculados
+        sobre os totais do período, não somados dia a dia: rollup só guarda contadores
+        somados. Só diverge da soma diária quando um dia tem mais regras atribuídas que
+        falhas (processo que falha em várias regras) ou mais pré-notas que sucessos;
+        a série diária ('period') continua com os valores de cada dia.
+        """
+        return self._attach_regras_labels(self._period_totals(start_date, end_date, day_items))
+
+    def _period_totals(self, start_date, end_date, day_items=None):
+        start = parse_date(start_date)
+        end = parse_date(end_date)
+        segments = plan_date_range(start, end)
+
+        def segment_key(kind, first):
+            if kind == 'month':
+                return month_rollup_key(first)
+            if kind == 'week':
+                return week_rollup_key(first)
+            return {'PK': f'METRICS#{first.isoformat()}', 'SK': 'SUMMARY'}
+
+        def day_range(first, last):
+            return [first + timedelta(days=i) for i in range((last - first).days + 1)]
+
+        keys = [
+            segment_key(kind, first)
+            for kind, first, _ in segments
+            if kind != 'day' or day_items is None
+        ]
+        if any(kind != 'day' for kind, _, _ in segments):
+            keys.insert(0, ROLLUP_CONFIG_KEY)
         try:
-            response = self.table.get_item(
-                Key={'PK': f'METRICS#{date}', 'SK': 'SUMMARY'}
+            found = self._load_rollup_items(keys) if keys else {}
+        except Exception as e:
+            if day_items is None:
+                raise
+            print(f"[get_period_aggregates] rollups indisponíveis, somando os dias: {e}")
+            found = {}
+        since = (found.get((ROLLUP_CONFIG_KEY['PK'], ROLLUP_CONFIG_KEY['SK'])) or {}).get('SINCE')
+
+        items = []
+        fallback_days = []
+        for kind, first, last in segments:
+            key = segment_key(kind, first)
+            item = found.get((key['PK'], key['SK']))
+            if kind == 'day':
+                if day_items is not None:
+                    item = day_items.get(first.isoformat())
+                if item:
+                    items.append(item)
+                continue
+            if rollup_is_trusted(item, first, since):
+                if item:
+                    items.append(item)
+                continue
+            fallback_days.extend(day_range(first, last))
+        if fallback_days and day_items is not None:
+            items.extend(
+                day_items[day.isoformat()] for day in fallback_days if day.isoformat() in day_items
             )
-            
-            if 'Item' not in response:
-                return {
-                    'date': date,
-                    'total_count': 0,
-                    'success_count': 0,
-                    'success_prenota_count': 0,
-                    'success_classified_count': 0,
-                    'failed_count': 0,
-                    'success_rate': 0,
-                    'avg_processing_time': 0,
-                    'processes_by_hour': {},
-                    'failure_reasons': {},
-                    'processes_by_type': {},
-                    'failed_rules': {},
-                    'failed_rules_operacional': {},
-                    'skipped_operacional': 0,
-                }
-            
-            item = response['Item']
-            
-            # Converter Decimal para float
-            total_count = int(item.get('total_count', 0))
-            success_count = int(item.get('success_count', 0))
-            success_prenota_count = int(item.get('success_prenota_count', 0) or 0)
-            success_classified_count = max(0, success_count - success_prenota_count)
-            failed_count = int(item.get('failed_count', 0))
-            total_time = float(item.get('total_time', 0))
-            
-            # Calcular métricas derivadas
-            success_rate = self._success_rate_pct(success_count, failed_count)
-            avg_time = (total_time / total_count) if total_count > 0 else 0
-            
-            # Converter horas UTC para BRT buscando dados do dia atual e seguinte
-            processes_by_hour = self._convert_hourly_utc_to_brt(date)
-            
-            failure_reasons = {}
-            if 'failure_reasons' in item:
-                for reason, count in item['failure_reasons'].items():
-                    failure_reasons[reason] = int(count)
-            
-            processes_by_type = {}
-            if 'processes_by_type' in item:
-                processes_by_type_dict = item['processes_by_type']
-                print(f"DEBUG: processes_by_type raw: {processes_by_type_dict}, type: {type(processes_by_type_dict)}")
-                if isinstance(processes_by_type_dict, dict):
-                    for proc_type, count in processes_by_type_dict.items():
-                        # Converter Decimal para int
-                        try:
-                            if isinstance(count, Decimal):
-                                processes_by_type[proc_type] = int(count)
-                            elif isinstance(count, (int, float)):
-                                processes_by_type[proc_type] = int(count)
-                            else:
-                                processes_by_type[proc_type] = int(count) if str(count).isdigit() else 0
-                        except Exception as e:
-                            print(f"Erro ao converter processes_by_type[{proc_type}]: {e}")
-                            processes_by_type[proc_type] = 0
-                print(f"DEBUG: processes_by_type converted: {processes_by_type}")
-            
-            failed_rules = {}
-            if 'failed_rules' in item:
-                failed_rules_dict = item['failed_rules']
-                print(f"DEBUG: failed_rules raw: {failed_rules_dict}, type: {type(failed_rules_dict)}")
-                if isinstance(failed_rules_dict, dict):
-                    for rule, count in failed_rules_dict.items():
-                        # Converter Decimal para int
-                        try:
-                            if isinstance(count, Decimal):
-                                failed_rules[rule] = int(count)
-                            elif isinstance(count, (int, float)):
-                                failed_rules[rule] = int(count)
-                            else:
-                                failed_rules[rule] = int(count) if str(count).isdigit() else 0
-                        except Exception as e:
-                            print(f"Erro ao converter failed_rules[{rule}]: {e}")
-                            failed_rules[rule] = 0
-                print(f"DEBUG: failed_rules converted: {failed_rules}")
-
-            failed_rules_operacional = {}
-            if 'failed_rules_operacional' in item:
-                fr_op = item['failed_rules_operacional']
-                if isinstance(fr_op, dict):
-                    for rule, count in fr_op.items():
-                        try:
-                            failed_rules_operacional[rule] = int(count)
-                        except (TypeError, ValueError):
-                            failed_rules_operacional[rule] = 0
-
-            skipped_operacional = int(item.get('skipped_operacional', 0) or 0)
-            
-            # Calcular taxa de sucesso por tipo
-            success_by_type = {}
-            failed_by_type = {}
-            # Nota: Para calcular taxa por tipo, precisaríamos de mais dados
-            # Por enquanto, apenas retornamos os totais por tipo
-            
+        elif fallback_days:
+            fallback_keys = [segment_key('day', day) for day in fallback_days]
+            items.extend(self._load_rollup_items(fallback_keys).values())
+
+        rollups_used = sum(1 for item in items if item.get('SK') not in (None, 'SUMMARY'))
+        print(
+            f"[get_period_aggregates] {start_date}..{end_date}: {len(segments)} segmentos, "
+            f"{rollups_used} rollups, {len(fallback_days)} dias de fallback"
+        )
+
+        totals = sum_summaries(items)
+        total = totals['total_count']
+        success = totals['success_count']
+        failed = totals['failed_count']
+        prenota = totals['success_prenota_count']
+        avg_time = float(totals['total_time']) / total if total > 0 else 0
+
+        return {
+            'summary': {
+                'total': total,
+                'success': success,
+                'success_prenota': prenota,
+                'success_classified': max(0, success - prenota),
+                'failed': failed,
+                'skipped_operacional': totals['skipped_operacional'],
+                'success_rate': self._success_rate_pct(success, failed),
+                'avg_processing_time': round(avg_time, 2)
+            },
+            'processes_by_type': totals['processes_by_type'],
+            'failed_rules': self._failed_rules_with_gap(totals['failed_rules'], failed),
+            'failed_rules_operacional': totals['failed_rules_operacional'],
+            'start_date': start_date,
+            'end_date': end_date
+        }
+
+    def get_metrics_by_date(self, date):
+        """Retorna métricas de uma data específica"""
+        return self.get_metrics_for_dates([date])[date]
+
+    def _metrics_from_summary(self, date, item, next_item=None):
+        """Converte o item SUMMARY do dia (e o do dia seguinte, para as horas BRT) em métricas"""
+        if item is None:
             return {
                 'date': date,
-                'total_count': total_count,
-                'success_count': success_count,
-                'success_prenota_count': success_prenota_count,
-                'success_classified_count': success_classified_count,
-                'failed_count': failed_count,
-                'success_rate': round(success_rate, 2),
-                'avg_processing_time': round(avg_time, 2),
-                'processes_by_hour': processes_by_hour,
-                'failure_reasons': failure_reasons,
-                'processes_by_type': processes_by_type,
-                'failed_rules': failed_rules,
-                'failed_rules_operacional': failed_rules_operacional,
-                'skipped_operacional': skipped_operacional,
+                'total_count': 0,
+                'success_count': 0,
+                'success_prenota_count': 0,
+                'success_classified_count': 0,
+                'failed_count': 0,
+                'success_rate': 0,
+                'avg_processing_time': 0,
+                'processes_by_hour': {},
+                'failure_reasons': {},
+                'processes_by_type': {},
+                'failed_rules': {},
+                'failed_rules_operacional': {},
+                'skipped_operacional': 0,
             }
-            
-        except Exception as e:
-            print(f"Erro ao buscar métricas para {date}: {e}")
-            return None
\ No newline at end of file
+        
+        # Converter Decimal para float
+        total_count = int(item.get('total_count', 0))
+        success_count = int(item.get('success_count', 0))
+        success_prenota_count = int(item.get('success_prenota_count', 0) or 0)
+        success_classified_count = max(0, success_count - success_prenota_count)
+        failed_count = int(item.get('failed_count', 0))
+        total_time = float(item.get('total_time', 0))
+        
+        # Calcular métricas derivadas
+        success_rate = self._success_rate_pct(success_count, failed_count)
+        avg_time = (total_time / total_count) if total_count > 0 else 0
+        
+        # Converter horas UTC para BRT com os dados do dia atual e seguinte
+        processes_by_hour = self._convert_hourly_utc_to_brt(
+            self._raw_hourly(item), self._raw_hourly(next_item)
+        )
+        
+        failure_reasons = {}
+        if 'failure_reasons' in item:
+            for reason, count in item['failure_reasons'].items():
+                failure_reasons[reason] = int(count)
+        
+        processes_by_type = {}
+        if 'processes_by_type' in item:
+            processes_by_type_dict = item['processes_by_type']
+            print(f"DEBUG: processes_by_type raw: {processes_by_type_dict}, type: {type(processes_by_type_dict)}")
+            if isinstance(processes_by_type_dict, dict):
+                for proc_type, count in processes_by_type_dict.items():
+                    # Converter Decimal para int
+                    try:
+                        if isinstance(count, Decimal):
+                            processes_by_type[proc_type] = int(count)
+                        elif isinstance(count, (int, float)):
+                            processes_by_type[proc_type] = int(count)
+                        else:
+                            processes_by_type[proc_type] = int(count) if str(count).isdigit() else 0
+                    except Exception as e:
+                        print(f"Erro ao converter processes_by_type[{proc_type}]: {e}")
+                        processes_by_type[proc_type] = 0
+            print(f"DEBUG: processes_by_type converted: {processes_by_type}")
+        
+        failed_rules = {}
+        if 'failed_rules' in item:
+            failed_rules_dict = item['failed_rules']
+            print(f"DEBUG: failed_rules raw: {failed_rules_dict}, type: {type(failed_rules_dict)}")
+            if isinstance(failed_rules_dict, dict):
+                for rule, count in failed_rules_dict.items():
+                    # Converter Decimal para int
+                    try:
+                        if isinstance(count, Decimal):
+                            failed_rules[rule] = int(count)
+                        elif isinstance(count, (int, float)):
+                            failed_rules[rule] = int(count)
+                        else:
+                            failed_rules[rule] = int(count) if str(count).isdigit() else 0
+                    except Exception as e:
+                        print(f"Erro ao converter failed_rules[{rule}]: {e}")
+                        failed_rules[rule] = 0
+            print(f"DEBUG: failed_rules converted: {failed_rules}")
+
+        failed_rules_operacional = {}
+        if 'failed_rules_operacional' in item:
+            fr_op = item['failed_rules_operacional']
+            if isinstance(fr_op, dict):
+                for rule, count in fr_op.items():
+                    try:
+                        failed_rules_operacional[rule] = int(count)
+                    except (TypeError, ValueError):
+                        failed_rules_operacional[rule] = 0
+
+        skipped_operacional = int(item.get('skipped_operacional', 0) or 0)
+        
+        # Calcular taxa de sucesso por tipo
+        success_by_type = {}
+        failed_by_type = {}
+        # Nota: Para calcular taxa por tipo, precisaríamos de mais dados
+        # Por enquanto, apenas retornamos os totais por tipo
+        
+        return {
+            'date': date,
+            'total_count': total_count,
+            'success_count': success_count,
+            'success_prenota_count': success_prenota_count,
+            'success_classified_count': success_classified_count,
+            'failed_count': failed_count,
+            'success_rate': round(success_rate, 2),
+            'avg_processing_time': round(avg_time, 2),
+            'processes_by_hour': processes_by_hour,
+            'failure_reasons': failure_reasons,
+            'processes_by_type': processes_by_type,
+            'failed_rules': failed_rules,
+            'failed_rules_operacional': failed_rules_operacional,
+            'skipped_operacional': skipped_operacional,
+        }
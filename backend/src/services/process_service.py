@@ -12,15 +12,25 @@ from src.utils.presigned_logging import (
     presigned_put_response_for_log,
     safe_presigned_url_preview,
 )
+from src.utils.blob_store import resolve_item_blobs
 from src.utils.failure_dedup import dedup_badge_label, format_failure_key_display
 from src.utils.extraction_dedup import (
     clear_process_extractions,
     dedupe_file_items_by_content_hash,
     normalize_content_sha256,
 )
+from src.utils.process_list import (
+    build_process_list_query,
+    encode_cursor,
+    process_list_keys,
+)
 
 logger = logging.getLogger(__name__)
 
+PROCESS_LIST_DEFAULT_PAGE_SIZE = 50
+PROCESS_LIST_MAX_PAGE_SIZE = 200
+PROCESS_LIST_MAX_QUERIES = 5
+
 
 def _new_file_upload_id() -> str:
     """Identificador único por upload (SK FILE#… / prefixo da chave S3)."""
@@ -189,7 +199,8 @@ class ProcessService:
         self.repository.put_item(f'PROCESS#{process_id}', 'METADATA', {
             'STATUS': 'CREATED',
             'PROCESS_TYPE': process_type,
-            'TIMESTAMP': timestamp
+            'TIMESTAMP': timestamp,
+            **process_list_keys(process_id, timestamp),
         })
         
         return {'process_id': process_id, 'process_type': process_type, 'status': 'CREATED'}
@@ -238,7 +249,7 @@ class ProcessService:
             # Criar processo se não existir
             pk = f'PROCESS#{process_id}'
             emit_presigned_line(logger, "[presigned] trace=%s fase=dynamodb_pre query pk=%s", trace, pk)
-            items = self.repository.query_by_pk_and_sk_prefix(pk, 'METADATA')
+            items = self.repository.query_by_pk_and_sk_prefix(pk, 'METADATA', projection=('SK',))
             emit_presigned_line(
                 logger,
                 "[presigned] trace=%s fase=dynamodb_pre metadata_items=%s",
@@ -262,7 +273,8 @@ class ProcessService:
                     })
                     self.repository.put_item(pk, 'METADATA', {
                         'STATUS': 'CREATED',
-                        'TIMESTAMP': timestamp
+                        'TIMESTAMP': timestamp,
+                        **process_list_keys(process_id, timestamp),
                     })
                     emit_presigned_line(logger, "[presigned] trace=%s fase=dynamodb_criar_processo_ok", trace)
                 except Exception as e:
@@ -460,7 +472,7 @@ class ProcessService:
                 )
 
         pk = f"PROCESS#{process_id}"
-        items = self.repository.query_by_pk_and_sk_prefix(pk, "METADATA")
+        items = self.repository.query_by_pk_and_sk_prefix(pk, "METADATA", projection=("SK",))
         if not items:
             timestamp = int(datetime.now().timestamp())
             self.repository.put_item("PROCESS", f"PROCESS#{process_id}", {
@@ -470,9 +482,10 @@ class ProcessService:
             self.repository.put_item(pk, "METADATA", {
                 "STATUS": "CREATED",
                 "TIMESTAMP": timestamp,
+                **process_list_keys(process_id, timestamp),
             })
 
-        existing = self.repository.query_by_pk_and_sk_prefix(pk, "FILE#")
+        existing = self.repository.query_by_pk_and_sk_prefix(pk, "FILE#", projection=("SK",))
         existing_count = len(existing)
         emit_presigned_line(
             logger,
@@ -600,7 +613,7 @@ class ProcessService:
             
             # Criar processo se não existir
             pk = f'PROCESS#{process_id}'
-            items = self.repository.query_by_pk_and_sk_prefix(pk, 'METADATA')
+            items = self.repository.query_by_pk_and_sk_prefix(pk, 'METADATA', projection=('SK',))
             
             if not items:
                 timestamp = int(datetime.now().timestamp())
@@ -611,7 +624,8 @@ class ProcessService:
                 })
                 self.repository.put_item(pk, 'METADATA', {
                     'STATUS': 'CREATED',
-                    'TIMESTAMP': timestamp
+                    'TIMESTAMP': timestamp,
+                    **process_list_keys(process_id, timestamp),
                 })
                 logger.info(f"[link_pedido_compra_metadata] Processo criado com process_id salvo: {process_id}")
             
@@ -769,6 +783,8 @@ class ProcessService:
         
         # Buscar resultados de parsing (XML e OCR)
         parsing_results = []
+        # MERGED_DATA / RAW_TEXT / TABLES_DATA / PARSED_DATA grandes ficam no S3 (blob_store)
+        items = [resolve_item_blobs(item) for item in items]
         
         logger.info(f"Total items for process: {len(items)}")
         logger.info(f"SK values: {[item.get('SK') for item in items]}")
@@ -993,35 +1009,60 @@ class ProcessService:
         logger.info(f"Result keys: {list(result.keys())}")
         return result
     
-    def list_processes(self) -> list:
-        try:
-            items = self.repository.query_by_pk_and_sk_prefix('PROCESS', 'PROCESS#')
-            items.sort(key=lambda x: x.get('TIMESTAMP', 0), reverse=True)
-            
-            processes = []
-            for item in items:
-                process_id = item.get('PROCESS_ID')
-                if not process_id:
-                    continue
-                
-                pk = f'PROCESS#{process_id}'
-                metadata_items = self.repository.query_by_pk_and_sk_prefix(pk, 'METADATA')
-                
-                if metadata_items:
-                    metadata = metadata_items[0]
-                    entry = {
-                        'process_id': process_id,
-                        'process_type': metadata.get('PROCESS_TYPE'),
-                        'status': metadata.get('STATUS'),
-                        'created_at': str(int(metadata.get('TIMESTAMP', 0))),
-                    }
-                    entry.update(_metrics_dedup_fields(metadata))
-                    processes.append(entry)
-            
-            return processes
-        except Exception as e:
-            logger.error(f"Error listing processes: {e}")
-            return []
+    def list_processes(
+        self,
+        limit: int = PROCESS_LIST_DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+        process_type: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Página de processos (mais recentes primeiro) direto do GSI ProcessListIndex.
+
+        Sem filtros de status/tipo a página custa uma Query; com filtros, as
+        Queries seguintes só acontecem se a anterior não preencheu ``limit``
+        (no máximo ``PROCESS_LIST_MAX_QUERIES``). ``ValueError`` para cursor/data inválidos.
+        """
+        limit = max(1, min(int(limit), PROCESS_LIST_MAX_PAGE_SIZE))
+        query_kwargs = build_process_list_query(
+            page_size=limit,
+            cursor=cursor,
+            status=status,
+            process_type=process_type,
+            date_from=date_from,
+            date_to=date_to,
+        )
+
+        rows: list = []
+        last_key = None
+        for _ in range(PROCESS_LIST_MAX_QUERIES):
+            items, last_key = self.repository.query_page(**query_kwargs)
+            rows.extend(items)
+            if len(rows) >= limit or not last_key:
+                break
+            query_kwargs['ExclusiveStartKey'] = last_key
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1])
+        elif last_key:
+            next_cursor = encode_cursor(last_key)
+
+        processes = []
+        for metadata in rows:
+            entry = {
+                'process_id': str(metadata.get('PK', '')).split('#', 1)[-1],
+                'process_type': metadata.get('PROCESS_TYPE'),
+                'status': metadata.get('STATUS'),
+                'created_at': str(int(metadata.get('TIMESTAMP', 0))),
+            }
+            entry.update(_metrics_dedup_fields(metadata))
+            processes.append(entry)
+
+        return {'processes': processes, 'next_cursor': next_cursor}
     
     def get_validation_results(self, process_id: str) -> list:
         pk = f'PROCESS#{process_id}'
@@ -1105,7 +1146,9 @@ class ProcessService:
         pk = f'PROCESS#{process_id}'
         safe_name = re.sub(r'[^a-zA-Z0-9._-]', '_', file_name)
 
-        items = self.repository.query_by_pk(pk)
+        items = self.repository.query_by_pk_and_sk_prefix(
+            pk, 'FILE#', projection=('FILE_KEY', 'FILE_NAME')
+        )
 
         if file_key:
             file_item = next(
@@ -9,6 +9,13 @@ class RulesService:
     def __init__(self):
         self.repository = DynamoDBRepository()
     
+    def _bump_version(self, process_type: str) -> None:
+        """Incrementa RULES#{process_type}/VERSION — invalida o cache de regras do validate_rules"""
+        try:
+            self.repository.increment(f"RULES#{process_type}", 'VERSION', 'VERSION')
+        except Exception as e:
+            logger.warning(f"Falha ao incrementar versão das regras de {process_type}: {e}")
+    
     def list_rules(self, process_type: str) -> List[Dict[str, Any]]:
         """Lista regras de um tipo de processo"""
         pk = f"RULES#{process_type}"
@@ -36,6 +43,7 @@ class RulesService:
             'ORDER': order,
             'ENABLED': enabled
         })
+        self._bump_version(process_type)
         
         return {'status': 'created', 'rule_name': rule_name}
     
@@ -51,6 +59,7 @@ class RulesService:
             update_data['ENABLED'] = updates['enabled']
         
         self.repository.update_item(pk, sk, update_data)
+        self._bump_version(process_type)
         
         return {'status': 'updated', 'rule_name': rule_name}
     
@@ -60,5 +69,6 @@ class RulesService:
         sk = f"RULE#{rule_name}"
         
         self.repository.delete_item(pk, sk)
+        self._bump_version(process_type)
         
         return {'status': 'deleted', 'rule_name': rule_name}
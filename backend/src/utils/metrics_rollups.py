@@ -0,0 +1,130 @@
+"""
+Rollups de métricas por semana ISO e por mês (API). Alinhado a lambdas/utils.
+
+Cada delta aplicado ao METRICS#{dia}/SUMMARY pelo update_metrics é replicado em:
+  - PK=METRICS#{ano_iso}-W{semana}  SK=WEEK_ROLLUP
+  - PK=METRICS#{YYYY-MM}            SK=MONTH_ROLLUP
+(MONTHLY_SUMMARY continua existindo, com sua contagem própria por processo.)
+
+Um rollup só é usado pelo dashboard se for confiável: gravado pelo backfill /
+rebuild (``BACKFILLED``) ou de um período que começa em/após ``SINCE`` do item
+``METRICS_ROLLUP/CONFIG`` — a partir dessa data todo delta diário já é replicado.
+"""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Iterable
+
+WEEK_ROLLUP_SK = "WEEK_ROLLUP"
+MONTH_ROLLUP_SK = "MONTH_ROLLUP"
+ROLLUP_CONFIG_KEY = {"PK": "METRICS_ROLLUP", "SK": "CONFIG"}
+
+ROLLUP_COUNTERS = (
+    "total_count",
+    "success_count",
+    "success_prenota_count",
+    "failed_count",
+    "skipped_operacional",
+    "total_time",
+)
+# processes_by_hour fica só no diário (gráfico por hora é de um dia)
+ROLLUP_MAPS = (
+    "failure_reasons",
+    "processes_by_type",
+    "failed_rules",
+    "failed_rules_operacional",
+)
+
+
+def parse_date(value: str) -> date:
+    return date.fromisoformat(str(value)[:10])
+
+
+def week_rollup_key(day: date) -> dict:
+    iso_year, iso_week, _ = day.isocalendar()
+    return {"PK": f"METRICS#{iso_year}-W{iso_week:02d}", "SK": WEEK_ROLLUP_SK}
+
+
+def month_rollup_key(day: date) -> dict:
+    return {"PK": f"METRICS#{day:%Y-%m}", "SK": MONTH_ROLLUP_SK}
+
+
+def rollup_keys_for_date(date_key: str) -> list[dict]:
+    """Rollups (semana ISO e mês) que contêm o dia ``date_key`` (YYYY-MM-DD)."""
+    day = parse_date(date_key)
+    return [week_rollup_key(day), month_rollup_key(day)]
+
+
+def week_bounds(day: date) -> tuple[date, date]:
+    start = day - timedelta(days=day.weekday())
+    return start, start + timedelta(days=6)
+
+
+def month_bounds(day: date) -> tuple[date, date]:
+    start = day.replace(day=1)
+    next_month = (start + timedelta(days=32)).replace(day=1)
+    return start, next_month - timedelta(days=1)
+
+
+def plan_date_range(start: date, end: date) -> list[tuple[str, date, date]]:
+    """
+    Cobre [start, end] com o menor número de peças: meses inteiros, depois
+    semanas ISO inteiras e, nas bordas, dias. Retorna (tipo, início, fim) com
+    tipo em {"month", "week", "day"}.
+    """
+    segments: list[tuple[str, date, date]] = []
+    day = start
+    while day <= end:
+        month_start, month_end = month_bounds(day)
+        if day == month_start and month_end <= end:
+            segments.append(("month", month_start, month_end))
+            day = month_end + timedelta(days=1)
+            continue
+        week_start, week_end = week_bounds(day)
+        if day == week_start and week_end <= end:
+            segments.append(("week", week_start, week_end))
+            day = week_end + timedelta(days=1)
+            continue
+        segments.append(("day", day, day))
+        day += timedelta(days=1)
+    return segments
+
+
+def rollup_is_trusted(item: dict | None, period_start: date, since: str | None) -> bool:
+    """True se o rollup (ou sua ausência) representa o período inteiro."""
+    if item and item.get("BACKFILLED"):
+        return True
+    return bool(since) and period_start.isoformat() >= str(since)[:10]
+
+
+def sum_summaries(items: Iterable[dict]) -> dict:
+    """Soma contadores e mapas de itens SUMMARY/rollup (total_time em Decimal)."""
+    out: dict = {counter: 0 for counter in ROLLUP_COUNTERS}
+    out["total_time"] = Decimal("0")
+    out.update({name: {} for name in ROLLUP_MAPS})
+    for item in items:
+        for counter in ROLLUP_COUNTERS:
+            value = item.get(counter) or 0
+            if counter == "total_time":
+                out[counter] += Decimal(str(value))
+            else:
+                out[counter] += int(value)
+        for name in ROLLUP_MAPS:
+            target = out[name]
+            for key, value in (item.get(name) or {}).items():
+                target[key] = target.get(key, 0) + int(value or 0)
+    return out
+
+
+def build_rollup_items(summaries_by_date: dict[str, dict]) -> dict[tuple[str, str], dict]:
+    """Itens WEEK_ROLLUP/MONTH_ROLLUP (marcados BACKFILLED) somando os SUMMARY diários dados."""
+    grouped: dict[tuple[str, str], list[dict]] = {}
+    for date_key, item in summaries_by_date.items():
+        for key in rollup_keys_for_date(date_key):
+            grouped.setdefault((key["PK"], key["SK"]), []).append(item)
+    return {
+        (pk, sk): {"PK": pk, "SK": sk, **sum_summaries(items), "BACKFILLED": True}
+        for (pk, sk), items in grouped.items()
+    }
@@ -0,0 +1,127 @@
+"""
+Listagem paginada de processos via GSI ``ProcessListIndex``.
+
+Cada item METADATA recebe ``LIST_PK``/``LIST_SK`` na criação (índice esparso);
+``LIST_SK`` = timestamp de criação (12 dígitos) + ``#`` + process_id, então a
+ordem do índice é a ordem cronológica e filtros de data viram condição de chave.
+O cursor devolvido ao cliente é a chave do último item, em base64 url-safe.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+PROCESS_LIST_PK = "PROCESS_LIST"
+PROCESS_LIST_INDEX = os.environ.get("PROCESS_LIST_INDEX", "ProcessListIndex")
+
+# Atributos projetados no GSI (ver agroamazonia-stack.ts).
+PROCESS_LIST_ATTRIBUTES = (
+    "STATUS",
+    "PROCESS_TYPE",
+    "TIMESTAMP",
+    "METRICS_FAILURE_DEDUP_ROLE",
+    "METRICS_FAILURE_DEDUP_PRIMARY",
+    "METRICS_FAILURE_KEYS",
+)
+
+_CURSOR_KEYS = ("PK", "SK", "LIST_PK", "LIST_SK")
+
+
+def process_list_sort_key(process_id: str, timestamp: int) -> str:
+    return f"{int(timestamp):012d}#{process_id}"
+
+
+def process_list_keys(process_id: str, timestamp: int) -> dict[str, str]:
+    """Atributos do GSI para gravar no METADATA do processo."""
+    return {
+        "LIST_PK": PROCESS_LIST_PK,
+        "LIST_SK": process_list_sort_key(process_id, timestamp),
+    }
+
+
+def encode_cursor(item: dict) -> str:
+    """Cursor opaco a partir das chaves (tabela + GSI) do último item da página."""
+    key = {k: str(item[k]) for k in _CURSOR_KEYS if item.get(k) is not None}
+    raw = json.dumps(key, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict[str, str]:
+    """ExclusiveStartKey a partir do cursor; ``ValueError`` se inválido."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise ValueError("cursor inválido") from e
+    if not isinstance(key, dict) or set(key) != set(_CURSOR_KEYS):
+        raise ValueError("cursor inválido")
+    if key["LIST_PK"] != PROCESS_LIST_PK:
+        raise ValueError("cursor inválido")
+    return {k: str(key[k]) for k in _CURSOR_KEYS}
+
+
+def _day_start_epoch(value: str) -> int:
+    """``YYYY-MM-DD`` (UTC) → epoch do início do dia; ``ValueError`` se inválido."""
+    day = datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    return int(day.timestamp())
+
+
+def build_process_list_query(
+    *,
+    page_size: int,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    process_type: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+) -> dict[str, Any]:
+    """kwargs de ``table.query`` no GSI (mais recentes primeiro)."""
+    names: dict[str, str] = {"#lpk": "LIST_PK"}
+    values: dict[str, Any] = {":lpk": PROCESS_LIST_PK}
+    key_cond = "#lpk = :lpk"
+
+    lower = process_list_sort_key("", _day_start_epoch(date_from)) if date_from else None
+    upper = None
+    if date_to:
+        next_day = _day_start_epoch(date_to) + int(timedelta(days=1).total_seconds())
+        upper = process_list_sort_key("", next_day)
+    if lower or upper:
+        names["#lsk"] = "LIST_SK"
+        if lower and upper:
+            key_cond += " AND #lsk BETWEEN :lo AND :hi"
+            values[":lo"], values[":hi"] = lower, upper
+        elif lower:
+            key_cond += " AND #lsk >= :lo"
+            values[":lo"] = lower
+        else:
+            key_cond += " AND #lsk < :hi"
+            values[":hi"] = upper
+
+    filters: list[str] = []
+    if status:
+        names["#st"] = "STATUS"
+        values[":st"] = status
+        filters.append("#st = :st")
+    if process_type:
+        names["#pt"] = "PROCESS_TYPE"
+        values[":pt"] = process_type
+        filters.append("#pt = :pt")
+
+    kwargs: dict[str, Any] = {
+        "IndexName": PROCESS_LIST_INDEX,
+        "KeyConditionExpression": key_cond,
+        "ExpressionAttributeNames": names,
+        "ExpressionAttributeValues": values,
+        "ScanIndexForward": False,
+        "Limit": int(page_size),
+    }
+    if filters:
+        kwargs["FilterExpression"] = " AND ".join(filters)
+    if cursor:
+        kwargs["ExclusiveStartKey"] = decode_cursor(cursor)
+    return kwargs
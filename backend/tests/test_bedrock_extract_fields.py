@@ -7,10 +7,15 @@ Covers:
 - Bedrock returns empty → fields_extracted = False
 - Bedrock returns invalid JSON → saves RAW_RESPONSE + PARSE_ERROR
 - _build_prompt: includes NF-e data, Textract data, pedido metadata
+- Textract FORMS: campos respondidos no prompt; boleto com vencimento + valor dispensa o modelo
+- Fan-out por arquivo: ordem do merge = ordem dos documentos; prazo esgotado (da Lambda ou do
+  arquivo) → extração parcial
 """
 
 import io
 import json
+import threading
+import time
 import pytest
 from unittest.mock import patch, MagicMock
 
@@ -172,7 +177,8 @@ class TestBedrockExtractFieldsHandler:
         }
         ex_a = json.dumps({"tipoDeDocumento": "NF", "documento": "111", "serie": "1"})
         ex_b = json.dumps({"tipoDeDocumento": "NF", "documento": "222", "serie": "2"})
-        mock_invoke.side_effect = [ex_a, ex_b]
+        # chamadas em paralelo: resposta escolhida pelo conteúdo do prompt, não pela ordem
+        mock_invoke.side_effect = lambda prompt, deadline=None: ex_a if "NOTA A" in prompt else ex_b
 
         result = handler({"process_id": "p1"}, None)
         assert result["fields_extracted"] is True
@@ -195,6 +201,191 @@ class TestBedrockExtractFieldsHandler:
         assert ocr_out["per_document"][1]["documento_entrada_protheus"]["documento"] == "222"
 
 
+class _FakeContext:
+    def __init__(self, remaining_ms):
+        self.remaining_ms = remaining_ms
+
+    def get_remaining_time_in_millis(self):
+        return self.remaining_ms
+
+
+class TestParallelPerFileExtraction:
+
+    @patch("bedrock_extract_fields.handler._invoke_bedrock")
+    @patch("bedrock_extract_fields.handler.table")
+    def test_merge_follows_document_order_not_arrival(self, mock_table, mock_invoke):
+        from bedrock_extract_fields.handler import handler
+
+        tex = [
+            {"file_name": "a.pdf", "raw_text": "NOTA A", "tables": []},
+            {"file_name": "b.pdf", "raw_text": "NOTA B", "tables": []},
+        ]
+        mock_table.query.return_value = {"Items": [_merged_item(textract_docs=tex)]}
+        b_answered = threading.Event()
+
+        def invoke(prompt, deadline=None):
+            if "NOTA A" in prompt:
+                # a.pdf só responde depois de b.pdf: as duas chamadas estão em voo juntas
+                assert b_answered.wait(5)
+                return json.dumps({"tipoDeDocumento": "NF", "documento": "111"})
+            b_answered.set()
+            return json.dumps({"tipoDeDocumento": "NF", "documento": "222"})
+
+        mock_invoke.side_effect = invoke
+
+        result = handler({"process_id": "p1"}, _FakeContext(300_000))
+
+        assert result["fields_extracted"] is True
+        sks = [c[1]["Item"]["SK"] for c in mock_table.put_item.call_args_list]
+        assert sks[:2] == ["BEDROCK_EXTRACTION#a.pdf", "BEDROCK_EXTRACTION#b.pdf"]
+        merged_item = next(c[1]["Item"] for c in mock_table.put_item.call_args_list
+                           if c[1]["Item"]["SK"] == "BEDROCK_EXTRACTION")
+        assert json.loads(merged_item["EXTRACTED_FIELDS"])["documento"] == "111"
+
+    @patch("bedrock_extract_fields.handler.BEDROCK_EXTRACT_SAFETY_SECONDS", 0.0)
+    @patch("bedrock_extract_fields.handler._invoke_bedrock")
+    @patch("bedrock_extract_fields.handler.table")
+    def test_document_past_deadline_gives_partial_extraction(self, mock_table, mock_invoke):
+        from bedrock_extract_fields.handler import handler
+
+        tex = [
+            {"file_name": "lenta.pdf", "raw_text": "NOTA LENTA", "tables": []},
+            {"file_name": "b.pdf", "raw_text": "NOTA B", "tables": []},
+        ]
+        mock_table.query.return_value = {"Items": [_merged_item(textract_docs=tex)]}
+        release = threading.Event()
+
+        def invoke(prompt, deadline=None):
+            if "NOTA LENTA" in prompt:
+                release.wait(5)
+                return VALID_EXTRACTION
+            return json.dumps({"tipoDeDocumento": "NF", "documento": "222"})
+
+        mock_invoke.side_effect = invoke
+        try:
+            result = handler({"process_id": "p1"}, _FakeContext(300))
+        finally:
+            release.set()
+
+        assert result["fields_extracted"] is True
+        sks = [c[1]["Item"]["SK"] for c in mock_table.put_item.call_args_list]
+        assert "BEDROCK_EXTRACTION#lenta.pdf" not in sks
+        assert "BEDROCK_EXTRACTION#b.pdf" in sks
+        merged_item = next(c[1]["Item"] for c in mock_table.put_item.call_args_list
+                           if c[1]["Item"]["SK"] == "BEDROCK_EXTRACTION")
+        assert json.loads(merged_item["EXTRACTED_FIELDS"])["documento"] == "222"
+
+    @patch("bedrock_extract_fields.handler.BEDROCK_EXTRACT_DOC_TIMEOUT_SECONDS", 30.0)
+    @patch("bedrock_extract_fields.handler._invoke_bedrock")
+    @patch("bedrock_extract_fields.handler.table")
+    def test_each_document_gets_its_own_deadline(self, mock_table, mock_invoke):
+        from bedrock_extract_fields.handler import handler
+
+        tex = [
+            {"file_name": "a.pdf", "raw_text": "NOTA A", "tables": []},
+            {"file_name": "b.pdf", "raw_text": "NOTA B", "tables": []},
+        ]
+        mock_table.query.return_value = {"Items": [_merged_item(textract_docs=tex)]}
+        deadlines = {}
+
+        def invoke(prompt, deadline=None):
+            if "NOTA A" in prompt:
+                deadlines["a"] = deadline
+                raise TimeoutError("prazo esgotado")
+            deadlines["b"] = deadline
+            return json.dumps({"tipoDeDocumento": "NF", "documento": "222"})
+
+        mock_invoke.side_effect = invoke
+        started = time.monotonic()
+
+        result = handler({"process_id": "p1"}, _FakeContext(300_000))
+
+        # Prazo do arquivo (30s) vence antes do prazo da Lambda (300s − reserva)
+        assert all(started < d <= time.monotonic() + 30 for d in deadlines.values())
+        assert result["fields_extracted"] is True
+        sks = [c[1]["Item"]["SK"] for c in mock_table.put_item.call_args_list]
+        assert "BEDROCK_EXTRACTION#a.pdf" not in sks
+        assert "BEDROCK_EXTRACTION#b.pdf" in sks
+
+
+BOLETO_FORMS = [
+    {"key": "Vencimento", "value": "10/05/2025", "confidence": 97.2},
+    {"key": "Valor do Documento", "value": "R$ 1.234,56", "confidence": 95.0},
+    {"key": "CPF/CNPJ do Beneficiário", "value": "19.378.380/0001-20", "confidence": 91.4},
+    {"key": "Nosso Número", "value": "123", "confidence": 40.0},
+]
+
+
+class TestTextractForms:
+
+    @patch("bedrock_extract_fields.handler._invoke_bedrock")
+    @patch("bedrock_extract_fields.handler.table")
+    def test_boleto_answered_by_forms_skips_bedrock(self, mock_table, mock_invoke):
+        from bedrock_extract_fields.handler import handler
+
+        tex = [{"file_name": "boleto_maio.pdf", "raw_text": "Ficha de compensação", "forms": BOLETO_FORMS}]
+        mock_table.query.return_value = {"Items": [_merged_item(textract_docs=tex)]}
+
+        result = handler({"process_id": "p1"}, None)
+
+        assert result["fields_extracted"] is True
+        mock_invoke.assert_not_called()
+        per_file = mock_table.put_item.call_args_list[0][1]["Item"]
+        assert per_file["SK"] == "BEDROCK_EXTRACTION#boleto_maio.pdf"
+        assert per_file["EXTRACTION_SOURCE"] == "textract_forms"
+        fields = json.loads(per_file["EXTRACTED_FIELDS"])
+        assert fields["duplicatas"] == [{"vencimento": "10/05/2025", "valorVencimento": 1234.56}]
+        assert fields["cnpjEmitente"] == "19378380000120"
+        assert fields["chaveAcesso"] is None
+
+    @patch("bedrock_extract_fields.handler._invoke_bedrock")
+    @patch("bedrock_extract_fields.handler.table")
+    def test_boleto_with_two_parcels_goes_to_bedrock(self, mock_table, mock_invoke):
+        from bedrock_extract_fields.handler import handler
+
+        forms = BOLETO_FORMS + [
+            {"key": "Vencimento", "value": "10/06/2025", "confidence": 96.0},
+            {"key": "Valor do Documento", "value": "R$ 1.234,56", "confidence": 95.0},
+        ]
+        tex = [{"file_name": "boleto_carne.pdf", "raw_text": "Carnê 2 parcelas", "forms": forms}]
+        mock_table.query.return_value = {"Items": [_merged_item(textract_docs=tex)]}
+        mock_invoke.return_value = json.dumps({"duplicatas": [
+            {"vencimento": "10/05/2025", "valorVencimento": 1234.56},
+            {"vencimento": "10/06/2025", "valorVencimento": 1234.56},
+        ]})
+
+        handler({"process_id": "p1"}, None)
+
+        mock_invoke.assert_called_once()
+        prompt = mock_invoke.call_args.args[0]
+        # vencimentos distintos não vão como campo já respondido; o valor (igual nas duas) vai
+        assert '"vencimento": "10/05/2025"' not in prompt
+        assert '"valorVencimento": 1234.56' in prompt
+        per_file = mock_table.put_item.call_args_list[0][1]["Item"]
+        assert per_file["EXTRACTION_SOURCE"] == "bedrock"
+        assert len(json.loads(per_file["EXTRACTED_FIELDS"])["duplicatas"]) == 2
+
+    def test_single_doc_prompt_lists_form_answers_and_shrinks_text(self):
+        from bedrock_extract_fields.handler import _build_prompt_single_doc
+
+        doc = {
+            "file_name": "nfse.pdf",
+            "raw_text": "x" * 7000,
+            "forms": [
+                {"key": "Data de Emissão", "value": "03/04/2025 10:22", "confidence": 99.0},
+                {"key": "Número da NFS-e", "value": "000027", "confidence": 92.0},
+                {"key": "Observação", "value": "ilegível", "confidence": 30.0},
+            ],
+        }
+        prompt = _build_prompt_single_doc({"nfe_xml": None}, doc, None)
+
+        assert '"dataEmissao": "20250403"' in prompt
+        assert '"documento": "27"' in prompt
+        assert "Número da NFS-e: 000027" in prompt
+        assert "ilegível" not in prompt
+        assert "x" * 4000 in prompt and "x" * 4001 not in prompt
+
+
 class TestBuildPrompt:
 
     def test_includes_nfe_xml_section(self):
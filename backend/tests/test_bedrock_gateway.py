@@ -0,0 +1,124 @@
+"""Testes: utils.bedrock_gateway (cliente do container, retry em throttling, contadores, prazo)."""
+
+import io
+import json
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from botocore.exceptions import ClientError
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "lambdas"))
+
+from utils import bedrock_gateway  # noqa: E402
+
+
+def _response(text="ok", usage=None):
+    body = {"output": {"message": {"content": [{"text": text}]}}}
+    if usage is not None:
+        body["usage"] = usage
+    return {"body": io.BytesIO(json.dumps(body).encode())}
+
+
+def _client_error(code):
+    return ClientError({"Error": {"Code": code, "Message": code}}, "InvokeModel")
+
+
+@pytest.fixture(autouse=True)
+def _reset(monkeypatch):
+    bedrock_gateway.reset_usage_totals()
+    monkeypatch.setattr(bedrock_gateway, "_clients", {})
+    sleeps = []
+    monkeypatch.setattr(bedrock_gateway.time, "sleep", sleeps.append)
+    yield sleeps
+    bedrock_gateway.reset_usage_totals()
+
+
+@patch("utils.bedrock_gateway.boto3")
+def test_client_is_created_once_per_region(mock_boto3):
+    assert bedrock_gateway.get_client() is bedrock_gateway.get_client()
+    bedrock_gateway.get_client("us-west-2")
+
+    assert mock_boto3.client.call_count == 2
+    assert mock_boto3.client.call_args_list[0].kwargs["region_name"] == "us-east-1"
+
+
+def test_throttling_is_retried_and_tokens_are_counted(_reset):
+    client = MagicMock()
+    client.invoke_model.side_effect = [
+        _client_error("ThrottlingException"),
+        _client_error("ServiceUnavailableException"),
+        _response("resposta", usage={"inputTokens": 120, "outputTokens": 30}),
+    ]
+
+    result = bedrock_gateway.invoke_text("prompt", {"maxTokens": 10}, client=client)
+
+    assert result.text == "resposta"
+    assert result.attempts == 3
+    assert (result.input_tokens, result.output_tokens) == (120, 30)
+    sent = json.loads(client.invoke_model.call_args.kwargs["body"])
+    assert sent["inferenceConfig"] == {"maxTokens": 10}
+    assert sent["messages"][0]["content"][0]["text"] == "prompt"
+    totals = bedrock_gateway.usage_totals()
+    assert totals["calls"] == 1 and totals["throttles"] == 2
+    assert totals["input_tokens"] == 120 and totals["output_tokens"] == 30
+    assert len(_reset) >= 2
+
+
+def test_validation_error_is_not_retried():
+    client = MagicMock()
+    client.invoke_model.side_effect = _client_error("ValidationException")
+
+    with pytest.raises(ClientError):
+        bedrock_gateway.invoke_text("prompt", {"maxTokens": 10}, client=client)
+
+    assert client.invoke_model.call_count == 1
+    assert bedrock_gateway.usage_totals()["errors"] == 1
+
+
+def test_gives_up_after_max_attempts(monkeypatch):
+    monkeypatch.setattr(bedrock_gateway, "MAX_ATTEMPTS", 3)
+    client = MagicMock()
+    client.invoke_model.side_effect = _client_error("ThrottlingException")
+
+    with pytest.raises(ClientError):
+        bedrock_gateway.invoke_text("prompt", {"maxTokens": 10}, client=client)
+
+    assert client.invoke_model.call_count == 3
+
+
+def test_deadline_stops_retrying_and_releases_slot(monkeypatch):
+    monkeypatch.setattr(bedrock_gateway, "_slots", bedrock_gateway.threading.BoundedSemaphore(1))
+    client = MagicMock()
+    client.invoke_model.side_effect = _client_error("ThrottlingException")
+    deadline = bedrock_gateway.time.monotonic() + 0.2
+
+    with patch.object(bedrock_gateway.random, "uniform", side_effect=lambda a, b: b):
+        with patch.object(bedrock_gateway, "_on_throttle", return_value=5.0):
+            with pytest.raises(TimeoutError):
+                bedrock_gateway.invoke_text("prompt", {"maxTokens": 10}, client=client, deadline=deadline)
+
+    # Espera de 5s passaria do prazo: sem sleep e sem segunda tentativa
+    assert client.invoke_model.call_count == 1
+    assert bedrock_gateway._slots.acquire(blocking=False)
+    bedrock_gateway._slots.release()
+
+
+def test_expired_deadline_skips_the_call(monkeypatch):
+    monkeypatch.setattr(bedrock_gateway, "_slots", bedrock_gateway.threading.BoundedSemaphore(1))
+    client = MagicMock()
+
+    with pytest.raises(TimeoutError):
+        bedrock_gateway.invoke_text(
+            "prompt", {"maxTokens": 10}, client=client, deadline=bedrock_gateway.time.monotonic() - 1
+        )
+
+    client.invoke_model.assert_not_called()
+    # Vaga ocupada por outra thread: não espera além do prazo
+    bedrock_gateway._slots.acquire()
+    with pytest.raises(TimeoutError):
+        bedrock_gateway.invoke_text(
+            "prompt", {"maxTokens": 10}, client=client, deadline=bedrock_gateway.time.monotonic() + 0.05
+        )
+    client.invoke_model.assert_not_called()
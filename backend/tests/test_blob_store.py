@@ -0,0 +1,109 @@
+"""Testes: blob_store (atributos grandes em S3 gzip + ponteiro no item)."""
+
+import gzip
+import json
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from botocore.exceptions import ClientError
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "lambdas"))
+
+from utils import blob_store  # noqa: E402
+from utils.process_snapshot import ProcessSnapshot  # noqa: E402
+
+
+class _FakeS3:
+    def __init__(self):
+        self.objects = {}
+        self.put_calls = 0
+        self.get_calls = 0
+
+    def head_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise ClientError({"Error": {"Code": "404"}}, "HeadObject")
+        return {}
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self.put_calls += 1
+        self.objects[(Bucket, Key)] = Body
+
+    def get_object(self, Bucket, Key):
+        self.get_calls += 1
+
+        class _Body:
+            def __init__(self, data):
+                self._data = data
+
+            def read(self):
+                return self._data
+
+        return {"Body": _Body(self.objects[(Bucket, Key)])}
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    fake = _FakeS3()
+    monkeypatch.setenv("BLOB_BUCKET", "blobs-bucket")
+    monkeypatch.setenv("BLOB_INLINE_MAX_BYTES", "1024")
+    blob_store._read_blob.cache_clear()
+    with patch.object(blob_store, "_s3", return_value=fake):
+        yield fake
+    blob_store._read_blob.cache_clear()
+
+
+def test_small_attributes_stay_inline(s3):
+    item = {"PK": "PROCESS#1", "SK": "TEXTRACT#a", "RAW_TEXT": "curto"}
+    assert blob_store.offload_large_attributes(item) == item
+    assert s3.put_calls == 0
+
+
+def test_large_attribute_becomes_content_addressed_pointer(s3):
+    merged = json.dumps({"textract_documents": [{"raw_text": "linha " * 2000}]})
+    item = {"PK": "PROCESS#1", "SK": "MERGED_EXTRACTION", "MERGED_DATA": merged, "TIMESTAMP": 1}
+
+    out = blob_store.offload_large_attributes(item)
+    pointer = out["MERGED_DATA"]
+    assert blob_store.is_blob_pointer(pointer)
+    assert pointer.startswith("blob+s3://blobs-bucket/blobs/")
+    assert item["MERGED_DATA"] == merged
+    (stored,) = s3.objects.values()
+    assert gzip.decompress(stored).decode("utf-8") == merged
+    assert len(stored) < len(merged)
+
+    again = blob_store.offload_large_attributes(item)
+    assert again["MERGED_DATA"] == pointer
+    assert s3.put_calls == 1
+
+    assert blob_store.resolve_blob(pointer) == merged
+    assert blob_store.resolve_item_blobs(out)["MERGED_DATA"] == merged
+    assert blob_store.resolve_blob("texto normal") == "texto normal"
+
+
+def test_no_bucket_keeps_item_inline(monkeypatch):
+    monkeypatch.delenv("BLOB_BUCKET", raising=False)
+    monkeypatch.delenv("BUCKET_NAME", raising=False)
+    item = {"SK": "TEXTRACT#a", "RAW_TEXT": "x" * 100_000}
+    assert blob_store.offload_large_attributes(item) is item
+
+
+def test_snapshot_resolves_pointers_once(s3):
+    tables = [{"rows": [["a", "b"]] * 200}]
+    raw_text = "página " * 500
+    stored = blob_store.offload_large_attributes({
+        "SK": "TEXTRACT#f1",
+        "RAW_TEXT": raw_text,
+        "TABLES_DATA": json.dumps(tables),
+    })
+    assert blob_store.is_blob_pointer(stored["RAW_TEXT"])
+    assert blob_store.is_blob_pointer(stored["TABLES_DATA"])
+    blob_store._read_blob.cache_clear()
+
+    snap = ProcessSnapshot("1", [stored])
+    item = snap.first_with_prefix("TEXTRACT#")
+    assert snap.text(item, "RAW_TEXT") == raw_text
+    assert snap.json(item, "TABLES_DATA") == tables
+    assert snap.text(item, "RAW_TEXT") == raw_text
+    assert s3.get_calls == 2
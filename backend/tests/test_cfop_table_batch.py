@@ -0,0 +1,164 @@
+"""Testes: resolução de CFOP × MAPPING (BatchGetItem direto e cache do container com VERSION)."""
+
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# lambdas/ antes de src/: utils.cfop_table só existe na Lambda
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "lambdas"))
+
+from utils import cfop_table  # noqa: E402
+from utils.cfop_table import (  # noqa: E402
+    clear_cfop_cache,
+    get_all_cfop_mappings_direct,
+    get_cfop_mappings_batch,
+)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    clear_cfop_cache()
+    yield
+    clear_cfop_cache()
+
+
+def _table(responses):
+    table = MagicMock()
+    table.name = "tbl"
+    table.meta.client.batch_get_item.side_effect = responses
+    return table
+
+
+def _resp(items, unprocessed=None):
+    out = {"Responses": {"tbl": items}}
+    if unprocessed:
+        out["UnprocessedKeys"] = {"tbl": {"Keys": unprocessed}}
+    return out
+
+
+def _mapping(mid, chave, ativo=True):
+    return {"PK": "CFOP_OPERATION", "SK": f"MAPPING#{mid}", "CHAVE": chave, "ATIVO": ativo}
+
+
+def test_batch_filters_inactive_mappings():
+    table = _table([
+        _resp([{"SK": "CFOP#5102", "MAPPING_ID": "m1", "MAPPING_IDS": ["m1", "m2"]}]),
+        _resp([_mapping("m1", "A"), _mapping("m2", "B", ativo=False)]),
+    ])
+    out = get_cfop_mappings_batch(table, ["5102"])["5102"]
+    assert [m["chave"] for m in out] == ["A"]
+    assert table.meta.client.batch_get_item.call_count == 2
+    table.get_item.assert_not_called()
+    table.query.assert_not_called()
+
+
+def test_multiple_cfops_share_two_round_trips():
+    table = _table([
+        _resp([
+            {"SK": "CFOP#5102", "MAPPING_ID": "m1"},
+            {"SK": "CFOP#6102", "MAPPING_IDS": ["m1", "m3"]},
+        ]),
+        _resp([_mapping("m1", "A"), _mapping("m3", "C")]),
+    ])
+    out = get_cfop_mappings_batch(table, ["5102", "6102", "1999"])
+    assert [m["chave"] for m in out["5102"]] == ["A"]
+    assert [m["chave"] for m in out["6102"]] == ["A", "C"]
+    assert out["1999"] == []
+    mapping_keys = table.meta.client.batch_get_item.call_args_list[1][1]["RequestItems"]["tbl"]["Keys"]
+    assert len(mapping_keys) == 2
+
+
+def test_unprocessed_keys_are_retried():
+    key = {"PK": "CFOP_OPERATION", "SK": "MAPPING#m1"}
+    table = _table([
+        _resp([{"SK": "CFOP#5102", "MAPPING_ID": "m1"}]),
+        _resp([], unprocessed=[key]),
+        _resp([_mapping("m1", "A")]),
+    ])
+    with patch("utils.dynamo_query.time.sleep") as sleep:
+        out = get_cfop_mappings_batch(table, ["5102"])["5102"]
+    assert [m["chave"] for m in out] == ["A"]
+    assert sleep.call_count == 1
+    retry = table.meta.client.batch_get_item.call_args_list[2][1]["RequestItems"]
+    assert retry == {"tbl": {"Keys": [key]}}
+
+
+def test_error_returns_empty():
+    table = _table(RuntimeError("boom"))
+    table.query.side_effect = RuntimeError("boom")
+    assert get_all_cfop_mappings_direct(table, "5102") == []
+    assert get_all_cfop_mappings_direct(table, ["5102"]) == {}
+
+
+def _cached_table(version=1):
+    table = MagicMock()
+    table.name = "tbl"
+    table.get_item.return_value = {"Item": {"VERSION": version}}
+    table.query.return_value = {"Items": [
+        {"SK": "CFOP#5102", "MAPPING_IDS": ["m1", "m2"]},
+        {"SK": "CFOP#6102", "MAPPING_ID": "m1"},
+        _mapping("m1", "A"),
+        _mapping("m2", "B", ativo=False),
+        {"SK": "VERSION", "VERSION": version},
+    ]}
+    return table
+
+
+def test_cache_serves_repeated_lookups_from_memory():
+    table = _cached_table()
+    assert [m["chave"] for m in get_all_cfop_mappings_direct(table, "5102")] == ["A"]
+    out = get_all_cfop_mappings_direct(table, ["5102", "6102", "1999"])
+    assert [m["chave"] for m in out["6102"]] == ["A"]
+    assert out["1999"] == []
+    assert table.query.call_count == 1
+    assert table.get_item.call_count == 1
+    table.meta.client.batch_get_item.assert_not_called()
+
+
+def test_cache_reloads_only_when_version_changes():
+    table = _cached_table(version=1)
+    with patch.object(cfop_table._cache, "check_seconds", 0):
+        get_all_cfop_mappings_direct(table, "5102")
+        get_all_cfop_mappings_direct(table, "5102")
+        assert table.query.call_count == 1
+        assert table.get_item.call_count == 2
+
+        table.get_item.return_value = {"Item": {"VERSION": 2}}
+        get_all_cfop_mappings_direct(table, "5102")
+        assert table.query.call_count == 2
+
+
+def _danfe(*cfops):
+    return {"produtos": [{"codigo": f"P{i}", "cfop": c} for i, c in enumerate(cfops)]}
+
+
+def test_rule_resolves_every_line_cfop_in_one_lookup():
+    from validate_rules.rules import validar_cfop_chave
+
+    by_cfop = {"5102": [{"chave": "A", "descricao": "Revenda"}], "5405": [{"chave": "B"}]}
+    with patch.object(validar_cfop_chave, "boto3"), patch.object(
+        validar_cfop_chave, "get_all_cfop_mappings_direct", return_value=by_cfop
+    ) as lookup:
+        result = validar_cfop_chave.validate(_danfe("5102", "5405", "5102"), [])
+
+    lookup.assert_called_once()
+    assert lookup.call_args.args[1] == ["5102", "5405"]
+    assert result["status"] == "PASSED"
+    assert result["cfop_data"]["chave"] == "A"
+    assert [c["status"] for c in result["comparisons"]] == ["MATCH", "MATCH"]
+
+
+def test_unmapped_line_cfop_does_not_fail_the_rule():
+    from validate_rules.rules import validar_cfop_chave
+
+    by_cfop = {"5102": [{"chave": "A"}], "6108": []}
+    with patch.object(validar_cfop_chave, "boto3"), patch.object(
+        validar_cfop_chave, "get_all_cfop_mappings_direct", return_value=by_cfop
+    ):
+        result = validar_cfop_chave.validate(_danfe("5102", "6108"), [])
+
+    assert result["status"] == "PASSED"
+    assert result["cfop_data"]["chave"] == "A"
+    assert [c["status"] for c in result["comparisons"]] == ["MATCH"]
@@ -0,0 +1,174 @@
+"""
+Tests for DashboardService (leitura em lote dos METRICS#{dia}/SUMMARY)
+
+Covers:
+- Período longo (90 dias) em uma única chamada BatchGetItem, sem GetItem por dia
+- Horas UTC → BRT usando o item do dia seguinte do mesmo lote
+- Dias sem item → métricas zeradas
+- Totais do período e dos últimos 7 dias saem dos rollups semana/mês (bordas = dias já lidos)
+- Outros e success_classified do período calculados sobre os totais, não por dia
+"""
+
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+
+def _build_service(items):
+    with patch("src.services.dashboard_service.boto3"):
+        from src.services.dashboard_service import DashboardService
+        service = DashboardService()
+    table = MagicMock()
+    table.name = "tbl"
+
+    def batch_get_item(RequestItems):
+        keys = RequestItems["tbl"]["Keys"]
+        found = [items[k["PK"]] for k in keys if k["PK"] in items and items[k["PK"]]["SK"] == k["SK"]]
+        return {"Responses": {"tbl": found}}
+
+    table.meta.client.batch_get_item.side_effect = batch_get_item
+    service.table = table
+    return service, table
+
+
+def _summary(date, **attrs):
+    return {"PK": f"METRICS#{date}", "SK": "SUMMARY", **attrs}
+
+
+class TestDashboardService:
+
+    def test_long_period_reads_days_in_one_batch(self):
+        service, table = _build_service({
+            "METRICS#2026-01-10": _summary(
+                "2026-01-10", total_count=4, success_count=3, failed_count=1,
+                total_time=40, failed_rules={"validar_serie": 1},
+            ),
+        })
+        result = service.get_dashboard_metrics("2026-01-01", "2026-03-31")
+
+        assert len(result["period"]) == 90
+        # 1ª leitura: dias (+ dia seguinte); 2ª: rollups dos 3 meses + CONFIG
+        assert table.meta.client.batch_get_item.call_count == 2
+        table.get_item.assert_not_called()
+        request = table.meta.client.batch_get_item.call_args_list[0][1]["RequestItems"]["tbl"]
+        assert len(request["Keys"]) == 91
+        assert "failure_dedup_registry" not in request["ExpressionAttributeNames"].values()
+        assert result["summary"]["total"] == 4
+        assert result["failed_rules"] == {"validar_serie": 1}
+
+    def test_hourly_brt_uses_next_day_from_same_batch(self):
+        service, table = _build_service({
+            "METRICS#2026-01-10": _summary(
+                "2026-01-10", total_count=2, processes_by_hour={"1": 1, "15": 1},
+            ),
+            "METRICS#2026-01-11": _summary(
+                "2026-01-11", total_count=1, processes_by_hour={"2": 1},
+            ),
+        })
+        metrics = service.get_metrics_for_dates(["2026-01-10", "2026-01-11"])
+
+        assert metrics["2026-01-10"]["processes_by_hour"] == {"12": 1, "23": 1}
+        assert metrics["2026-01-11"]["processes_by_hour"] == {}
+        assert table.meta.client.batch_get_item.call_count == 1
+
+    def test_missing_day_returns_zeroed_metrics(self):
+        service, _ = _build_service({})
+        day = service.get_metrics_by_date("2026-02-01")
+        assert day["total_count"] == 0
+        assert day["processes_by_hour"] == {}
+
+    def test_period_aggregates_read_month_rollups(self):
+        items = {
+            "METRICS_ROLLUP": {"PK": "METRICS_ROLLUP", "SK": "CONFIG", "SINCE": "2025-01-01"},
+        }
+        for month in range(1, 13):
+            pk = f"METRICS#2026-{month:02d}"
+            items[pk] = {
+                "PK": pk, "SK": "MONTH_ROLLUP", "total_count": 10, "success_count": 8,
+                "failed_count": 2, "total_time": 100, "failed_rules": {"validar_serie": 1},
+            }
+        service, table = _build_service(items)
+        result = service.get_dashboard_metrics("2026-01-01", "2026-12-31", include_days=False)
+
+        assert "period" not in result
+        assert result["summary"]["total"] == 120
+        assert result["summary"]["avg_processing_time"] == 10
+        assert result["failed_rules"] == {"validar_serie": 12, "Outros": 12}
+        assert table.meta.client.batch_get_item.call_count == 1
+        keys = table.meta.client.batch_get_item.call_args[1]["RequestItems"]["tbl"]["Keys"]
+        assert len(keys) == 13
+
+    def test_period_view_totals_come_from_trusted_rollups(self):
+        items = {
+            "METRICS#2026-01-10": _summary("2026-01-10", total_count=1, success_count=1),
+            "METRICS#2026-01-31": _summary("2026-01-31", total_count=2, failed_count=2),
+        }
+        for pk in ("METRICS#2026-01", "METRICS#2026-02"):
+            items[pk] = {
+                "PK": pk, "SK": "MONTH_ROLLUP", "BACKFILLED": True, "total_count": 10,
+                "success_count": 10, "processes_by_type": {"AGROQUIMICOS": 10},
+            }
+        service, table = _build_service(items)
+        result = service.get_dashboard_metrics("2026-01-01", "2026-02-28")
+
+        assert len(result["period"]) == 59
+        assert result["period"][9]["total"] == 1
+        assert result["summary"]["total"] == 20
+        assert result["processes_by_type"] == {"AGROQUIMICOS": 20}
+        assert table.meta.client.batch_get_item.call_count == 2
+        rollup_keys = table.meta.client.batch_get_item.call_args[1]["RequestItems"]["tbl"]["Keys"]
+        assert len(rollup_keys) == 3
+
+    def test_last_7_days_summary_uses_week_rollup(self):
+        class _Sunday(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return cls(2026, 3, 15, 12, 0)
+
+        service, table = _build_service({
+            "METRICS#2026-03-15": _summary("2026-03-15", total_count=1, success_count=1),
+            "METRICS#2026-W11": {
+                "PK": "METRICS#2026-W11", "SK": "WEEK_ROLLUP", "BACKFILLED": True,
+                "total_count": 7, "success_count": 5, "failed_count": 2, "total_time": 70,
+            },
+        })
+        with patch("src.services.dashboard_service.datetime", _Sunday):
+            result = service.get_dashboard_metrics()
+
+        assert result["today"]["total_count"] == 1
+        assert [d["total"] for d in result["last_7_days"]] == [1, 0, 0, 0, 0, 0, 0]
+        assert result["summary"]["total_week"] == 7
+        assert result["summary"]["failed_week"] == 2
+        assert result["summary"]["avg_processing_time"] == 10
+        assert table.meta.client.batch_get_item.call_count == 2
+
+    def test_untrusted_rollup_falls_back_to_days(self):
+        service, table = _build_service({
+            "METRICS#2026-02": {"PK": "METRICS#2026-02", "SK": "MONTH_ROLLUP", "total_count": 1},
+            "METRICS#2026-02-10": _summary("2026-02-10", total_count=5, success_count=5),
+        })
+        result = service.get_period_aggregates("2026-02-01", "2026-02-28")
+
+        assert result["summary"]["total"] == 5
+        assert table.meta.client.batch_get_item.call_count == 2
+
+    def test_period_gap_and_classified_use_period_totals(self):
+        service, _ = _build_service({
+            # 1 falha contada em 2 regras; pré-notas acima dos sucessos
+            "METRICS#2026-02-10": _summary(
+                "2026-02-10", total_count=3, success_count=1, success_prenota_count=2,
+                failed_count=1, failed_rules={"validar_serie": 1, "validar_cfop_chave": 1},
+            ),
+            "METRICS#2026-02-11": _summary(
+                "2026-02-11", total_count=5, success_count=3, failed_count=2,
+            ),
+        })
+        result = service.get_dashboard_metrics("2026-02-10", "2026-02-11")
+
+        # Por dia: Outros 0 + 2 e classificados 0 + 3
+        assert result["period"][1]["failed_rules"] == {"Outros": 2}
+        assert [d["success_classified"] for d in result["period"]] == [0, 3]
+        # Período: 3 falhas - 2 atribuídas = 1 e 4 sucessos - 2 pré-notas = 2
+        assert result["failed_rules"] == {
+            "validar_serie": 1, "validar_cfop_chave": 1, "Outros": 1,
+        }
+        assert result["summary"]["success_classified"] == 2
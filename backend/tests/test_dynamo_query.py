@@ -0,0 +1,59 @@
+"""Testes: leitura paginada de partições (LastEvaluatedKey, projeção, max_items)."""
+
+from unittest.mock import MagicMock
+
+from utils.dynamo_query import build_partition_query, iter_partition, query_partition
+
+
+def _paged_table(*pages):
+    """Mock de table.query devolvendo as páginas em sequência com LastEvaluatedKey."""
+    table = MagicMock()
+    responses = []
+    for idx, items in enumerate(pages):
+        resp = {"Items": list(items)}
+        if idx < len(pages) - 1:
+            resp["LastEvaluatedKey"] = {"PK": "PROCESS#p1", "SK": items[-1]["SK"]}
+        responses.append(resp)
+    table.query.side_effect = responses
+    return table
+
+
+def _item(sk):
+    return {"PK": "PROCESS#p1", "SK": sk}
+
+
+def test_query_partition_follows_last_evaluated_key():
+    table = _paged_table([_item("FILE#a"), _item("FILE#b")], [_item("METADATA")])
+    items = query_partition(table, "PROCESS#p1")
+    assert [it["SK"] for it in items] == ["FILE#a", "FILE#b", "METADATA"]
+    assert table.query.call_count == 2
+    second_kwargs = table.query.call_args_list[1][1]
+    assert second_kwargs["ExclusiveStartKey"] == {"PK": "PROCESS#p1", "SK": "FILE#b"}
+
+
+def test_max_items_stops_without_fetching_next_page():
+    table = _paged_table([_item("VALIDATION#2")], [_item("VALIDATION#1")])
+    items = list(iter_partition(table, "PROCESS#p1", max_items=1, scan_forward=False))
+    assert [it["SK"] for it in items] == ["VALIDATION#2"]
+    assert table.query.call_count == 1
+    kwargs = table.query.call_args[1]
+    assert kwargs["Limit"] == 1
+    assert kwargs["ScanIndexForward"] is False
+
+
+def test_build_partition_query_sk_prefix_and_projection_placeholders():
+    kwargs = build_partition_query(
+        "PROCESS#p1", sk_prefix="FILE#", projection=("STATUS", "FILE_KEY", "SK")
+    )
+    assert kwargs["KeyConditionExpression"] == "PK = :pk AND begins_with(SK, :sk)"
+    assert kwargs["ExpressionAttributeValues"] == {":pk": "PROCESS#p1", ":sk": "FILE#"}
+    names = kwargs["ExpressionAttributeNames"]
+    assert sorted(names.values()) == ["FILE_KEY", "PK", "SK", "STATUS"]
+    assert kwargs["ProjectionExpression"] == ", ".join(names.keys())
+
+
+def test_iter_partition_stops_on_malformed_last_evaluated_key():
+    table = MagicMock()
+    table.query.return_value = MagicMock()
+    assert list(iter_partition(table, "PROCESS#p1")) == []
+    assert table.query.call_count == 1
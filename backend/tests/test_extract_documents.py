@@ -6,6 +6,10 @@ Covers:
 - Extension gating: rejects unsupported formats (e.g. .docx)
 - Happy path: calls Textract and persists results
 - Empty process: 0 non-XML files → extracted_count = 0
+- Async Textract: todas as páginas via NextToken; marcador de retomada quando o prazo acaba
+- Staging do Textract: cópia server-side com chave por hash; reprocessamento não copia de novo
+- Cache de OCR por CONTENT_SHA256: hit grava TEXTRACT# sem Textract; miss grava o cache
+- FORMS: pares KEY_VALUE_SET com confiança gravados em FORMS_DATA
 """
 
 import io
@@ -197,6 +201,267 @@ class TestExtractDocumentsHappyPath:
         assert mock_table.put_item.call_args[1]["Item"]["SK"] == "TEXTRACT#doc.pdf"
 
 
+class TestTextractForms:
+    """KEY_VALUE_SET (FeatureTypes FORMS) → FORMS_DATA ao lado de TABLES_DATA."""
+
+    _blocks = [
+        {"BlockType": "LINE", "Id": "l1", "Text": "Vencimento 10/05/2025"},
+        {"BlockType": "KEY_VALUE_SET", "Id": "k1", "EntityTypes": ["KEY"], "Confidence": 96.4, "Page": 1,
+         "Relationships": [{"Type": "VALUE", "Ids": ["v1"]}, {"Type": "CHILD", "Ids": ["w1"]}]},
+        {"BlockType": "KEY_VALUE_SET", "Id": "v1", "EntityTypes": ["VALUE"], "Confidence": 88.123,
+         "Relationships": [{"Type": "CHILD", "Ids": ["w2"]}]},
+        {"BlockType": "WORD", "Id": "w1", "Text": "Vencimento"},
+        {"BlockType": "WORD", "Id": "w2", "Text": "10/05/2025"},
+        {"BlockType": "KEY_VALUE_SET", "Id": "k2", "EntityTypes": ["KEY"], "Confidence": 90.0,
+         "Relationships": [{"Type": "VALUE", "Ids": ["v2"]}, {"Type": "CHILD", "Ids": ["w3"]}]},
+        {"BlockType": "KEY_VALUE_SET", "Id": "v2", "EntityTypes": ["VALUE"], "Confidence": 95.0,
+         "Relationships": [{"Type": "CHILD", "Ids": ["s1"]}]},
+        {"BlockType": "WORD", "Id": "w3", "Text": "Aceite"},
+        {"BlockType": "SELECTION_ELEMENT", "Id": "s1", "SelectionStatus": "SELECTED"},
+    ]
+
+    def test_key_value_pairs_with_min_confidence(self):
+        from extract_documents.handler import _extract_text_tables_and_forms
+
+        raw_text, tables, forms = _extract_text_tables_and_forms(self._blocks)
+
+        assert raw_text == "Vencimento 10/05/2025"
+        assert tables == []
+        assert forms == [
+            {"key": "Vencimento", "value": "10/05/2025", "confidence": 88.1, "page": 1},
+            {"key": "Aceite", "value": "[X]", "confidence": 90.0, "page": None},
+        ]
+
+    @patch("extract_documents.handler.textract")
+    @patch("extract_documents.handler.s3")
+    @patch("extract_documents.handler.table")
+    def test_forms_persisted_next_to_tables(self, mock_table, mock_s3, mock_textract):
+        from extract_documents.handler import handler
+
+        mock_table.query.return_value = {"Items": [_file_item("boleto.png", key="processes/p1/docs/boleto.png")]}
+        mock_s3.head_object.return_value = {"ContentLength": 1000}
+        mock_s3.get_object.return_value = {"Body": io.BytesIO(b"\x89PNG fake")}
+        mock_textract.analyze_document.return_value = {"Blocks": list(self._blocks)}
+
+        handler({"process_id": "p1"}, None)
+
+        saved = mock_table.put_item.call_args_list[0][1]["Item"]
+        assert saved["FORM_COUNT"] == 2
+        assert json.loads(saved["FORMS_DATA"])[0]["key"] == "Vencimento"
+
+
+class TestExtractDocumentsAsync:
+    """PDF acima do limite síncrono → StartDocumentAnalysis + poll paginado."""
+
+    _event = {
+        "process_id": "p1",
+        "file_name": "grande.pdf",
+        "file_key": "processes/p1/docs/grande.pdf",
+        "file_sk": "FILE#grande.pdf",
+    }
+
+    @patch("extract_documents.handler.time.sleep")
+    @patch("extract_documents.handler.TEXTRACT_ASYNC_STAGING_BUCKET", "staging")
+    @patch("extract_documents.handler.boto3")
+    @patch("extract_documents.handler.textract")
+    @patch("extract_documents.handler.s3")
+    @patch("extract_documents.handler.table")
+    def test_collects_every_result_page(self, mock_table, mock_s3, mock_textract, _boto3, mock_sleep):
+        from extract_documents.handler import handler
+
+        mock_s3.head_object.return_value = {"ContentLength": 20 * 1024 * 1024}
+        mock_s3.get_object.return_value = {"Body": _pdf_body(1000)}
+        mock_textract.start_document_analysis.return_value = {"JobId": "job-1"}
+        mock_textract.get_document_analysis.side_effect = [
+            {"JobStatus": "IN_PROGRESS"},
+            {"JobStatus": "SUCCEEDED", "NextToken": "t1",
+             "Blocks": [{"BlockType": "LINE", "Id": "1", "Text": "Pagina 1"}]},
+            {"JobStatus": "SUCCEEDED", "NextToken": "t2",
+             "Blocks": [{"BlockType": "LINE", "Id": "2", "Text": "Pagina 2"}]},
+            {"JobStatus": "SUCCEEDED",
+             "Blocks": [{"BlockType": "LINE", "Id": "3", "Text": "Pagina 3"}]},
+        ]
+
+        result = handler(dict(self._event), None)
+
+        assert result["extracted_count"] == 1
+        item = mock_table.put_item.call_args[1]["Item"]
+        assert item["RAW_TEXT"] == "Pagina 1\nPagina 2\nPagina 3"
+        assert item["JOB_ID"] == "job-1"
+        tokens = [c.kwargs.get("NextToken") for c in mock_textract.get_document_analysis.call_args_list]
+        assert tokens == [None, None, "t1", "t2"]
+        assert mock_sleep.call_args_list[0].args[0] == 1.0
+
+    @patch("extract_documents.handler.time.sleep")
+    @patch("extract_documents.handler.textract")
+    @patch("extract_documents.handler.s3")
+    @patch("extract_documents.handler.table")
+    def test_returns_resume_marker_when_lambda_time_runs_out(self, mock_table, mock_s3, mock_textract, _sleep):
+        from extract_documents.handler import handler
+
+        mock_textract.get_document_analysis.return_value = {"JobStatus": "IN_PROGRESS"}
+        context = MagicMock()
+        context.get_remaining_time_in_millis.return_value = 10_000
+
+        result = handler({**self._event, "textract_job_id": "job-1"}, context)
+
+        assert result["textract_pending"] is True
+        assert result["textract_job_id"] == "job-1"
+        assert result["attachment"]["file_sk"] == "FILE#grande.pdf"
+        mock_textract.start_document_analysis.assert_not_called()
+        mock_s3.head_object.assert_not_called()
+        mock_table.put_item.assert_not_called()
+
+
+class TestTextractStaging:
+    """PDF grande → staging na região do Textract sem baixar o arquivo na Lambda."""
+
+    _head = {"ContentLength": 20 * 1024 * 1024, "ETag": '"abc123"'}
+
+    @patch("extract_documents.handler.TEXTRACT_ASYNC_STAGING_BUCKET", "staging")
+    @patch("extract_documents.handler.boto3")
+    @patch("extract_documents.handler.s3")
+    def test_server_side_copy_with_content_hash_key(self, mock_s3, mock_boto3):
+        from extract_documents.handler import _stage_for_textract
+
+        mock_s3.head_object.return_value = dict(self._head)
+        s3_tx = mock_boto3.client.return_value
+        s3_tx.head_object.side_effect = ClientError({"Error": {"Code": "404"}}, "HeadObject")
+
+        staging_key = _stage_for_textract("bkt", "processes/p1/docs/Grande.PDF")
+
+        assert staging_key == "textract-staging/etag-abc123.pdf"
+        args, kwargs = s3_tx.copy.call_args
+        assert args == ({"Bucket": "bkt", "Key": "processes/p1/docs/Grande.PDF"}, "staging", staging_key)
+        assert kwargs["SourceClient"] is mock_s3
+        mock_s3.get_object.assert_not_called()
+        s3_tx.put_object.assert_not_called()
+
+    @patch("extract_documents.handler.TEXTRACT_ASYNC_STAGING_BUCKET", "staging")
+    @patch("extract_documents.handler.boto3")
+    @patch("extract_documents.handler.s3")
+    def test_rerun_reuses_staged_object(self, mock_s3, mock_boto3):
+        from extract_documents.handler import _stage_for_textract
+
+        mock_s3.head_object.return_value = dict(self._head)
+        s3_tx = mock_boto3.client.return_value
+        s3_tx.head_object.return_value = {"ContentLength": self._head["ContentLength"]}
+
+        assert _stage_for_textract("bkt", "processes/p1/docs/grande.pdf") == "textract-staging/etag-abc123.pdf"
+        s3_tx.copy.assert_not_called()
+        s3_tx.upload_fileobj.assert_not_called()
+
+    @patch("extract_documents.handler.TEXTRACT_REGION", "us-east-1")
+    @patch("extract_documents.handler.TEXTRACT_ASYNC_STAGING_BUCKET", "staging")
+    @patch("extract_documents.handler.boto3")
+    @patch("extract_documents.handler.s3")
+    def test_cross_region_denied_copy_streams_object(self, mock_s3, mock_boto3):
+        from extract_documents.handler import _stage_for_textract
+
+        mock_s3.meta.region_name = "sa-east-1"
+        mock_s3.head_object.return_value = dict(self._head)
+        body = _pdf_body(1000)
+        mock_s3.get_object.return_value = {"Body": body}
+        s3_tx = mock_boto3.client.return_value
+        s3_tx.head_object.side_effect = ClientError({"Error": {"Code": "404"}}, "HeadObject")
+        s3_tx.copy.side_effect = ClientError({"Error": {"Code": "AccessDenied"}}, "CopyObject")
+
+        _stage_for_textract("bkt", "processes/p1/docs/grande.pdf")
+
+        s3_tx.upload_fileobj.assert_called_once_with(body, "staging", "textract-staging/etag-abc123.pdf")
+
+
+class TestOcrCache:
+    """OCR_CACHE#{sha256}: mesmo arquivo em outro processo não passa pelo Textract."""
+
+    _sha = "ab" * 32
+    _event = {
+        "process_id": "p2",
+        "file_name": "boleto.pdf",
+        "file_key": "processes/p2/docs/boleto.pdf",
+        "file_sk": "FILE#boleto.pdf",
+        "content_sha256": "ab" * 32,
+    }
+
+    @patch("extract_documents.handler.textract")
+    @patch("extract_documents.handler.s3")
+    @patch("extract_documents.handler.table")
+    def test_cache_hit_skips_textract(self, mock_table, mock_s3, mock_textract):
+        from extract_documents.handler import handler
+
+        mock_table.get_item.return_value = {"Item": {
+            "PK": f"OCR_CACHE#{self._sha}",
+            "SK": "V#2",
+            "RAW_TEXT": "Linha do boleto",
+            "TABLES_DATA": json.dumps([{"rows": [["a", "b"]]}]),
+            "PROTHEUS_HINTS": json.dumps({"valorDocumento": "10,00"}),
+            "TEXTRACT_MODE": "analyze_document",
+            "JOB_ID": "sync",
+            "EXPIRES_AT": 2 ** 40,
+        }}
+
+        result = handler(dict(self._event), None)
+
+        assert result["extracted_count"] == 1
+        mock_table.get_item.assert_called_once_with(Key={"PK": f"OCR_CACHE#{self._sha}", "SK": "V#2"})
+        mock_s3.head_object.assert_not_called()
+        mock_textract.analyze_document.assert_not_called()
+        saved = mock_table.put_item.call_args[1]["Item"]
+        assert saved["PK"] == "PROCESS#p2"
+        assert saved["RAW_TEXT"] == "Linha do boleto"
+        assert saved["TEXTRACT_MODE"] == "analyze_document"
+        assert json.loads(saved["PROTHEUS_HINTS"]) == {"valorDocumento": "10,00"}
+
+    @patch("extract_documents.handler.textract")
+    @patch("extract_documents.handler.s3")
+    @patch("extract_documents.handler.table")
+    def test_cache_miss_runs_textract_and_stores_entry(self, mock_table, mock_s3, mock_textract):
+        from extract_documents.handler import handler
+
+        mock_table.get_item.return_value = {"Item": {"PK": f"OCR_CACHE#{self._sha}", "SK": "V#2", "EXPIRES_AT": 1}}
+        mock_s3.head_object.return_value = {"ContentLength": 1000}
+        mock_s3.get_object.return_value = {"Body": io.BytesIO(b"\x89PNG fake")}
+        mock_textract.analyze_document.return_value = {
+            "Blocks": [{"BlockType": "LINE", "Id": "1", "Text": "Texto OCR"}],
+        }
+
+        handler({**self._event, "file_name": "boleto.png", "file_key": "processes/p2/docs/boleto.png"}, None)
+
+        mock_textract.analyze_document.assert_called_once()
+        cached = mock_table.put_item.call_args[1]["Item"]
+        assert cached["PK"] == f"OCR_CACHE#{self._sha}"
+        assert cached["RAW_TEXT"] == "Texto OCR"
+        assert cached["TEXTRACT_MODE"] == "analyze_document"
+        assert cached["EXPIRES_AT"] > cached["TIMESTAMP"]
+
+    @pytest.mark.parametrize("failure", ["dynamo", "json"])
+    @patch("extract_documents.handler.textract")
+    @patch("extract_documents.handler.s3")
+    @patch("extract_documents.handler.table")
+    def test_unreadable_cache_falls_back_to_textract(self, mock_table, mock_s3, mock_textract, failure):
+        from extract_documents.handler import handler
+
+        if failure == "dynamo":
+            mock_table.get_item.side_effect = ClientError(
+                {"Error": {"Code": "ProvisionedThroughputExceededException", "Message": "slow down"}}, "GetItem"
+            )
+        else:
+            mock_table.get_item.return_value = {"Item": {
+                "PK": f"OCR_CACHE#{self._sha}", "SK": "V#2", "RAW_TEXT": "x",
+                "TABLES_DATA": "{corrompido", "EXPIRES_AT": 2 ** 40,
+            }}
+        mock_s3.head_object.return_value = {"ContentLength": 1000}
+        mock_s3.get_object.return_value = {"Body": io.BytesIO(b"\x89PNG fake")}
+        mock_textract.analyze_document.return_value = {
+            "Blocks": [{"BlockType": "LINE", "Id": "1", "Text": "Texto OCR"}],
+        }
+
+        result = handler({**self._event, "file_name": "boleto.png", "file_key": "processes/p2/docs/boleto.png"}, None)
+
+        assert result["extracted_count"] == 1
+        mock_textract.analyze_document.assert_called_once()
+
+
 class TestExtractDocumentsRasterFallback:
     """AnalyzeDocument + DetectDocumentText unsupported → raster PNG por página."""
 
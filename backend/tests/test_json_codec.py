@@ -0,0 +1,62 @@
+"""Testes: json_codec (atributos JSON como Binary comprimido + formato String legado)."""
+
+import json
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+from boto3.dynamodb.types import Binary
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "lambdas"))
+
+from utils import json_codec  # noqa: E402
+from utils.dynamo_query import query_partition  # noqa: E402
+
+
+def _validation_results():
+    return [{"rule": f"validar_{i}", "status": "PASSED", "message": "ok " * 20} for i in range(30)]
+
+
+def test_roundtrip_keeps_legacy_text():
+    text = json.dumps(_validation_results())
+    encoded = json_codec.encode_attribute(text)
+    assert isinstance(encoded, Binary)
+    assert encoded.value[0] == json_codec.CODEC_VERSION_ZLIB
+    assert len(encoded.value) * 3 < len(text)
+    assert json_codec.decode_attribute(encoded) == text
+    assert json_codec.decode_attribute(bytes(encoded.value)) == text
+
+
+def test_small_or_legacy_values_stay_strings():
+    assert json_codec.encode_attribute('{"a":1}') == '{"a":1}'
+    assert json_codec.decode_attribute('{"a":1}') == '{"a":1}'
+    assert json_codec.decode_attribute(None) is None
+    with pytest.raises(ValueError):
+        json_codec.decode_attribute(Binary(b"\x07abc"))
+
+
+def test_encode_and_decode_item_only_touch_codec_attributes():
+    item = {
+        "PK": "PROCESS#1",
+        "SK": "VALIDATION#1",
+        "VALIDATION_RESULTS": json.dumps(_validation_results()),
+        "VALIDATION_STATUS": "PASSED",
+    }
+    encoded = json_codec.encode_item(item)
+    assert isinstance(encoded["VALIDATION_RESULTS"], Binary)
+    assert encoded["VALIDATION_STATUS"] == "PASSED"
+    assert json_codec.decode_item(encoded) == item
+    assert json_codec.decode_item(item) is item
+
+
+def test_partition_reads_return_decoded_text():
+    metadados = json.dumps({"requestBody": {"itens": [{"codigo": str(i)} for i in range(50)]}})
+    table = MagicMock()
+    table.query.return_value = {"Items": [
+        json_codec.encode_item({"PK": "PROCESS#1", "SK": "PEDIDO_COMPRA_METADATA", "METADADOS": metadados}),
+        {"PK": "PROCESS#1", "SK": "FILE#a", "METADADOS": '{"legado": true}'},
+    ]}
+    items = query_partition(table, "PROCESS#1")
+    assert items[0]["METADADOS"] == metadados
+    assert items[1]["METADADOS"] == '{"legado": true}'
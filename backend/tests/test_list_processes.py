@@ -0,0 +1,111 @@
+"""
+Tests for ProcessService.list_processes (GSI ProcessListIndex + cursor)
+
+Covers:
+- One Query per page without filters, no per-process METADATA reads
+- next_cursor round-trip (opaque, decodes to ExclusiveStartKey)
+- Filters: status/process_type (FilterExpression) and dates (key condition)
+- Invalid cursor / date → ValueError
+"""
+
+import pytest
+from unittest.mock import patch
+
+from src.utils.process_list import (
+    build_process_list_query,
+    decode_cursor,
+    encode_cursor,
+    process_list_keys,
+)
+
+
+def _build_service():
+    with patch("src.services.process_service.DynamoDBRepository"), \
+         patch("src.services.process_service.boto3"):
+        from src.services.process_service import ProcessService
+        service = ProcessService()
+        return service, service.repository
+
+
+def _row(process_id, ts, status="COMPLETED"):
+    return {
+        "PK": f"PROCESS#{process_id}", "SK": "METADATA",
+        "STATUS": status, "PROCESS_TYPE": "AGROQUIMICOS", "TIMESTAMP": ts,
+        **process_list_keys(process_id, ts),
+    }
+
+
+class TestListProcesses:
+
+    def test_single_query_per_page(self):
+        service, repo = _build_service()
+        rows = [_row("p2", 1700000200), _row("p1", 1700000100)]
+        repo.query_page.return_value = (rows, None)
+
+        page = service.list_processes(limit=10)
+
+        assert repo.query_page.call_count == 1
+        repo.query_by_pk_and_sk_prefix.assert_not_called()
+        kwargs = repo.query_page.call_args[1]
+        assert kwargs["IndexName"] == "ProcessListIndex"
+        assert kwargs["ScanIndexForward"] is False
+        assert kwargs["Limit"] == 10
+        assert [p["process_id"] for p in page["processes"]] == ["p2", "p1"]
+        assert page["processes"][0]["created_at"] == "1700000200"
+        assert page["next_cursor"] is None
+
+    def test_next_cursor_from_last_evaluated_key(self):
+        service, repo = _build_service()
+        rows = [_row("p2", 1700000200)]
+        last_key = {k: rows[0][k] for k in ("PK", "SK", "LIST_PK", "LIST_SK")}
+        repo.query_page.return_value = (rows, last_key)
+
+        page = service.list_processes(limit=1)
+
+        assert decode_cursor(page["next_cursor"]) == last_key
+        service.list_processes(limit=1, cursor=page["next_cursor"])
+        assert repo.query_page.call_args[1]["ExclusiveStartKey"] == last_key
+
+    def test_filters_fill_page_and_truncate_with_cursor(self):
+        service, repo = _build_service()
+        first = [_row("p5", 500, "FAILED")]
+        second = [_row("p3", 300, "FAILED"), _row("p2", 200, "FAILED")]
+        repo.query_page.side_effect = [
+            (first, {"PK": "PROCESS#p4", "SK": "METADATA", "LIST_PK": "PROCESS_LIST", "LIST_SK": "x"}),
+            (second, None),
+        ]
+
+        page = service.list_processes(limit=2, status="FAILED")
+
+        assert repo.query_page.call_count == 2
+        assert "FilterExpression" in repo.query_page.call_args_list[0][1]
+        assert [p["process_id"] for p in page["processes"]] == ["p5", "p3"]
+        assert decode_cursor(page["next_cursor"])["PK"] == "PROCESS#p3"
+
+    def test_invalid_cursor(self):
+        service, _ = _build_service()
+        with pytest.raises(ValueError):
+            service.list_processes(cursor="not-a-cursor")
+
+
+class TestProcessListQuery:
+
+    def test_date_range_is_key_condition(self):
+        kwargs = build_process_list_query(page_size=10, date_from="2024-01-15", date_to="2024-01-15")
+        assert "BETWEEN" in kwargs["KeyConditionExpression"]
+        lo = kwargs["ExpressionAttributeValues"][":lo"]
+        hi = kwargs["ExpressionAttributeValues"][":hi"]
+        inside = process_list_keys("p1", 1705320000)["LIST_SK"]  # 2024-01-15T12:00Z
+        next_day = process_list_keys("p2", 1705363200)["LIST_SK"]  # 2024-01-16T00:00Z
+        assert lo <= inside <= hi
+        assert next_day > hi
+
+    def test_invalid_date(self):
+        with pytest.raises(ValueError):
+            build_process_list_query(page_size=10, date_from="15/01/2024")
+
+    def test_cursor_round_trip(self):
+        row = _row("p1", 1700000000)
+        assert decode_cursor(encode_cursor(row)) == {
+            k: row[k] for k in ("PK", "SK", "LIST_PK", "LIST_SK")
+        }
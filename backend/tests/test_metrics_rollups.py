@@ -0,0 +1,52 @@
+"""Testes: rollups semana ISO / mês (chaves, cobertura de intervalo, soma)."""
+
+from datetime import date
+
+from utils.metrics_rollups import (
+    build_rollup_items,
+    plan_date_range,
+    rollup_is_trusted,
+    rollup_keys_for_date,
+)
+
+
+def test_rollup_keys_use_iso_week_and_month():
+    assert rollup_keys_for_date("2027-01-01") == [
+        {"PK": "METRICS#2026-W53", "SK": "WEEK_ROLLUP"},
+        {"PK": "METRICS#2027-01", "SK": "MONTH_ROLLUP"},
+    ]
+
+
+def test_year_range_is_twelve_months():
+    plan = plan_date_range(date(2026, 1, 1), date(2026, 12, 31))
+    assert [kind for kind, _, _ in plan] == ["month"] * 12
+
+
+def test_partial_range_uses_weeks_and_edge_days():
+    # Qua 2026-03-04 .. Dom 2026-04-19: dias até domingo, semanas, mês não cabe inteiro
+    plan = plan_date_range(date(2026, 3, 4), date(2026, 4, 19))
+    kinds = [kind for kind, _, _ in plan]
+    assert kinds[:5] == ["day"] * 5
+    assert kinds.count("week") == 6
+    assert "month" not in kinds
+    covered = sum((last - first).days + 1 for _, first, last in plan)
+    assert covered == (date(2026, 4, 19) - date(2026, 3, 4)).days + 1
+
+
+def test_rollup_trust_rules():
+    assert rollup_is_trusted({"BACKFILLED": True}, date(2025, 1, 1), None)
+    assert rollup_is_trusted(None, date(2026, 6, 1), "2026-05-20")
+    assert not rollup_is_trusted({"total_count": 3}, date(2026, 5, 1), "2026-05-20")
+    assert not rollup_is_trusted(None, date(2026, 6, 1), None)
+
+
+def test_build_rollup_items_sums_days():
+    rollups = build_rollup_items({
+        "2026-05-28": {"total_count": 2, "total_time": 10, "failed_rules": {"A": 1}},
+        "2026-05-29": {"total_count": 1, "total_time": 5.5, "failed_rules": {"A": 1, "B": 2}},
+    })
+    month = rollups[("METRICS#2026-05", "MONTH_ROLLUP")]
+    assert month["total_count"] == 3
+    assert float(month["total_time"]) == 15.5
+    assert month["failed_rules"] == {"A": 2, "B": 2}
+    assert month["BACKFILLED"] is True
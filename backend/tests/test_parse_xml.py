@@ -5,6 +5,7 @@ Covers:
 - _select_nfe_xml: priority logic among multiple XML files
 - handler: graceful skip when no XML exists
 - handler: full parse when NF-e XML exists
+- update_process_status_to_failed: METADATA criado com as chaves do GSI de listagem
 """
 
 import json
@@ -227,3 +228,20 @@ class TestParseXmlHandler:
 
         result = handler({"process_id": "abc"}, None)
         assert result["xml_files_parsed"] == 1
+
+
+class TestUpdateProcessStatusToFailed:
+
+    @patch("parse_xml.handler.table")
+    def test_created_metadata_is_listed(self, mock_table):
+        """METADATA criado no erro entra no GSI ProcessListIndex (GET /process)."""
+        from parse_xml.handler import update_process_status_to_failed
+
+        mock_table.get_item.return_value = {}
+
+        update_process_status_to_failed("PROCESS#abc", "abc", "XML inválido", "PARSE_ERROR")
+
+        saved = mock_table.put_item.call_args[1]["Item"]
+        assert saved["STATUS"] == "FAILED"
+        assert saved["LIST_PK"] == "PROCESS_LIST"
+        assert saved["LIST_SK"].endswith("#abc") and len(saved["LIST_SK"]) == 16
@@ -0,0 +1,147 @@
+"""Testes: raster fallback (páginas em paralelo, ordem estável, páginas em voo limitadas, redução de DPI)."""
+
+import sys
+import threading
+import time
+import types
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "lambdas"))
+
+from utils.pdf_raster_textract_fallback import textract_line_blocks_from_pdf_via_raster  # noqa: E402
+
+
+class _Pixmap:
+    def __init__(self, page_no, size):
+        self._png = bytes([page_no]) + b"x" * (size - 1)
+
+    def tobytes(self, fmt):
+        return self._png
+
+
+class _Page:
+    """PNG com 1000 bytes a 200 dpi (proporcional a dpi²); o 1º byte identifica a página."""
+
+    def __init__(self, number):
+        self.number = number
+        self.dpis = []
+
+    def get_pixmap(self, matrix, alpha):
+        dpi = matrix.zoom * 72.0
+        self.dpis.append(dpi)
+        return _Pixmap(self.number, int(1000 * (dpi / 200) ** 2))
+
+
+class _Doc:
+    def __init__(self, pages):
+        self.pages = pages
+
+    def __len__(self):
+        return len(self.pages)
+
+    def load_page(self, n):
+        return self.pages[n]
+
+    def close(self):
+        pass
+
+
+def _fake_fitz(pages):
+    mod = types.ModuleType("fitz")
+
+    class Matrix:
+        def __init__(self, zx, zy):
+            self.zoom = zx
+
+    mod.Matrix = Matrix
+    mod.open = lambda stream, filetype: _Doc(pages)
+    return mod
+
+
+class _Textract:
+    """Páginas iniciais respondem mais devagar: a ordem de conclusão é inversa à das páginas."""
+
+    def __init__(self, n_pages):
+        self.n_pages = n_pages
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def detect_document_text(self, Document):
+        page_no = Document["Bytes"][0]
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.01 * (self.n_pages - page_no))
+        with self._lock:
+            self.active -= 1
+        return {"Blocks": [
+            {"BlockType": "PAGE", "Text": "ignorado"},
+            {"BlockType": "LINE", "Text": f"p{page_no} a"},
+            {"BlockType": "LINE", "Text": f"p{page_no} b"},
+        ]}
+
+
+@pytest.fixture
+def pages(monkeypatch):
+    pages = [_Page(i) for i in range(5)]
+    monkeypatch.setitem(sys.modules, "fitz", _fake_fitz(pages))
+    monkeypatch.setenv("TEXTRACT_RASTER_WORKERS", "4")
+    return pages
+
+
+def test_pages_run_in_parallel_and_keep_line_order(pages):
+    textract = _Textract(len(pages))
+
+    blocks = textract_line_blocks_from_pdf_via_raster(textract, b"%PDF", "k", max_sync_bytes=10_000)
+
+    assert [b["Text"] for b in blocks] == [f"p{i} {s}" for i in range(5) for s in ("a", "b")]
+    assert [b["Id"] for b in blocks[:3]] == ["r0-L0", "r0-L1", "r1-L2"]
+    assert textract.max_active > 1
+
+
+def test_in_flight_pages_are_capped_at_workers(pages, monkeypatch):
+    monkeypatch.setenv("TEXTRACT_RASTER_WORKERS", "2")
+    textract = _Textract(len(pages))
+    in_flight_at_render = []
+    original = _Page.get_pixmap
+
+    def get_pixmap(page, matrix, alpha):
+        with textract._lock:
+            in_flight_at_render.append(page.number - textract_done[0])
+        return original(page, matrix, alpha)
+
+    textract_done = [0]
+    detect = textract.detect_document_text
+
+    def counted(Document):
+        out = detect(Document)
+        with textract._lock:
+            textract_done[0] += 1
+        return out
+
+    monkeypatch.setattr(_Page, "get_pixmap", get_pixmap)
+    textract.detect_document_text = counted
+
+    blocks = textract_line_blocks_from_pdf_via_raster(textract, b"%PDF", "k", max_sync_bytes=10_000)
+
+    assert len(blocks) == 10
+    # ao renderizar a próxima página, no máximo 2 PNGs aguardam o Textract
+    assert max(in_flight_at_render) <= 2
+
+
+def test_oversized_png_steps_dpi_down(pages):
+    textract = _Textract(len(pages))
+
+    textract_line_blocks_from_pdf_via_raster(textract, b"%PDF", "k", max_sync_bytes=700)
+
+    assert [round(d) for d in pages[0].dpis] == [200, 150]
+
+
+def test_page_still_too_large_at_min_dpi_raises(pages, monkeypatch):
+    monkeypatch.setenv("TEXTRACT_RASTER_MIN_DPI", "150")
+
+    with pytest.raises(ValueError, match="excede limite"):
+        textract_line_blocks_from_pdf_via_raster(_Textract(len(pages)), b"%PDF", "k", max_sync_bytes=100)
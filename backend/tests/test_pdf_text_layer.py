@@ -0,0 +1,51 @@
+"""Tests for utils.pdf_text_layer (camada de texto nativa antes do Textract)."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "lambdas"))
+
+from extract_documents.handler import _extract_text_and_tables  # noqa: E402
+from utils.pdf_text_layer import DEFAULT_MIN_SCORE, _synthetic_blocks, score_text_layer  # noqa: E402
+
+NFSE_PAGE = """Chave de Acesso da NFS-e
+35041072219378380000120000000000005326032643827496
+Prestador do Serviço
+19.378.380/0001-20
+TOMADOR DO SERVIÇO
+13.563.680/0033-80
+Valor Líquido da NFS-e
+R$ 8.170,58
+""" + "Descrição do serviço prestado conforme contrato de manutenção\n" * 8
+
+
+def test_digital_nfse_scores_above_default_threshold():
+    metrics = score_text_layer([NFSE_PAGE])
+    assert metrics["has_chave"] and metrics["has_cnpj"]
+    assert metrics["score"] >= DEFAULT_MIN_SCORE
+
+
+def test_sparse_scanned_or_garbled_text_scores_zero_or_low():
+    assert score_text_layer(["Página 1"])["score"] < DEFAULT_MIN_SCORE
+    assert score_text_layer([NFSE_PAGE, ""], scanned_pages=1)["score"] == 0.0
+    assert score_text_layer(["��" * 300 + NFSE_PAGE])["score"] == 0.0
+    assert score_text_layer([])["score"] == 0.0
+
+
+def test_density_alone_does_not_reach_threshold():
+    dense = "Descrição do serviço prestado conforme contrato de manutenção\n" * 12
+    assert score_text_layer([dense])["score"] < DEFAULT_MIN_SCORE
+    with_cnpj = dense + "Prestador do Serviço\n19.378.380/0001-20\n"
+    metrics = score_text_layer([with_cnpj])
+    assert metrics["has_cnpj"] and not metrics["has_chave"]
+    assert metrics["score"] >= DEFAULT_MIN_SCORE
+
+
+def test_synthetic_blocks_round_trip_through_textract_parser():
+    blocks = _synthetic_blocks(
+        [["Linha 1", "Linha 2"], ["Linha 3"]],
+        [[["Produto", "Qtd"], ["Adubo", ""]]],
+    )
+    raw_text, tables = _extract_text_and_tables(blocks)
+    assert raw_text == "Linha 1\nLinha 2\nLinha 3"
+    assert tables == [{"rows": [["Produto", "Qtd"], ["Adubo", ""]]}]
@@ -0,0 +1,71 @@
+"""Testes: ProcessSnapshot (índice por SK, JSON sob demanda, acessores tipados)."""
+
+import json
+from unittest.mock import MagicMock, patch
+
+from utils.primary_xml import pick_best_parsed_xml_item
+from utils.process_snapshot import ProcessSnapshot, sk_family
+
+
+def _nfe(numero):
+    return {"numero_nota": numero, "emitente": {"cnpj": "1"}, "produtos": [{"codigo": "A"}]}
+
+
+def _items():
+    return [
+        {"SK": "METADATA", "PROCESS_TYPE": "AGROQUIMICOS", "INPUT_JSON": json.dumps({"requestBody": {"itens": []}})},
+        {"SK": "PEDIDO_COMPRA_METADATA", "METADADOS": json.dumps({"header": {"tenantId": "t"}, "requestBody": {}})},
+        {"SK": "FILE#a.xml", "FILE_NAME": "a.xml", "METADADOS": "{invalid"},
+        {"SK": "PARSED_XML=generic.xml", "FILE_NAME": "generic.xml", "PARSED_DATA": json.dumps({"foo": "bar"})},
+        {"SK": "PARSED_XML=nfe.xml", "FILE_NAME": "nfe.xml", "PARSED_DATA": json.dumps(_nfe("123"))},
+        {"SK": "VALIDATION#1", "TIMESTAMP": 10, "VALIDATION_RESULTS": json.dumps([{"rule": "old"}])},
+        {"SK": "VALIDATION#2", "TIMESTAMP": 20, "VALIDATION_RESULTS": json.dumps([{"rule": "new"}])},
+        {"SK": "MERGED_EXTRACTION", "MERGED_DATA": json.dumps({"textract_documents": []})},
+    ]
+
+
+def test_sk_family():
+    assert sk_family("FILE#abc") == "FILE#"
+    assert sk_family("PARSED_XML=x#1") == "PARSED_XML="
+    assert sk_family("METADATA") == "METADATA"
+
+
+def test_indexes_and_typed_accessors():
+    snap = ProcessSnapshot("p1", _items())
+    assert snap.process_type == "AGROQUIMICOS"
+    assert snap.input_json == {"requestBody": {"itens": []}}
+    assert snap.pedido_compra["header"]["tenantId"] == "t"
+    assert [it["SK"] for it in snap.file_items] == ["FILE#a.xml"]
+    assert snap.file_metadados(snap.file_items[0]) is None
+    assert snap.latest_validation["SK"] == "VALIDATION#2"
+    assert snap.latest_validation_results == [{"rule": "new"}]
+    assert snap.merged_data == {"textract_documents": []}
+    assert snap.bedrock_extraction is None
+
+
+def test_best_parsed_xml_matches_primary_xml_helper():
+    items = _items()
+    snap = ProcessSnapshot("p1", items)
+    assert snap.best_parsed_xml is pick_best_parsed_xml_item(items)
+    assert snap.best_parsed_xml_data["numero_nota"] == "123"
+
+
+def test_json_is_decoded_once_per_attribute():
+    snap = ProcessSnapshot("p1", _items())
+    with patch("utils.process_snapshot.json.loads", wraps=json.loads) as loads:
+        snap.merged_data
+        snap.merged_data
+        snap.json(snap.merged_item, "MERGED_DATA")
+    assert loads.call_count == 1
+
+
+def test_load_reads_partition_with_pagination():
+    table = MagicMock()
+    table.query.side_effect = [
+        {"Items": [{"SK": "FILE#a"}], "LastEvaluatedKey": {"PK": "PROCESS#p1", "SK": "FILE#a"}},
+        {"Items": [{"SK": "METADATA", "PROCESS_TYPE": "SEMENTES"}]},
+    ]
+    snap = ProcessSnapshot.load(table, "p1")
+    assert snap.pk == "PROCESS#p1"
+    assert snap.process_type == "SEMENTES"
+    assert table.query.call_count == 2
@@ -0,0 +1,182 @@
+"""Testes: cache de comparações de nome de produto (LRU do container + DynamoDB)."""
+
+import json
+import sys
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+_BACKEND = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_BACKEND / "lambdas"))
+sys.path.insert(0, str(_BACKEND / "lambdas" / "validate_rules"))
+
+from rules import utils as rules_utils  # noqa: E402
+from utils import product_compare_cache  # noqa: E402
+from utils.bedrock_gateway import BedrockResult  # noqa: E402
+
+MATCH_JSON = json.dumps({
+    "validado": True,
+    "explicacao": "Mesmo produto",
+    "nome_base": "VESSARYA",
+    "volumetria": "5L",
+    "categoria_agronomica": "fungicida",
+    "embalagem": "galão",
+    "detalhes": "",
+})
+
+
+@pytest.fixture
+def table():
+    product_compare_cache.clear_local_cache()
+    table = MagicMock()
+    table.get_item.return_value = {}
+    with patch("utils.product_compare_cache._get_table", return_value=table):
+        yield table
+    product_compare_cache.clear_local_cache()
+
+
+@patch("rules.utils.invoke_text")
+def test_repeat_pair_is_served_from_container_cache(mock_invoke, table):
+    mock_invoke.return_value = BedrockResult(text=MATCH_JSON)
+
+    first = rules_utils.compare_with_bedrock("VESSARYA 5L", "vessarya  5l ", "nome do produto")
+    second = rules_utils.compare_with_bedrock("Vessarya 5L", "VESSARYA 5L", "nome do produto")
+
+    assert mock_invoke.call_count == 1
+    assert first == second
+    assert second["bedrock"]["nome_base"] == "VESSARYA"
+    stored = table.put_item.call_args.kwargs["Item"]
+    assert stored["PK"].startswith("PRODUCT_COMPARE#")
+    assert json.loads(stored["RESULT"])["status"] == "MATCH"
+    assert stored["EXPIRES_AT"] > time.time()
+
+
+@patch("rules.utils.invoke_text")
+def test_dynamo_hit_skips_bedrock_and_flag_changes_key(mock_invoke, table):
+    cached = {"status": "MISMATCH", "bedrock": {"explicacao": "Produtos distintos"}}
+    table.get_item.return_value = {"Item": {
+        "RESULT": json.dumps(cached),
+        "EXPIRES_AT": int(time.time()) + 3600,
+    }}
+
+    assert rules_utils.compare_with_bedrock("PRIMER BIO", "GALIL SC", "nome do produto") == cached
+    mock_invoke.assert_not_called()
+
+    key_plain = product_compare_cache.compare_cache_key("A", "B", "nome do produto", False, "1")
+    key_eq = product_compare_cache.compare_cache_key("A", "B", "nome do produto", True, "1")
+    key_v2 = product_compare_cache.compare_cache_key("A", "B", "nome do produto", False, "2")
+    assert len({key_plain, key_eq, key_v2}) == 3
+
+
+@patch("rules.utils.invoke_text")
+def test_errors_are_not_cached(mock_invoke, table):
+    mock_invoke.side_effect = RuntimeError("throttled")
+
+    result = rules_utils.compare_with_bedrock("SPHERIC PLUS 20L", "SPHERIC 20 LT", "nome do produto")
+
+    assert result["status"] == "MISMATCH"
+    table.put_item.assert_not_called()
+    rules_utils.compare_with_bedrock("SPHERIC PLUS 20L", "SPHERIC 20 LT", "nome do produto")
+    assert mock_invoke.call_count == 2
+
+
+def _batch_answer(*entries):
+    return BedrockResult(text="Segue:\n" + json.dumps([
+        {"id": pid, "validado": ok, "explicacao": "lote", "nome_base": "X", "volumetria": "",
+         "categoria_agronomica": "", "embalagem": "", "detalhes": ""}
+        for pid, ok in entries
+    ]))
+
+
+@patch("rules.utils.invoke_text")
+def test_batch_prefetch_answers_pairs_in_one_prompt(mock_invoke, table):
+    pairs = [("ALFA PRODUTO UM", "ALFA OUTRO"), ("BETA PRODUTO", "BETA OUTRO"), ("GAMA X", "GAMA Y")]
+    mock_invoke.side_effect = [
+        _batch_answer(("p1", True), ("p2", False), ("p3", "talvez")),  # p3 malformado
+        BedrockResult(text=MATCH_JSON),
+    ]
+
+    assert rules_utils.prefetch_product_comparisons(pairs) == 2
+    prompt = mock_invoke.call_args_list[0].args[0]
+    assert '"id": "p3"' in prompt and "GAMA Y" in prompt
+
+    assert rules_utils.compare_with_bedrock("ALFA PRODUTO UM", "ALFA OUTRO", "nome do produto")["status"] == "MATCH"
+    assert rules_utils.compare_with_bedrock("BETA PRODUTO", "BETA OUTRO", "nome do produto")["status"] == "MISMATCH"
+    assert mock_invoke.call_count == 1
+    # par sem resposta válida no lote: chamada individual
+    assert rules_utils.compare_with_bedrock("GAMA X", "GAMA Y", "nome do produto")["status"] == "MATCH"
+    assert mock_invoke.call_count == 2
+
+
+@patch("rules.utils.invoke_text")
+def test_batch_failure_leaves_pairs_for_per_pair_calls(mock_invoke, table):
+    mock_invoke.side_effect = RuntimeError("ThrottlingException")
+
+    assert rules_utils.prefetch_product_comparisons([("A1 X", "A1 Y"), ("B1 X", "B1 Y")]) == 0
+    table.put_item.assert_not_called()
+
+
+def _line(nome, codigo="", **extra):
+    return {"produto": nome, "codigo": codigo, **extra}
+
+
+@patch("rules.utils.prefetch_product_comparisons", return_value=0)
+def test_prefetch_skips_lines_matched_by_supplier_code(mock_prefetch):
+    from rules.validar_produtos import prefetch_unsure_name_pairs
+
+    danfe = [_line("ALFA PRODUTO UM", "111"), _line("BETA PRODUTO", "222")]
+    pedido = [
+        {"produto": "ALFA OUTRO", "codProdFornecedor": "111"},
+        {"produto": "BETA OUTRO", "codProdFornecedor": "222"},
+    ]
+
+    assert prefetch_unsure_name_pairs(danfe, pedido) == 0
+    mock_prefetch.assert_not_called()
+
+
+@patch("rules.utils.prefetch_product_comparisons", return_value=2)
+def test_prefetch_pairs_unmatched_lines_with_free_pedido_items_only(mock_prefetch):
+    from rules.validar_produtos import prefetch_unsure_name_pairs
+
+    danfe = [_line("ALFA PRODUTO UM", "111"), _line("BETA PRODUTO"), _line("DELTA PRODUTO")]
+    pedido = [
+        {"produto": "ALFA OUTRO", "codProdFornecedor": "111"},
+        {"produto": "BETA OUTRO"},
+        {"produto": "DELTA OUTRO"},
+    ]
+
+    assert prefetch_unsure_name_pairs(danfe, pedido) == 2
+    pairs = mock_prefetch.call_args.args[0]
+    # ALFA casou por codProdFornecedor: nem o par próprio nem a linha 1 do pedido entram no lote
+    assert sorted(pairs) == [
+        ("BETA PRODUTO", "BETA OUTRO"),
+        ("BETA PRODUTO", "DELTA OUTRO"),
+        ("DELTA PRODUTO", "BETA OUTRO"),
+        ("DELTA PRODUTO", "DELTA OUTRO"),
+    ]
+
+
+@patch("rules.utils.invoke_text")
+def test_batch_answers_use_own_version_and_short_ttl(mock_invoke, table):
+    mock_invoke.return_value = _batch_answer(("p1", True), ("p2", False))
+
+    assert rules_utils.prefetch_product_comparisons([("ALFA PRODUTO UM", "ALFA OUTRO"), ("BETA PRODUTO", "BETA OUTRO")]) == 2
+
+    stored = [c.kwargs["Item"] for c in table.put_item.call_args_list]
+    assert {item["PROMPT_VERSION"] for item in stored} == {"batch-1"}
+    assert all(item["EXPIRES_AT"] <= time.time() + 3600 for item in stored)
+    per_pair_key = product_compare_cache.compare_cache_key(
+        "ALFA PRODUTO UM", "ALFA OUTRO", "nome do produto", False, rules_utils.PRODUCT_COMPARE_PROMPT_VERSION
+    )
+    assert product_compare_cache.get_cached_compare(per_pair_key) is None
+    # mesmo processamento: a chamada por par usa a resposta do lote
+    assert rules_utils.compare_with_bedrock("ALFA PRODUTO UM", "ALFA OUTRO", "nome do produto")["status"] == "MATCH"
+    assert mock_invoke.call_count == 1
+
+
+def test_expired_entry_is_not_served_from_container_cache(table):
+    product_compare_cache.put_cached_compare("k", {"status": "MATCH"}, ttl_seconds=0)
+
+    assert product_compare_cache.get_cached_compare("k") is None
@@ -0,0 +1,61 @@
+"""Testes: comparação local de nomes de produto (rules/product_similarity) antes do Bedrock."""
+
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+
+_lambdas_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "lambdas"))
+sys.path.insert(0, _lambdas_dir)
+sys.path.insert(0, os.path.join(_lambdas_dir, "validate_rules"))
+
+import rules.utils  # noqa: E402,F401  (alvo do patch de compare_with_bedrock)
+from rules.product_similarity import extract_features, score_product_names  # noqa: E402
+
+
+def test_extracts_volume_npk_and_brand_tokens():
+    f = extract_features("VESSARYA BOMBONA 10 LITROS FUNGICIDA")
+    assert f["tokens"] == ["VESSARYA"]
+    assert f["volumes"] == {("L", 10.0)}
+    assert f["packaging"] == ["BOMBONA"]
+    assert f["categories"] == ["FUNGICIDA"]
+
+    assert extract_features("15.15.15 UNI BASE")["npk"] == {"15 15 15"}
+    assert extract_features("PROTAC PT 500 GR")["volumes"] == {("KG", 0.5)}
+
+
+@pytest.mark.parametrize("p1,p2,expected", [
+    ("VESSARYA GL 10 LT", "VESSARYA BOMBONA 10L FUNGICIDA", "MATCH"),
+    ("OPTERADUO 1X20L", "OPTERADUO GL 20 LT", "MATCH"),
+    ("15.15.15 UNI BASE 180 AMIDICO", "15-15-15 UNIFERTIL TN 1000 KG", "MATCH"),
+    ("15.15.15 UNI BASE 180 AMIDICO", "20.20.20 UNIFERTIL TN 1000 KG", "MISMATCH"),
+    ("VESSARYA GL 10 LT", "VESSARYA GL 20 LT", "MISMATCH"),
+    ("SPHERIC PLUS NORTOX", "GALIL SC 1X20", "MISMATCH"),
+    ("GLIFOSATO PRODUTO UNICO", "GLIFOSATO TOTALMENTE DIFERENTE OUTRO", "UNSURE"),
+    ("PROD X", "PRODUTO TESTE MULTILOTE", "UNSURE"),
+])
+def test_local_decisions(p1, p2, expected):
+    assert score_product_names(p1, p2)["status"] == expected
+
+
+def test_threshold_turns_weak_decisions_into_unsure(monkeypatch):
+    monkeypatch.setenv("PRODUCT_SIMILARITY_MIN_CONFIDENCE", "0.9")
+    assert score_product_names("SPHERIC PLUS NORTOX", "GALIL SC 1X20")["status"] == "UNSURE"
+
+
+@patch("rules.utils.compare_with_bedrock")
+def test_only_unsure_pairs_reach_bedrock(mock_bedrock):
+    from rules.validar_produtos import compare_product_names
+
+    mock_bedrock.return_value = {"status": "MISMATCH", "bedrock": {"explicacao": "diff"}}
+
+    local = compare_product_names("VESSARYA GL 10 LT", "VESSARYA BOMBONA 10L")
+    assert local["status"] == "MATCH"
+    assert local["bedrock"]["origem"] == "local"
+    assert local["bedrock"]["nome_base"] == "VESSARYA"
+    mock_bedrock.assert_not_called()
+
+    remote = compare_product_names("GLIFOSATO PRODUTO UNICO", "GLIFOSATO TOTALMENTE DIFERENTE OUTRO")
+    assert remote["status"] == "MISMATCH"
+    mock_bedrock.assert_called_once()
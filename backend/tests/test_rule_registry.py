@@ -0,0 +1,83 @@
+"""Testes: registro de regras do validate_rules (módulos pré-carregados + cache por VERSION)."""
+
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# lambdas/ antes de src/: rules importa utils.* da Lambda
+_lambdas_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "lambdas"))
+sys.path.insert(0, _lambdas_dir)
+_rules_dir = os.path.join(_lambdas_dir, "validate_rules")
+if _rules_dir not in sys.path:
+    sys.path.insert(0, _rules_dir)
+
+from rules import registry  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    registry.clear_rules_cache()
+    yield
+    registry.clear_rules_cache()
+
+
+def _table(version=1):
+    table = MagicMock()
+    table.get_item.return_value = {"Item": {"VERSION": version}}
+    table.query.return_value = {"Items": [
+        {"SK": "RULE#validar_serie", "RULE_NAME": "validar_serie", "ORDER": 2},
+        {"SK": "RULE#validar_icms", "RULE_NAME": "validar_icms", "ORDER": 3, "ENABLED": False},
+        {"SK": "RULE#validar_numero_nota", "RULE_NAME": "validar_numero_nota", "ORDER": 1},
+    ]}
+    return table
+
+
+def test_preload_imports_only_rule_modules():
+    modules = registry.preload_rule_modules()
+    assert "validar_cfop_chave" in modules
+    assert "validar_produtos" in modules
+    assert not {"registry", "utils", "ocr_utils"} & set(modules)
+    assert all(callable(m.validate) for m in modules.values())
+    assert registry.get_rule_module("nao_existe") is None
+
+
+def test_broken_rule_import_is_recorded(monkeypatch):
+    real_import = registry.importlib.import_module
+
+    def fake_import(name, *args, **kwargs):
+        if name.endswith(".validar_serie"):
+            raise SyntaxError("invalid syntax (validar_serie.py, line 1)")
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(registry, "_rule_modules", {})
+    monkeypatch.setattr(registry, "_import_errors", {})
+    monkeypatch.setattr(registry.importlib, "import_module", fake_import)
+
+    assert registry.get_rule_module("validar_serie") is None
+    assert "invalid syntax" in registry.import_failed("validar_serie")
+    assert registry.import_failed("validar_icms") is None
+    assert registry.import_failed("nao_existe") is None
+
+
+def test_rules_are_cached_enabled_and_ordered():
+    table = _table()
+    first = registry.get_rules(table, "AGROQUIMICOS")
+    second = registry.get_rules(table, "AGROQUIMICOS")
+    assert [r["rule_name"] for r in first] == ["validar_numero_nota", "validar_serie"]
+    assert first == second
+    assert table.query.call_count == 1
+
+
+def test_version_bump_reloads_rules():
+    table = _table(version=1)
+    with patch.object(registry._rules_cache, "check_seconds", 0):
+        registry.get_rules(table, "SEMENTES")
+        registry.get_rules(table, "SEMENTES")
+        assert table.query.call_count == 1
+
+        table.get_item.return_value = {"Item": {"VERSION": 2}}
+        registry.get_rules(table, "SEMENTES")
+        assert table.query.call_count == 2
+    assert table.get_item.call_args[1]["Key"] == {"PK": "RULES#SEMENTES", "SK": "VERSION"}
@@ -0,0 +1,68 @@
+"""Tests for s3_upload_handler Lambda (FILE# direto pelo upload_id da chave S3)."""
+
+import pytest
+from unittest.mock import patch
+from botocore.exceptions import ClientError
+
+UPLOAD_A = "a" * 32
+UPLOAD_B = "b" * 32
+
+
+@pytest.fixture(autouse=True)
+def _env(monkeypatch):
+    monkeypatch.setenv("TABLE_NAME", "test-table")
+
+
+def _event(*keys):
+    return {"Records": [{"s3": {"bucket": {"name": "bkt"}, "object": {"key": k}}} for k in keys]}
+
+
+def _conditional_failure(*args, **kwargs):
+    raise ClientError({"Error": {"Code": "ConditionalCheckFailedException"}}, "UpdateItem")
+
+
+@patch("s3_upload_handler.handler.table")
+def test_upload_id_keys_update_without_reading_partition(mock_table):
+    from s3_upload_handler.handler import handler
+
+    out = handler(_event(
+        f"processes/p1/danfe/{UPLOAD_A}_nota.xml",
+        f"processes/p1/adicionais/{UPLOAD_B}_boleto+%281%29.pdf",
+    ), None)
+
+    assert out["updated"] == 2
+    mock_table.query.assert_not_called()
+    calls = [c.kwargs for c in mock_table.update_item.call_args_list]
+    assert calls[0]["Key"] == {"PK": "PROCESS#p1", "SK": f"FILE#{UPLOAD_A}"}
+    assert calls[0]["ConditionExpression"] == "FILE_KEY = :key"
+    assert calls[1]["ExpressionAttributeValues"][":key"] == (
+        f"processes/p1/adicionais/{UPLOAD_B}_boleto (1).pdf"
+    )
+
+
+@patch("s3_upload_handler.handler.table")
+def test_legacy_keys_read_partition_once_per_process(mock_table):
+    from s3_upload_handler.handler import handler
+
+    mock_table.query.return_value = {"Items": [
+        {"PK": "PROCESS#p1", "SK": "FILE#nota.xml", "FILE_KEY": "processes/p1/nota.xml"},
+        {"PK": "PROCESS#p1", "SK": "FILE#boleto.pdf", "FILE_KEY": "processes/p1/boleto.pdf"},
+    ]}
+    out = handler(_event("processes/p1/nota.xml", "processes/p1/boleto.pdf", "outros/x.pdf"), None)
+
+    assert out["updated"] == 2
+    assert mock_table.query.call_count == 1
+    sks = [c.kwargs["Key"]["SK"] for c in mock_table.update_item.call_args_list]
+    assert sks == ["FILE#nota.xml", "FILE#boleto.pdf"]
+
+
+@patch("s3_upload_handler.handler.table")
+def test_mismatched_file_key_falls_back_to_partition(mock_table):
+    from s3_upload_handler.handler import handler
+
+    mock_table.update_item.side_effect = _conditional_failure
+    mock_table.query.return_value = {"Items": []}
+    out = handler(_event(f"processes/p1/danfe/{UPLOAD_A}_nota.xml"), None)
+
+    assert out["updated"] == 0
+    assert mock_table.query.call_count == 1
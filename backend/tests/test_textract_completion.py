@@ -0,0 +1,110 @@
+"""Testes: Textract em modo callback (SNS + task token) — extract_documents e completion."""
+
+import json
+import pytest
+from unittest.mock import patch
+
+CALLBACK_ITEM = {
+    "PK": "TEXTRACT_CALLBACK#tag1",
+    "SK": "CALLBACK",
+    "TASK_TOKEN": "tok-1",
+    "PROCESS_ID": "p1",
+    "FILE_NAME": "grande.pdf",
+    "FILE_KEY": "processes/p1/docs/grande.pdf",
+    "FILE_SK": "FILE#grande.pdf",
+}
+
+
+@pytest.fixture(autouse=True)
+def _env(monkeypatch):
+    monkeypatch.setenv("TABLE_NAME", "test-table")
+    monkeypatch.setenv("BUCKET_NAME", "test-bucket")
+
+
+def _sns_event(status="SUCCEEDED", tag="tag1"):
+    message = {"JobId": "job-1", "Status": status, "API": "StartDocumentAnalysis", "JobTag": tag}
+    return {"Records": [{"Sns": {"Message": json.dumps(message)}}]}
+
+
+@patch("extract_documents.handler.TEXTRACT_NOTIFICATION_ROLE_ARN", "arn:aws:iam::1:role/tx")
+@patch("extract_documents.handler.TEXTRACT_COMPLETION_TOPIC_ARN", "arn:aws:sns:us-east-1:1:tx")
+@patch("extract_documents.handler.TEXTRACT_ASYNC_STAGING_BUCKET", "staging")
+@patch("extract_documents.handler.boto3")
+@patch("extract_documents.handler.sfn")
+@patch("extract_documents.handler.textract")
+@patch("extract_documents.handler.s3")
+@patch("extract_documents.handler.table")
+def test_large_pdf_starts_job_with_notification_and_keeps_token(mock_table, mock_s3, mock_textract, mock_sfn, _boto3):
+    from extract_documents.handler import handler
+
+    mock_s3.head_object.return_value = {"ContentLength": 20 * 1024 * 1024}
+    mock_textract.start_document_analysis.return_value = {"JobId": "job-1"}
+
+    result = handler({
+        "process_id": "p1",
+        "file_name": "grande.pdf",
+        "file_key": "processes/p1/docs/grande.pdf",
+        "file_sk": "FILE#grande.pdf",
+        "task_token": "tok-1",
+    }, None)
+
+    assert result["textract_callback"] is True
+    start = mock_textract.start_document_analysis.call_args.kwargs
+    assert start["NotificationChannel"]["SNSTopicArn"] == "arn:aws:sns:us-east-1:1:tx"
+    stored = mock_table.put_item.call_args.kwargs["Item"]
+    assert stored["PK"] == f"TEXTRACT_CALLBACK#{start['JobTag']}"
+    assert stored["TASK_TOKEN"] == "tok-1"
+    mock_textract.get_document_analysis.assert_not_called()
+    mock_sfn.send_task_success.assert_not_called()
+
+
+@patch("extract_documents.handler.sfn")
+@patch("extract_documents.handler.textract")
+@patch("extract_documents.handler.table")
+def test_completion_collects_pages_and_sends_task_success(mock_table, mock_textract, mock_sfn):
+    from extract_documents.completion import handler
+
+    mock_table.get_item.return_value = {"Item": dict(CALLBACK_ITEM)}
+    mock_textract.get_document_analysis.side_effect = [
+        {"JobStatus": "SUCCEEDED", "NextToken": "t1", "Blocks": [{"BlockType": "LINE", "Id": "1", "Text": "Pagina 1"}]},
+        {"JobStatus": "SUCCEEDED", "Blocks": [{"BlockType": "LINE", "Id": "2", "Text": "Pagina 2"}]},
+    ]
+
+    out = handler(_sns_event(), None)
+
+    assert out["outcomes"] == ["succeeded"]
+    item = mock_table.put_item.call_args.kwargs["Item"]
+    assert item["RAW_TEXT"] == "Pagina 1\nPagina 2"
+    sent = mock_sfn.send_task_success.call_args.kwargs
+    assert sent["taskToken"] == "tok-1"
+    assert json.loads(sent["output"])["file_name"] == "grande.pdf"
+    mock_table.delete_item.assert_called_once_with(Key={"PK": "TEXTRACT_CALLBACK#tag1", "SK": "CALLBACK"})
+
+
+@patch("extract_documents.handler.sfn")
+@patch("extract_documents.handler.textract")
+@patch("extract_documents.handler.table")
+def test_failed_job_marks_file_and_sends_task_failure(mock_table, mock_textract, mock_sfn):
+    from extract_documents.completion import handler
+
+    mock_table.get_item.return_value = {"Item": dict(CALLBACK_ITEM)}
+
+    out = handler(_sns_event(status="FAILED"), None)
+
+    assert out["outcomes"] == ["failed"]
+    mock_textract.get_document_analysis.assert_not_called()
+    assert mock_table.update_item.call_args.kwargs["Key"] == {"PK": "PROCESS#p1", "SK": "FILE#grande.pdf"}
+    assert mock_sfn.send_task_failure.call_args.kwargs["error"] == "TextractJobFailed"
+    mock_sfn.send_task_success.assert_not_called()
+
+
+@patch("extract_documents.handler.sfn")
+@patch("extract_documents.handler.table")
+def test_unknown_job_tag_is_ignored(mock_table, mock_sfn):
+    from extract_documents.completion import handler
+
+    mock_table.get_item.return_value = {}
+
+    assert handler(_sns_event(tag="outro"), None)["outcomes"] == ["unknown_job"]
+    mock_sfn.send_task_success.assert_not_called()
+    mock_sfn.send_task_failure.assert_not_called()
@@ -1,3 +1,7 @@
+import copy
+import operator
+import re
+
 import pytest
 
 
@@ -7,36 +11,147 @@ def _env(monkeypatch):
     monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
 
 
+def _client_error(code):
+    from botocore.exceptions import ClientError
+
+    return ClientError({"Error": {"Code": code, "Message": code}}, "UpdateItem")
+
+
 class _FakeTable:
+    """Tabela em memória que avalia o subconjunto de UpdateExpression usado pelo handler."""
+
     def __init__(self):
         self.items = {}
+        self.put_calls = 0
 
     def _key(self, key):
         return (key["PK"], key["SK"])
 
-    def get_item(self, Key):
+    def get_item(self, Key, **kwargs):
         k = self._key(Key)
         if k in self.items:
-            return {"Item": self.items[k]}
+            return {"Item": copy.deepcopy(self.items[k])}
         return {}
 
-    def put_item(self, Item):
+    def put_item(self, Item, ConditionExpression=None):
         k = (Item["PK"], Item["SK"])
+        if ConditionExpression and not self._condition(self.items.get(k, {}), ConditionExpression, {}, {}):
+            raise _client_error("ConditionalCheckFailedException")
+        if not k[0].startswith("METRICS_DEDUP#"):
+            self.put_calls += 1
         self.items[k] = Item
         return {"ResponseMetadata": {"HTTPStatusCode": 200}}
 
-    def update_item(self, Key, UpdateExpression=None, ExpressionAttributeValues=None, **kwargs):
-        item = self.get_item(Key).get("Item", {"PK": Key["PK"], "SK": Key["SK"]})
-        if "METRICS_FAILURE_KEYS" in (UpdateExpression or ""):
-            item["METRICS_FAILURE_KEYS"] = ExpressionAttributeValues[":fkeys"]
-            item["METRICS_FAILED_RULES"] = ExpressionAttributeValues[":rules"]
-            item["METRICS_STATUS"] = ExpressionAttributeValues[":status"]
-            item["METRICS_DATE"] = ExpressionAttributeValues[":date"]
-            item["METRICS_PROCESSING_TIME"] = ExpressionAttributeValues[":proc_time"]
-            item["METRICS_IS_PRENOTA"] = ExpressionAttributeValues[":prenota"]
-        self.put_item(item)
+    def delete_item(self, Key, ConditionExpression=None):
+        k = self._key(Key)
+        if ConditionExpression and not self._condition(self.items.get(k, {}), ConditionExpression, {}, {}):
+            raise _client_error("ConditionalCheckFailedException")
+        self.items.pop(k, None)
         return {"ResponseMetadata": {"HTTPStatusCode": 200}}
 
+    def dedup_records(self, date_key):
+        return {
+            sk[len("KEY#"):]: item["PROCESS_ID"]
+            for (pk, sk), item in self.items.items()
+            if pk == f"METRICS_DEDUP#{date_key}"
+        }
+
+    @staticmethod
+    def _path(expr, names):
+        return [names.get(part, part) for part in expr.strip().split(".")]
+
+    @staticmethod
+    def _lookup(item, path):
+        node = item
+        for part in path:
+            if not isinstance(node, dict) or part not in node:
+                return None
+            node = node[part]
+        return node
+
+    @staticmethod
+    def _parent(item, path):
+        node = item
+        for part in path[:-1]:
+            if not isinstance(node, dict) or part not in node:
+                raise _client_error("ValidationException")
+            node = node[part]
+        return node
+
+    def _condition(self, item, cond, names, values):
+        for clause in re.split(r"\s+AND\s+", cond):
+            m = re.fullmatch(r"(attribute_exists|attribute_not_exists)\((.+)\)", clause.strip())
+            if m:
+                exists = self._lookup(item, self._path(m.group(2), names)) is not None
+                if exists != (m.group(1) == "attribute_exists"):
+                    return False
+                continue
+            lhs, op, rhs = re.fullmatch(r"(\S+)\s*(>=|>|<)\s*(\S+)", clause.strip()).groups()
+            current = self._lookup(item, self._path(lhs, names))
+            if current is None:
+                return False
+            if not {">=": operator.ge, ">": operator.gt, "<": operator.lt}[op](current, values[rhs]):
+                return False
+        return True
+
+    def update_item(
+        self,
+        Key,
+        UpdateExpression,
+        ExpressionAttributeNames=None,
+        ExpressionAttributeValues=None,
+        ConditionExpression=None,
+        ReturnValues=None,
+    ):
+        names = ExpressionAttributeNames or {}
+        values = ExpressionAttributeValues or {}
+        k = self._key(Key)
+        exists = k in self.items
+        item = copy.deepcopy(self.items.get(k, {"PK": Key["PK"], "SK": Key["SK"]}))
+        check = item if exists else {}
+        if ConditionExpression and not self._condition(check, ConditionExpression, names, values):
+            raise _client_error("ConditionalCheckFailedException")
+
+        old_item = copy.deepcopy(item)
+        updated_paths = []
+        sections = re.split(r"\b(ADD|SET|REMOVE)\b", UpdateExpression)
+        for section, body in zip(sections[1::2], sections[2::2]):
+            for clause in re.split(r",\s*(?![^()]*\))", body.strip()):
+                if section == "ADD":
+                    target, val = clause.split()
+                    path = self._path(target, names)
+                    updated_paths.append(path)
+                    parent = self._parent(item, path)
+                    parent[path[-1]] = parent.get(path[-1], 0) + values[val]
+                elif section == "SET":
+                    target, rhs = [x.strip() for x in clause.split("=", 1)]
+                    path = self._path(target, names)
+                    updated_paths.append(path)
+                    parent = self._parent(item, path)
+                    m = re.fullmatch(r"if_not_exists\((.+),\s*(:\w+)\)", rhs)
+                    if m:
+                        current = self._lookup(item, self._path(m.group(1), names))
+                        parent[path[-1]] = copy.deepcopy(values[m.group(2)]) if current is None else current
+                    else:
+                        parent[path[-1]] = values[rhs]
+                else:
+                    path = self._path(clause, names)
+                    self._parent(item, path).pop(path[-1], None)
+        self.items[k] = item
+        response = {"ResponseMetadata": {"HTTPStatusCode": 200}}
+        if ReturnValues == "UPDATED_OLD":
+            attributes = {}
+            for path in updated_paths:
+                old = self._lookup(old_item, path)
+                if old is None:
+                    continue
+                node = attributes
+                for part in path[:-1]:
+                    node = node.setdefault(part, {})
+                node[path[-1]] = old
+            response["Attributes"] = attributes
+        return response
+
 
 def test_nf_cnpj_from_parsed_xml_example():
     from update_metrics.handler import _build_failure_keys, _nf_cnpj_from_parsed_xml
@@ -145,7 +260,8 @@ def test_daily_metrics_dedup_same_nf_cnpj_rule_pedido(monkeypatch):
     item = fake.get_item(Key={"PK": "METRICS#2026-05-28", "SK": "SUMMARY"})["Item"]
     assert int(item["failed_count"]) == 1
     assert int(item["failed_rules"]["validar_produtos"]) == 1
-    assert len(item["failure_dedup_registry"]) == 1
+    assert fake.dedup_records("2026-05-28") == {key: "p1"}
+    assert "failure_dedup_registry" not in item
 
 
 def test_daily_metrics_dedup_distinct_pedido_counts_separately(monkeypatch):
@@ -328,3 +444,140 @@ def test_decrement_daily_metrics_removes_failure_keys(monkeypatch):
     item = fake.get_item(Key={"PK": "METRICS#2026-05-28", "SK": "SUMMARY"})["Item"]
     assert int(item["failed_count"]) == 0
     assert int(item["failed_rules"].get("Outros", 0)) == 0
+    assert fake.dedup_records("2026-05-28") == {}
+
+
+def test_metrics_counters_use_atomic_updates_without_put(monkeypatch):
+    import update_metrics.handler as h
+
+    fake = _FakeTable()
+    monkeypatch.setattr(h, "table", fake)
+
+    for _ in range(2):
+        h.update_daily_metrics(
+            "2026-05-28", "SUCCESS", 10, None, 11, "AGROQUIMICOS", [], [], "p1", True,
+            operacional_failed_rules=["OP_1", "OP_1"],
+        )
+        h.update_monthly_metrics("2026-05", "SUCCESS", 10, "AGROQUIMICOS", True)
+
+    day = fake.get_item(Key={"PK": "METRICS#2026-05-28", "SK": "SUMMARY"})["Item"]
+    assert fake.put_calls == 0
+    assert int(day["total_count"]) == 2
+    assert int(day["success_prenota_count"]) == 2
+    assert int(day["failed_count"]) == 0
+    assert int(day["processes_by_hour"]["11"]) == 2
+    assert int(day["processes_by_type"]["AGROQUIMICOS"]) == 2
+    assert int(day["failed_rules_operacional"]["OP_1"]) == 4
+    assert "failure_dedup_registry" not in day
+    month = fake.get_item(Key={"PK": "METRICS#2026-05", "SK": "MONTHLY_SUMMARY"})["Item"]
+    assert int(month["success_count"]) == 2
+    assert int(month["processes_by_type"]["AGROQUIMICOS"]) == 2
+
+
+def test_summary_missing_maps_gets_them_created(monkeypatch):
+    import update_metrics.handler as h
+
+    fake = _FakeTable()
+    fake.items[("METRICS#2026-05-28", "SUMMARY")] = {
+        "PK": "METRICS#2026-05-28", "SK": "SUMMARY", "total_count": 5, "failed_count": 2,
+        "processes_by_type": {"SEMENTES": 5},
+    }
+    monkeypatch.setattr(h, "table", fake)
+
+    r = h.update_daily_metrics(
+        "2026-05-28", "FAILED", 10, "VALIDATION_FAILED", 9, "SEMENTES",
+        ["validar_produtos"], ["NF1|CNPJ|validar_produtos|PED"], "p1", False,
+    )
+    item = fake.get_item(Key={"PK": "METRICS#2026-05-28", "SK": "SUMMARY"})["Item"]
+    assert r["dedup_role"] == "primary"
+    assert int(item["total_count"]) == 6
+    assert int(item["failed_count"]) == 3
+    assert int(item["failed_rules"]["validar_produtos"]) == 1
+    assert int(item["processes_by_type"]["SEMENTES"]) == 6
+    assert fake.dedup_records("2026-05-28") == {"NF1|CNPJ|validar_produtos|PED": "p1"}
+
+
+def test_legacy_registry_in_summary_still_deduplicates(monkeypatch):
+    import update_metrics.handler as h
+
+    key = "NF1|CNPJ|validar_produtos|PED"
+    fake = _FakeTable()
+    fake.items[("METRICS#2026-05-28", "SUMMARY")] = {
+        "PK": "METRICS#2026-05-28", "SK": "SUMMARY", "total_count": 1, "failed_count": 1,
+        "failed_rules": {"validar_produtos": 1}, "failure_dedup_registry": {key: "p0"},
+    }
+    monkeypatch.setattr(h, "table", fake)
+
+    r = h.update_daily_metrics(
+        "2026-05-28", "FAILED", 10, "VALIDATION_FAILED", 9, "SEMENTES",
+        ["validar_produtos"], [key], "p1", False,
+    )
+    item = fake.get_item(Key={"PK": "METRICS#2026-05-28", "SK": "SUMMARY"})["Item"]
+    assert r["dedup_role"] == "duplicate"
+    assert r["primary_process_id"] == "p0"
+    assert int(item["failed_count"]) == 1
+    assert fake.dedup_records("2026-05-28") == {}
+
+    h.decrement_daily_metrics("2026-05-28", "FAILED", "SEMENTES", [], [key], 0, False)
+    item = fake.get_item(Key={"PK": "METRICS#2026-05-28", "SK": "SUMMARY"})["Item"]
+    assert int(item["failed_count"]) == 0
+    assert item["failure_dedup_registry"] == {}
+
+
+def test_decrements_never_go_below_zero(monkeypatch):
+    import update_metrics.handler as h
+
+    fake = _FakeTable()
+    monkeypatch.setattr(h, "table", fake)
+
+    h.update_daily_metrics("2026-05-28", "SUCCESS", 5, None, 11, "SEMENTES", [], [], "p1", False)
+    h.update_monthly_metrics("2026-05", "SUCCESS", 5, "SEMENTES", False)
+    h.decrement_daily_metrics("2026-05-28", "SUCCESS", "SEMENTES", [], [], 30, True)
+    h.decrement_monthly_metrics("2026-05", "SUCCESS", "SEMENTES", 30, True)
+
+    day = fake.get_item(Key={"PK": "METRICS#2026-05-28", "SK": "SUMMARY"})["Item"]
+    assert int(day["total_count"]) == 0
+    assert int(day["success_count"]) == 0
+    assert int(day["success_prenota_count"]) == 0
+    assert day["total_time"] == 0
+    assert int(day["processes_by_type"]["SEMENTES"]) == 0
+    month = fake.get_item(Key={"PK": "METRICS#2026-05", "SK": "MONTHLY_SUMMARY"})["Item"]
+    assert int(month["total_count"]) == 0
+    assert month["total_time"] == 0
+
+    h.decrement_daily_metrics("2026-06-01", "SUCCESS", "SEMENTES", [], [], 30, False)
+    assert ("METRICS#2026-06-01", "SUMMARY") not in fake.items
+
+
+def test_daily_deltas_are_mirrored_to_week_and_month_rollups(monkeypatch):
+    import update_metrics.handler as h
+
+    fake = _FakeTable()
+    monkeypatch.setattr(h, "table", fake)
+
+    key = "NF27|07467822000126|validar_produtos|PED001"
+    h.update_daily_metrics(
+        "2026-05-28", "FAILED", 10, "VALIDATION_FAILED", 11, "AGROQUIMICOS",
+        ["validar_produtos"], [key], "p1", False,
+    )
+    h.update_daily_metrics(
+        "2026-05-29", "SUCCESS", 20, None, 11, "SEMENTES", [], [], "p2", False,
+    )
+    week = fake.get_item(Key={"PK": "METRICS#2026-W22", "SK": "WEEK_ROLLUP"})["Item"]
+    month = fake.get_item(Key={"PK": "METRICS#2026-05", "SK": "MONTH_ROLLUP"})["Item"]
+    for rollup in (week, month):
+        assert int(rollup["total_count"]) == 2
+        assert int(rollup["failed_count"]) == 1
+        assert int(rollup["success_count"]) == 1
+        assert rollup["total_time"] == 30
+        assert rollup["failed_rules"] == {"validar_produtos": 1}
+        assert rollup["processes_by_type"] == {"AGROQUIMICOS": 1, "SEMENTES": 1}
+        assert "processes_by_hour" not in rollup
+
+    h.decrement_daily_metrics("2026-05-28", "FAILED", "AGROQUIMICOS", [], [key], 25, False, "VALIDATION_FAILED")
+    month = fake.get_item(Key={"PK": "METRICS#2026-05", "SK": "MONTH_ROLLUP"})["Item"]
+    assert int(month["total_count"]) == 1
+    assert int(month["failed_count"]) == 0
+    assert month["failed_rules"] == {"validar_produtos": 0}
+    # total_time do dia era 10: o clamp desconta só 10 do rollup
+    assert month["total_time"] == 20
@@ -1,7 +1,13 @@
 """Detecção de pré-nota Protheus para métricas de dashboard."""
 
+import sys
+from pathlib import Path
+
 import pytest
 
+# lambdas/ antes de src/: update_metrics importa utils.* da Lambda
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "lambdas"))
+
 
 @pytest.fixture(autouse=True)
 def _env(monkeypatch):
@@ -50,3 +56,17 @@ def test_prenota_fallback_metadata_json_string():
         "protheus_response": '{"message": "Documento de entrada criado como pré-nota devido a X."}'
     }
     assert protheus_response_indicates_prenota({}, meta) is True
+
+
+def test_prenota_fallback_metadata_binary_comprimido():
+    """METADATA lido por scan cru (scripts de backfill): protheus_response ainda em Binary."""
+    import json
+
+    from boto3.dynamodb.types import Binary
+    from update_metrics.handler import protheus_response_indicates_prenota
+    from utils.json_codec import encode_attribute
+
+    body = {"message": "Documento de entrada criado como pré-nota devido a X.", "log": ["linha"] * 200}
+    encoded = encode_attribute(json.dumps(body, ensure_ascii=False))
+    assert isinstance(encoded, Binary)
+    assert protheus_response_indicates_prenota({}, {"protheus_response": encoded}) is True
@@ -14,10 +14,12 @@ import os
 import pytest
 from unittest.mock import patch, MagicMock
 
-# Setup path so rule modules resolve
-_rules_dir = os.path.join(os.path.dirname(__file__), "..", "lambdas", "validate_rules")
+# Setup path so rule modules resolve (lambdas/ antes de src/: rules importa utils.* da Lambda)
+_lambdas_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "lambdas"))
+sys.path.insert(0, _lambdas_dir)
+_rules_dir = os.path.join(_lambdas_dir, "validate_rules")
 if _rules_dir not in sys.path:
-    sys.path.insert(0, os.path.abspath(_rules_dir))
+    sys.path.insert(0, _rules_dir)
 
 
 # ─── Fixtures ────────────────────────────────────────────────────────────────
@@ -115,7 +117,8 @@ def _deep_merge(base, override):
 
 @pytest.fixture(autouse=True)
 def mock_bedrock():
-    with patch("rules.utils.compare_with_bedrock") as m:
+    with patch("rules.utils.compare_with_bedrock") as m, \
+         patch("rules.utils.prefetch_product_comparisons", return_value=0):
         m.return_value = {"status": "MATCH", "bedrock": {"explicacao": "mock"}}
         yield m
 
@@ -47,6 +47,7 @@ let API_URL = normalizeApiUrl(localStorage.getItem('apiUrl') || window.ENV?.API_
 let API_KEY = localStorage.getItem('apiKey') || window.ENV?.API_KEY;
 let selectedProcess = null;
 let refreshInterval = null;
+let processListCursor = null;
 let currentPage = 'dashboard';
 let dailyProcessesChart, successErrorRateChart, hourlyChart, errorChart, typeChart, failedRulesChart, failedRulesByDayChart;
 let regrasLabelsCatalog = null;
@@ -1299,6 +1300,7 @@ async function loadProcesses(silent = false) {
             `;
         }
         
+        processListCursor = null;
         const response = await fetch(`${API_URL}/process/`, {
             headers: getAuthHeaders()
         });
@@ -1330,99 +1332,147 @@ async function loadProcesses(silent = false) {
             return;
         }
 
-        list.innerHTML = data.processes.map(p => {
-            const createdDate = new Date(parseInt(p.created_at) * 1000);
-            const now = new Date();
-            const diffMs = now - createdDate;
-            const diffMins = Math.floor(diffMs / 60000);
-            const diffHours = Math.floor(diffMs / 3600000);
-            const diffDays = Math.floor(diffMs / 86400000);
-            
-            let timeAgo = '';
-            if (diffMins < 1) {
-                timeAgo = 'Agora mesmo';
-            } else if (diffMins < 60) {
-                timeAgo = `${diffMins} min${diffMins > 1 ? 's' : ''} atrás`;
-            } else if (diffHours < 24) {
-                timeAgo = `${diffHours} hora${diffHours > 1 ? 's' : ''} atrás`;
-            } else if (diffDays < 7) {
-                timeAgo = `${diffDays} dia${diffDays > 1 ? 's' : ''} atrás`;
-            } else {
-                timeAgo = createdDate.toLocaleDateString('pt-BR');
-            }
-            
-            const statusIcon = {
-                'CREATED': '📝',
-                'PROCESSING': '⏳',
-                'COMPLETED': '✅',
-                'SUCCESS': '✅',
-                'VALIDATED': '✅',
-                'FAILED': '❌',
-                'VALIDATION_FAILURE': '⚠️'
-            }[p.status] || '📄';
-            
-            const processTypeLabel = {
-                'AGROQUIMICOS': '🧪 Agroquímicos',
-                'BARTER': '🌾 Barter (Commodities)',
-                'USOCONSUMO': '📋 Uso e consumo',
-                'SEMENTES': '🌱 Sementes',
-                'FERTILIZANTES': '💊 Fertilizantes'
-            }[p.process_type] || `📦 ${p.process_type || 'N/A'}`;
-            
-            const statusColor = {
-                'CREATED': '#6b7280',
-                'PROCESSING': '#f59e0b',
-                'COMPLETED': '#10b981',
-                'SUCCESS': '#10b981',
-                'VALIDATED': '#10b981',
-                'FAILED': '#ef4444',
-                'VALIDATION_FAILURE': '#f59e0b'
-            }[p.status] || '#6b7280';
-            
-            const dedupBadge = metricsDedupBadgeHtml(p);
-
-            return `
-                <div class="process-item ${p.status === 'FAILED' || p.status === 'VALIDATION_FAILURE' ? 'failed' : ''}" onclick="selectProcess('${p.process_id}')">
-                    <div class="process-item-header">
-                        <div class="process-item-icon" style="background: ${statusColor}20; color: ${statusColor};">
-                            ${statusIcon}
-                        </div>
-                        <div class="process-item-title">
-                            <h3>${processTypeLabel}</h3>
-                            <p class="process-id">${p.process_id}</p>
-                            ${dedupBadge}
-                        </div>
-                    </div>
-                    <div class="process-item-body">
-                        <div class="process-info-row">
-                            <span class="info-label">📅 Criado:</span>
-                            <span class="info-value">${createdDate.toLocaleString('pt-BR', { 
-                                day: '2-digit', 
-                                month: '2-digit', 
-                                year: 'numeric',
-                                hour: '2-digit',
-                                minute: '2-digit'
-                            })}</span>
-                        </div>
-                        <div class="process-info-row">
-                            <span class="info-label">⏱️ Há:</span>
-                            <span class="info-value">${timeAgo}</span>
-                        </div>
-                    </div>
-                    <div class="process-item-footer">
-                        <span class="status-badge ${p.status.toLowerCase().replace(/_/g, '-')}" style="background: ${statusColor}20; color: ${statusColor}; border-color: ${statusColor};">
-                            ${p.status.replace(/_/g, ' ')}
-                        </span>
-                    </div>
-                </div>
-            `;
-        }).join('');
+        list.innerHTML = data.processes.map(processItemHtml).join('');
+        processListCursor = data.next_cursor || null;
+        renderLoadMoreProcesses(list);
 
     } catch (error) {
         console.error('Erro ao carregar processos:', error);
     }
 }
 
+// GET /process devolve uma página (mais recentes primeiro) + next_cursor para a seguinte
+async function loadMoreProcesses() {
+    const list = document.getElementById('processesList');
+    if (!list || !processListCursor) {
+        return;
+    }
+    const button = document.getElementById('loadMoreProcessesBtn');
+    if (button) {
+        button.disabled = true;
+        button.textContent = 'Carregando...';
+    }
+    try {
+        const response = await fetch(`${API_URL}/process/?cursor=${encodeURIComponent(processListCursor)}`, {
+            headers: getAuthHeaders()
+        });
+        if (!response.ok) throw new Error('Falha ao carregar mais processos');
+
+        const data = await response.json();
+        document.getElementById('loadMoreProcesses')?.remove();
+        list.insertAdjacentHTML('beforeend', data.processes.map(processItemHtml).join(''));
+        processListCursor = data.next_cursor || null;
+        renderLoadMoreProcesses(list);
+    } catch (error) {
+        console.error('Erro ao carregar mais processos:', error);
+        showToast('Erro ao carregar mais processos', 'error');
+        if (button) {
+            button.disabled = false;
+            button.textContent = 'Carregar mais';
+        }
+    }
+}
+
+function renderLoadMoreProcesses(list) {
+    document.getElementById('loadMoreProcesses')?.remove();
+    if (!processListCursor) {
+        return;
+    }
+    list.insertAdjacentHTML('beforeend', `
+        <div id="loadMoreProcesses" style="grid-column: 1 / -1; text-align: center; padding: 20px;">
+            <button id="loadMoreProcessesBtn" class="btn-secondary" onclick="loadMoreProcesses()">Carregar mais</button>
+        </div>
+    `);
+}
+
+function processItemHtml(p) {
+    const createdDate = new Date(parseInt(p.created_at) * 1000);
+    const now = new Date();
+    const diffMs = now - createdDate;
+    const diffMins = Math.floor(diffMs / 60000);
+    const diffHours = Math.floor(diffMs / 3600000);
+    const diffDays = Math.floor(diffMs / 86400000);
+    
+    let timeAgo = '';
+    if (diffMins < 1) {
+        timeAgo = 'Agora mesmo';
+    } else if (diffMins < 60) {
+        timeAgo = `${diffMins} min${diffMins > 1 ? 's' : ''} atrás`;
+    } else if (diffHours < 24) {
+        timeAgo = `${diffHours} hora${diffHours > 1 ? 's' : ''} atrás`;
+    } else if (diffDays < 7) {
+        timeAgo = `${diffDays} dia${diffDays > 1 ? 's' : ''} atrás`;
+    } else {
+        timeAgo = createdDate.toLocaleDateString('pt-BR');
+    }
+    
+    const statusIcon = {
+        'CREATED': '📝',
+        'PROCESSING': '⏳',
+        'COMPLETED': '✅',
+        'SUCCESS': '✅',
+        'VALIDATED': '✅',
+        'FAILED': '❌',
+        'VALIDATION_FAILURE': '⚠️'
+    }[p.status] || '📄';
+    
+    const processTypeLabel = {
+        'AGROQUIMICOS': '🧪 Agroquímicos',
+        'BARTER': '🌾 Barter (Commodities)',
+        'USOCONSUMO': '📋 Uso e consumo',
+        'SEMENTES': '🌱 Sementes',
+        'FERTILIZANTES': '💊 Fertilizantes'
+    }[p.process_type] || `📦 ${p.process_type || 'N/A'}`;
+    
+    const statusColor = {
+        'CREATED': '#6b7280',
+        'PROCESSING': '#f59e0b',
+        'COMPLETED': '#10b981',
+        'SUCCESS': '#10b981',
+        'VALIDATED': '#10b981',
+        'FAILED': '#ef4444',
+        'VALIDATION_FAILURE': '#f59e0b'
+    }[p.status] || '#6b7280';
+    
+    const dedupBadge = metricsDedupBadgeHtml(p);
+
+    return `
+        <div class="process-item ${p.status === 'FAILED' || p.status === 'VALIDATION_FAILURE' ? 'failed' : ''}" onclick="selectProcess('${p.process_id}')">
+            <div class="process-item-header">
+                <div class="process-item-icon" style="background: ${statusColor}20; color: ${statusColor};">
+                    ${statusIcon}
+                </div>
+                <div class="process-item-title">
+                    <h3>${processTypeLabel}</h3>
+                    <p class="process-id">${p.process_id}</p>
+                    ${dedupBadge}
+                </div>
+            </div>
+            <div class="process-item-body">
+                <div class="process-info-row">
+                    <span class="info-label">📅 Criado:</span>
+                    <span class="info-value">${createdDate.toLocaleString('pt-BR', { 
+                        day: '2-digit', 
+                        month: '2-digit', 
+                        year: 'numeric',
+                        hour: '2-digit',
+                        minute: '2-digit'
+                    })}</span>
+                </div>
+                <div class="process-info-row">
+                    <span class="info-label">⏱️ Há:</span>
+                    <span class="info-value">${timeAgo}</span>
+                </div>
+            </div>
+            <div class="process-item-footer">
+                <span class="status-badge ${p.status.toLowerCase().replace(/_/g, '-')}" style="background: ${statusColor}20; color: ${statusColor}; border-color: ${statusColor};">
+                    ${p.status.replace(/_/g, ' ')}
+                </span>
+            </div>
+        </div>
+    `;
+}
+
 async function selectProcess(processId, silent = false) {
     try {
         const response = await fetch(`${API_URL}/process/${processId}`, {
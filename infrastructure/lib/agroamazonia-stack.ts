@@ -7,6 +7,7 @@ import * as tasks from 'aws-cdk-lib/aws-stepfunctions-tasks';
 import * as iam from 'aws-cdk-lib/aws-iam';
 import * as s3n from 'aws-cdk-lib/aws-s3-notifications';
 import * as sns from 'aws-cdk-lib/aws-sns';
+import * as snsSubs from 'aws-cdk-lib/aws-sns-subscriptions';
 import * as ec2 from 'aws-cdk-lib/aws-ec2';
 import * as logs from 'aws-cdk-lib/aws-logs';
 import { Construct } from 'constructs';
@@ -179,10 +180,29 @@ export class AgroAmazoniaStack extends cdk.Stack {
       sortKey: { name: 'SK', type: dynamodb.AttributeType.STRING },
       billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
       pointInTimeRecovery: true,
+      // Itens com validade (ex.: OCR_CACHE#): o DynamoDB remove após EXPIRES_AT (epoch segundos)
+      timeToLiveAttribute: 'EXPIRES_AT',
       removalPolicy: cdk.RemovalPolicy.RETAIN,
       deletionProtection: true
     });
 
+    // GSI esparso da listagem de processos: só itens METADATA com LIST_PK/LIST_SK
+    // (LIST_SK = timestamp de criação + process_id) — uma página custa uma Query.
+    documentTable.addGlobalSecondaryIndex({
+      indexName: 'ProcessListIndex',
+      partitionKey: { name: 'LIST_PK', type: dynamodb.AttributeType.STRING },
+      sortKey: { name: 'LIST_SK', type: dynamodb.AttributeType.STRING },
+      projectionType: dynamodb.ProjectionType.INCLUDE,
+      nonKeyAttributes: [
+        'STATUS',
+        'PROCESS_TYPE',
+        'TIMESTAMP',
+        'METRICS_FAILURE_DEDUP_ROLE',
+        'METRICS_FAILURE_DEDUP_PRIMARY',
+        'METRICS_FAILURE_KEYS'
+      ]
+    });
+
     // Lambda: Notificação de Recebimento
     const notifyReceiptLambda = new lambda.Function(this, 'NotifyReceiptFunction', {
       functionName: name('lambda', 'notify-receipt'),
@@ -237,6 +257,7 @@ export class AgroAmazoniaStack extends cdk.Stack {
       }),
       environment: {
         TABLE_NAME: documentTable.tableName,
+        BLOB_BUCKET: rawDocumentsBucket.bucketName,
         BEDROCK_MODEL_ID: process.env.BEDROCK_MODEL_ID || 'amazon.nova-pro-v1:0'
       },
       timeout: cdk.Duration.minutes(5),
@@ -246,6 +267,8 @@ export class AgroAmazoniaStack extends cdk.Stack {
     });
 
     documentTable.grantReadWriteData(validateRulesLambda);
+    // Atributos grandes (PARSED_DATA, MERGED_DATA…) descarregados em blobs/ (utils/blob_store)
+    rawDocumentsBucket.grantReadWrite(validateRulesLambda, 'blobs/*');
     validateRulesLambda.addToRolePolicy(new iam.PolicyStatement({
       actions: ['bedrock:InvokeModel'],
       resources: ['*']
@@ -317,6 +340,7 @@ export class AgroAmazoniaStack extends cdk.Stack {
       }),
       environment: {
         TABLE_NAME: documentTable.tableName,
+        BLOB_BUCKET: rawDocumentsBucket.bucketName,
         PROTHEUS_SECRET_ID: protheusSecretId,
         PROTHEUS_API_URL: protheusUrl,
         PROTHEUS_TIMEOUT: '100', // Timeout em segundos
@@ -335,6 +359,7 @@ export class AgroAmazoniaStack extends cdk.Stack {
     });
 
     documentTable.grantReadWriteData(sendToProtheusLambda);
+    rawDocumentsBucket.grantRead(sendToProtheusLambda, 'blobs/*');
     sendToProtheusLambda.addToRolePolicy(new iam.PolicyStatement({
       actions: ['bedrock:InvokeModel'],
       resources: ['*']
@@ -372,6 +397,7 @@ export class AgroAmazoniaStack extends cdk.Stack {
       }),
       environment: {
         TABLE_NAME: documentTable.tableName,
+        BLOB_BUCKET: rawDocumentsBucket.bucketName,
         BEDROCK_MODEL_ID: process.env.BEDROCK_MODEL_ID || 'amazon.nova-pro-v1:0'
       },
       timeout: cdk.Duration.seconds(30),
@@ -381,6 +407,7 @@ export class AgroAmazoniaStack extends cdk.Stack {
     });
 
     documentTable.grantReadWriteData(updateMetricsLambda);
+    rawDocumentsBucket.grantRead(updateMetricsLambda, 'blobs/*');
 
     // Lambda: Notify Success - Busca dados, Bedrock summary, feedback API e SNS (mesmo payload que send_feedback)
     const notifySuccessLambda = new lambda.Function(this, 'NotifySuccessFunction', {
@@ -465,7 +492,15 @@ export class AgroAmazoniaStack extends cdk.Stack {
       functionName: name('lambda', 'parse-xml'),
       runtime: lambda.Runtime.PYTHON_3_12,
       handler: 'handler.handler',
-      code: lambda.Code.fromAsset('../backend/lambdas/parse_xml'),
+      code: lambda.Code.fromAsset(path.join(__dirname, '../../backend/lambdas'), {
+        bundling: {
+          image: lambda.Runtime.PYTHON_3_12.bundlingImage,
+          command: [
+            'bash', '-c',
+            'cd parse_xml && cp -au . /asset-output/ && cp -au ../utils /asset-output/utils',
+          ],
+        },
+      }),
       environment: {
         TABLE_NAME: documentTable.tableName,
         BUCKET_NAME: rawDocumentsBucket.bucketName
@@ -478,6 +513,7 @@ export class AgroAmazoniaStack extends cdk.Stack {
 
     documentTable.grantReadWriteData(parseXmlLambda);
     rawDocumentsBucket.grantRead(parseXmlLambda);
+    rawDocumentsBucket.grantWrite(parseXmlLambda, 'blobs/*');
 
     // Lambda: Extract Documents (Textract on non-XML files — multi-anexo)
     const extractDocumentsLambda = new lambda.Function(this, 'ExtractDocumentsFunction', {
@@ -507,6 +543,7 @@ export class AgroAmazoniaStack extends cdk.Stack {
 
     documentTable.grantReadWriteData(extractDocumentsLambda);
     rawDocumentsBucket.grantRead(extractDocumentsLambda);
+    rawDocumentsBucket.grantWrite(extractDocumentsLambda, 'blobs/*');
     extractDocumentsLambda.addToRolePolicy(new iam.PolicyStatement({
       actions: [
         'textract:AnalyzeDocument',
@@ -521,6 +558,64 @@ export class AgroAmazoniaStack extends cdk.Stack {
       resources: [rawDocumentsBucket.arnForObjects('*')]
     }));
 
+    // Modo callback do Textract assíncrono (opt-in): o job publica a conclusão num tópico SNS na região
+    // do Textract (us-east-1, criado fora desta stack) e a Lambda de conclusão devolve o task token do
+    // Map — nenhuma Lambda fica em poll. Sem o tópico, o Map segue com poll + Wait/retomada.
+    const textractCompletionTopicArn =
+      this.node.tryGetContext('textractCompletionTopicArn') || process.env.TEXTRACT_COMPLETION_TOPIC_ARN || '';
+    const textractCallbackMode = Boolean(textractCompletionTopicArn);
+    if (textractCallbackMode) {
+      const textractCompletionTopic = sns.Topic.fromTopicArn(this, 'TextractCompletionTopic', textractCompletionTopicArn);
+      const textractNotificationRole = new iam.Role(this, 'TextractNotificationRole', {
+        assumedBy: new iam.ServicePrincipal('textract.amazonaws.com'),
+        description: 'Textract publica a conclusão de StartDocumentAnalysis no tópico de callback'
+      });
+      textractCompletionTopic.grantPublish(textractNotificationRole);
+
+      extractDocumentsLambda.addEnvironment('TEXTRACT_COMPLETION_TOPIC_ARN', textractCompletionTopicArn);
+      extractDocumentsLambda.addEnvironment('TEXTRACT_NOTIFICATION_ROLE_ARN', textractNotificationRole.roleArn);
+      textractNotificationRole.grantPassRole(extractDocumentsLambda.grantPrincipal);
+
+      const textractCompletionLambda = new lambda.Function(this, 'TextractCompletionFunction', {
+        functionName: name('lambda', 'textract-completion'),
+        runtime: lambda.Runtime.PYTHON_3_12,
+        handler: 'completion.handler',
+        code: lambda.Code.fromAsset(path.join(__dirname, '../../backend/lambdas'), {
+          bundling: {
+            image: lambda.Runtime.PYTHON_3_12.bundlingImage,
+            command: [
+              'bash', '-c',
+              'cd extract_documents && pip install -r requirements.txt -t /asset-output && cp -au . /asset-output/ && cp -au ../utils /asset-output/utils',
+            ],
+          },
+        }),
+        environment: {
+          TABLE_NAME: documentTable.tableName,
+          BUCKET_NAME: rawDocumentsBucket.bucketName,
+          TEXTRACT_REGION: 'us-east-1',
+        },
+        timeout: cdk.Duration.minutes(5),
+        memorySize: 1024,
+        logRetention: logs.RetentionDays.TWO_WEEKS,
+        ...vpcConfig
+      });
+      documentTable.grantReadWriteData(textractCompletionLambda);
+      rawDocumentsBucket.grantWrite(textractCompletionLambda, 'blobs/*');
+      textractCompletionLambda.addToRolePolicy(new iam.PolicyStatement({
+        actions: ['textract:GetDocumentAnalysis'],
+        resources: ['*']
+      }));
+      textractCompletionTopic.addSubscription(new snsSubs.LambdaSubscription(textractCompletionLambda));
+
+      // Token do Map (waitForTaskToken): ARN da state machine criaria dependência circular com as Lambdas.
+      for (const fn of [extractDocumentsLambda, textractCompletionLambda]) {
+        fn.addToRolePolicy(new iam.PolicyStatement({
+          actions: ['states:SendTaskSuccess', 'states:SendTaskFailure'],
+          resources: ['*']
+        }));
+      }
+    }
+
     // Lambda: Merge Extractions (unify XML + Textract into canonical JSON)
     const mergeExtractionsLambda = new lambda.Function(this, 'MergeExtractionsFunction', {
       functionName: name('lambda', 'merge-extractions'),
@@ -536,7 +631,8 @@ export class AgroAmazoniaStack extends cdk.Stack {
         },
       }),
       environment: {
-        TABLE_NAME: documentTable.tableName
+        TABLE_NAME: documentTable.tableName,
+        BLOB_BUCKET: rawDocumentsBucket.bucketName
       },
       timeout: cdk.Duration.minutes(2),
       memorySize: 256,
@@ -545,6 +641,7 @@ export class AgroAmazoniaStack extends cdk.Stack {
     });
 
     documentTable.grantReadWriteData(mergeExtractionsLambda);
+    rawDocumentsBucket.grantReadWrite(mergeExtractionsLambda, 'blobs/*');
 
     // Lambda: listar FILE# para Step Functions Map (xml / textract / skip)
     const listAttachmentsLambda = new lambda.Function(this, 'ListAttachmentsFunction', {
@@ -604,6 +701,7 @@ export class AgroAmazoniaStack extends cdk.Stack {
       }),
       environment: {
         TABLE_NAME: documentTable.tableName,
+        BLOB_BUCKET: rawDocumentsBucket.bucketName,
         BEDROCK_MODEL_ID: process.env.BEDROCK_MODEL_ID || 'amazon.nova-pro-v1:0'
       },
       timeout: cdk.Duration.minutes(3),
@@ -613,6 +711,7 @@ export class AgroAmazoniaStack extends cdk.Stack {
     });
 
     documentTable.grantReadWriteData(bedrockExtractFieldsLambda);
+    rawDocumentsBucket.grantReadWrite(bedrockExtractFieldsLambda, 'blobs/*');
     bedrockExtractFieldsLambda.addToRolePolicy(new iam.PolicyStatement({
       actions: ['bedrock:InvokeModel'],
       resources: ['*']
@@ -641,7 +740,15 @@ export class AgroAmazoniaStack extends cdk.Stack {
       functionName: name('lambda', 's3-upload-handler'),
       runtime: lambda.Runtime.PYTHON_3_12,
       handler: 'handler.handler',
-      code: lambda.Code.fromAsset('../backend/lambdas/s3_upload_handler'),
+      code: lambda.Code.fromAsset(path.join(__dirname, '../../backend/lambdas'), {
+        bundling: {
+          image: lambda.Runtime.PYTHON_3_12.bundlingImage,
+          command: [
+            'bash', '-c',
+            'cd s3_upload_handler && cp -au . /asset-output/ && cp -au ../utils /asset-output/utils',
+          ],
+        },
+      }),
       environment: {
         TABLE_NAME: documentTable.tableName,
         BEDROCK_MODEL_ID: process.env.BEDROCK_MODEL_ID || 'amazon.nova-pro-v1:0'
@@ -717,20 +824,73 @@ export class AgroAmazoniaStack extends cdk.Stack {
       resultPath: '$'
     });
 
-    const extractTextractSingleTask = new tasks.LambdaInvoke(attachmentsMap, 'ExtractTextractSingle', {
-      stateName: 'MapItem_TextractOCR',
-      comment: 'Iteração Map: PDF/imagem → Textract; .txt → leitura UTF-8 no S3 (mesmo item TEXTRACT#).',
+    const extractTextractPayload: Record<string, any> = {
+      'process_id.$': '$.process_id',
+      'file_name.$': '$.attachment.file_name',
+      'file_key.$': '$.attachment.file_key',
+      'file_sk.$': '$.attachment.file_sk'
+    };
+    // Modo callback: a iteração espera o task token (devolvido pela própria Lambda nos casos síncronos
+    // ou pela textract-completion quando o job assíncrono termina).
+    const extractTextractSingleTask = textractCallbackMode
+      ? new tasks.LambdaInvoke(attachmentsMap, 'ExtractTextractSingle', {
+          stateName: 'MapItem_TextractOCR',
+          comment: 'Iteração Map: PDF/imagem → Textract (callback SNS + task token); .txt → leitura UTF-8 no S3.',
+          lambdaFunction: extractDocumentsLambda,
+          integrationPattern: sfn.IntegrationPattern.WAIT_FOR_TASK_TOKEN,
+          payload: sfn.TaskInput.fromObject({
+            ...extractTextractPayload,
+            'task_token': sfn.JsonPath.taskToken
+          }),
+          taskTimeout: sfn.Timeout.duration(cdk.Duration.hours(1)),
+          resultPath: '$'
+        })
+      : new tasks.LambdaInvoke(attachmentsMap, 'ExtractTextractSingle', {
+          stateName: 'MapItem_TextractOCR',
+          comment: 'Iteração Map: PDF/imagem → Textract; .txt → leitura UTF-8 no S3 (mesmo item TEXTRACT#).',
+          lambdaFunction: extractDocumentsLambda,
+          payload: sfn.TaskInput.fromObject(extractTextractPayload),
+          outputPath: '$.Payload',
+          resultPath: '$'
+        });
+
+    // Textract assíncrono que não termina no tempo da Lambda devolve textract_pending + textract_job_id:
+    // espera e reinvoca com o mesmo job (sem novo StartDocumentAnalysis) até concluir.
+    const resumeTextractTask = new tasks.LambdaInvoke(attachmentsMap, 'ResumeTextractSingle', {
+      stateName: 'MapItem_TextractRetomarJob',
+      comment: 'Iteração Map: retoma o poll do job Textract assíncrono (todas as páginas via NextToken).',
       lambdaFunction: extractDocumentsLambda,
       payload: sfn.TaskInput.fromObject({
         'process_id.$': '$.process_id',
         'file_name.$': '$.attachment.file_name',
         'file_key.$': '$.attachment.file_key',
-        'file_sk.$': '$.attachment.file_sk'
+        'file_sk.$': '$.attachment.file_sk',
+        'textract_job_id.$': '$.textract_job_id'
       }),
       outputPath: '$.Payload',
       resultPath: '$'
     });
 
+    const waitTextractJob = new sfn.Wait(attachmentsMap, 'WaitTextractJob', {
+      stateName: 'MapItem_AguardarJobTextract',
+      time: sfn.WaitTime.duration(cdk.Duration.seconds(20))
+    });
+
+    const textractPendingChoice = new sfn.Choice(attachmentsMap, 'TextractJobPending', {
+      stateName: 'MapItem_TextractPendente'
+    })
+      .when(
+        sfn.Condition.and(
+          sfn.Condition.isPresent('$.textract_pending'),
+          sfn.Condition.booleanEquals('$.textract_pending', true)
+        ),
+        waitTextractJob.next(resumeTextractTask)
+      )
+      .otherwise(new sfn.Pass(attachmentsMap, 'TextractDone', { stateName: 'MapItem_TextractConcluido' }));
+
+    extractTextractSingleTask.next(textractPendingChoice);
+    resumeTextractTask.next(textractPendingChoice);
+
     const rejectUnsupportedTask = new tasks.LambdaInvoke(attachmentsMap, 'RejectUnsupportedAttachment', {
       stateName: 'MapItem_RejeitarSemOCR',
       comment: 'Iteração Map: DOCX etc. → REJECTED no FILE#, sem Textract.',